@@ -2,6 +2,7 @@
 
 import sys
 import os
+import threading
 import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -68,13 +69,13 @@ from config.utils import (
     is_url_summarization_request,
     is_pdf_url,
     is_pdf_summarization_request,
-    fetch_webpage_content,
+    fetch_webpage,
     fetch_pdf_text,
     analyze_youtube_with_gemini,
-    extract_webpage_metadata,
     is_image_analysis_request,
     is_pdf_analysis_request,
     create_summary,
+    classify_request,
 )
 
 # Import validators
@@ -125,7 +126,8 @@ from config.usage_manager import (
 )
 
 # Import session manager
-from config.session_manager import initialize_session_state, create_new_chat_session, save_current_session, load_session, delete_session, export_chat_session
+from config.session_manager import initialize_session_state, create_new_chat_session, save_current_session, load_session, delete_session, export_chat_session, prepare_export, has_more_sessions, load_more_sessions, load_older_messages
+from config.exporter import EXPORT_FORMATS, EXPORT_COMPRESSIONS, export_file_name
 
 # Login UI moved to config/login_html.py
 from config.login_html import show_login_page, create_or_get_user
@@ -133,6 +135,20 @@ from config.login_html import show_login_page, create_or_get_user
 # Import API manager for web search
 from config.api_manager import initialize_apis
 
+# Token streaming with time-to-first-token metrics
+from config.streaming import is_streaming_enabled, send_message_with_metrics
+from config.history_manager import get_budgeted_history
+from config.turn_pipeline import Stage, TurnPipeline
+
+# Parallel bounded-concurrency image uploads
+from config.image_uploader import submit_image_uploads, attach_image_uploads
+from config.image_pipeline import prepare_uploaded_image, prune_prepared_cache
+from config.blob_store import store_image, resolve_image
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Process-wide Gemini model registry
+from config.model_registry import get_model, get_model_registry_stats, DEFAULT_MODEL_NAME
+
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -230,28 +246,156 @@ def detect_response_language(user_input: str, system_language: str) -> str:
     # 7. 그 외의 경우: 시스템 언어 사용
     return system_language
 
-def create_model_for_language(language: str):
-    """특정 언어에 맞는 Gemini 모델을 생성합니다"""
-    # Ensure genai is configured before creating model (lazy init)
+# 일반 대화 턴 파이프라인 단계별 타임아웃(초)
+F1_INTENT_STAGE_TIMEOUT = 2.0
+WEATHER_STAGE_TIMEOUT = float(os.environ.get("WEATHER_STAGE_TIMEOUT", "8"))
+WEB_SEARCH_STAGE_TIMEOUT = float(os.environ.get("WEB_SEARCH_STAGE_TIMEOUT", "10"))
+# 날씨 질문의 폴백 검색 헤지: 날씨 API가 이 시간(초) 안에 답하지 않으면 검색을 동시에 시작
+# (보통 날씨 API는 이 안에 답하므로 검색 쿼터를 쓰지 않고, 늦거나 실패할 때만 검색.
+#  최악 지연은 날씨+검색 직렬 대신 max(날씨, 유예+검색). 0이면 항상 동시에 미리 검색)
+WEATHER_SEARCH_GRACE = float(os.environ.get("WEATHER_SEARCH_GRACE", "1.0"))
+
+# 한글-영어 도시명 매핑
+WEATHER_CITY_MAPPING = {
+    "서울": "Seoul", "부산": "Busan", "인천": "Incheon", 
+    "대구": "Daegu", "대전": "Daejeon", "광주": "Gwangju",
+    "제주": "Jeju", "전주": "Jeonju", "춘천": "Chuncheon", 
+    "강릉": "Gangneung", "경기": "Gyeonggi",
+    "도쿄": "Tokyo", "오사카": "Osaka", "베이징": "Beijing",
+    "상하이": "Shanghai", "뉴욕": "New York", "런던": "London",
+    "파리": "Paris", "베를린": "Berlin", "마드리드": "Madrid",
+    "로마": "Rome", "모스크바": "Moscow", "방콕": "Bangkok",
+    "싱가포르": "Singapore", "시드니": "Sydney", 
+    "멜버른": "Melbourne", "토론토": "Toronto", 
+    "밴쿠버": "Vancouver", "로스앤젤레스": "Los Angeles",
+    "시카고": "Chicago", "워싱턴": "Washington", 
+    "보스턴": "Boston", "두바이": "Dubai", "홍콩": "Hong Kong"
+}
+
+# 도시명 추출 (한글 + 영어)
+WEATHER_CITY_PATTERN = re.compile(
+    '(' + '|'.join(list(WEATHER_CITY_MAPPING.keys()) +
+                   ['seoul', 'busan', 'incheon', 'daegu', 'daejeon', 
+                    'gwangju', 'jeju', 'jeonju', 'tokyo', 'osaka', 
+                    'beijing', 'shanghai', 'new york', 'london', 'paris',
+                    'berlin', 'madrid', 'rome', 'moscow', 'bangkok', 
+                    'singapore', 'sydney', 'melbourne', 'toronto', 
+                    'vancouver', 'los angeles', 'chicago', 'washington', 
+                    'boston', 'dubai', 'hong kong']) + ')',
+    re.IGNORECASE,
+)
+
+# F1 표 후속 질문 감지 패턴 (KO/EN/ES)
+F1_FOLLOWUP_REF_PATTERNS = [
+    re.compile(r"\b(여기서|이 표|이 결과|이 목록|이 순위|이 데이터|이 내용|여기|지금 여기)\b"),
+    re.compile(r"\b(based on this|from this list|this table|this list|this result|from this)\b"),
+    re.compile(r"\b(top5|top 5|top|상위|상위권|정리|요약|정리해|정리해줘|요약해|요약해줘)\b"),
+    re.compile(r"\b(quien|quién|resumen|top)\b"),
+]
+F1_FOLLOWUP_QUESTION_PATTERN = re.compile(r"\b(누구|어떤|누가|몇|how many|who|which|where|어디|언제|지금)\b")
+
+
+def is_weather_query(user_input: str) -> bool:
+    """날씨 질문인지 확인합니다."""
+    query_lower = user_input.lower().replace(" ", "")
+    return "날씨" in query_lower or "weather" in query_lower or "tiempo" in query_lower
+
+
+def lookup_weather(user_input: str, weather_api):
+    """OpenWeatherMap으로 날씨를 조회합니다 (실패 시 None → 웹 검색 폴백)."""
+    query_lower = user_input.lower().replace(" ", "")
     try:
-        ensure_genai_configured()
-    except NameError:
-        # If function not yet defined (shouldn't happen), skip and rely on main() configuration
-        pass
+        city_match = WEATHER_CITY_PATTERN.search(user_input)
+        
+        if city_match:
+            matched_city = city_match.group(1)
+            # 한글이면 영어로 변환, 영어면 capitalize
+            city_name = WEATHER_CITY_MAPPING.get(matched_city, matched_city.title())
+            logger.info(f"🌍 정규표현식 매칭: {matched_city} → {city_name}")
+        else:
+            # 🤖 AI 모델을 사용한 도시명 추출 (폴백)
+            logger.info("🤖 정규표현식 실패 - AI 모델로 도시명 추출 시도")
+            try:
+                extraction_prompt = f"""다음 질문에서 도시명을 추출하고 영어로 변환해주세요.
+질문: "{user_input}"
+
+도시명이 있으면 영어 도시명만 출력하세요. (예: Seoul, Paris, Tokyo)
+도시명이 없으면 "Seoul"을 출력하세요.
+출력 형식: 도시명만 (추가 설명 없이)"""
+                
+                temp_model = get_model(None, model_name="gemini-2.0-flash-exp")
+                ai_response = temp_model.generate_content(extraction_prompt).text.strip()
+                
+                # AI 응답에서 도시명만 추출 (첫 단어 또는 첫 줄)
+                city_name = ai_response.split('\n')[0].split()[0].strip()
+                
+                # 유효성 검사 (알파벳과 공백만 허용)
+                if not re.match(r'^[A-Za-z\s]+$', city_name):
+                    city_name = "Seoul"
+                
+                logger.info(f"🤖 AI 추출 성공: {ai_response} → {city_name}")
+            except Exception as e:
+                logger.error(f"❌ AI 도시명 추출 실패: {e}")
+                city_name = "Seoul"  # 최종 기본값
+        
+        # 내일 날씨 vs 현재 날씨
+        if "내일" in query_lower or "tomorrow" in query_lower:
+            weather_result = weather_api.get_forecast_by_day(city_name, 1)
+            logger.info(f"☀️ OpenWeatherMap API로 내일 날씨 조회: {city_name}")
+        else:
+            weather_result = weather_api.get_city_weather(city_name)
+            logger.info(f"☀️ OpenWeatherMap API로 현재 날씨 조회: {city_name}")
+        
+        # 날씨 API 실패 시 None 반환 (폴백 처리)
+        if weather_result is None:
+            logger.warning(f"⚠️ OpenWeatherMap API 실패, 네이버 검색으로 폴백")
+        return weather_result
+    except Exception as e:
+        logger.error(f"❌ 날씨 API 오류: {e}")
+        return None
+
+
+def decide_web_search(user_input: str, web_search_api, f1_intent_check, last_f1_table_md):
+    """
+    웹 검색 필요 여부를 판단합니다.
+
+    Returns:
+        (need_search, reason, search_context) - F1 표 후속 질문이면 search_context에 이전 표
+    """
+    # Prioritize F1 intent: if user asks about F1 standings, skip web search
+    if f1_intent_check and f1_intent_check.get("intent") == "f1_rank":
+        logger.info("⏭️ F1 인텐트 감지: 웹 검색 생략")
+        return False, "f1_intent", ""
+
+    # follow-up detection: prefer stored F1 context when user refers
+    # to the previous table/result (examples: '여기서', '이 표', '이 결과',
+    # 'based on this', 'from this list', '정리', 'top5' etc.). Also
+    # if the user input is short and we have a recent table, assume
+    # follow-up intent.
+    is_followup = False
+    if last_f1_table_md:
+        u = user_input.lower()
+        is_followup = any(pat.search(u) for pat in F1_FOLLOWUP_REF_PATTERNS)
+
+        # also consider short/clarifying follow-ups (< 60 chars)
+        if not is_followup and len(u.strip()) <= 60:
+            # if question words or pronouns present, treat as follow-up
+            if F1_FOLLOWUP_QUESTION_PATTERN.search(u):
+                is_followup = True
+
+    if last_f1_table_md and is_followup:
+        logger.info("⏭️ F1 follow-up detected: using last F1 context as search_context")
+        return False, "f1_context_followup", last_f1_table_md
+
+    # ✨ 개선된 should_search() 메서드에 검색 판단 위임
+    # 스코어링 시스템으로 실시간 정보 필요성 자동 판단
+    need_search, reason = web_search_api.should_search(user_input)
+    return need_search, reason, ""
+
+@lru_cache(maxsize=8)
+def build_system_instruction(language: str) -> str:
+    """언어별 시스템 프롬프트 + 응답 언어 가이드라인 (언어당 1회만 생성)"""
     system_prompt = get_system_prompt(language)
-    safety_settings = {
-        'HARASSMENT': 'BLOCK_NONE',
-        'HATE_SPEECH': 'BLOCK_NONE',
-        'SEXUALLY_EXPLICIT': 'BLOCK_NONE',
-        'DANGEROUS': 'BLOCK_NONE',
-    }
-    
-    # 언어별 응답 가이드라인 (각 언어로 작성)
-    language_names = {
-        "ko": "한국어",
-        "en": "English", 
-        "es": "español"
-    }
     
     # 언어별 가이드라인 구성
     if language == "ko":
@@ -279,11 +423,32 @@ El idioma preferido por defecto es español."""
 
 The default preferred language is English."""
     
-    system_prompt_with_lang = f"""{system_prompt}
+    return f"""{system_prompt}
 
 {language_guide}"""
-    
-    return genai.GenerativeModel('gemini-2.5-flash', system_instruction=system_prompt_with_lang, safety_settings=safety_settings)
+
+# 모든 모델이 공유하는 safety settings
+MODEL_SAFETY_SETTINGS = {
+    'HARASSMENT': 'BLOCK_NONE',
+    'HATE_SPEECH': 'BLOCK_NONE',
+    'SEXUALLY_EXPLICIT': 'BLOCK_NONE',
+    'DANGEROUS': 'BLOCK_NONE',
+}
+
+def create_model_for_language(language: str):
+    """특정 언어에 맞는 Gemini 모델을 반환합니다 (프로세스 전역 레지스트리에서 재사용)"""
+    # Ensure genai is configured before creating model (lazy init)
+    try:
+        ensure_genai_configured()
+    except NameError:
+        # If function not yet defined (shouldn't happen), skip and rely on main() configuration
+        pass
+    return get_model(
+        language,
+        build_system_instruction(language),
+        model_name=DEFAULT_MODEL_NAME,
+        safety_settings=MODEL_SAFETY_SETTINGS,
+    )
 
 
 def ensure_genai_configured():
@@ -311,9 +476,6 @@ def show_chat_dashboard():
     """기존 채팅 대쉬보드 표시 (다국어 적용)"""
     lang = st.session_state.system_language
     logger.info(f"System language: {lang}")
-    
-    # 기본 모델 생성
-    model = create_model_for_language(lang)
 
     with st.sidebar:
         st.header(get_text("settings", lang))
@@ -347,7 +509,8 @@ def show_chat_dashboard():
                 
                 sorted_sessions = sorted(st.session_state.chat_sessions, 
                                         key=get_sortable_datetime, reverse=True)
-                for idx, session in enumerate(sorted_sessions[:5]):
+                visible_sessions = sorted_sessions[:st.session_state.sidebar_session_limit]
+                for idx, session in enumerate(visible_sessions):
                     is_current = session['id'] == st.session_state.current_session_id
                     title = session['title'][:25] + "..." if len(session['title']) > 25 else session['title']
                     col1, col2 = st.columns([4, 1])
@@ -366,10 +529,12 @@ def show_chat_dashboard():
                                      help="이 세션을 삭제합니다"):
                             delete_session(session["id"])
                             st.rerun()
-                    if idx < len(sorted_sessions) - 1:
+                    if idx < len(visible_sessions) - 1:
                         st.markdown("---")
-                if len(st.session_state.chat_sessions) > 5:
-                    st.caption(f"+ {len(st.session_state.chat_sessions) - 5}개 더보기")
+                if has_more_sessions():
+                    if st.button(get_text("load_more_sessions", lang), key="load_more_sessions", width='stretch'):
+                        load_more_sessions()
+                        st.rerun()
         
         with st.expander(get_text("language_selection", lang), expanded=False):
             options, current_index = get_language_options(lang)
@@ -383,7 +548,6 @@ def show_chat_dashboard():
             new_lang = get_lang_code_from_option(selected_language)
             if new_lang != lang:
                 st.session_state.system_language = new_lang
-                model = create_model_for_language(new_lang)
                 # 채팅 히스토리는 보존하되, 언어 변경 메시지 추가
                 st.session_state.messages.append({
                     "role": "assistant",
@@ -425,21 +589,7 @@ def show_chat_dashboard():
                     help=get_text("export_help", lang), 
                     width='stretch'
                 ):
-                    try:
-                        export_data = export_chat_session()
-                        if export_data:
-                            st.download_button(
-                                label=get_text("download", lang),
-                                data=export_data,
-                                file_name=f"chat_{datetime.now().strftime('%m%d_%H%M')}.json",
-                                mime="application/json",
-                                key="download_json",
-                                width='stretch'
-                            )
-                        else:
-                            st.error(get_text("no_export_data", lang))
-                    except Exception as e:
-                        st.error(get_text("export_failed", lang))
+                    st.session_state.show_export_options = not st.session_state.get("show_export_options", False)
             with col2:
                 if st.button(
                     get_text("delete_all", lang), 
@@ -462,6 +612,40 @@ def show_chat_dashboard():
                                     st.session_state.confirm_delete_checkbox = False
                                     st.rerun()
 
+            # 내보내기 옵션: 파일은 다운로드 버튼을 누를 때 별도 스레드에서 스트리밍으로 생성
+            if st.session_state.get("show_export_options", False):
+                if not st.session_state.messages and not st.session_state.chat_sessions:
+                    st.error(get_text("no_export_data", lang))
+                else:
+                    export_scope = st.radio(
+                        get_text("export_scope", lang),
+                        ["current", "all"],
+                        format_func=lambda scope: get_text(f"export_scope_{scope}", lang),
+                        key="export_scope",
+                        horizontal=True,
+                    )
+                    export_format = st.selectbox(get_text("export_format", lang), list(EXPORT_FORMATS), key="export_format")
+                    export_compression = st.selectbox(
+                        get_text("export_compression", lang), list(EXPORT_COMPRESSIONS),
+                        key="export_compression", disabled=export_format == "zip",
+                    )
+                    export_compact = st.checkbox(
+                        get_text("export_compact", lang), key="export_compact", disabled=export_format == "zip",
+                    )
+                    try:
+                        file_name, mime = export_file_name(export_format, export_compression)
+                        st.download_button(
+                            label=get_text("download", lang),
+                            data=prepare_export(export_scope, export_format, export_compression, export_compact),
+                            file_name=file_name,
+                            mime=mime,
+                            key="download_export",
+                            width='stretch'
+                        )
+                    except Exception as e:
+                        logger.error(f"내보내기 준비 오류: {e}")
+                        st.error(get_text("export_failed", lang))
+
         with st.expander(get_text("help_guide", lang), expanded=False):
             st.markdown(f"""
             {get_text("help_basic", lang)}
@@ -551,8 +735,12 @@ def show_chat_dashboard():
                                     # URL인 경우 직접 표시
                                     st.image(img_data, caption=f"이미지 {idx+1}", width=300)
                                 else:
-                                    # 바이너리 데이터인 경우
-                                    img = Image.open(io.BytesIO(img_data))
+                                    # 블롭 참조/바이너리 데이터인 경우 (필요할 때만 블롭 저장소에서 읽음)
+                                    img_bytes = resolve_image(img_data)
+                                    if img_bytes is None:
+                                        st.caption(f"이미지 {idx+1} 없음")
+                                        continue
+                                    img = Image.open(io.BytesIO(img_bytes))
                                     st.image(img, caption=f"이미지 {idx+1}", width=300)
                             except Exception as e:
                                 st.error(f"이미지 로드 실패: {str(e)}")
@@ -560,6 +748,11 @@ def show_chat_dashboard():
                 del st.session_state.selected_message
                 st.rerun()
         else:
+            # 최근 턴만 로드된 세션: 이전 턴은 요청 시 페이지 단위로 로드
+            if st.session_state.get("loaded_turn_offset", 0) > 0:
+                if st.button(get_text("load_older_messages", lang), key="load_older_messages"):
+                    load_older_messages()
+                    st.rerun()
             for message in st.session_state.messages:
                 with st.chat_message(message["role"]):
                     st.markdown(message["content"])
@@ -572,8 +765,12 @@ def show_chat_dashboard():
                                         # URL인 경우 직접 표시
                                         st.image(img_data, caption=f"이미지 {idx+1}", width=300)
                                     else:
-                                        # 바이너리 데이터인 경우
-                                        img = Image.open(io.BytesIO(img_data))
+                                        # 블롭 참조/바이너리 데이터인 경우 (필요할 때만 블롭 저장소에서 읽음)
+                                        img_bytes = resolve_image(img_data)
+                                        if img_bytes is None:
+                                            st.caption(f"이미지 {idx+1} 없음")
+                                            continue
+                                        img = Image.open(io.BytesIO(img_bytes))
                                         st.image(img, caption=f"이미지 {idx+1}", width=300)
                                 except Exception as e:
                                     st.error(f"이미지 로드 실패: {str(e)}")
@@ -591,11 +788,16 @@ def show_chat_dashboard():
             if uploaded_images:
                 st.session_state.uploaded_images = uploaded_images
                 st.success(get_text("images_ready", lang, count=len(uploaded_images)))
+                # 첨부 시 한 번만 전처리 (리런/전송 시 재사용), 미리보기는 썸네일 사용
+                prune_prepared_cache(st.session_state.prepared_images, uploaded_images)
                 cols = st.columns(min(4, len(uploaded_images)))
                 for idx, img_file in enumerate(uploaded_images):
                     with cols[idx % 4]:
-                        img = Image.open(img_file)
-                        st.image(img, caption=f"이미지 {idx+1}", width=200)
+                        prepared = prepare_uploaded_image(img_file, st.session_state.prepared_images)
+                        if prepared is not None:
+                            st.image(prepared.thumbnail, caption=f"이미지 {idx+1}", width=200)
+                        else:
+                            st.error(f"이미지 로드 실패: {img_file.name}")
             
             uploaded_pdf = st.file_uploader(
                 get_text("upload_pdf", lang),
@@ -614,6 +816,7 @@ def show_chat_dashboard():
             
             if st.button(get_text("clear_attachments", lang), key="clear_attachments", use_container_width=False, type="secondary"):
                 st.session_state.uploaded_images = []
+                st.session_state.prepared_images = {}
                 st.session_state.uploaded_pdf_file = None
                 st.session_state.uploader_key += 1
                 st.rerun()
@@ -643,8 +846,10 @@ def show_chat_dashboard():
         response_language = detect_response_language(user_input, st.session_state.system_language)
         logger.info(f"응답 언어 결정: {response_language}")
         
-        # 응답 언어에 맞는 모델 생성
+        # 응답 언어에 맞는 모델 (레지스트리에서 재사용)
         response_model = create_model_for_language(response_language)
+        if os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1":
+            logger.info(f"TIMING: model registry {get_model_registry_stats()}")
         
         if get_usage_count() >= 100:
             st.error(get_text("daily_limit_exceeded", response_language))
@@ -652,7 +857,8 @@ def show_chat_dashboard():
             increment_usage()
             # 이미지 처리
             image_data = []
-            image_urls = []
+            image_uploads = []
+            prepared_images = []
             
             if st.session_state.uploaded_images:
                 for img_file in st.session_state.uploaded_images:
@@ -661,26 +867,19 @@ def show_chat_dashboard():
                         st.error(msg)
                         continue
                         
-                    # 이미지 데이터 준비 (Gemini API용)
-                    img_file.seek(0)
-                    img_bytes = img_file.read()
-                    image_data.append(img_bytes)
-                    
-                    # 로그인한 경우 Supabase에 이미지 업로드
-                    if st.session_state.is_logged_in and st.session_state.user_id and supabase:
-                        try:
-                            # 파일 포인터 초기화
-                            img_file.seek(0)
-                            # Supabase에 업로드
-                            image_url = upload_image_to_supabase(img_file, supabase, "chat-images", st.session_state.user_id)
-                            if image_url:
-                                image_urls.append(image_url)
-                                logger.info(f"이미지 업로드 성공: {image_url}")
-                            else:
-                                logger.error("이미지 업로드 실패")
-                        except Exception as e:
-                            logger.error(f"이미지 업로드 오류: {str(e)}")
-                            st.warning(f"이미지 업로드 실패: {str(e)}")
+                    # 한 번 디코딩한 전처리 결과 사용 (축소된 버퍼 하나를 이력/업로드/Gemini가 공유)
+                    prepared = prepare_uploaded_image(img_file, st.session_state.prepared_images)
+                    if prepared is None:
+                        continue
+                    prepared_images.append(prepared)
+                    image_data.append(store_image(prepared.data, prepared.mime_type))
+                    image_uploads.append(prepared.upload_spec)
+
+            # 로그인한 경우 Supabase 업로드를 백그라운드 풀에 넘김
+            # (모델 호출은 업로드를 기다리지 않고, 완료되면 URL이 메시지에 채워짐)
+            upload_batch = None
+            if image_uploads and st.session_state.is_logged_in and st.session_state.user_id and supabase:
+                upload_batch = submit_image_uploads(image_uploads, supabase, st.session_state.user_id)
 
             if not st.session_state.messages:
                 st.session_state.messages.append({
@@ -695,19 +894,28 @@ def show_chat_dashboard():
                 "images": image_data  # Gemini API용 이미지 바이너리 데이터
             }
             
-            # 이미지 URL이 있으면 별도로 저장 (Supabase 저장용)
-            if image_urls:
-                new_message["image_urls"] = image_urls
+            # 업로드가 끝나면 image_urls가 채워짐 (Supabase 저장용)
+            if upload_batch is not None:
+                attach_image_uploads(new_message, upload_batch)
                 
             st.session_state.messages.append(new_message)
 
-            is_pdf_request, pdf_url = is_pdf_summarization_request(user_input)
+            # 입력을 한 번만 파싱하여 라우팅 결정
+            route = classify_request(user_input)
+            is_pdf_request = route.is_pdf
+            pdf_url = route.primary_url if is_pdf_request else None
             has_uploaded_pdf = st.session_state.uploaded_pdf_file is not None
-            is_pdf_analysis = is_pdf_analysis_request(user_input, has_uploaded_pdf or is_pdf_request)
-            is_youtube_request, youtube_url = is_youtube_summarization_request(user_input)
-            is_webpage_request, webpage_url = is_url_summarization_request(user_input)
+            is_pdf_analysis = route.is_pdf_analysis(has_uploaded_pdf or is_pdf_request)
+            is_youtube_request = route.is_youtube
+            youtube_url = route.primary_url if is_youtube_request else None
+            is_webpage_request = route.is_webpage
+            webpage_url = route.primary_url if is_webpage_request else None
             has_images = len(st.session_state.uploaded_images) > 0
-            is_image_analysis = is_image_analysis_request(user_input, has_images)
+            is_image_analysis = route.is_image_analysis(has_images)
+
+            turn_metrics_before = st.session_state.get("last_turn_metrics")
+            # 스트리밍 응답을 렌더링할 영역 (status 박스 바깥, 채팅 영역 하단)
+            stream_target = st.empty() if is_streaming_enabled() else None
 
             with st.status(get_text("processing", response_language), expanded=True) as status:
                 if is_pdf_analysis:
@@ -727,9 +935,9 @@ def show_chat_dashboard():
                     if content.startswith("❌"):
                         response = content
                     else:
-                        chat_session = response_model.start_chat(history=st.session_state.chat_history)
+                        chat_session = response_model.start_chat(history=get_budgeted_history())
                         pdf_source = pdf_url if pdf_url else (st.session_state.uploaded_pdf_file.name if has_uploaded_pdf else "")
-                        response = analyze_pdf_with_gemini_multiturn(content, metadata, user_input, chat_session, response_language, pdf_source, sections)
+                        response = analyze_pdf_with_gemini_multiturn(content, metadata, user_input, chat_session, response_language, pdf_source, sections, stream_target=stream_target)
                         st.session_state.chat_history = chat_session.history
                         
                 elif is_youtube_request:
@@ -740,12 +948,13 @@ def show_chat_dashboard():
                             response = "⚠️ 유효하지 않은 YouTube URL입니다."
                         else:
                             # 멀티턴에서 한 번에 모든 처리
-                            chat_session = response_model.start_chat(history=st.session_state.chat_history)
+                            chat_session = response_model.start_chat(history=get_budgeted_history())
                             response = analyze_youtube_with_gemini_multiturn(
                                 youtube_url,  # URL 직접 전달
                                 user_input, 
                                 chat_session, 
-                                response_language
+                                response_language,
+                                stream_target=stream_target
                             )
                             st.session_state.chat_history = chat_session.history
                     except Exception as e:
@@ -756,202 +965,109 @@ def show_chat_dashboard():
                     status.update(label=get_text("processing_webpage", response_language))
                     if st.session_state.current_webpage_url != webpage_url:
                         st.session_state.current_webpage_url = webpage_url
-                        content = fetch_webpage_content(webpage_url)
+                        content, metadata = fetch_webpage(webpage_url)
                         st.session_state.current_webpage_content = content
-                        st.session_state.current_webpage_metadata = extract_webpage_metadata(webpage_url, content)
+                        st.session_state.current_webpage_metadata = metadata
                     content = st.session_state.current_webpage_content
                     metadata = st.session_state.current_webpage_metadata
                     if content.startswith("❌"):
                         response = content
                     else:
-                        chat_session = response_model.start_chat(history=st.session_state.chat_history)
-                        response = summarize_webpage_with_gemini_multiturn(content, metadata, user_input, chat_session, response_language, webpage_url)
+                        chat_session = response_model.start_chat(history=get_budgeted_history())
+                        response = summarize_webpage_with_gemini_multiturn(content, metadata, user_input, chat_session, response_language, webpage_url, stream_target=stream_target)
                         st.session_state.chat_history = chat_session.history
                 elif is_image_analysis and has_images:
                     status.update(label=get_text("processing_image", response_language))
-                    images = [process_image_for_gemini(img) for img in st.session_state.uploaded_images]
-                    if all(img is not None for img in images):
-                        chat_session = response_model.start_chat(history=st.session_state.chat_history)
-                        response = analyze_image_with_gemini_multiturn(images, user_input, chat_session, response_language)
+                    images = [prepared.model_part for prepared in prepared_images]
+                    if images and len(images) == len(st.session_state.uploaded_images):
+                        chat_session = response_model.start_chat(history=get_budgeted_history())
+                        response = analyze_image_with_gemini_multiturn(images, user_input, chat_session, response_language, stream_target=stream_target)
                         st.session_state.chat_history = chat_session.history
                     else:
                         response = "❌ 이미지 처리 중 오류가 발생했습니다."
                 else:
                     status.update(label=get_text("processing_response", response_language))
                     
-                    # ✨ 날씨 쿼리 우선 처리 (OpenWeatherMap API)
-                    weather_result = None
-                    if st.session_state.api_manager:
-                        weather_api = st.session_state.api_manager['apis'].get('weather')
-                        if weather_api:
-                            query_lower = user_input.lower().replace(" ", "")
-                            
-                            # 날씨 쿼리 감지
-                            if "날씨" in query_lower or "weather" in query_lower or "tiempo" in query_lower:
-                                try:
-                                    status.update(label="🌤️ 날씨 정보 조회 중...")
-                                    
-                                    # 한글-영어 도시명 매핑
-                                    city_mapping = {
-                                        "서울": "Seoul", "부산": "Busan", "인천": "Incheon", 
-                                        "대구": "Daegu", "대전": "Daejeon", "광주": "Gwangju",
-                                        "제주": "Jeju", "전주": "Jeonju", "춘천": "Chuncheon", 
-                                        "강릉": "Gangneung", "경기": "Gyeonggi",
-                                        "도쿄": "Tokyo", "오사카": "Osaka", "베이징": "Beijing",
-                                        "상하이": "Shanghai", "뉴욕": "New York", "런던": "London",
-                                        "파리": "Paris", "베를린": "Berlin", "마드리드": "Madrid",
-                                        "로마": "Rome", "모스크바": "Moscow", "방콕": "Bangkok",
-                                        "싱가포르": "Singapore", "시드니": "Sydney", 
-                                        "멜버른": "Melbourne", "토론토": "Toronto", 
-                                        "밴쿠버": "Vancouver", "로스앤젤레스": "Los Angeles",
-                                        "시카고": "Chicago", "워싱턴": "Washington", 
-                                        "보스턴": "Boston", "두바이": "Dubai", "홍콩": "Hong Kong"
-                                    }
-                                    
-                                    # 도시명 추출 (한글 + 영어)
-                                    city_pattern = '|'.join(list(city_mapping.keys()) + 
-                                                            ['seoul', 'busan', 'incheon', 'daegu', 'daejeon', 
-                                                             'gwangju', 'jeju', 'jeonju', 'tokyo', 'osaka', 
-                                                             'beijing', 'shanghai', 'new york', 'london', 'paris',
-                                                             'berlin', 'madrid', 'rome', 'moscow', 'bangkok', 
-                                                             'singapore', 'sydney', 'melbourne', 'toronto', 
-                                                             'vancouver', 'los angeles', 'chicago', 'washington', 
-                                                             'boston', 'dubai', 'hong kong'])
-                                    
-                                    city_match = re.search(f'({city_pattern})', user_input, re.IGNORECASE)
-                                    
-                                    if city_match:
-                                        matched_city = city_match.group(1)
-                                        # 한글이면 영어로 변환, 영어면 capitalize
-                                        city_name = city_mapping.get(matched_city, matched_city.title())
-                                        logger.info(f"🌍 정규표현식 매칭: {matched_city} → {city_name}")
-                                    else:
-                                        # 🤖 AI 모델을 사용한 도시명 추출 (폴백)
-                                        logger.info("🤖 정규표현식 실패 - AI 모델로 도시명 추출 시도")
-                                        try:
-                                            extraction_prompt = f"""다음 질문에서 도시명을 추출하고 영어로 변환해주세요.
-질문: "{user_input}"
-
-도시명이 있으면 영어 도시명만 출력하세요. (예: Seoul, Paris, Tokyo)
-도시명이 없으면 "Seoul"을 출력하세요.
-출력 형식: 도시명만 (추가 설명 없이)"""
-                                            
-                                            temp_model = genai.GenerativeModel("gemini-2.0-flash-exp")
-                                            ai_response = temp_model.generate_content(extraction_prompt).text.strip()
-                                            
-                                            # AI 응답에서 도시명만 추출 (첫 단어 또는 첫 줄)
-                                            city_name = ai_response.split('\n')[0].split()[0].strip()
-                                            
-                                            # 유효성 검사 (알파벳과 공백만 허용)
-                                            if not re.match(r'^[A-Za-z\s]+$', city_name):
-                                                city_name = "Seoul"
-                                            
-                                            logger.info(f"🤖 AI 추출 성공: {ai_response} → {city_name}")
-                                        except Exception as e:
-                                            logger.error(f"❌ AI 도시명 추출 실패: {e}")
-                                            city_name = "Seoul"  # 최종 기본값
-                                    
-                                    # 내일 날씨 vs 현재 날씨
-                                    if "내일" in query_lower or "tomorrow" in query_lower:
-                                        weather_result = weather_api.get_forecast_by_day(city_name, 1)
-                                        logger.info(f"☀️ OpenWeatherMap API로 내일 날씨 조회: {city_name}")
-                                    else:
-                                        weather_result = weather_api.get_city_weather(city_name)
-                                        logger.info(f"☀️ OpenWeatherMap API로 현재 날씨 조회: {city_name}")
-                                    
-                                    # 날씨 API 실패 시 None 반환 (폴백 처리)
-                                    if weather_result is None:
-                                        logger.warning(f"⚠️ OpenWeatherMap API 실패, 네이버 검색으로 폴백")
-                                
-                                except Exception as e:
-                                    logger.error(f"❌ 날씨 API 오류: {e}")
-                                    weather_result = None
-                    
-                    # ✨ 웹 검색 필요 여부 판단 및 실행 (날씨 API 실패 시 폴백)
+                    # ✨ 날씨 조회 / F1 인텐트 / 검색 판단 / 웹 검색을 의존성 그래프로 동시 실행
+                    #    (날씨 API가 답을 확정하면 나머지 단계는 취소)
+                    apis = st.session_state.api_manager['apis'] if st.session_state.api_manager else {}
+                    weather_api = apis.get('weather')
+                    web_search_api = apis.get('web_search')
+                    weather_query = is_weather_query(user_input)
+                    weather_fallback = "날씨" in user_input.lower() or "weather" in user_input.lower()
+                    last_f1_table_md = st.session_state.get("last_f1_table_md")
+                    if weather_api and weather_query:
+                        status.update(label="🌤️ 날씨 정보 조회 중...")
+
+                    script_ctx = get_script_run_ctx()
+                    pipeline = TurnPipeline(
+                        [
+                            Stage("f1_intent", lambda deps: detect_f1_intent(user_input), timeout=F1_INTENT_STAGE_TIMEOUT),
+                            Stage(
+                                "weather",
+                                lambda deps: lookup_weather(user_input, weather_api),
+                                timeout=WEATHER_STAGE_TIMEOUT,
+                                run_if=lambda deps: bool(weather_api and weather_query),
+                                answers_turn=lambda result: result is not None,
+                            ),
+                            Stage(
+                                "search_decision",
+                                lambda deps: decide_web_search(user_input, web_search_api, deps["f1_intent"], last_f1_table_md),
+                                deps=("f1_intent",),
+                                run_if=lambda deps: web_search_api is not None,
+                            ),
+                            # 날씨 질문의 폴백 검색은 날씨 API를 WEATHER_SEARCH_GRACE초까지만 기다림
+                            # (그 안에 답하면 검색 생략, 늦으면 동시에 검색하고 날씨가 답하면 결과 폐기)
+                            # 세션 상태는 작업 스레드에서 건드리지 않고 아래에서 저장
+                            Stage(
+                                "web_search",
+                                lambda deps: web_search_api.run_search(user_input),
+                                deps=("search_decision",),
+                                soft_deps=("weather",),
+                                soft_grace=WEATHER_SEARCH_GRACE,
+                                timeout=WEB_SEARCH_STAGE_TIMEOUT,
+                                run_if=lambda deps: bool(deps["search_decision"]) and (
+                                    deps["search_decision"][0] or (weather_fallback and deps.get("weather") is None)
+                                ),
+                            ),
+                        ],
+                        name="general_chat",
+                        thread_setup=lambda: add_script_run_ctx(threading.current_thread(), script_ctx),
+                    )
+                    stages = pipeline.run()
+
+                    weather_result = stages.results.get("weather")
+                    f1_intent = stages.results.get("f1_intent")
                     search_context = ""
-                    if st.session_state.api_manager:
-                        try:
-                            web_search_api = st.session_state.api_manager['apis']['web_search']
-                            # Prioritize F1 intent: if user asks about F1 standings, skip web search
-                            try:
-                                f1_intent_check = detect_f1_intent(user_input)
-                            except Exception as e:
-                                logger.debug(f"F1 intent pre-check error: {e}")
-                                f1_intent_check = None
-
-                            if f1_intent_check and f1_intent_check.get("intent") == "f1_rank":
-                                need_search = False
-                                reason = "f1_intent"
-                                logger.info("⏭️ F1 인텐트 감지: 웹 검색 생략")
-                            else:
-                                # follow-up detection: prefer stored F1 context when user refers
-                                # to the previous table/result (examples: '여기서', '이 표', '이 결과',
-                                # 'based on this', 'from this list', '정리', 'top5' etc.). Also
-                                # if the user input is short and we have a recent table, assume
-                                # follow-up intent.
-                                last_md = st.session_state.get("last_f1_table_md")
-                                is_followup = False
-                                if last_md:
-                                    u = user_input.lower()
-                                    # anaphora / reference patterns (KO/EN/ES)
-                                    ref_patterns = [
-                                        r"\b(여기서|이 표|이 결과|이 목록|이 순위|이 데이터|이 내용|여기|지금 여기)\b",
-                                        r"\b(based on this|from this list|this table|this list|this result|from this)\b",
-                                        r"\b(top5|top 5|top|상위|상위권|정리|요약|정리해|정리해줘|요약해|요약해줘)\b",
-                                        r"\b(quien|quién|resumen|top)\b",
-                                    ]
-                                    for pat in ref_patterns:
-                                        if re.search(pat, u):
-                                            is_followup = True
-                                            break
-
-                                    # also consider short/clarifying follow-ups (< 60 chars)
-                                    if not is_followup and len(u.strip()) <= 60:
-                                        # if question words or pronouns present, treat as follow-up
-                                        if re.search(r"\b(누구|어떤|누가|몇|how many|who|which|where|어디|언제|지금)\b", u):
-                                            is_followup = True
-
-                                if last_md and is_followup:
-                                    need_search = False
-                                    reason = "f1_context_followup"
-                                    search_context = last_md
-                                    logger.info("⏭️ F1 follow-up detected: using last F1 context as search_context")
-                                else:
-                                    # ✨ 개선된 should_search() 메서드에 검색 판단 위임
-                                    # 스코어링 시스템으로 실시간 정보 필요성 자동 판단
-                                    need_search, reason = web_search_api.should_search(user_input)
-
-                            
-                            # 날씨 쿼리이고 OpenWeatherMap API가 성공한 경우 웹 검색 생략
-                            if weather_result is not None and ("날씨" in user_input.lower() or "weather" in user_input.lower()):
-                                need_search = False
-                                reason = "날씨 API 성공 (웹 검색 생략)"
-                                logger.info(f"⏭️ {reason}")
-                            # 날씨 쿼리이고 OpenWeatherMap API가 실패한 경우 강제 검색
-                            elif weather_result is None and ("날씨" in user_input.lower() or "weather" in user_input.lower()):
-                                need_search = True
-                                reason = "날씨 API 폴백"
-                            
-                            if need_search:
-                                status.update(label="🔍 최신 정보 검색 중...")
-                                logger.info(f"🔍 웹 검색 실행: {reason}")
-                                search_result = web_search_api.search_and_create_context(
-                                    user_input, 
-                                    st.session_state
-                                )
-                                
-                                # 검색 결과를 컨텍스트로 추가
-                                if not search_result.startswith("검색이 필요하지 않음"):
-                                    search_context = search_result
-                                    logger.info(f"✅ 검색 완료: {len(search_result)} chars")
-                                    # 디버그: 검색 결과 미리보기
-                                    preview = search_result[:200] + "..." if len(search_result) > 200 else search_result
-                                    logger.info(f"📄 검색 결과 미리보기:\n{preview}")
-                            else:
-                                logger.info(f"⏭️ 검색 불필요: {reason}")
-                        except Exception as e:
-                            logger.error(f"❌ 웹 검색 오류: {e}")
-                            # 검색 실패 시에도 일반 대화는 계속 진행
+                    if stages.results.get("search_decision"):
+                        need_search, reason, search_context = stages.results["search_decision"]
+
+                        # 날씨 쿼리이고 OpenWeatherMap API가 성공한 경우 웹 검색 생략
+                        if weather_result is not None and weather_fallback:
+                            need_search = False
+                            reason = "날씨 API 성공 (웹 검색 생략)"
+                            logger.info(f"⏭️ {reason}")
+                        # 날씨 쿼리이고 OpenWeatherMap API가 실패한 경우 강제 검색
+                        elif weather_result is None and weather_fallback:
+                            need_search = True
+                            reason = "날씨 API 폴백"
+
+                        if need_search:
+                            logger.info(f"🔍 웹 검색 실행: {reason}")
+                            search_entry = stages.results.get("web_search")
+                            search_result = None
+                            if search_entry:
+                                web_search_api.store_search_context(st.session_state, search_entry)
+                                search_result = web_search_api.format_search_context(search_entry["result"])
+                            # 검색 결과를 컨텍스트로 추가
+                            if search_result and not search_result.startswith("검색이 필요하지 않음"):
+                                search_context = search_result
+                                logger.info(f"✅ 검색 완료: {len(search_result)} chars")
+                                # 디버그: 검색 결과 미리보기
+                                preview = search_result[:200] + "..." if len(search_result) > 200 else search_result
+                                logger.info(f"📄 검색 결과 미리보기:\n{preview}")
+                        else:
+                            logger.info(f"⏭️ 검색 불필요: {reason}")
                     
                     # 날씨 API 결과가 있으면 직접 응답으로 사용 (검색 불필요)
                     if weather_result:
@@ -978,12 +1094,15 @@ def show_chat_dashboard():
 3. 숫자, 날짜, 구체적인 정보는 포함해주세요
 4. 자연스러운 한 문장 형식으로 답변해주세요"""
                         
-                        chat_session = response_model.start_chat(history=st.session_state.chat_history)
+                        chat_session = response_model.start_chat(history=get_budgeted_history())
                         try:
-                            summary_response = chat_session.send_message(summary_prompt).text
-                            # 요약은 별도 메시지로 추가
+                            # 요약은 별도 메시지로 추가 (스트리밍 가능하면 청크 단위로 표시)
                             with st.chat_message("assistant"):
-                                st.markdown(f"\n\n💡 **핵심 답변**\n\n{summary_response}")
+                                st.markdown("💡 **핵심 답변**")
+                                summary_target = st.empty() if stream_target is not None else None
+                                summary_response = send_message_with_metrics(chat_session, summary_prompt, summary_target, kind="search_summary", as_chat_message=False)
+                                if summary_target is None:
+                                    st.markdown(summary_response)
                             
                             # 히스토리에는 검색 결과 + 요약을 함께 저장
                             full_response = f"{search_context}\n\n💡 **핵심 요약**\n{summary_response}"
@@ -998,13 +1117,7 @@ def show_chat_dashboard():
                             st.session_state.chat_history.append({"role": "user", "parts": [user_input]})
                             st.session_state.chat_history.append({"role": "model", "parts": [response]})
                     else:
-                        # 검색 결과가 없으면 먼저 F1 관련 인텐트인지 확인
-                        try:
-                            f1_intent = detect_f1_intent(user_input)
-                        except Exception as e:
-                            logger.warning(f"F1 intent detection error: {e}")
-                            f1_intent = None
-
+                        # 검색 결과가 없으면 먼저 F1 관련 인텐트인지 확인 (파이프라인에서 계산한 결과 재사용)
                         if f1_intent and f1_intent.get("intent") == "f1_rank":
                             # year 추출 또는 기본 현재 연도
                             year = f1_intent.get("year") or datetime.now().year
@@ -1156,10 +1269,10 @@ def show_chat_dashboard():
                             final_input = user_input
                     
                         if final_input is not None:
-                            chat_session = response_model.start_chat(history=st.session_state.chat_history)
+                            chat_session = response_model.start_chat(history=get_budgeted_history())
                             try:
                                 status.update(label=get_text("processing_response", response_language))
-                                response = chat_session.send_message(final_input).text
+                                response = send_message_with_metrics(chat_session, final_input, stream_target, kind="chat")
                                 st.session_state.chat_history = chat_session.history
                             except Exception as e:
                                 logger.error(f"Google Generative AI 서비스 오류: {e}")
@@ -1170,8 +1283,15 @@ def show_chat_dashboard():
                     
                     status.update(label=get_text("processing_complete", response_language), state="complete")
 
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            assistant_message = {"role": "assistant", "content": response}
+            # 이번 턴에서 측정된 생성 시간 (저장 시 time_taken으로 기록)
+            last_metrics = st.session_state.get("last_turn_metrics")
+            if last_metrics and last_metrics is not turn_metrics_before:
+                assistant_message["time_taken"] = last_metrics["total"]
+                assistant_message["ttft"] = last_metrics["ttft"]
+            st.session_state.messages.append(assistant_message)
             st.session_state.uploaded_images = []
+            st.session_state.prepared_images = {}
             st.session_state.uploaded_pdf_file = None
             save_current_session()
             # Only trigger a rerun if we actually invoked the model flow.
@@ -0,0 +1,144 @@
+# benchmarks/bench_browser_pool.py
+# 네이버 블로그 Playwright 폴백 비교 (로컬 HTTP 서버의 프레임셋 + 본문 iframe + 이미지/폰트):
+#   기존: 호출마다 sync_playwright() + chromium.launch(--single-process) + networkidle 대기 후 종료
+#   신규: config/browser_pool (브라우저/컨텍스트 재사용, 이미지·폰트·미디어 차단, 본문 선택자 대기)
+#
+# 추출된 본문이 같은지, 브라우저 기동 횟수와 서버가 받은 이미지/폰트 요청 수를 비교합니다.
+# Chromium이 설치되어 있지 않으면 (playwright install chromium) 건너뜁니다.
+#
+# 실행: python benchmarks/bench_browser_pool.py
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from config.browser_pool import BROWSER_MAX_CONCURRENCY, browser_pool  # noqa: E402
+from config.utils import PLAYWRIGHT_CONTENT_SELECTORS, fetch_naver_blog_with_playwright  # noqa: E402
+
+CALLS = int(os.environ.get("BENCH_BROWSER_CALLS", "6"))
+_PARAGRAPHS = "".join(f"<p>제주 여행 {i}일차 기록입니다. 오름과 해변을 따라 걸었습니다.</p>" for i in range(40))
+_FRAMESET = ("<html><head><title>여행 기록 : 네이버 블로그</title></head>"
+             "<body><iframe id='mainFrame' src='/PostView.naver?logNo=1'></iframe></body></html>")
+_POSTVIEW = ("<html><head><link rel='stylesheet' href='/font.css'></head><body>"
+             + "".join(f"<img src='/img/{i}.jpg'>" for i in range(10))
+             + "<div id='root'></div><script>setTimeout(function () {"
+             "document.getElementById('root').innerHTML = \"<div class='se-main-container'>"
+             + _PARAGRAPHS + "</div>\";}, 200);</script></body></html>")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    asset_requests = 0
+    lock = threading.Lock()
+
+    def _send(self, content_type, body, delay=0.0):
+        time.sleep(delay)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/PostView.naver"):
+            self._send("text/html; charset=utf-8", _POSTVIEW.encode("utf-8"))
+        elif self.path.startswith("/blog/"):
+            self._send("text/html; charset=utf-8", _FRAMESET.encode("utf-8"))
+        elif self.path == "/font.css":
+            self._send("text/css", b"@font-face{font-family:x;src:url(/font.woff2)} body{font-family:x}")
+        elif self.path.startswith("/img/") or self.path == "/font.woff2":
+            with _Handler.lock:
+                _Handler.asset_requests += 1
+            self._send("application/octet-stream", b"\x00" * 200_000, delay=0.3)
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_fetch(url):
+    """기존 fetch_naver_blog_with_playwright (본문은 선택자가 있는 iframe 프레임에서 읽음)"""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=['--disable-dev-shm-usage', '--single-process'])
+        context = browser.new_context()
+        page = context.new_page()
+        try:
+            page.goto(url, wait_until='networkidle', timeout=30000)
+            html = next((frame.content() for frame in page.frames
+                         if frame.query_selector(", ".join(PLAYWRIGHT_CONTENT_SELECTORS))), page.content())
+        finally:
+            context.close()
+            browser.close()
+    soup = BeautifulSoup(html, 'html.parser')
+    main = soup.select_one('div.se-main-container')
+    text = main.get_text(separator='\n', strip=True) if main else ""
+    return '\n'.join(line.strip() for line in text.split('\n') if len(line.strip()) > 2)
+
+
+def _chromium_available():
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception as e:
+        print(f"Chromium을 실행할 수 없어 건너뜁니다: {str(e).splitlines()[0]}")
+        return False
+
+
+def _run(label, fn, urls, workers):
+    _Handler.asset_requests = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        results = list(executor.map(fn, urls))
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<6} {elapsed:>7.2f}s  (호출당 {elapsed / len(urls):.2f}s, 이미지/폰트 요청 {_Handler.asset_requests})")
+    return results
+
+
+def main():
+    if not _chromium_available():
+        print("\n불일치: 0")
+        sys.exit(0)
+
+    mismatches = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/blog/{i}" for i in range(CALLS)]
+    print(f"호출 {CALLS}회, 동시 처리 {BROWSER_MAX_CONCURRENCY}")
+    try:
+        legacy = _run("기존", legacy_fetch, urls, 1)
+        pooled = _run("풀", fetch_naver_blog_with_playwright, urls, BROWSER_MAX_CONCURRENCY * 2)
+        for old, new in zip(legacy, pooled):
+            if not new or new != old:
+                mismatches += 1
+                print(f"  MISMATCH: 본문이 다릅니다 ({len(new)} vs {len(old)} chars)")
+        stats = browser_pool.stats
+        print(f"브라우저 기동 {stats['launches']}회 (기존 {CALLS}회), 컨텍스트 재사용 {stats['context_reuse']}, "
+              f"차단 {stats['blocked']}, 대기 초과 {stats['queue_timeouts']}")
+        if stats["launches"] != 1:
+            mismatches += 1
+            print("  MISMATCH: 브라우저는 한 번만 기동해야 합니다")
+        if _Handler.asset_requests:
+            mismatches += 1
+            print("  MISMATCH: 이미지/폰트 요청이 차단되지 않았습니다")
+    finally:
+        browser_pool.shutdown()
+        server.shutdown()
+
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
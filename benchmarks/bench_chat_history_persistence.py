@@ -0,0 +1,506 @@
+# benchmarks/bench_chat_history_persistence.py
+# 세션 길이별 채팅 이력 저장 왕복 횟수 비교:
+#   기존 (세션 전체 delete + 턴마다 insert) vs 증분 (새 턴/변경 턴만 일괄 upsert)
+#
+# 로컬 가짜 Supabase 클라이언트(메모리 테이블)로 execute() 호출 수를 셉니다.
+# 앱처럼 턴이 끝날 때마다 세션 전체를 저장하는 흐름을 재현합니다.
+# 세션 로드는 전체 로드와 최근 턴 페이지 로드의 전송 행 수를 비교합니다.
+# 내보내기는 기존 (메모리에서 json.dumps indent=2) vs 스트리밍 NDJSON의 최대 메모리를 비교합니다.
+#
+# 실행: python benchmarks/bench_chat_history_persistence.py
+
+import base64
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import storage_utils  # noqa: E402
+from config.exporter import build_export, build_export_bytes  # noqa: E402
+from config.storage_utils import (  # noqa: E402
+    forget_persisted_turns,
+    iter_chat_history_pages,
+    load_chat_history_from_supabase,
+    load_chat_history_page_from_supabase,
+    save_chat_history_to_supabase,
+)
+
+SESSION_LENGTHS = (10, 50, 100)
+# 가짜 클라이언트 왕복당 지연 (실제 Supabase 왕복 ~30-80ms 가정, 벤치 시간을 줄이려 축소)
+FAKE_ROUND_TRIP_LATENCY = float(os.environ.get("FAKE_ROUND_TRIP_LATENCY", "0.0005"))
+
+
+# -----------------------------------------------------------------------------
+# 로컬 가짜 Supabase (chat_history 테이블만, PostgREST 빌더 흉내)
+# -----------------------------------------------------------------------------
+
+class _FakeQuery:
+    def __init__(self, db, table, op, payload=None, on_conflict=None, ignore_duplicates=False):
+        self.db = db
+        self.table = table
+        self.op = op
+        self.payload = payload
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        self.filters = []
+        self.orders = []
+        self.row_limit = None
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def _match(self, row):
+        return all(f(row) for f in self.filters)
+
+    def execute(self):
+        self.db.round_trips += 1
+        if FAKE_ROUND_TRIP_LATENCY:
+            time.sleep(FAKE_ROUND_TRIP_LATENCY)
+        rows = self.db.tables.setdefault(self.table, [])
+        payload = self.payload if isinstance(self.payload, list) else [self.payload] if self.payload else []
+        self.db.rows_sent += len(payload)
+
+        if self.op == "select":
+            data = [dict(row) for row in rows if self._match(row)]
+            for column, desc in reversed(self.orders):
+                data.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            if self.row_limit is not None:
+                data = data[:self.row_limit]
+            self.db.rows_received += len(data)
+            return _FakeResponse(data)
+        if self.op == "delete":
+            self.db.tables[self.table] = [row for row in rows if not self._match(row)]
+            return _FakeResponse([])
+        if self.op == "insert":
+            rows.extend(dict(row) for row in payload)
+            return _FakeResponse(payload)
+        if self.op == "upsert":
+            keys = [k.strip() for k in self.on_conflict.split(",")]
+            index = {tuple(row.get(k) for k in keys): row for row in rows}
+            for new in payload:
+                existing = index.get(tuple(new.get(k) for k in keys))
+                if existing is not None:
+                    if not self.ignore_duplicates:
+                        existing.update(new)
+                else:
+                    row = dict(new)
+                    row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+                    rows.append(row)
+                    index[tuple(row.get(k) for k in keys)] = row
+            return _FakeResponse(payload)
+        raise ValueError(self.op)
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class _FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def select(self, columns="*"):
+        return _FakeQuery(self.db, self.name, "select")
+
+    def delete(self):
+        return _FakeQuery(self.db, self.name, "delete")
+
+    def insert(self, payload):
+        return _FakeQuery(self.db, self.name, "insert", payload)
+
+    def upsert(self, payload, on_conflict=None, ignore_duplicates=False):
+        return _FakeQuery(self.db, self.name, "upsert", payload, on_conflict, ignore_duplicates)
+
+
+class _FakeBucket:
+    def __init__(self, db):
+        self.db = db
+
+    def upload(self, path, file, file_options=None):
+        self.db.round_trips += 1
+        self.db.uploads += 1
+        return {"path": path}
+
+    def get_public_url(self, path):
+        return f"https://storage.example/{path}"
+
+
+class _FakeStorage:
+    def __init__(self, db):
+        self.db = db
+
+    def from_(self, bucket_name):
+        return _FakeBucket(self.db)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.round_trips = 0
+        self.rows_sent = 0
+        self.rows_received = 0
+        self.uploads = 0
+        self.storage = _FakeStorage(self)
+
+    def table(self, name):
+        return _FakeTable(self, name)
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.rows_sent = 0
+        self.rows_received = 0
+        self.uploads = 0
+
+
+# -----------------------------------------------------------------------------
+# 기존 구현 (변경 전 config/storage_utils.py 그대로, 타이밍 로그 제외)
+# -----------------------------------------------------------------------------
+
+def _legacy_save_chat_history_to_supabase(supabase_client, user_id, session_id, messages):
+    try:
+        supabase_client.table("chat_history").delete().eq("session_id", session_id).execute()
+
+        current_question = None
+        current_question_images = None
+
+        for msg in messages:
+            if msg.get("role") == "user":
+                current_question = msg.get("content", "")
+                current_question_images = msg.get("images", []) if "images" in msg else []
+            elif msg.get("role") == "assistant" and current_question is not None:
+                message_data = {
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "question": current_question,
+                    "answer": msg.get("content", ""),
+                    "time_taken": msg.get("time_taken", 0.0),
+                    "created_at": datetime.now(timezone.utc).isoformat()
+                }
+                if current_question_images:
+                    image_urls = []
+                    for img_data in current_question_images:
+                        if isinstance(img_data, str):
+                            image_urls.append(img_data)
+                    if image_urls:
+                        message_data["images"] = image_urls
+                supabase_client.table("chat_history").insert(message_data).execute()
+                current_question = None
+                current_question_images = None
+        return True
+    except Exception:
+        return False
+
+
+# -----------------------------------------------------------------------------
+# 시나리오
+# -----------------------------------------------------------------------------
+
+def _turn(i):
+    user = {"role": "user", "content": f"질문 {i}: " + "내용 " * 20}
+    if i % 7 == 0:
+        user["images"] = [f"https://example.supabase.co/storage/v1/object/public/chat-images/u/{i}.jpg"]
+    return [user, {"role": "assistant", "content": f"답변 {i}: " + "설명 " * 80, "time_taken": 1.5 + i % 3}]
+
+
+def _snapshot(db, session_id):
+    """저장된 세션 내용 (로드 순서대로 질문/답변/이미지)"""
+    messages = load_chat_history_from_supabase(db, session_id)
+    return [(m["role"], m["content"], tuple(m.get("images") or ())) for m in messages]
+
+
+def run_growing_session(save_fn, turns, session_id):
+    """턴마다 세션 전체를 저장 (앱의 save_current_session 흐름)"""
+    db = FakeSupabase()
+    forget_persisted_turns(session_id)
+    messages = []
+    per_save = []
+    t0 = time.perf_counter()
+    for i in range(turns):
+        messages.extend(_turn(i))
+        before = db.round_trips
+        assert save_fn(db, "user-1", session_id, list(messages))
+        per_save.append(db.round_trips - before)
+    elapsed = time.perf_counter() - t0
+    return db, per_save, elapsed, messages
+
+
+def run_edit_scenario(save_fn, session_id):
+    """기존 턴 수정 + 뒤쪽 턴 삭제(대화 되돌리기)도 같은 결과가 되는지 확인"""
+    db = FakeSupabase()
+    forget_persisted_turns(session_id)
+    messages = [m for i in range(12) for m in _turn(i)]
+    save_fn(db, "user-1", session_id, messages)
+    messages[7] = dict(messages[7], content="수정된 답변")
+    save_fn(db, "user-1", session_id, messages)
+    messages = messages[:16]
+    db.reset_counters()
+    save_fn(db, "user-1", session_id, messages)
+    return db
+
+
+def run_lazy_load_checks():
+    """세션 로드: 전체 로드 vs 최근 턴 페이지 로드 + 이전 턴 페이지 + 오프셋 저장"""
+    mismatches = 0
+    print("\n세션 로드 (전체 vs 최근 턴 페이지)")
+    for turns in SESSION_LENGTHS:
+        db, _, _, messages = run_growing_session(save_chat_history_to_supabase, turns, f"lazy-{turns}")
+
+        db.reset_counters()
+        t0 = time.perf_counter()
+        full = load_chat_history_from_supabase(db, f"lazy-{turns}")
+        full_time, full_rows = time.perf_counter() - t0, db.rows_received
+
+        db.reset_counters()
+        t0 = time.perf_counter()
+        page, first_turn_index, has_more = load_chat_history_page_from_supabase(db, f"lazy-{turns}")
+        page_time, page_rows = time.perf_counter() - t0, db.rows_received
+
+        # 이전 턴을 모두 페이지로 불러오면 전체 로드와 같아야 함
+        merged, offset = page, first_turn_index
+        while offset > 0:
+            older, offset, _ = load_chat_history_page_from_supabase(db, f"lazy-{turns}", before_turn=offset)
+            merged = older + merged
+        if merged != full or full != messages_for_compare(messages):
+            mismatches += 1
+            print(f"  MISMATCH: {turns}턴 페이지 로드 결과가 전체 로드와 다릅니다")
+
+        print(f"{turns:>6}턴 | 전체 {full_rows:>4}행 {full_time * 1000:>6.2f}ms | "
+              f"첫 페이지 {page_rows:>3}행 {page_time * 1000:>6.2f}ms (first_turn={first_turn_index}, more={has_more})")
+
+    # 최근 턴만 로드한 상태에서 새 턴 저장 → 이전 턴은 건드리지 않고 1회 왕복
+    db, _, _, messages = run_growing_session(save_chat_history_to_supabase, 50, "lazy-save")
+    forget_persisted_turns("lazy-save")
+    page, first_turn_index, _ = load_chat_history_page_from_supabase(db, "lazy-save")
+    db.reset_counters()
+    save_chat_history_to_supabase(db, "user-1", "lazy-save", page + _turn(50), first_turn_index)
+    trips = db.round_trips
+    full = load_chat_history_from_supabase(db, "lazy-save")
+    if (storage_utils.CHAT_HISTORY_INCREMENTAL and trips != 1) or full != messages_for_compare(messages + _turn(50)):
+        mismatches += 1
+        print("  MISMATCH: 부분 로드 세션 저장 결과가 다릅니다")
+    print(f"최근 턴만 로드한 50턴 세션에 1턴 추가 저장: {trips}회 왕복")
+    return mismatches
+
+
+def _legacy_export(session, messages):
+    """기존 export_chat_session: 전체를 메모리에서 하나의 JSON 문자열로 생성"""
+    serialized_messages = []
+    for msg in messages:
+        msg_copy = msg.copy()
+        if "images" in msg_copy and msg_copy["images"]:
+            msg_copy["images"] = [base64.b64encode(img).decode('utf-8') for img in msg_copy["images"]]
+        serialized_messages.append(msg_copy)
+    return json.dumps({
+        "title": session["title"],
+        "created_at": session["created_at"].isoformat(),
+        "last_updated": session["last_updated"].isoformat(),
+        "messages": serialized_messages,
+    }, ensure_ascii=False, indent=2)
+
+
+def run_export_checks(turns=500, image_turns=20):
+    """내보내기: 페이지 조회 결과가 전체 로드와 같은지 + 기존/스트리밍 최대 메모리"""
+    mismatches = 0
+    print("\n내보내기 (기존 메모리 JSON vs 스트리밍 NDJSON)")
+    db, _, _, messages = run_growing_session(save_chat_history_to_supabase, turns, "export")
+    db.reset_counters()
+    paged = [msg for page in iter_chat_history_pages(db, "export") for msg in page]
+    if paged != load_chat_history_from_supabase(db, "export"):
+        mismatches += 1
+        print("  MISMATCH: 내보내기 페이지 조회 결과가 전체 로드와 다릅니다")
+    print(f"{turns}턴 세션 페이지 조회: {db.round_trips}회 왕복")
+
+    # 메모리에 이미지 바이트가 있는 현재 세션 (사진 ~400KB)
+    # (기존 내보내기는 URL 이미지에서 실패하므로 URL은 빼고 바이트 이미지만 둠)
+    in_memory = [{k: v for k, v in msg.items() if k != "images"} for msg in messages]
+    for i in range(image_turns):
+        in_memory[i * 2] = dict(in_memory[i * 2], images=[os.urandom(400_000)])
+    now = datetime.now(timezone.utc)
+    session = {"id": "export", "title": "export", "created_at": now, "last_updated": now}
+
+    tracemalloc.start()
+    legacy = _legacy_export(session, in_memory)
+    legacy_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    legacy_size = len(legacy.encode("utf-8"))
+    del legacy
+
+    tracemalloc.start()
+    out = build_export(iter([(session, [in_memory])]), "ndjson", "gzip")
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stream_size = out.seek(0, 2)
+    out.seek(0)
+    exported = [json.loads(line) for line in gzip.open(out).read().splitlines()]
+    if len(exported) != len(in_memory) + 2:
+        mismatches += 1
+        print("  MISMATCH: 스트리밍 내보내기 메시지 수가 다릅니다")
+
+    # st.download_button(data=콜러블)이 받는 형태인지 (Streamlit 변환 함수 통과)
+    # 버튼에 넘기는 값은 bytes이므로 최대 메모리는 build_export_bytes 기준으로 측정
+    tracemalloc.start()
+    data = build_export_bytes(iter([(session, [in_memory])]), "ndjson", "gzip")
+    button_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    try:
+        from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+        data, _ = convert_data_to_bytes_and_infer_mime(data, TypeError("unsupported type"))
+        if len(gzip.decompress(data).splitlines()) != len(exported):
+            mismatches += 1
+            print("  MISMATCH: 다운로드 버튼용 내보내기 내용이 다릅니다")
+    except TypeError as e:
+        mismatches += 1
+        print(f"  MISMATCH: 다운로드 버튼이 내보내기 결과를 받지 못합니다 ({e})")
+    print(f"{turns}턴 + 이미지 {image_turns}장 | 기존 {legacy_size / 1e6:.1f}MB, 최대 메모리 {legacy_peak / 1e6:.1f}MB | "
+          f"스트리밍 {stream_size / 1e6:.1f}MB, 생성 최대 메모리 {stream_peak / 1e6:.1f}MB, "
+          f"다운로드 버튼(bytes) 최대 메모리 {button_peak / 1e6:.1f}MB")
+    mismatches += run_zip_url_image_check(session, messages[:4])
+    return mismatches
+
+
+def run_zip_url_image_check(session, messages):
+    """zip 내보내기: 저장소에서 읽은 URL 이미지가 images/ 사이드카로 들어가는지"""
+    png = b"\x89PNG\r\n\x1a\n" + os.urandom(4096)
+
+    class _ImageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/image.png":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(png)))
+            self.end_headers()
+            self.wfile.write(png)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        stored = [dict(msg) for msg in messages]
+        stored[0]["images"] = [f"{base}/image.png", f"{base}/missing.png"]
+        out = build_export(iter([(session, [stored])]), "zip")
+        with zipfile.ZipFile(out) as archive:
+            sidecars = [name for name in archive.namelist() if name.startswith("images/")]
+            record = json.loads(archive.read(f"sessions/{session['id']}.ndjson").splitlines()[1])
+            ok = (len(sidecars) == 1 and archive.read(sidecars[0]) == png
+                  and record["images"][0].get("path") == sidecars[0]
+                  and record["images"][1] == f"{base}/missing.png")
+    finally:
+        server.shutdown()
+    print(f"zip 내보내기 URL 이미지 | 사이드카 {len(sidecars)}개 (받지 못한 이미지는 URL로 유지)")
+    if not ok:
+        print("  MISMATCH: zip 내보내기가 URL 이미지를 사이드카로 저장하지 않았습니다")
+        return 1
+    return 0
+
+
+def messages_for_compare(messages):
+    """로드 결과와 비교할 수 있도록 저장 전 메시지를 로드 형태로 맞춤"""
+    result = []
+    for msg in messages:
+        copy = {"role": msg["role"], "content": msg["content"]}
+        if msg.get("images"):
+            copy["images"] = msg["images"]
+        if msg["role"] == "assistant" and msg.get("time_taken") is not None:
+            copy["time_taken"] = msg["time_taken"]
+        result.append(copy)
+    return result
+
+
+def main():
+    mismatches = 0
+
+    print("세션 길이별 저장 왕복 횟수 (턴마다 저장)")
+    print(f"{'turns':>6} | {'legacy total':>12} {'last save':>9} {'time':>8} | "
+          f"{'incr total':>10} {'last save':>9} {'time':>8} | {'rows sent legacy/incr':>21}")
+    for turns in SESSION_LENGTHS:
+        legacy_db, legacy_saves, legacy_time, messages = run_growing_session(
+            _legacy_save_chat_history_to_supabase, turns, f"legacy-{turns}")
+        incr_db, incr_saves, incr_time, _ = run_growing_session(
+            save_chat_history_to_supabase, turns, f"incr-{turns}")
+
+        legacy_state = _snapshot(legacy_db, f"legacy-{turns}")
+        incr_state = _snapshot(incr_db, f"incr-{turns}")
+        if legacy_state != incr_state or len(incr_state) != len(messages):
+            mismatches += 1
+            print(f"  MISMATCH: {turns}턴 저장 결과가 다릅니다")
+
+        print(f"{turns:>6} | {sum(legacy_saves):>12} {legacy_saves[-1]:>9} {legacy_time:>7.3f}s | "
+              f"{sum(incr_saves):>10} {incr_saves[-1]:>9} {incr_time:>7.3f}s | "
+              f"{legacy_db.rows_sent:>10}/{incr_db.rows_sent:<10}")
+
+    # 변경 없는 재저장 (세션 전환 시 save_current_session)
+    db, _, _, messages = run_growing_session(save_chat_history_to_supabase, 50, "noop")
+    db.reset_counters()
+    save_chat_history_to_supabase(db, "user-1", "noop", messages)
+    print(f"\n변경 없는 50턴 세션 재저장: 증분 {db.round_trips}회 왕복 (기존 51회)")
+    if storage_utils.CHAT_HISTORY_INCREMENTAL and db.round_trips != 0:
+        mismatches += 1
+
+    # 로드 후 한 턴 추가 (앱 재시작 후 이어서 대화)
+    forget_persisted_turns("noop")
+    loaded = load_chat_history_from_supabase(db, "noop")
+    db.reset_counters()
+    save_chat_history_to_supabase(db, "user-1", "noop", loaded + _turn(50))
+    print(f"로드한 50턴 세션에 1턴 추가 저장: 증분 {db.round_trips}회 왕복, 행 {db.rows_sent}개 전송")
+    if storage_utils.CHAT_HISTORY_INCREMENTAL and (db.round_trips != 1 or db.rows_sent != 1):
+        mismatches += 1
+
+    # 수정 + 되돌리기
+    legacy_db = run_edit_scenario(_legacy_save_chat_history_to_supabase, "edit-legacy")
+    incr_db = run_edit_scenario(save_chat_history_to_supabase, "edit-incr")
+    legacy_trips, incr_trips = legacy_db.round_trips, incr_db.round_trips
+    if _snapshot(legacy_db, "edit-legacy") != _snapshot(incr_db, "edit-incr"):
+        mismatches += 1
+        print("  MISMATCH: 수정/되돌리기 결과가 다릅니다")
+    print(f"12턴 → 8턴 되돌리기 저장: 기존 {legacy_trips}회 / 증분 {incr_trips}회 왕복")
+
+    mismatches += run_lazy_load_checks()
+    mismatches += run_export_checks()
+
+    print(f"\nCHAT_HISTORY_INCREMENTAL={storage_utils.CHAT_HISTORY_INCREMENTAL}, 불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
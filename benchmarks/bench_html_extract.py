@@ -0,0 +1,145 @@
+# benchmarks/bench_html_extract.py
+# 웹페이지 본문/메타데이터 추출 비교 (저장된 HTML fixture 사용):
+#   기존: iframe 확인 파싱 + 본문 파싱 (html.parser) + 추출된 평문을 다시 파싱하는 extract_webpage_metadata
+#   신규: config/html_extract.extract_page 한 번 파싱 (lxml 있으면 lxml)
+#
+# 본문/iframe 주소가 기존과 같은지 확인하고, 기존 방식에서 "Unknown"이던 제목/설명이
+# 이제 채워지는지 확인합니다.
+#
+# 실행: python benchmarks/bench_html_extract.py
+
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from config.html_extract import HTML_PARSER, extract_page  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+ITERATIONS = int(os.environ.get("BENCH_HTML_ITERATIONS", "20"))
+
+# (fixture, URL, 기대 제목)
+FIXTURES = [
+    ("naver_blog_frameset.html", "https://blog.naver.com/travel_note", "여행 기록 : 네이버 블로그"),
+    ("naver_blog_postview.html", "https://blog.naver.com/PostView.naver?blogId=travel_note&logNo=223456789012",
+     "제주 3박 4일 여행 코스 정리"),
+    ("news_article.html", "https://news.example.co.kr/article/20261017/123", "반도체 공급망 지원 확대 검토 | 경제일보"),
+    ("docs_page.html", "https://docs.example.org/3.2/configuration.html", "Configuration Reference — ExampleDocs 3.2"),
+]
+
+
+def legacy_extract(html, url):
+    """기존 fetch_webpage_content 추출부 + extract_webpage_metadata(url, 본문)"""
+    if "blog.naver.com" in url and "/PostView.naver" not in url:
+        soup_check = BeautifulSoup(html, 'html.parser')
+        iframe = soup_check.find('iframe')
+        if iframe and iframe.get('src'):
+            src = iframe.get('src')
+            return None, 'https://blog.naver.com' + src if src.startswith('/') else src, None
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style", "nav", "header", "footer", "aside", "advertisement", "noscript"]):
+        script.decompose()
+    text = ""
+    if "blog.naver.com" in url:
+        for selector in ['div.se-main-container', 'div#postListBody', 'div.post-body', 'div.se-viewer',
+                         'div.se-component', 'div[role="main"]', 'article']:
+            post_body = soup.select_one(selector)
+            if post_body:
+                text = post_body.get_text(separator='\n', strip=True)
+                if len(text) > 100:
+                    break
+                text = ""
+        if not text:
+            json_pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
+            for json_str in re.findall(json_pattern, html, re.DOTALL):
+                try:
+                    data = json.loads(json_str)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(data, dict):
+                    if 'articleBody' in data:
+                        text = data['articleBody']
+                        break
+                    if 'description' in data:
+                        text = data['description']
+                        break
+    if not text:
+        main_content = None
+        for selector in ['main', 'article', '.content', '.post-content', '.entry-content', '#content', '.post-view', '.blog-content']:
+            if content_elem := soup.select_one(selector):
+                main_content = content_elem
+                break
+        text = (main_content or soup).get_text(separator='\n', strip=True)
+    lines = [line.strip() for line in text.split('\n') if line.strip() and len(line.strip()) > 2]
+    cleaned_text = '\n'.join(lines)
+
+    # 기존 app.py: 추출된 평문을 다시 파싱
+    meta_soup = BeautifulSoup(cleaned_text, 'html.parser')
+    title = meta_soup.find('title')
+    return cleaned_text, None, {"title": title.get_text().strip() if title else "Unknown"}
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    for _ in range(ITERATIONS):
+        result = fn(*args)
+    return result, (time.perf_counter() - t0) / ITERATIONS * 1000
+
+
+def main():
+    mismatches = 0
+    parsers = ["html.parser"] + ([HTML_PARSER] if HTML_PARSER != "html.parser" else [])
+    print(f"기본 파서: {HTML_PARSER}, 반복 {ITERATIONS}회")
+    print(f"{'fixture':<26} {'기존':>9} " + " ".join(f"{p:>12}" for p in parsers) + "  제목 (기존 → 신규)")
+    for name, url, expected_title in FIXTURES:
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            html = f.read()
+        (legacy_text, legacy_iframe, legacy_meta), legacy_ms = _time(legacy_extract, html, url)
+        timings = []
+        page = None
+        for parser in parsers:
+            page, ms = _time(extract_page, html, url, parser)
+            timings.append(ms)
+            if legacy_iframe is not None:
+                if page.iframe_url != legacy_iframe:
+                    mismatches += 1
+                    print(f"  MISMATCH [{name}/{parser}]: iframe {page.iframe_url!r} != {legacy_iframe!r}")
+            elif page.text != legacy_text:
+                mismatches += 1
+                print(f"  MISMATCH [{name}/{parser}]: 본문이 기존 추출과 다릅니다 ({len(page.text)} vs {len(legacy_text)} chars)")
+            if legacy_iframe is None:
+                # 앞부분만 모으고 멈춘 결과가 전체 추출 후 자른 결과와 같은지
+                for limit in (500, 5000):
+                    if extract_page(html, url, parser, max_chars=limit).text != legacy_text[:limit]:
+                        mismatches += 1
+                        print(f"  MISMATCH [{name}/{parser}]: max_chars={limit} 결과가 다릅니다")
+            if page.metadata["title"] != expected_title or page.metadata["description"] == "No description available":
+                mismatches += 1
+                print(f"  MISMATCH [{name}/{parser}]: 메타데이터 {page.metadata}")
+        old_title = legacy_meta["title"] if legacy_meta else "(iframe)"
+        print(f"{name:<26} {legacy_ms:>7.2f}ms " + " ".join(f"{ms:>10.2f}ms" for ms in timings)
+              + f"  {old_title} → {page.metadata['title']}")
+
+    # 프레임셋이 아닌 페이지의 iframe(광고/임베드)은 따라가지 않음
+    embed = '<iframe src="https://ads.example.com/banner"></iframe>'
+    for label, html, url in [
+        ("모바일 글", embed, "https://m.blog.naver.com/travel_note/223456789012"),
+        ("글 주소", embed, "https://blog.naver.com/travel_note/223456789012"),
+        ("mainFrame 없음", embed, "https://blog.naver.com/travel_note"),
+    ]:
+        if (iframe_url := extract_page(f"<html><body>{html}</body></html>", url).iframe_url) is not None:
+            mismatches += 1
+            print(f"  MISMATCH [{label}]: iframe을 따라갔습니다 ({iframe_url})")
+
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
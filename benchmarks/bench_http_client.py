@@ -0,0 +1,141 @@
+# benchmarks/bench_http_client.py
+# 외부 HTTP 호출 비교:
+#   호출마다 requests.Session 생성 (기존 fetch_webpage_content / fetch_weather 방식) vs
+#   config/http_client.py 공유 커넥션 풀 클라이언트
+#
+# 로컬 HTTP/1.1 keep-alive 서버를 띄워 서버가 받은 TCP 연결 수를 세고,
+# 두 방식의 응답 본문이 같은지 확인합니다. 같은 서버로 fetch_webpage_content도 호출해
+# 실제 호출 경로가 공유 풀을 재사용하는지, 429(긴 Retry-After)에서 retry=False 클라이언트는
+# 바로 돌아오고 기본 클라이언트는 HTTP_RETRY_AFTER_MAX까지만 기다리는지 확인합니다.
+#
+# 실행: python benchmarks/bench_http_client.py
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 웹페이지 캐시가 저장소의 api_cache를 건드리지 않도록 임시 디렉터리 사용
+os.environ.setdefault("WEBPAGE_CACHE_DIR", tempfile.mkdtemp(prefix="bench_http_webpages_"))
+
+import requests  # noqa: E402
+from requests.adapters import HTTPAdapter  # noqa: E402
+from urllib3.util.retry import Retry  # noqa: E402
+
+from config.http_client import HTTP_RETRY_AFTER_MAX, http_client_stats, http_get  # noqa: E402
+
+CALLS = int(os.environ.get("BENCH_HTTP_CALLS", "300"))
+PAGE = ("<html><head><title>bench</title></head><body><article>"
+        + "<p>본문 문단입니다. 커넥션 재사용을 확인합니다.</p>" * 40
+        + "</article></body></html>").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 지연 ACK 대기 방지
+    connections = 0
+    quota_requests = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with _Handler.lock:
+            _Handler.connections += 1
+
+    def do_GET(self):
+        if self.path.startswith("/quota"):
+            # 호출 한도 초과 (Retry-After가 긴 429)
+            with _Handler.lock:
+                _Handler.quota_requests += 1
+            self.send_response(429)
+            self.send_header("Retry-After", "30")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = PAGE if self.path.startswith("/page") else self.path.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_get(url):
+    """기존 방식: 호출마다 Session + 어댑터 생성"""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("http://", HTTPAdapter(max_retries=retries))
+    return session.get(url, timeout=15).content
+
+
+def _run(label, fetch, base):
+    _Handler.connections = 0
+    t0 = time.perf_counter()
+    bodies = [fetch(f"{base}/item/{i}") for i in range(CALLS)]
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<12} | {CALLS}회 요청, 서버 연결 {_Handler.connections:>4}개, {elapsed:.3f}s")
+    return bodies, _Handler.connections
+
+
+def main():
+    mismatches = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        legacy_bodies, _ = _run("호출별 Session", legacy_get, base)
+        pooled_bodies, pooled_connections = _run("공유 클라이언트", lambda url: http_get(url).content, base)
+        if legacy_bodies != pooled_bodies:
+            mismatches += 1
+            print("  MISMATCH: 응답 본문이 다릅니다")
+        if pooled_connections != 1:
+            mismatches += 1
+            print(f"  MISMATCH: 공유 클라이언트가 연결 {pooled_connections}개를 열었습니다 (기대값 1)")
+
+        # 실제 호출 경로 (URL마다 캐시 미스)
+        from config.utils import fetch_webpage_content
+        _Handler.connections = 0
+        texts = {fetch_webpage_content(f"{base}/page/{i}") for i in range(20)}
+        print(f"fetch_webpage_content 20회, 새 서버 연결 {_Handler.connections}개")
+        if _Handler.connections or len(texts) != 1 or "본문 문단" not in next(iter(texts)):
+            mismatches += 1
+            print("  MISMATCH: fetch_webpage_content가 공유 풀을 재사용하지 않았거나 본문이 다릅니다")
+
+        # 호출 한도가 있는 API: 429는 재시도 없이 바로, 기본 클라이언트도 Retry-After는 최대값까지만 대기
+        for label, retry, max_requests, max_seconds in [
+            ("retry=False", False, 1, 1.0),
+            ("기본", True, 4, HTTP_RETRY_AFTER_MAX * 3 + 2),
+        ]:
+            _Handler.quota_requests = 0
+            t0 = time.perf_counter()
+            status = http_get(f"{base}/quota", retry=retry, timeout=3).status_code
+            elapsed = time.perf_counter() - t0
+            print(f"429 (Retry-After 30s) {label}: 요청 {_Handler.quota_requests}회, {elapsed:.2f}s")
+            if status != 429 or _Handler.quota_requests > max_requests or elapsed > max_seconds:
+                mismatches += 1
+                print(f"  MISMATCH: 429 처리 시간/요청 수가 한도를 넘었습니다 ({label})")
+        quota_calls = 1 + _Handler.quota_requests
+
+        stats = http_client_stats()
+        print(f"공유 클라이언트 통계: 요청 {stats['requests']}, 연결 {stats['connections']}, 재사용 {stats['reused']}")
+        if stats["requests"] != CALLS + 20 + quota_calls or stats["connections"] != 2:
+            mismatches += 1
+            print("  MISMATCH: 재사용 통계가 서버 관측값과 다릅니다")
+    finally:
+        server.shutdown()
+        shutil.rmtree(os.environ["WEBPAGE_CACHE_DIR"], ignore_errors=True)
+
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# benchmarks/bench_import.py
+# 내보내기 파일 일괄 가져오기 비교:
+#   세션마다 이미지 업로드 + 세션 저장 1회 (기존 저장 경로를 세션별로 호출) vs
+#   config/importer.py (스트리밍 파싱, 내용 해시 중복 제거, 배치 upsert)
+#
+# 로컬 가짜 Supabase 클라이언트로 왕복 횟수를 세고, 두 방식의 결과 행이 같은지 확인합니다.
+# 같은 파일을 다시 가져오면 아무 행도 쓰지 않아야 합니다.
+#
+# 실행: python benchmarks/bench_import.py
+
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 업로드 URL 인덱스가 저장소의 api_cache를 건드리지 않도록 임시 디렉터리 사용
+os.environ.setdefault("IMAGE_URL_INDEX_DIR", tempfile.mkdtemp(prefix="bench_import_index_"))
+# 실패 배치 시나리오가 백오프로 오래 걸리지 않도록 재시도는 한 번만
+os.environ.setdefault("IMPORT_BATCH_RETRIES", "1")
+
+from bench_chat_history_persistence import FakeSupabase  # noqa: E402
+from config import storage_utils  # noqa: E402
+from config.exporter import build_export  # noqa: E402
+from config.importer import import_exports, iter_export_files, iter_export_sessions  # noqa: E402
+from config.storage_utils import forget_persisted_turns, save_chat_history_to_supabase, upload_image_to_supabase  # noqa: E402
+
+SESSIONS = int(os.environ.get("BENCH_IMPORT_SESSIONS", "2000"))
+TURNS_PER_SESSION = 5
+SESSIONS_PER_FILE = 500
+IMAGE_POOL = [b"\x89PNG\r\n\x1a\n" + bytes([i]) * 2048 for i in range(20)]
+
+
+def _make_sessions():
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for s in range(SESSIONS):
+        created = base + timedelta(minutes=s)
+        meta = {"id": str(uuid.UUID(int=s + 1)), "title": f"세션 {s}",
+                "created_at": created, "last_updated": created + timedelta(minutes=TURNS_PER_SESSION)}
+        messages = []
+        for t in range(TURNS_PER_SESSION):
+            user = {"role": "user", "content": f"질문 {s}-{t}"}
+            if t == 0 and s % 10 == 0:
+                user["images"] = [IMAGE_POOL[s % len(IMAGE_POOL)]]
+            messages += [user, {"role": "assistant", "content": f"답변 {s}-{t} " + "설명 " * 30, "time_taken": 1.0}]
+        yield meta, messages
+
+
+def write_export_files(directory):
+    sessions = list(_make_sessions())
+    for i in range(0, len(sessions), SESSIONS_PER_FILE):
+        chunk = sessions[i:i + SESSIONS_PER_FILE]
+        out = build_export(((meta, [messages]) for meta, messages in chunk), "ndjson", "gzip")
+        with open(os.path.join(directory, f"export_{i // SESSIONS_PER_FILE:03}.ndjson.gz"), "wb") as f:
+            shutil.copyfileobj(out, f)
+    # 같은 세션이 두 번 들어 있는 파일 (이관 중 겹친 내보내기)
+    shutil.copy(os.path.join(directory, "export_000.ndjson.gz"), os.path.join(directory, "export_dup.ndjson.gz"))
+
+
+def _reset_image_index():
+    storage_utils._get_image_url_index().clear()
+
+
+def naive_import(directory, client, user_id):
+    """세션별로 기존 저장 경로 호출 (이미지마다 업로드, 세션마다 저장 1회)"""
+    for path in iter_export_files([directory]):
+        for meta, records, load_image in iter_export_sessions(path):
+            messages = []
+            for record in records:
+                message = {"role": record["role"], "content": record["content"]}
+                if record.get("time_taken") is not None:
+                    message["time_taken"] = record["time_taken"]
+                images = []
+                for image in record.get("images") or []:
+                    data = load_image(image)
+                    fake_file = type("Upload", (), {})()
+                    fake_file.read, fake_file.seek = (lambda d=data: d), (lambda *_: None)
+                    fake_file.name, fake_file.type = "import.png", "image/png"
+                    images.append(upload_image_to_supabase(fake_file, client, "chat-images", user_id))
+                if images:
+                    message["images"] = images
+                messages.append(message)
+            forget_persisted_turns(meta["id"])
+            save_chat_history_to_supabase(client, user_id, meta["id"], messages)
+
+
+class _FlakySupabase(FakeSupabase):
+    """upsert 중 fail_on 번째(1부터) 호출들을 503으로 실패시키는 가짜 클라이언트 (fail_on=None이면 항상 실패)"""
+
+    def __init__(self, fail_on=None):
+        super().__init__()
+        self.fail_on = fail_on
+        self.upserts = 0
+
+    def table(self, name):
+        table = super().table(name)
+        upsert = table.upsert
+
+        def flaky_upsert(*args, **kwargs):
+            query = upsert(*args, **kwargs)
+            self.upserts += 1
+            if self.fail_on is None or self.upserts in self.fail_on:
+                def fail():
+                    raise RuntimeError("503 Service Unavailable")
+                query.execute = fail
+            return query
+
+        table.upsert = flaky_upsert
+        return table
+
+
+def _table_state(client):
+    return sorted(
+        (row["session_id"], row["turn_index"], row["question"], row["answer"], tuple(row.get("images") or ()))
+        for row in client.tables.get("chat_history", [])
+    )
+
+
+def main():
+    mismatches = 0
+    directory = tempfile.mkdtemp(prefix="bench_import_")
+    try:
+        write_export_files(directory)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"{SESSIONS}개 세션 x {TURNS_PER_SESSION}턴, 파일 {len(os.listdir(directory))}개 ({size / 1e6:.1f}MB, 중복 파일 1개 포함)")
+
+        _reset_image_index()
+        naive_db = FakeSupabase()
+        t0 = time.perf_counter()
+        naive_import(directory, naive_db, "user-1")
+        naive_time = time.perf_counter() - t0
+
+        _reset_image_index()
+        import_db = FakeSupabase()
+        t0 = time.perf_counter()
+        stats = import_exports([directory], import_db, "user-1")
+        import_time = time.perf_counter() - t0
+
+        print(f"세션별 저장 | {naive_db.round_trips:>6}회 왕복, 업로드 {naive_db.uploads:>4}회, {naive_time:.2f}s")
+        print(f"일괄 가져오기 | {import_db.round_trips:>6}회 왕복, 업로드 {import_db.uploads:>4}회, {import_time:.2f}s "
+              f"(배치 {stats.batches}, 중복 세션 {stats.duplicate_sessions})")
+
+        if _table_state(naive_db) != _table_state(import_db):
+            mismatches += 1
+            print("  MISMATCH: 가져온 행이 세션별 저장 결과와 다릅니다")
+        if stats.sessions != SESSIONS or stats.errors:
+            mismatches += 1
+            print(f"  MISMATCH: 가져온 세션 수 {stats.sessions} (오류 {stats.errors[:3]})")
+
+        # 다시 가져오기: 이미 있는 세션은 건너뛰고 행을 쓰지 않아야 함
+        import_db.reset_counters()
+        rerun = import_exports([directory], import_db, "user-1")
+        print(f"다시 가져오기 | {import_db.round_trips:>6}회 왕복, 기존 세션 {rerun.existing_sessions}, 쓴 행 {rerun.rows}")
+        if rerun.rows or rerun.existing_sessions != SESSIONS:
+            mismatches += 1
+            print("  MISMATCH: 다시 가져오기에서 행을 썼습니다")
+
+        # 마지막 배치 upsert가 한 번 실패: 재시도로 모든 세션을 가져와야 함
+        _reset_image_index()
+        flaky_db = _FlakySupabase(fail_on={stats.batches})
+        flaky = import_exports([directory], flaky_db, "user-1")
+        print(f"일시적 503    | 세션 {flaky.sessions}, 오류 {len(flaky.errors)}")
+        if flaky.sessions != SESSIONS or flaky.errors or _table_state(flaky_db) != _table_state(import_db):
+            mismatches += 1
+            print("  MISMATCH: 실패한 배치를 다시 시도하지 않았습니다")
+
+        # upsert가 계속 실패: 예외 없이 실패한 세션 ID를 오류로 남겨야 함
+        _reset_image_index()
+        down = import_exports([directory], _FlakySupabase(), "user-1")
+        failed_ids = sum(error.count(",") + 1 for error in down.errors if error.startswith("배치 저장 실패"))
+        print(f"계속 503      | 세션 {down.sessions}, 실패 기록 세션 {failed_ids}")
+        if down.sessions or failed_ids != SESSIONS:
+            mismatches += 1
+            print("  MISMATCH: 실패한 배치의 세션 ID가 오류에 남지 않았습니다")
+
+        # 다른 사용자로 가져오기: 겹치는 세션 ID를 새 ID로 바꿔 모두 가져와야 하고, 다시 실행하면 건너뜀
+        other = import_exports([directory], import_db, "user-2")
+        other_rerun = import_exports([directory], import_db, "user-2")
+        owned = {row["session_id"] for row in import_db.tables["chat_history"] if row["user_id"] == "user-2"}
+        print(f"다른 사용자    | 세션 {other.sessions}, 새 ID {len(other.remapped)}, 다시 실행 시 기존 {other_rerun.existing_sessions}")
+        if (other.sessions != SESSIONS or other.errors or len(other.remapped) != SESSIONS or len(owned) != SESSIONS
+                or other_rerun.rows or other_rerun.existing_sessions != SESSIONS):
+            mismatches += 1
+            print("  MISMATCH: 다른 사용자로 가져온 세션이 빠지거나 중복되었습니다")
+
+        # 첫 줄이 export 레코드인지 (형식 확인)
+        with gzip.open(os.path.join(directory, "export_000.ndjson.gz")) as f:
+            if json.loads(f.readline()).get("type") != "export":
+                mismatches += 1
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        shutil.rmtree(os.environ["IMAGE_URL_INDEX_DIR"], ignore_errors=True)
+
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
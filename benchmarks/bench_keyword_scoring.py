@@ -0,0 +1,421 @@
+# benchmarks/bench_keyword_scoring.py
+# 쿼리당 키워드 스코어링 비용 비교: 기존 should_search / F1 인텐트 (패턴별 re.search 루프)
+# vs 컴파일된 KeywordScoringEngine
+#
+# 실행: python benchmarks/bench_keyword_scoring.py
+
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.intents import (  # noqa: E402
+    F1_SCORING_ENGINE, INTENT_PATTERNS, KW_WEIGHTS, NEGATIVE_KEYWORDS, NEGATIVE_KW_WEIGHTS,
+    _HAS_LANGDETECT, _fallback_detect, detect, detect_f1_intent,
+)
+from config.web_search import SEARCH_SCORING_ENGINE, WebSearchAPI  # noqa: E402
+
+# -----------------------------------------------------------------------------
+# 기존 구현 (변경 전 config/web_search.py — 이중 이스케이프(r"\\b")만 바로잡음.
+# 원본 그대로는 첫 패턴에서 re.error: multiple repeat 가 발생합니다)
+# -----------------------------------------------------------------------------
+
+def legacy_should_search(query):
+    """
+    개선된 검색 필요 판단기 (스코어링 + 부정 키워드 시스템)
+    반환: (bool, reason)
+    - True: 검색이 필요함
+    - False: 검색 불필요, 이유 문자열 반환
+    """
+    if not query or not isinstance(query, str):
+        return False, "빈 쿼리"
+
+    q = query.lower()
+
+    # ========================================
+    # 0. 짧은 추가 질문 필터링 (이전 컨텍스트 활용)
+    # ========================================
+    short_followup_patterns = [
+        r'^[가-힣]{1,3}[는은]?\?*$',  # "온도는?", "습도?"
+        r'^[가-힣]{1,5}[요야]?\?*$',  # "얼마야?", "몇도요?"
+        r'^정확한\s*[가-힣]{2,4}',    # "정확한 온도"
+        r'^구체적인\s*[가-힣]{2,4}',  # "구체적인 습도"
+        r'^\w{1,10}\?*$',            # 영어 단어 하나 "temperature?"
+    ]
+
+    for pattern in short_followup_patterns:
+        if re.search(pattern, q):
+            return False, "추가 질문 (이전 컨텍스트 활용)"
+
+    # ========================================
+    # 1. 부정 키워드 체크 (일반 지식/설명 요청)
+    # ========================================
+    NEGATIVE_KEYWORDS = [
+        # 일반 설명/정의 요청 (한국어)
+        r"\b설명해\b", r"\b설명\b", r"\b이란\b", r"\b뭐야\b", r"\b무엇\b",
+        r"\b뭔지\b", r"\b의미\b", r"\b개념\b", r"\b정의\b",
+        r"\b이해\b", r"\b알려줘\b(?!.*검색)", # "알려줘"만 단독으로 (검색 없이)
+        # 비교/추천 (검색 불필요)
+        r"\b차이\b", r"\b비교\b", r"\b추천\b", r"\b좋은\b", r"\b나은\b",
+        # 의견/생각 요청
+        r"\b생각해\b", r"\b의견\b", r"\b어떻게 생각\b",
+        # 역사/이론/학문
+        r"\b역사\b", r"\b기원\b", r"\b유래\b", r"\b이론\b",
+        r"\b철학\b", r"\b원리\b", r"\b과학\b", r"\b수학\b",
+        # 일반 대화
+        r"\b안녕\b", r"\b감사\b", r"\b고마워\b", r"\b미안\b",
+
+        # 영어
+        r"\bexplain\b", r"\bwhat is\b", r"\bwhat's\b", r"\bwhat are\b",
+        r"\bdefine\b", r"\bdefinition\b", r"\bmeaning\b", r"\bconcept\b",
+        r"\btell me about\b(?!.*(latest|recent|current))", # "tell me about"만 단독
+        r"\bcompare\b", r"\bdifference\b", r"\brecommend\b",
+        r"\bopinion\b", r"\bthink\b", r"\bbelieve\b",
+        r"\bhistory\b", r"\btheory\b", r"\borigin\b", r"\bphilosophy\b",
+        r"\bhello\b", r"\bthanks\b", r"\bthank you\b", r"\bsorry\b",
+
+        # 스페인어
+        r"\bexplicar\b", r"\bqué es\b", r"\bcuál es\b",
+        r"\bdefinir\b", r"\bdefinición\b", r"\bsignificado\b",
+        r"\bcomparar\b", r"\bdiferencia\b", r"\brecomendar\b",
+        r"\bopinión\b", r"\bpensar\b", r"\bcreer\b",
+        r"\bhistoria\b", r"\bteoría\b", r"\borigen\b",
+        r"\bhola\b", r"\bgracias\b", r"\bperdón\b",
+    ]
+
+    for neg_pattern in NEGATIVE_KEYWORDS:
+        if re.search(neg_pattern, q):
+            # 단, 실시간 키워드와 함께 사용되면 검색 허용
+            realtime_override = ['최신', '현재', '실시간', '오늘', 'latest', 'current', 'today', 'now']
+            if not any(rt in q for rt in realtime_override):
+                return False, f"일반 대화/설명 요청 감지: {neg_pattern}"
+
+    # ========================================
+    # 2. 명시적 검색 의도 체크 (우선순위 최상위)
+    # ========================================
+    EXPLICIT_SEARCH_KEYWORDS = [
+        # 한국어
+        r"\b검색\b", r"\b찾아봐\b", r"\b찾아줘\b", r"\b조회\b",
+        r"\b검색해\b", r"\b알아봐\b",
+        # 영어
+        r"\bsearch\b", r"\blook up\b", r"\bfind out\b",
+        r"\bgoogle\b", r"\bcheck\b",
+        # 스페인어
+        r"\bbuscar\b", r"\bbusca\b", r"\bconsultar\b",
+    ]
+
+    for search_kw in EXPLICIT_SEARCH_KEYWORDS:
+        if re.search(search_kw, q):
+            return True, f"명시적 검색 요청: {search_kw}"
+
+    # ========================================
+    # 3. 스코어링 시스템 (실시간 정보 필요성 평가)
+    # ========================================
+    score = 0.0
+    matched_reasons = []
+
+    # 3.1) 실시간 필수 정보 (높은 점수)
+    REALTIME_CRITICAL = {
+        # 날씨 (1.5점)
+        '날씨': 1.5, 'weather': 1.5, 'tiempo': 1.5,
+        '기온': 1.5, 'temperature': 1.5, 'temperatura': 1.5,
+        # 금융 (1.5점)
+        '주가': 1.5, 'stock': 1.5, 'bolsa': 1.5,
+        '환율': 1.5, 'exchange rate': 1.5, 'tipo de cambio': 1.5,
+        '비트코인': 1.3, 'bitcoin': 1.3,
+        # 뉴스/속보 (1.5점)
+        '뉴스': 1.5, 'news': 1.5, 'noticias': 1.5,
+        '속보': 1.5, 'breaking': 1.5,
+    }
+
+    for kw, points in REALTIME_CRITICAL.items():
+        if kw in q:
+            score += points
+            matched_reasons.append(f'{kw}(+{points})')
+
+    # 3.2) 시간성 키워드 (중간 점수)
+    TEMPORAL_KEYWORDS = {
+        '오늘': 1.0, 'today': 1.0, 'hoy': 1.0,
+        '현재': 1.0, 'current': 1.0, 'actual': 1.0,
+        '지금': 1.0, 'now': 1.0, 'ahora': 1.0,
+        '최신': 1.0, 'latest': 1.0, 'último': 1.0,
+        '최근': 0.8, 'recent': 0.8, 'reciente': 0.8,
+        '실시간': 1.2, 'real-time': 1.2, 'tiempo real': 1.2,
+    }
+
+    for kw, points in TEMPORAL_KEYWORDS.items():
+        if kw in q:
+            score += points
+            matched_reasons.append(f'{kw}(+{points})')
+
+    # 3.3) 의약품 (안전을 위해 검색 권장)
+    MEDICINE_KEYWORDS = {
+        '타이레놀': 1.5, 'tylenol': 1.5,
+        '아스피린': 1.5, 'aspirin': 1.5,
+        '부작용': 1.3, 'side effect': 1.3, 'efectos secundarios': 1.3,
+        '복용법': 1.3, 'dosage': 1.3, 'dosis': 1.3,
+        '효능': 1.0, 'efficacy': 1.0,
+    }
+
+    for kw, points in MEDICINE_KEYWORDS.items():
+        if kw in q:
+            score += points
+            matched_reasons.append(f'{kw}(+{points})')
+
+    # 3.4) 지역 + 날씨/시간 조합 (강력한 실시간 지표)
+    location_weather_pattern = r'(서울|부산|인천|뉴욕|런던|도쿄|파리|베이징|LA|시드니).*(날씨|기온|시간|온도|weather|temperature)'
+    if re.search(location_weather_pattern, q):
+        score += 2.0
+        matched_reasons.append('지역+날씨(+2.0)')
+
+    # 3.5) 날짜/연도 포함 (중간 점수)
+    if re.search(r'(202[0-9]|203[0-9])년?', q):
+        score += 0.8
+        matched_reasons.append('연도(+0.8)')
+
+    if re.search(r'\b(\d{1,2}월|어제|내일|방금)\b', q):
+        score += 0.5
+        matched_reasons.append('날짜(+0.5)')
+
+    # ========================================
+    # 4. Threshold 판단 (2.5 이상이면 검색)
+    # ========================================
+    THRESHOLD = 2.5
+
+    if score >= THRESHOLD:
+        reason = f"실시간 정보 필요 (점수: {score:.1f}/{THRESHOLD}, 매칭: {', '.join(matched_reasons)})"
+        return True, reason
+
+    # ========================================
+    # 5. 기본: 검색 불필요
+    # ========================================
+    if score > 0:
+        return False, f'점수 부족 ({score:.1f} < {THRESHOLD})'
+    else:
+        return False, '실시간 정보 불필요 (일반 대화)'
+
+
+# -----------------------------------------------------------------------------
+# 기존 구현 (변경 전 config/intents.py 그대로)
+# -----------------------------------------------------------------------------
+
+def legacy_detect_f1_intent(text: str):
+    """Detect F1 standings intent and language.
+
+    Returns: dict {lang, intent, year, pattern}
+    """
+    text_lower = (text or "").lower()
+
+    # 0) 부정 키워드 체크 - 순위가 아닌 다른 주제를 물어보는 경우
+    for neg_kw in NEGATIVE_KEYWORDS:
+        if re.search(neg_kw, text_lower):
+            # 순위가 아닌 다른 주제이므로 즉시 None 반환
+            return {"lang": None, "intent": None, "year": None, "pattern": None}
+
+    # 1) Exact pattern check (quick confidence)
+    # helper: robust year extraction (matches '2024', '2024년', '24년')
+    def _extract_year(t: str):
+        # match full 20xx optionally followed by '년'
+        m = re.search(r"(20\d{2})(?=년|\b)", t)
+        if m:
+            return int(m.group(1))
+        # match two-digit year with '년' suffix e.g. '24년' -> 2024
+        m2 = re.search(r"\b(\d{2})년\b", t)
+        if m2:
+            yy = int(m2.group(1))
+            return 2000 + yy
+        # fallback to plain four-digit
+        m3 = re.search(r"\b(20\d{2})\b", t)
+        if m3:
+            return int(m3.group(1))
+        return None
+
+    for lang, patterns in INTENT_PATTERNS.items():
+        for p in patterns:
+            if re.search(p, text_lower):
+                year = _extract_year(text_lower)
+                return {"lang": lang, "intent": "f1_rank", "year": year, "pattern": p}
+
+    # 2) Scoring-based fallback (helpful for short / colloquial queries)
+    scored = legacy_detect_f1_intent_scored(text_lower)
+    if scored.get("intent"):
+        return scored
+
+    # 3) Language fallback
+    try:
+        lang_guess = detect(text or "en") if _HAS_LANGDETECT else _fallback_detect(text)
+    except Exception:
+        lang_guess = 'en'
+
+    if lang_guess.startswith('ko'):
+        lang = 'ko'
+    elif lang_guess.startswith('es'):
+        lang = 'es'
+    elif lang_guess.startswith('en'):
+        lang = 'en'
+    else:
+        lang = 'en'
+
+    return {"lang": lang, "intent": None, "year": None, "pattern": None}
+
+
+### Scoring-based detection
+
+
+def legacy_detect_f1_intent_scored(text: str, threshold: float = 2.2):
+    """Score-based intent detection. Returns dict similar to detect_f1_intent.
+
+    Threshold raised to 2.2 to require explicit ranking-related keywords.
+    Negative keywords subtract from the score.
+    """
+    t = (text or "").lower()
+    score = 0.0
+    matched = []
+
+    # presence of F1
+    if re.search(r"\bf-?1\b|에프원|formula\s*1", t):
+        # F1만으로는 낮은 점수
+        if "formula 1" in t or "formula1" in t:
+            score += 1.0
+            matched.append('formula_1')
+        else:
+            score += 0.8
+            matched.append('f1')
+
+    # keyword weights
+    for kw, w in KW_WEIGHTS.items():
+        if kw in t:
+            score += w
+            matched.append(kw)
+
+    # negative keyword penalties
+    for neg_kw, penalty in NEGATIVE_KW_WEIGHTS.items():
+        if neg_kw in t:
+            score += penalty  # penalty는 음수
+            matched.append(f'negative:{neg_kw}')
+
+    # year extraction boosts confidence
+    year = None
+    m = re.search(r"(20\d{2})(?=년|\b)", t)
+    if m:
+        year = int(m.group(1))
+    else:
+        m2 = re.search(r"\b(\d{2})년\b", t)
+        if m2:
+            year = 2000 + int(m2.group(1))
+        else:
+            m3 = re.search(r"\b(20\d{2})\b", t)
+            if m3:
+                year = int(m3.group(1))
+    if year:
+        score += 0.5
+        matched.append('year')
+
+    intent = None
+    if score >= threshold:
+        intent = 'f1_rank'
+
+    return {"lang": None, "intent": intent, "year": year, "score": score, "matched": matched}
+
+
+CORPUS = [
+    # 한국어
+    "안녕하세요",
+    "오늘 서울 날씨 어때?",
+    "온도는?",
+    "정확한 온도 알려줘",
+    "비트코인 현재 시세",
+    "최신 뉴스 검색해줘",
+    "삼성전자 주가 실시간으로 알려줄래",
+    "양자역학의 개념을 설명해줘",
+    "파이썬과 자바의 차이가 뭐야",
+    "타이레놀 복용법과 부작용",
+    "2025년 3월 환율 동향",
+    "내일 부산 기온은 어떻게 될까요",
+    "F1 순위 알려줘",
+    "에프원 드라이버 순위",
+    "2024년 f1 컨스트럭터 순위표",
+    "f1 규정이 바뀐 이유",
+    "에프원 다음 경기 일정",
+    # English
+    "what's the weather in New York today",
+    "latest news about the stock market",
+    "explain how transformers work",
+    "search for bitcoin price",
+    "formula 1 driver standings 2023",
+    "current f1 standings",
+    "who won the f1 race yesterday",
+    "f1 car setup and aerodynamics",
+    "temperature?",
+    # Español
+    "¿Qué tiempo hace hoy en Madrid?",
+    "buscar noticias de última hora",
+    "clasificación de pilotos f1 2024",
+    "explicar la teoría de la relatividad",
+    "efectos secundarios de la aspirina",
+    # 긴 메시지
+    "이 글에서 말하는 요점을 정리하면 " * 50 + "오늘 날씨",
+]
+
+
+def _time_per_query(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in CORPUS:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(CORPUS))
+
+
+def _uncached(engine):
+    """엔진 LRU를 우회하는 scan 함수 (매 호출마다 실제 스캔)"""
+    return engine._scan
+
+
+def main(iterations=200):
+    api = WebSearchAPI("id", "secret", cache_handler=None)
+
+    # 1) 결정 동일성 검증
+    mismatches = 0
+    for text in CORPUS:
+        for name, before, after in (
+            ("should_search", legacy_should_search(text), api.should_search(text)),
+            ("detect_f1_intent", legacy_detect_f1_intent(text), detect_f1_intent(text)),
+        ):
+            if before != after:
+                mismatches += 1
+                print(f"MISMATCH[{name}]: {text[:60]!r}\n  before={before}\n  after ={after}")
+    print(f"decisions checked: {len(CORPUS) * 2}, mismatches: {mismatches}")
+
+    # 2) 쿼리당 스코어링 비용
+    #    detect_f1_intent의 마지막 언어 감지 fallback(langdetect)은 양쪽이 동일하고
+    #    비용 대부분을 차지하므로 측정 중에는 상수 함수로 대체합니다.
+    import config.intents as intents_module
+    global detect
+    original_detect = detect
+    detect = intents_module.detect = lambda t: "en"
+    try:
+        for label, legacy_fn, new_fn, engine in (
+            ("should_search", legacy_should_search, api.should_search, SEARCH_SCORING_ENGINE),
+            ("f1_intent", legacy_detect_f1_intent, detect_f1_intent, F1_SCORING_ENGINE),
+        ):
+            legacy = _time_per_query(legacy_fn, iterations)
+            cached = _time_per_query(new_fn, iterations)
+            original_scan = engine.scan
+            engine.scan = _uncached(engine)
+            try:
+                uncached = _time_per_query(new_fn, iterations)
+            finally:
+                engine.scan = original_scan
+            print(f"{label:<14} legacy             : {legacy * 1e6:8.2f} µs/query")
+            print(f"{label:<14} engine (uncached)  : {uncached * 1e6:8.2f} µs/query  ({legacy / uncached:.1f}x)")
+            print(f"{label:<14} engine (memoized)  : {cached * 1e6:8.2f} µs/query  ({legacy / cached:.1f}x)")
+    finally:
+        detect = intents_module.detect = original_detect
+    return mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,287 @@
+# benchmarks/bench_lang_detection.py
+# 메시지당 언어 감지 비용 비교: 기존 단어별 정규식 17개 검사 vs 단어 집합 분류 + LRU 캐시
+# (10k자 이상 붙여넣기 입력 포함)
+#
+# 실행: python benchmarks/bench_lang_detection.py
+
+import os
+import re
+import sys
+import time
+from typing import Dict, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.lang import _analyze_clean_text, analyze_language_composition, detect_dominant_language  # noqa: E402
+
+# -----------------------------------------------------------------------------
+# 기존 구현 (변경 전 config/lang.py 그대로)
+# -----------------------------------------------------------------------------
+
+def legacy_detect_language_learning_context(text: str) -> bool:
+    """언어 학습 맥락인지 판단"""
+    learning_keywords = {
+        "ko": [
+            "공부", "배우", "학습", "의미", "뜻", "알려줘", "설명해줘", "번역", 
+            "어떻게 말해", "뭐라고 해", "표현", "단어", "회화", "문법", "언어"
+        ],
+        "en": [
+            "study", "learn", "learning", "meaning", "means", "translate", "translation",
+            "how to say", "what does", "expression", "word", "conversation", "grammar", 
+            "practice", "language"
+        ],
+        "es": [
+            "estudiar", "aprender", "significado", "significa", "traducir", "traducción",
+            "cómo se dice", "qué significa", "expresión", "palabra", "conversación", 
+            "gramática", "idioma"
+        ]
+    }
+    
+    text_lower = text.lower()
+    for lang_keywords in learning_keywords.values():
+        if any(keyword in text_lower for keyword in lang_keywords):
+            return True
+    return False
+
+def legacy_analyze_language_composition(text: str) -> Dict[str, float]:
+    """텍스트의 언어별 구성 비율을 정밀 분석"""
+    # URL과 특수문자 제거
+    url_pattern = r'https?://[^\s]+'
+    text_clean = re.sub(url_pattern, '', text)
+    text_clean = re.sub(r'[^\w\s가-힣ñáéíóúü¿¡]', ' ', text_clean)
+    text_clean = text_clean.strip()
+    
+    if not text_clean:
+        return {"ko": 0, "en": 0, "es": 0}
+    
+    total_chars = len(text_clean.replace(' ', ''))
+    if total_chars == 0:
+        return {"ko": 0, "en": 0, "es": 0}
+    
+    # 한글 문자 카운트
+    korean_chars = sum(1 for char in text_clean if '\uac00' <= char <= '\ud7af')
+    korean_ratio = korean_chars / total_chars
+    
+    # 스페인어 특수문자
+    spanish_special_chars = sum(1 for char in text_clean if char in 'ñáéíóúü¿¡')
+    
+    # 단어 단위 분석
+    words = text_clean.split()
+    total_words = len(words)
+    
+    if total_words == 0:
+        return {"ko": korean_ratio, "en": 0, "es": 0}
+    
+    # 스페인어 단어 패턴 (대폭 개선)
+    spanish_patterns = [
+        # 스페인어 특수문자 포함 단어
+        r'[a-zA-Z]*[ñáéíóúü][a-zA-Z]*',  
+        
+        # 기본 관사, 전치사, 접속사
+        r'\b(el|la|los|las|un|una|del|al|y|o|de|en|por|para|con|sin|que|se|te|me|le|lo|su|mi|tu)\b',
+        
+        # 동사 (be동사, 일반동사)
+        r'\b(es|son|está|están|ser|estar|tiene|tengo|hay|va|voy|fue|era|dice|dijo|hace|hizo|puede|quiere|sabe|conoce)\b',
+        
+        # 형용사 (중요한 buenos, buenas 포함)
+        r'\b(bueno|buena|buenos|buenas|malo|mala|malos|malas|grande|grandes|pequeño|pequeña|nuevo|nueva|viejo|vieja|mejor|peor)\b',
+        
+        # 시간 관련 (핵심: días, tardes, noches)
+        r'\b(días|día|tardes|tarde|noches|noche|mañana|mañanas|hoy|ayer|tiempo|año|años)\b',
+        
+        # 인사말 및 정중 표현
+        r'\b(hola|adiós|gracias|por\s+favor|disculpe|perdón|lo\s+siento|de\s+nada)\b',
+        
+        # 의문사 및 기본 대화
+        r'\b(qué|quién|quiénes|dónde|cuándo|cómo|por\s+qué|cuánto|cuánta|cuántos|cuántas|cuál|cuáles)\b',
+        
+        # 기본 부사/형용사
+        r'\b(muy|más|menos|bien|mal|sí|no|también|siempre|nunca|aquí|allí|donde)\b',
+        
+        # 일반 명사
+        r'\b(casa|trabajo|persona|personas|gente|hombre|mujer|niño|niña|agua|comida|dinero)\b'
+    ]
+    
+    spanish_word_count = 0
+    for word in words:
+        word_lower = word.lower()
+        if any(re.search(pattern, word_lower) for pattern in spanish_patterns):
+            spanish_word_count += 1
+    
+    spanish_word_ratio = spanish_word_count / total_words
+    spanish_char_ratio = spanish_special_chars / total_chars
+    spanish_total_score = max(spanish_word_ratio * 0.7 + spanish_char_ratio * 0.3, spanish_char_ratio)
+    
+    # 영어 단어 패턴 (개선)
+    english_patterns = [
+        # 기본 관사, 전치사, 접속사
+        r'\b(the|a|an|and|or|but|if|when|where|how|what|who|which|that|this|these|those)\b',
+        
+        # be동사, 조동사, 일반동사
+        r'\b(is|are|was|were|be|been|being|have|has|had|will|would|can|could|should|must|may|might)\b',
+        r'\b(do|does|did|get|got|make|made|take|took|go|went|come|came|see|saw|know|knew)\b',
+        r'\b(think|thought|say|said|tell|told|give|gave|find|found|help|want|need|like|love)\b',
+        
+        # 형용사
+        r'\b(good|bad|big|small|new|old|first|last|long|short|high|low|early|late|fast|slow|hot|cold)\b',
+        
+        # 인사말, 정중표현
+        r'\b(hello|hi|goodbye|bye|please|thank|you|thanks|sorry|excuse|welcome)\b',
+        
+        # 기본 부사
+        r'\b(yes|no|not|very|much|more|less|well|here|there|now|then|always|never)\b',
+        
+        # 일반 명사
+        r'\b(time|day|year|work|home|people|person|man|woman|child|water|food|money)\b'
+    ]
+    
+    english_word_count = 0
+    for word in words:
+        word_lower = word.lower()
+        # 한글이나 스페인어 특수문자가 포함된 단어는 제외
+        if not re.search(r'[가-힣ñáéíóúü]', word):
+            if any(re.search(pattern, word_lower) for pattern in english_patterns):
+                english_word_count += 1
+    
+    english_ratio = english_word_count / total_words
+    
+    # 나머지는 영어로 간주 (한국어, 스페인어가 아닌 라틴 문자)
+    remaining_chars = total_chars - korean_chars - spanish_special_chars
+    remaining_ratio = remaining_chars / total_chars if remaining_chars > 0 else 0
+    
+    # 영어 점수는 영어 단어 패턴과 나머지 라틴 문자를 고려
+    english_total_score = max(english_ratio * 0.8 + remaining_ratio * 0.2, english_ratio)
+    
+    return {
+        "ko": korean_ratio,
+        "en": english_total_score,
+        "es": spanish_total_score
+    }
+
+def legacy_detect_dominant_language(text: str, current_language: str = "ko") -> Tuple[str, float]:
+    """
+    주요 언어를 감지합니다.
+    
+    Args:
+        text: 분석할 텍스트
+        current_language: 현재 설정된 언어
+        
+    Returns:
+        (감지된_언어, 신뢰도) 튜플
+    """
+    # 언어 학습 맥락인지 확인
+    is_learning_context = legacy_detect_language_learning_context(text)
+    
+    # 언어별 구성 비율 분석
+    composition = legacy_analyze_language_composition(text)
+    
+    # 임계값 설정 (더 엄격하게)
+    DOMINANT_THRESHOLD = 0.6  # 60% 이상이어야 주요 언어로 인정
+    MIXED_THRESHOLD = 0.3     # 30% 이상이면 혼합된 것으로 간주
+    
+    max_lang = max(composition.keys(), key=lambda k: composition[k])
+    max_score = composition[max_lang]
+    
+    # 신뢰도 계산
+    second_max_score = sorted(composition.values(), reverse=True)[1] if len(composition) > 1 else 0
+    confidence = max_score - second_max_score
+    
+    # 언어 학습 맥락이면 현재 언어 유지
+    if is_learning_context:
+        return current_language, 0.9
+    
+    # 주요 언어가 명확한 경우 (60% 이상)
+    if max_score >= DOMINANT_THRESHOLD:
+        return max_lang, confidence
+    
+    # 혼합된 텍스트인 경우 - 현재 언어가 30% 이상이면 유지
+    if composition[current_language] >= MIXED_THRESHOLD:
+        return current_language, 0.5
+    
+    # 그 외의 경우 - 최고 점수 언어 반환 (낮은 신뢰도)
+    return max_lang, confidence * 0.7
+
+
+_KO_PARAGRAPH = (
+    "인공지능 기술은 최근 몇 년 사이 빠르게 발전하면서 산업 전반에 큰 변화를 가져오고 있습니다. "
+    "특히 대규모 언어 모델은 문서 요약, 번역, 코드 작성 등 다양한 분야에서 활용되고 있으며, "
+    "기업들은 이를 업무 자동화에 적극적으로 도입하고 있습니다. "
+)
+_EN_PARAGRAPH = (
+    "The committee said that the new policy would help people who need more time to find work, "
+    "but critics think it is not enough and that the government should do much more this year. "
+)
+_ES_PARAGRAPH = (
+    "Buenos días a todos. Hoy hace muy buen tiempo en la ciudad y la gente está en la calle; "
+    "el año pasado fue más difícil para muchas personas, pero también hay buenas noticias. "
+)
+
+
+def _repeat_to(text, min_chars):
+    return text * (min_chars // len(text) + 1)
+
+
+CORPUS = [
+    "안녕하세요",
+    "오늘 서울 날씨 어때?",
+    "Hello, how are you today?",
+    "Buenos días, ¿cómo estás?",
+    "¿Qué significa 'sobremesa'?",
+    "What does 안녕 mean in Korean?",
+    "이 문장 영어로 번역해줘: I want to go home",
+    "https://www.youtube.com/watch?v=8E6-emm_QVg 요약해줘",
+    "por favor dime qué hora es",
+    "ok",
+]
+LONG_CORPUS = [
+    _repeat_to(_KO_PARAGRAPH, 12000),
+    _repeat_to(_EN_PARAGRAPH, 12000),
+    _repeat_to(_ES_PARAGRAPH, 12000),
+    _repeat_to(_KO_PARAGRAPH + _EN_PARAGRAPH + " https://example.com/a?b=c ", 15000),
+]
+
+
+def _time_per_call(fn, corpus, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in corpus:
+            fn(text, "ko")
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(corpus))
+
+
+def _uncached_detect(text, current_language):
+    _analyze_clean_text.cache_clear()
+    return detect_dominant_language(text, current_language)
+
+
+def main(iterations=20):
+    # 1) 결과 동일성 검증 (구성 비율 + 감지 결과)
+    mismatches = 0
+    for text in CORPUS + LONG_CORPUS:
+        before = legacy_analyze_language_composition(text)
+        after = analyze_language_composition(text)
+        if before != after:
+            mismatches += 1
+            print(f"MISMATCH[composition]: {text[:40]!r}\n  before={before}\n  after ={after}")
+        for current in ("ko", "en", "es"):
+            before = legacy_detect_dominant_language(text, current)
+            after = detect_dominant_language(text, current)
+            if before != after:
+                mismatches += 1
+                print(f"MISMATCH[dominant/{current}]: {text[:40]!r}\n  before={before}\n  after ={after}")
+    print(f"inputs checked: {len(CORPUS) + len(LONG_CORPUS)}, mismatches: {mismatches}")
+
+    # 2) 메시지당 감지 비용 (짧은 입력 / 10k자 이상 입력)
+    for label, corpus, n in (("short", CORPUS, iterations * 50), ("10k+ chars", LONG_CORPUS, iterations)):
+        legacy = _time_per_call(legacy_detect_dominant_language, corpus, n)
+        uncached = _time_per_call(_uncached_detect, corpus, n)
+        cached = _time_per_call(detect_dominant_language, corpus, n)
+        print(f"{label:<10} legacy               : {legacy * 1e3:9.3f} ms/message")
+        print(f"{label:<10} set classifier       : {uncached * 1e3:9.3f} ms/message  ({legacy / uncached:.1f}x)")
+        print(f"{label:<10} set classifier + LRU : {cached * 1e3:9.3f} ms/message  ({legacy / cached:.1f}x)")
+    return mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
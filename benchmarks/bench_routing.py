@@ -0,0 +1,157 @@
+# benchmarks/bench_routing.py
+# 메시지당 라우팅 비용 비교: 기존 is_* 헬퍼 5회 호출 vs classify_request 1회
+#
+# 실행: python benchmarks/bench_routing.py
+
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.utils import classify_request  # noqa: E402
+
+# -----------------------------------------------------------------------------
+# 기존 구현 (변경 전 config/utils.py 그대로)
+# -----------------------------------------------------------------------------
+
+def _legacy_is_youtube_url(url):
+    patterns = [
+        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=',
+        r'(?:https?://)?(?:www\.)?youtube\.com/embed/',
+        r'(?:https?://)?youtu\.be/',
+        r'(?:https?://)?(?:www\.)?youtube\.com/shorts/',
+    ]
+    return any(re.match(pattern, url) for pattern in patterns)
+
+def _legacy_extract_urls_from_text(text):
+    url_pattern = r'https?://[^\s<>"]+|www\.[^\s<>"]+'
+    return re.findall(url_pattern, text)
+
+def _legacy_is_pdf_url(url):
+    return url.lower().endswith('.pdf') or '/pdf/' in url
+
+def _legacy_is_youtube_summarization_request(text):
+    youtube_url = _legacy_extract_urls_from_text(text)
+    if youtube_url and _legacy_is_youtube_url(youtube_url[0]):
+        return True, youtube_url[0]
+    return False, None
+
+def _legacy_is_url_summarization_request(text):
+    urls = _legacy_extract_urls_from_text(text)
+    if urls and not _legacy_is_youtube_url(urls[0]) and not _legacy_is_pdf_url(urls[0]):
+        return True, urls[0]
+    return False, None
+
+def _legacy_is_pdf_summarization_request(text):
+    urls = _legacy_extract_urls_from_text(text)
+    if urls and _legacy_is_pdf_url(urls[0]):
+        return True, urls[0]
+    return False, None
+
+def _legacy_is_image_analysis_request(query, has_images):
+    if not has_images:
+        return False
+    ko_keywords = ['분석', '설명', '알려줘', '무엇', '뭐', '어떤', '보여줘', '읽어줘', '해석', '분석해줘']
+    en_keywords = ['analyze', 'describe', 'explain', 'what', 'show', 'read', 'tell', 'see', 'image', 'picture', 'photo']
+    es_keywords = [
+        'analizar', 'describir', 'explicar', 'qué', 'mostrar', 'leer', 'decir', 'ver',
+        'imagen', 'foto', 'picture', 'muestra', 'enseña', 'dice', 'contiene',
+        'puedes', 'podrías', 'ayuda', 'favor'
+    ]
+    all_keywords = ko_keywords + en_keywords + es_keywords
+    return any(keyword in query.lower() for keyword in all_keywords)
+
+def _legacy_is_pdf_analysis_request(query, has_pdf):
+    if not has_pdf and not _legacy_is_pdf_summarization_request(query)[0]:
+        return False
+    analysis_keywords = [
+        '요약', '분석', '설명', '알려줘', '정리',
+        'summarize', 'analyze', 'explain', 'describe', 'tell',
+        'resumir', 'analizar', 'explicar', 'describir', 'decir',
+        'mostrar', 'ayuda', 'puedes', 'podrías'
+    ]
+    return any(keyword in query.lower() for keyword in analysis_keywords)
+
+
+def legacy_route(text, has_pdf_upload=False, has_images=False):
+    """변경 전 app.py의 메시지당 라우팅"""
+    is_pdf_request, pdf_url = _legacy_is_pdf_summarization_request(text)
+    is_pdf_analysis = _legacy_is_pdf_analysis_request(text, has_pdf_upload or is_pdf_request)
+    is_youtube_request, youtube_url = _legacy_is_youtube_summarization_request(text)
+    is_webpage_request, webpage_url = _legacy_is_url_summarization_request(text)
+    is_image_analysis = _legacy_is_image_analysis_request(text, has_images)
+    return (is_pdf_request, pdf_url, is_pdf_analysis, is_youtube_request, youtube_url,
+            is_webpage_request, webpage_url, is_image_analysis)
+
+
+def new_route(text, has_pdf_upload=False, has_images=False, classify=classify_request):
+    """변경 후 app.py의 메시지당 라우팅"""
+    route = classify(text)
+    is_pdf_request = route.is_pdf
+    return (is_pdf_request, route.primary_url if is_pdf_request else None,
+            route.is_pdf_analysis(has_pdf_upload or is_pdf_request),
+            route.is_youtube, route.primary_url if route.is_youtube else None,
+            route.is_webpage, route.primary_url if route.is_webpage else None,
+            route.is_image_analysis(has_images))
+
+
+CORPUS = [
+    "안녕하세요",
+    "오늘 서울 날씨 어때?",
+    "https://www.youtube.com/watch?v=8E6-emm_QVg 요약해줘",
+    "https://youtu.be/8E6-emm_QVg 3개 포인트로 정리",
+    "https://www.youtube.com/shorts/abc123 what is this about",
+    "https://arxiv.org/pdf/2410.04064 요약해줘",
+    "https://arxiv.org/abs/2410.04064 explain this paper",
+    "https://example.com/files/report.PDF summarize",
+    "https://blog.naver.com/someone/223456789012 이 글 요약해줘",
+    "https://www.aitimes.com/news/articleView.html?idxno=200667 이 사이트에 대해 설명해줘",
+    "www.example.org 뭐 하는 곳이야?",
+    "이미지 분석해줘",
+    "Analyze this image please",
+    "¿Qué hay en esta foto?",
+    "Resume este PDF por favor",
+    "F1 순위 알려줘",
+    "Let's learn Spanish! Teach me basic conversation",
+    "여기 두 링크 비교해줘 https://a.com/x https://www.youtube.com/watch?v=1",
+    "long message " * 200 + " https://example.com/long",
+]
+
+
+def _time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in CORPUS:
+            fn(text, False, True)
+            fn(text, True, False)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(CORPUS) * 2)
+
+
+def main(iterations=500):
+    # 1) 결정 동일성 검증
+    mismatches = 0
+    for text in CORPUS:
+        for has_pdf, has_images in ((False, False), (True, False), (False, True), (True, True)):
+            before = legacy_route(text, has_pdf, has_images)
+            after = new_route(text, has_pdf, has_images)
+            if before != after:
+                mismatches += 1
+                print(f"MISMATCH: {text[:60]!r} pdf={has_pdf} img={has_images}\n  before={before}\n  after ={after}")
+    print(f"decisions checked: {len(CORPUS) * 4}, mismatches: {mismatches}")
+
+    # 2) 메시지당 라우팅 비용
+    uncached = classify_request.__wrapped__
+    legacy = _time_per_call(legacy_route, iterations)
+    single = _time_per_call(lambda t, p, i: new_route(t, p, i, classify=uncached), iterations)
+    cached = _time_per_call(new_route, iterations)
+    print(f"legacy  (5 helpers)         : {legacy * 1e6:8.2f} µs/message")
+    print(f"classify_request (uncached) : {single * 1e6:8.2f} µs/message  ({legacy / single:.1f}x)")
+    print(f"classify_request (memoized) : {cached * 1e6:8.2f} µs/message  ({legacy / cached:.1f}x)")
+    return mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
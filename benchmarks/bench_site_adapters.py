@@ -0,0 +1,121 @@
+# benchmarks/bench_site_adapters.py
+# 네이버 블로그 가져오기 요청 수 비교 (저장된 HTML fixture를 돌려주는 가짜 네이버):
+#   기존: 프레임셋 GET → iframe 주소 재귀 GET (PostView가 막히면 Playwright 폴백)
+#   신규: config/site_adapters.NaverBlogAdapter (글 주소를 PostView로 바로 GET,
+#         막히면 모바일 주소, 성공한 전략을 기억해 다음 호출은 그 전략부터)
+#
+# 본문/제목이 기존과 같은지, 글 하나당 GET 수가 줄었는지 확인합니다.
+# (캐시는 끄고, 브라우저 폴백은 PLAYWRIGHT_DISABLED=1로 건너뜀)
+#
+# 실행: python benchmarks/bench_site_adapters.py
+
+import os
+import sys
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["WEBPAGE_CACHE"] = "0"
+os.environ["PLAYWRIGHT_DISABLED"] = "1"
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+import config.utils as utils  # noqa: E402
+from config.html_extract import extract_page  # noqa: E402
+from config.http_client import Download  # noqa: E402
+from config.site_adapters import adapter_for, adapter_stats  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+POSTS = 20
+
+with open(os.path.join(FIXTURE_DIR, "naver_blog_frameset.html"), encoding="utf-8") as f:
+    _FRAMESET = f.read().encode("utf-8")
+with open(os.path.join(FIXTURE_DIR, "naver_blog_postview.html"), encoding="utf-8") as f:
+    _POSTVIEW = f.read().encode("utf-8")
+
+
+class _FakeNaver:
+    """URL별 응답: 프레임셋 / PostView / 모바일 (block_postview면 PostView는 403)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.block_postview = False
+
+    def __call__(self, url, max_bytes, **kwargs):
+        self.requests += 1
+        parts = urlsplit(url)
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        if parts.hostname == "m.blog.naver.com":
+            body = _POSTVIEW
+        elif parts.path.startswith("/PostView"):
+            if self.block_postview:
+                response.status_code = 403
+                raise requests.exceptions.HTTPError("403 Forbidden", response=response)
+            body = _POSTVIEW
+        else:
+            body = _FRAMESET
+        return Download(response, bytearray(body), "text/html")
+
+
+def legacy_fetch(fake, url):
+    """기존 흐름: 요청 URL GET, 프레임셋이면 iframe 주소를 다시 GET"""
+    try:
+        html = fake(url, 0).data.decode("utf-8")
+        if "blog.naver.com" in url and "/PostView.naver" not in url:
+            iframe = BeautifulSoup(html, 'html.parser').find('iframe')
+            if iframe and iframe.get('src'):
+                src = iframe.get('src')
+                return legacy_fetch(fake, 'https://blog.naver.com' + src if src.startswith('/') else src)
+        page = extract_page(html, url, max_chars=utils.WEBPAGE_MAX_CHARS)
+        return page.text, page.metadata
+    except requests.exceptions.HTTPError:
+        return None, None  # Playwright 폴백 (여기서는 비활성화)
+
+
+def _post_urls():
+    return [f"https://blog.naver.com/travel_note/2234567890{i:02d}" for i in range(POSTS)]
+
+
+def main():
+    mismatches = 0
+    fake = _FakeNaver()
+    utils.http_download = fake
+    adapter = adapter_for(_post_urls()[0])
+    print(f"어댑터: {adapter.name}, 글 {POSTS}개")
+    print(f"{'상황':<24} {'기존 GET':>8} {'신규 GET':>8}")
+
+    scenarios = [
+        ("글 주소", False, _post_urls()),
+        ("PostView 차단 (403)", True, _post_urls()),
+        ("블로그 홈 (글 주소 아님)", False, ["https://blog.naver.com/travel_note"]),
+    ]
+    for label, blocked, urls in scenarios:
+        fake.block_postview = blocked
+        fake.requests = 0
+        expected = [legacy_fetch(fake, url) for url in urls]
+        legacy_requests, fake.requests = fake.requests, 0
+        results = [utils.fetch_webpage(url) for url in urls]
+        new_requests = fake.requests
+        print(f"{label:<24} {legacy_requests:>8} {new_requests:>8}")
+
+        for url, (old_text, old_meta), (text, metadata) in zip(urls, expected, results):
+            if old_text is not None and (text != old_text or metadata["title"] != old_meta["title"]):
+                mismatches += 1
+                print(f"  MISMATCH [{label}]: 본문/제목이 기존과 다릅니다: {url}")
+            if old_text is None and utils.is_failure_text(text):
+                mismatches += 1
+                print(f"  MISMATCH [{label}]: 모바일 주소로 가져오지 못했습니다: {url}")
+        if new_requests > (len(urls) + 1 if blocked else legacy_requests):
+            mismatches += 1
+            print(f"  MISMATCH [{label}]: 요청 수가 줄지 않았습니다")
+
+    print(f"\n전략 기록: {adapter_stats()[adapter.name]}")
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# benchmarks/bench_streaming_download.py
+# 웹페이지/PDF 다운로드 비교:
+#   기존: response.text / response.content로 전체 본문을 메모리에 읽은 뒤 25k/15k자로 자름
+#   신규: config/http_client.http_download 스트리밍 (최대 바이트, 첫 청크 형식 확인, 초과 시 중단)
+#
+# 로컬 HTTP 서버가 큰 HTML/PDF를 흘려보내고, 서버가 소켓에 쓴 바이트 수(커널 버퍼 포함)와
+# 클라이언트 tracemalloc 최대 메모리를 비교합니다. 일반 크기 페이지는 추출 결과가 기존과 같은지 확인합니다.
+#
+# 실행: python benchmarks/bench_streaming_download.py
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("WEBPAGE_CACHE", "0")
+
+import requests  # noqa: E402
+
+from config.html_extract import extract_page  # noqa: E402
+from config.http_client import HTTP_MAX_HTML_BYTES, HTTP_MAX_PDF_BYTES  # noqa: E402
+from config.utils import WEBPAGE_MAX_CHARS, _fetch_webpage, fetch_pdf_text  # noqa: E402
+
+HUGE_BYTES = int(os.environ.get("BENCH_HUGE_BYTES", str(120 * 1024 * 1024)))
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html", "docs_page.html")
+_CHUNK = 64 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    sent = {}
+    lock = threading.Lock()
+
+    def _count(self, n):
+        with _Handler.lock:
+            _Handler.sent[self.path] = _Handler.sent.get(self.path, 0) + n
+
+    def _stream(self, content_type, head, filler, total, declare_length=True):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if declare_length:
+            self.send_header("Content-Length", str(total))
+        else:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            self.wfile.write(head)
+            self._count(len(head))
+            remaining = total - len(head)
+            while remaining > 0:
+                block = filler[:min(_CHUNK, remaining)]
+                self.wfile.write(block)
+                self._count(len(block))
+                remaining -= len(block)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 중단
+        if not declare_length:
+            self.close_connection = True
+
+    def do_GET(self):
+        if self.path == "/docs.html":
+            with open(FIXTURE, "rb") as f:
+                body = f.read()
+            self._stream("text/html; charset=utf-8", body, b"", len(body))
+        elif self.path == "/huge.html":
+            # Content-Length 없이 끝없이 이어지는 HTML
+            head = b"<html><head><title>huge</title></head><body><main>"
+            filler = ("<p>" + "끝없이 이어지는 본문 문단입니다. " * 20 + "</p>\n").encode("utf-8") * 64
+            self._stream("text/html; charset=utf-8", head, filler, HUGE_BYTES, declare_length=False)
+        elif self.path == "/huge.pdf":
+            self._stream("application/pdf", b"%PDF-1.7\n", b"0" * _CHUNK, HUGE_BYTES)
+        elif self.path == "/page-not-pdf.pdf":
+            self._stream("text/html", b"<!DOCTYPE html><html><body>login required</body></html>", b" " * _CHUNK, 8 * 1024 * 1024)
+        elif self.path == "/photo.jpg":
+            self._stream("image/jpeg", b"\xff\xd8\xff\xe0", b"\x00" * _CHUNK, 16 * 1024 * 1024)
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as e:
+        result = f"(예외) {type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 1e6, elapsed
+
+
+def legacy_webpage(url):
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    response.encoding = 'utf-8'
+    return extract_page(response.text, url).text[:WEBPAGE_MAX_CHARS]
+
+
+def legacy_pdf(url):
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    if 'application/pdf' not in response.headers.get('Content-Type', '').lower():
+        return f"❌ URL은 PDF 파일이 아닙니다: {url}"
+    return f"{len(response.content)} bytes를 메모리에 읽음"
+
+
+def main():
+    mismatches = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    print(f"HTML 한도 {HTTP_MAX_HTML_BYTES / 1e6:.1f}MB, PDF 한도 {HTTP_MAX_PDF_BYTES / 1e6:.1f}MB, 큰 본문 {HUGE_BYTES / 1e6:.0f}MB")
+    try:
+        # 일반 페이지: 결과 동일
+        expected, _, _ = _measure(lambda: legacy_webpage(f"{base}/docs.html"))
+        (text, _, _), _, _ = _measure(lambda: _fetch_webpage(f"{base}/docs.html"))
+        if text != expected:
+            mismatches += 1
+            print("  MISMATCH: 일반 페이지 본문이 기존 추출과 다릅니다")
+
+        cases = [
+            ("/huge.html", legacy_webpage, lambda url: _fetch_webpage(url)[0]),
+            ("/huge.pdf", legacy_pdf, lambda url: fetch_pdf_text(pdf_url=url)[0]),
+            ("/page-not-pdf.pdf", legacy_pdf, lambda url: fetch_pdf_text(pdf_url=url)[0]),
+            ("/photo.jpg", legacy_webpage, lambda url: _fetch_webpage(url)[0]),
+        ]
+        print(f"{'경로':<18} {'방식':<6} {'서버 전송':>10} {'최대 메모리':>11} {'시간':>7}  결과")
+        for path, legacy, streaming in cases:
+            url = base + path
+            rows = {}
+            for label, fn in (("기존", legacy), ("스트림", streaming)):
+                _Handler.sent.pop(path, None)
+                result, peak_mb, elapsed = _measure(lambda: fn(url))
+                time.sleep(0.2)  # 서버 쓰기 스레드가 중단을 감지할 시간
+                sent_mb = _Handler.sent.get(path, 0) / 1e6
+                rows[label] = (sent_mb, peak_mb, result)
+                print(f"{path:<18} {label:<6} {sent_mb:>8.1f}MB {peak_mb:>9.1f}MB {elapsed:>6.2f}s  {str(result)[:60]!r}")
+
+            sent_mb, peak_mb, result = rows["스트림"]
+            limit_mb = (HTTP_MAX_PDF_BYTES if path.endswith(".pdf") else HTTP_MAX_HTML_BYTES) / 1e6
+            # 한도만큼의 본문 + 디코딩된 문자열 + 파싱 트리까지는 허용
+            if peak_mb > limit_mb * 6:
+                mismatches += 1
+                print(f"  MISMATCH: {path} 스트리밍 최대 메모리 {peak_mb:.1f}MB가 한도를 크게 넘습니다")
+            if path == "/huge.html" and (len(result) != WEBPAGE_MAX_CHARS or result != rows["기존"][2]):
+                mismatches += 1
+                print("  MISMATCH: 큰 HTML의 앞부분 본문이 기존 결과와 다릅니다")
+            if path != "/huge.html" and not str(result).startswith("❌"):
+                mismatches += 1
+                print(f"  MISMATCH: {path}는 거부되어야 합니다")
+            if path == "/huge.pdf" and peak_mb > 1:
+                mismatches += 1
+                print("  MISMATCH: Content-Length가 한도를 넘는 PDF는 본문을 읽기 전에 중단해야 합니다")
+    finally:
+        server.shutdown()
+
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
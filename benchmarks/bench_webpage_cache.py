@@ -0,0 +1,196 @@
+# benchmarks/bench_webpage_cache.py
+# 웹페이지 본문 캐시 비교:
+#   프로세스별 @lru_cache(maxsize=128) (기존 fetch_webpage_content) vs
+#   config/webpage_cache.py (공유 diskcache + ETag/Last-Modified 조건부 GET)
+#
+# 로컬 HTTP 서버(ETag 지원)에 여러 "레플리카" 프로세스가 동시에 같은 인기 링크를 요청하고,
+# 서버가 본문을 보낸 횟수(200)와 304 응답 수를 셉니다. 캐시 결과가 캐시 없이 추출한
+# 본문과 같은지, 실패 결과가 짧은 TTL 뒤에 다시 시도되는지, 재검증 실패 시 이전 본문을
+# 반환하는지도 확인합니다.
+#
+# 실행: python benchmarks/bench_webpage_cache.py
+
+import functools
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("WEBPAGE_CACHE_DIR", tempfile.mkdtemp(prefix="bench_webpage_cache_"))
+
+from config.utils import _fetch_webpage, fetch_webpage_content  # noqa: E402
+from config.webpage_cache import webpage_cache  # noqa: E402
+
+REPLICAS = 4
+THREADS_PER_REPLICA = 4
+POPULAR = 10
+REPEATS = 5
+
+
+def _page(i):
+    return ("<html><body><article>" + f"<p>인기 링크 {i}번 본문 문단입니다. 여러 사용자가 공유합니다.</p>" * 20
+            + "</article></body></html>").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    counts = None  # multiprocessing 공유 카운터 {"full", "not_modified", "missing"}
+    failing = None
+
+    def do_GET(self):
+        if self.path.startswith("/missing") or (self.failing.value and self.path.startswith("/page")):
+            with self.counts.get_lock():
+                self.counts[2] += 1
+            # failing 1: 일시적인 서버 오류, 2: 페이지 삭제
+            if self.failing.value == 1 and self.path.startswith("/page"):
+                self._send(503, b"unavailable")
+            else:
+                self._send(404, b"not found")
+            return
+        i = int(self.path.rsplit("/", 1)[-1].split("?")[0])
+        etag = f'"page-{i}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.counts.get_lock():
+                self.counts[1] += 1
+            self._send(304, b"", etag)
+            return
+        with self.counts.get_lock():
+            self.counts[0] += 1
+        self._send(200, _page(i), etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _urls(base):
+    # 같은 링크를 추적 파라미터만 다르게 공유하는 경우 포함
+    return [f"{base}/page/{i}" + ("?utm_source=share" if r % 2 else "") for r in range(REPEATS) for i in range(POPULAR)]
+
+
+def _replica(base, fetch_name, results):
+    if fetch_name == "legacy":
+        fetch = functools.lru_cache(maxsize=128)(lambda url: _fetch_webpage(url)[0])
+    else:
+        fetch = fetch_webpage_content
+    with ThreadPoolExecutor(THREADS_PER_REPLICA) as pool:
+        texts = list(pool.map(fetch, _urls(base)))
+    results.put(sorted(set(texts)))
+
+
+def _run_replicas(base, fetch_name, counts):
+    for k in range(3):
+        counts[k] = 0
+    results = multiprocessing.Queue()
+    t0 = time.perf_counter()
+    procs = [multiprocessing.Process(target=_replica, args=(base, fetch_name, results)) for _ in range(REPLICAS)]
+    for p in procs:
+        p.start()
+    texts = [results.get(timeout=120) for _ in procs]
+    for p in procs:
+        p.join()
+    return texts, time.perf_counter() - t0
+
+
+def _age_entries():
+    """신선 기간이 지난 것처럼 만듭니다 (TTL을 기다리지 않기 위해)."""
+    store = webpage_cache._get_store()
+    for key in list(store.iterkeys()):
+        entry = store.get(key)
+        if isinstance(entry, dict):
+            entry["fresh_until"] = 0
+            store.set(key, entry)
+
+
+def main():
+    mismatches = 0
+    counts = multiprocessing.Array("i", 3)
+    failing = multiprocessing.Value("b", 0)
+    _Handler.counts, _Handler.failing = counts, failing
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        expected = sorted({_fetch_webpage(f"{base}/page/{i}")[0] for i in range(POPULAR)})
+        total = REPLICAS * POPULAR * REPEATS
+        print(f"레플리카 {REPLICAS}개 x 스레드 {THREADS_PER_REPLICA}개, 인기 링크 {POPULAR}개 x {REPEATS}회 = {total}회 요청")
+
+        legacy_texts, legacy_time = _run_replicas(base, "legacy", counts)
+        print(f"프로세스별 lru_cache | 본문 전송 {counts[0]:>3}회, {legacy_time:.2f}s")
+
+        webpage_cache.clear()
+        cached_texts, cached_time = _run_replicas(base, "cache", counts)
+        print(f"공유 디스크 캐시      | 본문 전송 {counts[0]:>3}회, {cached_time:.2f}s")
+        if counts[0] != POPULAR:
+            mismatches += 1
+            print(f"  MISMATCH: 링크당 한 번씩 가져와야 합니다 (본문 전송 {counts[0]}회)")
+        if any(texts != expected for texts in legacy_texts + cached_texts):
+            mismatches += 1
+            print("  MISMATCH: 캐시된 본문이 캐시 없이 추출한 본문과 다릅니다")
+
+        # 신선 기간이 지난 뒤: 조건부 GET → 304, 본문 재전송 없음
+        _age_entries()
+        revalidated_texts, _ = _run_replicas(base, "cache", counts)
+        print(f"TTL 경과 후 재검증    | 본문 전송 {counts[0]:>3}회, 304 {counts[1]:>3}회")
+        if counts[0] or counts[1] != POPULAR or any(texts != expected for texts in revalidated_texts):
+            mismatches += 1
+            print("  MISMATCH: 재검증이 304로 처리되지 않았습니다")
+
+        # 재검증 중 일시적 실패: 이전 본문 반환
+        _age_entries()
+        failing.value = 1
+        stale = fetch_webpage_content(f"{base}/page/0")
+        failing.value = 0
+        if stale != _fetch_webpage(f"{base}/page/0")[0]:
+            mismatches += 1
+            print("  MISMATCH: 재검증 실패 시 이전 본문을 반환하지 않았습니다")
+
+        # 재검증 중 404: 이전 본문을 버리고 실패 결과로 교체
+        _age_entries()
+        failing.value = 2
+        gone = fetch_webpage_content(f"{base}/page/1")
+        failing.value = 0
+        cached_gone = fetch_webpage_content(f"{base}/page/1")
+        print(f"삭제된 페이지        | 재검증 결과 {gone[:20]!r}, 다음 요청 {cached_gone[:20]!r}")
+        if not gone.startswith("❌") or cached_gone != gone:
+            mismatches += 1
+            print("  MISMATCH: 404 재검증 후에도 이전 본문을 반환했습니다")
+
+        # 실패 결과: 짧은 TTL 동안만 저장 (lru_cache는 영구 저장)
+        counts[2] = 0
+        first = fetch_webpage_content(f"{base}/missing/1")
+        fetch_webpage_content(f"{base}/missing/1")
+        after_hit = counts[2]
+        _age_entries()
+        fetch_webpage_content(f"{base}/missing/1")
+        print(f"실패 결과            | 두 번째 요청 서버 호출 {after_hit - 1}회, 실패 TTL 경과 후 {counts[2] - after_hit}회 재시도")
+        if not first.startswith("❌") or after_hit != 1 or counts[2] != 2:
+            mismatches += 1
+            print("  MISMATCH: 실패 결과 TTL 처리가 잘못되었습니다")
+        print(f"캐시 통계: {webpage_cache.stats}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(os.environ["WEBPAGE_CACHE_DIR"], ignore_errors=True)
+
+    print(f"\n불일치: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# config/blob_store.py
+# 메시지 이미지용 콘텐츠 주소(해시) 기반 블롭 저장소
+#
+# - st.session_state.messages에는 이미지 바이트 대신 BlobRef(sha256 해시 참조)만 둡니다.
+#   chat_sessions로 복사되는 메시지도 참조만 복사하므로 세션당 메모리가 늘지 않습니다.
+# - 바이트는 프로세스 전역 메모리 LRU에 보관하며, 바이트 예산(BLOB_MEMORY_BUDGET)을 넘으면
+#   가장 오래 쓰지 않은 블롭을 디스크(BLOB_STORE_DIR)로 내보냅니다.
+#   (lock 안에서는 메모리에서 꺼내기만 하고, 파일 쓰기/오래된 블롭 정리는 lock 밖에서 수행.
+#    쓰는 동안의 블롭은 _spilling에서 계속 읽을 수 있음)
+# - 화면 표시/내보내기/업로드 시 resolve_image로 필요할 때만 다시 읽어옵니다.
+# - 같은 내용은 해시가 같으므로 여러 세션/메시지가 하나의 블롭을 공유합니다.
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# BLOB_STORE=0 이면 기존처럼 메시지에 이미지 바이트를 직접 보관
+BLOB_STORE_ENABLED = os.environ.get("BLOB_STORE", "1") == "1"
+BLOB_MEMORY_BUDGET = int(os.environ.get("BLOB_MEMORY_BUDGET", str(64 * 1024 * 1024)))
+BLOB_STORE_DIR = os.environ.get("BLOB_STORE_DIR", os.path.join("local_store", "blobs"))
+BLOB_DISK_TTL = 7 * 24 * 3600  # 디스크로 내보낸 블롭 보관 기간 (초)
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """블롭 참조 (메시지에 저장되는 값)"""
+    digest: str
+    size: int
+    mime_type: str = "application/octet-stream"
+
+
+class BlobStore:
+    """
+    바이트 예산이 있는 메모리 LRU + 디스크 스필 블롭 저장소 (스레드 안전).
+
+    Args:
+        memory_budget: 메모리에 보관할 최대 바이트 수
+        directory: 메모리에서 밀려난 블롭을 저장할 디렉터리
+    """
+
+    def __init__(self, memory_budget=BLOB_MEMORY_BUDGET, directory=BLOB_STORE_DIR):
+        self.memory_budget = memory_budget
+        self.directory = directory
+        self._memory = OrderedDict()  # digest -> bytes
+        self._memory_bytes = 0
+        self._spilling = {}  # digest -> bytes (메모리에서 밀려나 디스크에 쓰는 중)
+        self._lock = threading.Lock()
+        self._disk_pruned = False
+        self.stats = {"puts": 0, "dedup": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "spilled": 0}
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def put(self, data, mime_type="application/octet-stream"):
+        """바이트를 저장하고 BlobRef를 반환합니다 (같은 내용은 한 번만 저장)."""
+        data = bytes(data)
+        digest = hashlib.sha256(data).hexdigest()
+        evicted = None
+        with self._lock:
+            self.stats["puts"] += 1
+            if digest in self._memory:
+                self.stats["dedup"] += 1
+                self._memory.move_to_end(digest)
+            else:
+                self._memory[digest] = data
+                self._memory_bytes += len(data)
+                evicted = self._evict_locked()
+        if evicted:
+            self._spill_evicted(evicted)
+        return BlobRef(digest, len(data), mime_type)
+
+    def get(self, ref):
+        """
+        블롭 바이트를 반환합니다 (메모리에 없으면 디스크에서 읽어 다시 메모리에 올림).
+
+        Returns:
+            바이트 (찾을 수 없으면 None)
+        """
+        digest = ref.digest if isinstance(ref, BlobRef) else ref
+        with self._lock:
+            data = self._memory.get(digest)
+            if data is not None:
+                self._memory.move_to_end(digest)
+                self.stats["memory_hits"] += 1
+                return data
+            data = self._spilling.get(digest)
+            if data is not None:
+                self.stats["memory_hits"] += 1
+                return data
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            logger.warning(f"⚠️ 블롭을 찾을 수 없음: {digest[:12]}")
+            return None
+        except Exception as e:
+            self.stats["misses"] += 1
+            logger.error(f"블롭 읽기 오류: {e}")
+            return None
+        evicted = None
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            if digest not in self._memory:
+                self._memory[digest] = data
+                self._memory_bytes += len(data)
+                evicted = self._evict_locked(keep=digest)
+        if evicted:
+            self._spill_evicted(evicted)
+        return data
+
+    def _evict_locked(self, keep=None):
+        """
+        메모리 예산을 넘으면 오래된 블롭부터 메모리에서 꺼냅니다 (lock 보유 상태).
+
+        Returns:
+            디스크에 쓸 [(digest, bytes)] — lock을 놓은 뒤 _spill_evicted로 넘김
+        """
+        evicted = []
+        while self._memory_bytes > self.memory_budget and self._memory:
+            digest = next(iter(self._memory))
+            if digest == keep:
+                # 방금 올린 블롭 하나가 예산보다 크면 메모리에 두지 않음 (디스크에 이미 있음)
+                if len(self._memory) == 1:
+                    data = self._memory.pop(digest)
+                    self._memory_bytes -= len(data)
+                    break
+                self._memory.move_to_end(digest)
+                continue
+            data = self._memory.pop(digest)
+            self._memory_bytes -= len(data)
+            self._spilling[digest] = data
+            evicted.append((digest, data))
+        return evicted
+
+    def _spill_evicted(self, evicted):
+        """메모리에서 밀려난 블롭을 디스크에 씁니다 (lock 밖에서 호출)."""
+        with self._lock:
+            prune, self._disk_pruned = not self._disk_pruned, True
+        if prune:
+            # 프로세스당 한 번, 처음 내보낼 때 오래된 블롭 정리
+            self.prune_disk()
+        for digest, data in evicted:
+            try:
+                self._spill(digest, data)
+            finally:
+                with self._lock:
+                    if self._spilling.get(digest) is data:
+                        del self._spilling[digest]
+
+    def _spill(self, digest, data):
+        path = self._path(digest)
+        if os.path.exists(path):
+            # 다시 내보낸 블롭은 보관 기간을 새로 시작 (그 사이 정리되었으면 다시 씀)
+            try:
+                os.utime(path)
+                return
+            except OSError:
+                pass
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.stats["spilled"] += 1
+            logger.debug(f"💾 블롭 디스크로 내보냄: {digest[:12]} ({len(data)} bytes)")
+        except Exception as e:
+            logger.error(f"블롭 디스크 저장 오류: {e}")
+
+    def memory_usage(self):
+        with self._lock:
+            return self._memory_bytes, len(self._memory)
+
+    def prune_disk(self, max_age=BLOB_DISK_TTL):
+        """디스크에 내보낸 지 max_age초가 지난 블롭을 지웁니다."""
+        cutoff = time.time() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            logger.info(f"🧹 오래된 블롭 {removed}개 삭제")
+        return removed
+
+
+# 프로세스 전역 블롭 저장소 (모든 Streamlit 세션이 메모리 예산을 공유)
+blob_store = BlobStore()
+
+
+def store_image(data, mime_type="image/jpeg"):
+    """메시지에 넣을 이미지 값을 반환합니다 (블롭 저장소 사용 시 BlobRef, 아니면 바이트)."""
+    if not BLOB_STORE_ENABLED:
+        return data
+    return blob_store.put(data, mime_type)
+
+
+def resolve_image(image):
+    """
+    메시지 이미지 값을 표시/업로드 가능한 형태로 바꿉니다.
+
+    Returns:
+        URL 문자열은 그대로, BlobRef는 바이트 (찾을 수 없으면 None), 바이트는 그대로
+    """
+    if isinstance(image, BlobRef):
+        return blob_store.get(image)
+    return image
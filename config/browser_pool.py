@@ -0,0 +1,330 @@
+# config/browser_pool.py
+# 워커 프로세스당 하나의 Chromium을 띄워두고 재사용하는 Playwright 브라우저 풀
+#
+# - 기존: 호출마다 sync_playwright() + chromium.launch(--single-process) + networkidle 대기 후 종료
+#   (폴백 한 번에 브라우저 기동 수 초)
+# - Playwright 객체는 만든 스레드에 묶이므로, 전용 스레드의 asyncio 루프가 브라우저를 소유하고
+#   Streamlit 세션 스레드들은 run_coroutine_threadsafe로 작업을 넘깁니다.
+# - 컨텍스트는 최대 BROWSER_MAX_CONTEXTS개까지 재사용하고, 동시에 여는 페이지 수는
+#   BROWSER_MAX_CONCURRENCY로 제한합니다 (컨테이너 메모리 보호).
+# - 이미지/폰트/미디어 요청은 route에서 차단하고, networkidle 대신 본문 선택자가
+#   (iframe 포함) 나타날 때까지만 기다립니다.
+# - 브라우저 연결이 끊기거나 페이지 오류가 이어지면 폐기 후 다음 요청에서 새로 띄우고,
+#   BROWSER_RECYCLE_PAGES 페이지마다, 그리고 BROWSER_IDLE_TIMEOUT 동안 쓰이지 않으면 종료합니다.
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BROWSER_MAX_CONCURRENCY = int(os.environ.get("BROWSER_MAX_CONCURRENCY", "2"))  # 동시에 여는 페이지 수
+BROWSER_MAX_CONTEXTS = int(os.environ.get("BROWSER_MAX_CONTEXTS", "2"))  # 재사용할 컨텍스트 수
+BROWSER_RECYCLE_PAGES = int(os.environ.get("BROWSER_RECYCLE_PAGES", "100"))  # 이 페이지 수마다 브라우저 교체
+BROWSER_IDLE_TIMEOUT = int(os.environ.get("BROWSER_IDLE_TIMEOUT", "600"))  # 유휴 시 브라우저 종료 (초)
+BROWSER_QUEUE_TIMEOUT = float(os.environ.get("BROWSER_QUEUE_TIMEOUT", "15"))  # 빈 자리를 기다리는 최대 시간 (초)
+BROWSER_NAVIGATION_TIMEOUT = 20.0  # 페이지 이동 제한 (초)
+BROWSER_SELECTOR_TIMEOUT = 8.0  # 본문 선택자 대기 제한 (초)
+BROWSER_MAX_FAILURES = 3  # 연속 실패가 이만큼이면 브라우저 폐기
+BROWSER_LAUNCH_ARGS = ['--disable-dev-shm-usage', '--disable-gpu', '--disable-extensions', '--mute-audio']
+BROWSER_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+_SELECTOR_POLL_INTERVAL = 0.1
+
+
+def playwright_disabled():
+    return os.environ.get("PLAYWRIGHT_DISABLED") == "1"
+
+
+def _missing_browser(error):
+    message = str(error)
+    return isinstance(error, FileNotFoundError) or "Executable doesn't exist" in message or "headless_shell" in message
+
+
+class _BrowserSlot:
+    """실행 중인 브라우저 하나와 그 컨텍스트들"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.idle_contexts = []
+        self.contexts = 0
+        self.active = 0
+        self.pages = 0
+        self.failures = 0
+        self.retired = False
+
+    def healthy(self):
+        return not self.retired and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    프로세스당 하나의 Chromium을 재사용하는 Playwright 풀.
+
+    Args:
+        max_concurrency: 동시에 여는 페이지 수
+        max_contexts: 재사용할 브라우저 컨텍스트 수
+        recycle_pages: 이 페이지 수를 처리한 브라우저는 교체
+    """
+
+    def __init__(self, max_concurrency=BROWSER_MAX_CONCURRENCY, max_contexts=BROWSER_MAX_CONTEXTS,
+                 recycle_pages=BROWSER_RECYCLE_PAGES):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_contexts = max(1, max_contexts)
+        self.recycle_pages = recycle_pages
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._slot = None
+        self._semaphore = None
+        self._launch_lock = None
+        self._idle_handle = None
+        self.stats = {"launches": 0, "pages": 0, "context_reuse": 0, "blocked": 0,
+                      "recycled": 0, "failures": 0, "queue_timeouts": 0}
+
+    # ---- 루프 스레드 ----
+
+    def _ensure_loop(self):
+        pid = os.getpid()
+        if self._loop is not None and self._pid == pid and self._thread.is_alive():
+            return self._loop
+        with self._lock:
+            if self._loop is None or self._pid != pid or not self._thread.is_alive():
+                # fork된 자식은 부모의 루프/브라우저를 쓰지 않고 새로 시작
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+                thread.start()
+                self._playwright = None
+                self._slot = None
+                self._semaphore = None
+                self._launch_lock = None
+                self._idle_handle = None
+                self._loop, self._thread, self._pid = loop, thread, pid
+        return self._loop
+
+    async def _get_slot(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            slot = self._slot
+            if slot is not None and slot.healthy():
+                return slot
+            if slot is not None:
+                self._retire(slot, "연결 끊김" if not slot.browser.is_connected() else "교체")
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            t0 = time.perf_counter()
+            browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+            self.stats["launches"] += 1
+            logger.info(f"TIMING: browser launch took {time.perf_counter() - t0:.4f}s")
+            self._slot = _BrowserSlot(browser)
+            return self._slot
+
+    def _retire(self, slot, reason):
+        """브라우저를 새 요청에서 제외하고, 진행 중인 페이지가 끝나면 닫습니다."""
+        if not slot.retired:
+            slot.retired = True
+            self.stats["recycled"] += 1
+            logger.info(f"🎭 브라우저 교체 ({reason}, {slot.pages} pages)")
+        if self._slot is slot:
+            self._slot = None
+        if slot.active == 0:
+            asyncio.ensure_future(self._close_slot(slot))
+
+    @staticmethod
+    async def _close_slot(slot):
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.debug(f"브라우저 종료 실패: {e}")
+
+    async def _route(self, route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            self.stats["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _acquire_context(self, slot):
+        if slot.idle_contexts:
+            self.stats["context_reuse"] += 1
+            return slot.idle_contexts.pop()
+        context = await slot.browser.new_context(user_agent=BROWSER_USER_AGENT)
+        await context.route("**/*", self._route)
+        slot.contexts += 1
+        return context
+
+    async def _release_context(self, slot, context, reusable):
+        if reusable and slot.healthy() and len(slot.idle_contexts) < self.max_contexts:
+            try:
+                await context.clear_cookies()
+                slot.idle_contexts.append(context)
+                return
+            except Exception:
+                pass
+        slot.contexts -= 1
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    # ---- 페이지 가져오기 ----
+
+    @staticmethod
+    async def _wait_for_content(page, selectors, timeout):
+        """선택자가 (iframe 포함) 어느 프레임에든 나타나면 그 프레임의 HTML을 반환합니다."""
+        query = ", ".join(selectors)
+        deadline = time.monotonic() + timeout
+        while True:
+            for frame in page.frames:
+                try:
+                    if await frame.query_selector(query):
+                        return await frame.content()
+                except Exception:
+                    continue  # 이동 중이거나 분리된 프레임
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(_SELECTOR_POLL_INTERVAL)
+
+    async def _fetch(self, url, selectors, timeout):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), BROWSER_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.stats["queue_timeouts"] += 1
+            logger.warning(f"⚠️ 브라우저 풀 대기 시간 초과 ({self.max_concurrency}개 사용 중): {url}")
+            return None
+        self._cancel_idle_timer()
+        slot = context = page = None
+        ok = False
+        try:
+            if playwright_disabled():
+                return None  # 대기 중 앞선 요청이 브라우저 미설치를 확인한 경우
+            slot = await self._get_slot()
+            slot.active += 1
+            context = await self._acquire_context(slot)
+            page = await context.new_page()
+            t0 = time.perf_counter()
+            await page.goto(url, wait_until="domcontentloaded", timeout=BROWSER_NAVIGATION_TIMEOUT * 1000)
+            html = await self._wait_for_content(page, selectors, timeout) if selectors else None
+            if html is None:
+                html = await page.content()  # 선택자가 없으면 현재 DOM 그대로
+            logger.info(f"TIMING: browser page {url} took {time.perf_counter() - t0:.4f}s")
+            ok = True
+            slot.failures = 0
+            return html
+        except Exception:
+            self.stats["failures"] += 1
+            if slot is not None:
+                slot.failures += 1
+                if not slot.browser.is_connected() or slot.failures >= BROWSER_MAX_FAILURES:
+                    self._retire(slot, "연속 실패" if slot.browser.is_connected() else "연결 끊김")
+            raise
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    ok = False
+            if slot is not None:
+                if context is not None:
+                    await self._release_context(slot, context, ok)
+                slot.active -= 1
+                slot.pages += 1
+                self.stats["pages"] += 1
+                if self.recycle_pages and slot.pages >= self.recycle_pages:
+                    self._retire(slot, "페이지 수 도달")
+                elif slot.retired and slot.active == 0:
+                    asyncio.ensure_future(self._close_slot(slot))
+            self._semaphore.release()
+            self._schedule_idle_timer()
+
+    def _cancel_idle_timer(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def _schedule_idle_timer(self):
+        self._cancel_idle_timer()
+        if BROWSER_IDLE_TIMEOUT > 0:
+            self._idle_handle = self._loop.call_later(BROWSER_IDLE_TIMEOUT, self._close_idle)
+
+    def _close_idle(self):
+        self._idle_handle = None
+        slot = self._slot
+        if slot is not None and slot.active == 0:
+            logger.info(f"🎭 브라우저 유휴 {BROWSER_IDLE_TIMEOUT}s, 종료")
+            self._slot = None
+            asyncio.ensure_future(self._close_slot(slot))
+
+    def fetch_html(self, url, selectors=(), timeout=BROWSER_SELECTOR_TIMEOUT):
+        """
+        브라우저로 페이지를 열어 렌더링된 HTML을 반환합니다.
+
+        Args:
+            url: 페이지 URL
+            selectors: 기다릴 본문 선택자 (처음 나타난 프레임의 HTML 반환)
+            timeout: 선택자 대기 제한 (초, 지나면 현재 DOM 반환)
+
+        Returns:
+            HTML 문자열 (비활성화/대기 초과/오류 시 None)
+        """
+        if playwright_disabled():
+            logger.warning("🎭 Playwright가 비활성화되어 있습니다 (Streamlit Cloud 환경).")
+            return None
+        loop = self._ensure_loop()
+        if self._semaphore is None:
+            # 루프 스레드에서 만들어야 하는 객체들
+            asyncio.run_coroutine_threadsafe(self._init_primitives(), loop).result()
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url, list(selectors), timeout), loop)
+        try:
+            return future.result(BROWSER_QUEUE_TIMEOUT + BROWSER_NAVIGATION_TIMEOUT + timeout + 5)
+        except ImportError:
+            logger.error("❌ Playwright 라이브러리가 설치되지 않았습니다")
+            os.environ["PLAYWRIGHT_DISABLED"] = "1"
+        except Exception as e:
+            if _missing_browser(e):
+                logger.warning(f"⚠️ Playwright 브라우저 바이너리를 찾을 수 없습니다: {str(e).splitlines()[0]}")
+                # 환경 변수 설정으로 다음 시도에서 스킵
+                os.environ["PLAYWRIGHT_DISABLED"] = "1"
+            else:
+                future.cancel()
+                logger.warning(f"⚠️ Playwright 추출 오류 (폴백으로 진행): {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+        return None
+
+    async def _init_primitives(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _shutdown(self):
+        self._cancel_idle_timer()
+        if self._slot is not None:
+            await self._close_slot(self._slot)
+            self._slot = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def shutdown(self):
+        """브라우저와 Playwright 드라이버를 종료합니다 (프로세스 종료 시 자동 호출)."""
+        loop = self._loop
+        if loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(10)
+        except Exception as e:
+            logger.debug(f"브라우저 풀 종료 실패: {e}")
+
+
+# 프로세스 전역 브라우저 풀
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
@@ -0,0 +1,157 @@
+# config/document_context.py
+# 문서(웹페이지/PDF) 컨텍스트 재사용 계층 (콘텐츠 해시 기준)
+#
+# - 문서 본문은 세션에서 처음 한 번만 프롬프트에 넣고 [doc:<해시>] 표식을 붙입니다.
+# - 같은 문서에 대한 후속 질문은 채팅 이력에 본문이 온전히 남아 있으면
+#   본문 대신 짧은 참조만 보냅니다 (이력 압축으로 본문이 밀려났으면 다시 보냄).
+# - 등록된 문서는 캐시 백엔드에 보관됩니다. 기본 백엔드는 오프라인에서도 동작하는
+#   로컬 인메모리 스탠드인(LocalContextCache)이며, 원격 컨텍스트 캐시 백엔드는
+#   같은 인터페이스(register/lookup/resolve)로 교체할 수 있습니다.
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config.history_manager import HISTORY_SUMMARY_MARKER, TRUNCATED_MARKER, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 문서 컨텍스트 재사용 on/off (DOC_CONTEXT_REUSE=0 으로 매 턴 본문 전송)
+DOC_CONTEXT_REUSE = os.environ.get("DOC_CONTEXT_REUSE", "1") == "1"
+DOC_CONTEXT_TTL = int(os.environ.get("DOC_CONTEXT_TTL", "3600"))
+DOC_CONTEXT_MAX_ENTRIES = 64
+
+DOC_MARKER_FORMAT = "[doc:{doc_id}]"
+
+# 후속 질문에서 본문 대신 보내는 참조 문구
+DOC_REFERENCE_TEXTS = {
+    "ko": "(본문 생략 - 앞선 대화에서 제공한 문서 {marker}의 내용을 참고하세요)",
+    "en": "(Body omitted - refer to document {marker} provided earlier in this conversation)",
+    "es": "(Contenido omitido - consulta el documento {marker} proporcionado anteriormente en esta conversación)",
+}
+
+
+def content_hash(content):
+    """문서 본문의 콘텐츠 해시 (문서 ID)"""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()[:16]
+
+
+class LocalContextCache:
+    """
+    컨텍스트 캐시 백엔드의 로컬 스탠드인 (프로세스 메모리, TTL + 개수 제한).
+
+    원격 캐시와 같은 인터페이스를 제공하여 오프라인 테스트에 사용합니다.
+    """
+
+    def __init__(self, ttl=DOC_CONTEXT_TTL, max_entries=DOC_CONTEXT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # doc_id -> (handle, content, expires_at)
+        self._lock = threading.Lock()
+
+    def register(self, doc_id, content):
+        """문서를 등록하고 캐시 핸들을 반환합니다."""
+        handle = f"local-context/{doc_id}"
+        with self._lock:
+            self._entries[doc_id] = (handle, content, time.time() + self.ttl)
+            self._entries.move_to_end(doc_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def lookup(self, doc_id):
+        """등록된 문서의 핸들 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(doc_id)
+            if entry is None:
+                return None
+            if entry[2] < time.time():
+                del self._entries[doc_id]
+                return None
+            self._entries.move_to_end(doc_id)
+            return entry[0]
+
+    def resolve(self, handle):
+        """핸들로 문서 본문을 돌려받습니다."""
+        doc_id = handle.rsplit("/", 1)[-1]
+        with self._lock:
+            entry = self._entries.get(doc_id)
+        return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DocumentContext:
+    """프롬프트에 넣을 문서 블록 (본문 또는 참조)"""
+
+    def __init__(self, doc_id, block, reused, handle=None):
+        self.doc_id = doc_id
+        self.block = block
+        self.reused = reused
+        self.handle = handle
+
+
+class DocumentContextRegistry:
+    """콘텐츠 해시 기준 문서 컨텍스트 레지스트리"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalContextCache()
+        self.stats = {"sent": 0, "reused": 0, "tokens_saved": 0}
+
+    def _in_history(self, history, marker):
+        """채팅 이력에 문서 본문이 잘리지 않은 채로 남아 있는지 확인"""
+        for entry in history or []:
+            parts = entry.get("parts", []) if isinstance(entry, dict) else getattr(entry, "parts", [])
+            for part in parts:
+                text = part if isinstance(part, str) else getattr(part, "text", "")
+                if not text or marker not in text:
+                    continue
+                # 롤링 요약이나 예산 초과로 잘린 본문은 재사용하지 않음
+                if text.startswith(HISTORY_SUMMARY_MARKER) or TRUNCATED_MARKER in text:
+                    continue
+                return True
+        return False
+
+    def prepare(self, content, history, lang="ko"):
+        """
+        문서 본문을 프롬프트용 블록으로 준비합니다.
+
+        Args:
+            content: 프롬프트에 넣을 문서 본문
+            history: 현재 채팅 세션 이력 (chat_session.history)
+            lang: 참조 문구 언어
+
+        Returns:
+            DocumentContext (block을 프롬프트의 본문 자리에 넣음)
+        """
+        doc_id = content_hash(content)
+        marker = DOC_MARKER_FORMAT.format(doc_id=doc_id)
+        handle = self.backend.lookup(doc_id)
+
+        if DOC_CONTEXT_REUSE and handle is not None and self._in_history(history, marker):
+            saved = estimate_tokens(content)
+            self.stats["reused"] += 1
+            self.stats["tokens_saved"] += saved
+            logger.info(f"♻️ 문서 컨텍스트 재사용: {marker} (본문 재전송 생략, ~{saved} 토큰 절약)")
+            reference = DOC_REFERENCE_TEXTS.get(lang, DOC_REFERENCE_TEXTS["en"]).format(marker=marker)
+            return DocumentContext(doc_id, reference, True, handle)
+
+        handle = self.backend.register(doc_id, content)
+        self.stats["sent"] += 1
+        logger.info(f"📎 문서 컨텍스트 등록: {marker} ({len(content)}자)")
+        return DocumentContext(doc_id, f"{marker}\n{content}", False, handle)
+
+
+# 프로세스 전역 레지스트리
+document_context_registry = DocumentContextRegistry()
+
+
+def prepare_document_context(content, chat_session, lang="ko"):
+    """chat_session 이력을 기준으로 문서 블록을 준비합니다."""
+    history = getattr(chat_session, "history", None)
+    return document_context_registry.prepare(content, history, lang)
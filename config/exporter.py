@@ -0,0 +1,275 @@
+# config/exporter.py
+# 대화 내보내기 (스트리밍 NDJSON / 이미지 사이드카 zip)
+#
+# - 세션과 메시지를 한 줄에 하나씩 JSON 레코드로 씁니다. 전체 내보내기를 메모리에서
+#   하나의 문자열로 만들지 않고, 세션 메시지는 페이지 단위로 읽어 바로 씁니다.
+# - 출력은 SpooledTemporaryFile에 쓰고 EXPORT_SPOOL_MAX를 넘으면 디스크로 넘깁니다.
+# - NDJSON: gzip 또는 zstd(zstandard 설치 시, 없으면 gzip) 압축 선택.
+#   이미지 바이트는 base64로 인라인되며, compact=True면 더 작은 base85를 사용합니다.
+# - zip: sessions/<세션ID>.ndjson + images/<sha256>.<확장자> 사이드카 파일
+#   (같은 이미지는 한 번만 저장, 이미 압축된 이미지는 무압축으로 저장).
+#   저장소에서 읽은 세션의 이미지는 URL뿐이므로 URL 이미지도 HTTP_MAX_IMAGE_BYTES 한도로
+#   내려받아 사이드카로 저장합니다 (다른 배포로 옮겨도 이전 버킷을 가리키지 않도록).
+#   받지 못한 이미지는 URL 문자열로 남깁니다.
+# - NDJSON은 URL 이미지를 URL 문자열 그대로 기록합니다.
+# - st.download_button은 bytes만 받으므로 버튼에 넘길 때(build_export_bytes)는
+#   압축된 내보내기 전체가 메모리에 올라갑니다. 스풀은 만드는 동안의 메모리만 제한합니다.
+#
+# 레코드 형식:
+#   {"type": "export", "version": 1, "exported_at": ..., "format": ...}
+#   {"type": "session", "id", "title", "created_at", "last_updated"}
+#   {"type": "message", "session_id", "role", "content", "time_taken"?, "images"?}
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+
+from config.blob_store import resolve_image
+from config.http_client import HTTP_MAX_IMAGE_BYTES, IMAGE_CONTENT_TYPES, http_download
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "zip")
+EXPORT_COMPRESSIONS = ("gzip", "zstd", "none")
+EXPORT_SPOOL_MAX = 8 * 1024 * 1024
+EXPORT_VERSION = 1
+
+_IMAGE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+_MESSAGE_FIELDS = ("time_taken", "ttft")
+
+
+def _sniff_mime(data):
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+
+def _timestamp(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _open_compressed(raw, compression):
+    """압축 스트림을 엽니다 (zstandard가 없으면 gzip으로 대체). Returns: (stream, 실제 압축 방식)"""
+    if compression == "zstd":
+        try:
+            import zstandard
+            return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False), "zstd"
+        except ImportError:
+            logger.warning("⚠️ zstandard 미설치, gzip으로 내보냅니다")
+            compression = "gzip"
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0), "gzip"
+    return None, "none"
+
+
+class NdjsonExportWriter:
+    """NDJSON 스트림 writer (이미지 인라인)"""
+
+    def __init__(self, raw, compression="gzip", compact=False):
+        self.raw = raw
+        self.compact = compact
+        self._stream, self.compression = _open_compressed(raw, compression)
+        self._out = self._stream or raw
+
+    def write(self, record):
+        self._out.write(_dumps(record))
+
+    def begin_session(self, record):
+        self.write(record)
+
+    def end_session(self, session_id):
+        pass
+
+    def image_url(self, url):
+        return url
+
+    def image(self, data, mime_type):
+        if self.compact:
+            return {"mime_type": mime_type, "encoding": "base85", "data": base64.b85encode(data).decode("ascii")}
+        return {"mime_type": mime_type, "encoding": "base64", "data": base64.b64encode(data).decode("ascii")}
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+
+
+class ZipExportWriter:
+    """zip writer: 세션별 NDJSON + 이미지 사이드카 파일"""
+
+    def __init__(self, raw):
+        self.zip = zipfile.ZipFile(raw, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        self._images = set()
+        self._urls = {}  # URL → 사이드카 레코드 (받지 못했으면 URL 문자열)
+        self._lines = []  # 현재 세션의 레코드 (zip은 항목 하나씩만 쓸 수 있어 세션 단위로 모음)
+
+    def write(self, record):
+        if record.get("type") == "export":
+            self.zip.writestr("manifest.json", json.dumps(record, ensure_ascii=False))
+        else:
+            self._lines.append(_dumps(record))
+
+    def begin_session(self, record):
+        self._lines = [_dumps(record)]
+
+    def end_session(self, session_id):
+        self.zip.writestr(f"sessions/{session_id}.ndjson", b"".join(self._lines))
+        self._lines = []
+
+    def image_url(self, url):
+        """URL 이미지를 내려받아 사이드카로 저장합니다 (실패 시 URL 그대로)."""
+        if url in self._urls:
+            return self._urls[url]
+        try:
+            download = http_download(url, HTTP_MAX_IMAGE_BYTES, accept=IMAGE_CONTENT_TYPES,
+                                     allow_unknown=False, timeout=15)
+            data = bytes(download.data)
+            mime_type = download.content_type if download.content_type in _IMAGE_EXTENSIONS else _sniff_mime(data)
+            record = dict(self.image(data, mime_type), url=url)
+        except Exception as e:
+            logger.warning(f"⚠️ 내보내기 이미지 다운로드 실패, URL로 기록: {url} ({e})")
+            record = url
+        self._urls[url] = record
+        return record
+
+    def image(self, data, mime_type):
+        path = f"images/{hashlib.sha256(data).hexdigest()}{_IMAGE_EXTENSIONS.get(mime_type, '.bin')}"
+        if path not in self._images:
+            self._images.add(path)
+            self.zip.writestr(zipfile.ZipInfo(path), data, compress_type=zipfile.ZIP_STORED)
+        return {"mime_type": mime_type, "path": path}
+
+    def close(self):
+        self.zip.close()
+
+
+def _message_record(session_id, message, writer):
+    record = {
+        "type": "message",
+        "session_id": session_id,
+        "role": message.get("role"),
+        "content": message.get("content", ""),
+    }
+    for key in _MESSAGE_FIELDS:
+        if message.get(key) is not None:
+            record[key] = message[key]
+    images = []
+    for image in message.get("images") or []:
+        if isinstance(image, str):
+            images.append(writer.image_url(image))  # zip은 사이드카로 내려받음
+            continue
+        data = resolve_image(image)
+        if data is None:
+            continue
+        data = bytes(data)
+        images.append(writer.image(data, getattr(image, "mime_type", None) or _sniff_mime(data)))
+    if images:
+        record["images"] = images
+    return record
+
+
+def write_export(raw, sessions, fmt="ndjson", compression="gzip", compact=False):
+    """
+    세션들을 내보내기 형식으로 씁니다.
+
+    Args:
+        raw: 바이너리 출력 파일 객체
+        sessions: (세션 정보 dict, 메시지 목록 페이지 iterable) 쌍의 iterable
+        fmt: "ndjson" 또는 "zip"
+        compression: NDJSON 압축 ("gzip", "zstd", "none")
+        compact: NDJSON 이미지 인라인에 base85 사용
+
+    Returns:
+        {"sessions", "messages", "images", "compression"} 통계
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 내보내기 형식: {fmt}")
+    writer = ZipExportWriter(raw) if fmt == "zip" else NdjsonExportWriter(raw, compression, compact)
+    stats = {"sessions": 0, "messages": 0, "images": 0,
+             "compression": "deflate" if fmt == "zip" else writer.compression}
+    try:
+        writer.write({
+            "type": "export",
+            "version": EXPORT_VERSION,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "format": fmt,
+        })
+        for session, pages in sessions:
+            session_id = session["id"]
+            writer.begin_session({
+                "type": "session",
+                "id": session_id,
+                "title": session.get("title", ""),
+                "created_at": _timestamp(session.get("created_at")),
+                "last_updated": _timestamp(session.get("last_updated")),
+            })
+            for page in pages:
+                for message in page:
+                    record = _message_record(session_id, message, writer)
+                    stats["images"] += len(record.get("images", ()))
+                    writer.write(record)
+                    stats["messages"] += 1
+            writer.end_session(session_id)
+            stats["sessions"] += 1
+    finally:
+        writer.close()
+    return stats
+
+
+def build_export(sessions, fmt="ndjson", compression="gzip", compact=False):
+    """
+    내보내기 파일을 만들어 처음 위치로 되감은 파일 객체를 반환합니다
+    (EXPORT_SPOOL_MAX를 넘으면 디스크 임시 파일 사용).
+    """
+    t0 = time.perf_counter()
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX)
+    stats = write_export(out, sessions, fmt, compression, compact)
+    size = out.tell()
+    out.seek(0)
+    logger.info(
+        f"TIMING: export {fmt}/{stats['compression']} took {time.perf_counter() - t0:.4f}s "
+        f"(sessions={stats['sessions']}, messages={stats['messages']}, images={stats['images']}, {size} bytes)"
+    )
+    return out
+
+
+def build_export_bytes(sessions, fmt="ndjson", compression="gzip", compact=False):
+    """
+    내보내기 결과를 bytes로 반환합니다 (st.download_button 콜러블용:
+    Streamlit은 str/bytes/BytesIO/BufferedReader/RawIOBase만 받으며 SpooledTemporaryFile은 거부).
+
+    Streamlit이 어차피 전체를 bytes로 읽으므로 반환값은 압축된 내보내기 전체 크기만큼
+    메모리를 씁니다 (스풀은 만드는 동안의 메모리만 제한).
+    """
+    out = build_export(sessions, fmt, compression, compact)
+    try:
+        return out.read()
+    finally:
+        out.close()
+
+
+def export_file_name(fmt="ndjson", compression="gzip", now=None):
+    """내보내기 파일명과 MIME 타입 (zstd 미설치 시 gzip 확장자)"""
+    stamp = (now or datetime.now()).strftime('%m%d_%H%M')
+    if fmt == "zip":
+        return f"chat_{stamp}.zip", "application/zip"
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+            return f"chat_{stamp}.ndjson.zst", "application/zstd"
+        except ImportError:
+            compression = "gzip"
+    if compression == "gzip":
+        return f"chat_{stamp}.ndjson.gz", "application/gzip"
+    return f"chat_{stamp}.ndjson", "application/x-ndjson"
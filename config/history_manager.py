@@ -0,0 +1,230 @@
+# config/history_manager.py
+# 토큰 예산 기반 Gemini 채팅 이력 관리
+#
+# - 최근 N턴(user + model)은 그대로 유지
+# - 그보다 오래된 턴은 짧은 요약 줄로 바꿔 롤링 요약(st.session_state.history_summary)에 누적
+# - 모델별 토큰 예산을 넘으면 오래된 턴부터 요약으로 밀어내고, 그래도 넘으면
+#   남은 턴의 긴 텍스트(웹페이지 본문, PDF 발췌, 검색 결과 등)를 잘라냄
+#
+# 토큰 수는 count_tokens API 호출 없이 UTF-8 바이트 수로 추정합니다 (턴당 네트워크 왕복 없음).
+
+import logging
+import os
+import re
+
+import streamlit as st
+
+from config.model_registry import DEFAULT_MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+# 모델별 채팅 이력 토큰 예산 (CHAT_HISTORY_TOKEN_BUDGET 환경 변수로 일괄 변경 가능)
+HISTORY_TOKEN_BUDGETS = {
+    "gemini-2.5-flash": 32000,
+    "gemini-2.0-flash-exp": 16000,
+}
+DEFAULT_HISTORY_TOKEN_BUDGET = 16000
+
+# 요약 없이 그대로 유지할 최근 턴 수
+HISTORY_KEEP_TURNS = int(os.environ.get("CHAT_HISTORY_KEEP_TURNS", "6"))
+
+# 롤링 요약 최대 길이 (넘으면 가장 오래된 줄부터 제거)
+HISTORY_SUMMARY_MAX_CHARS = 4000
+SUMMARY_USER_CHARS = 120
+SUMMARY_MODEL_CHARS = 200
+
+# 토큰 추정: 영어 ~4바이트/토큰, 한국어 ~3바이트/글자 ≈ 1토큰 미만
+BYTES_PER_TOKEN = 3.5
+# 이미지 파트 1개당 토큰 (Gemini 기준 고정 258토큰)
+IMAGE_TOKEN_ESTIMATE = 258
+
+HISTORY_SUMMARY_MARKER = "[이전 대화 요약]"
+HISTORY_SUMMARY_ACK = "네, 이전 대화 요약을 참고해서 이어서 답변할게요."
+TRUNCATED_MARKER = "\n…(토큰 예산 초과로 이후 내용 생략)"
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def get_history_token_budget(model_name=DEFAULT_MODEL_NAME):
+    """모델별 채팅 이력 토큰 예산"""
+    override = os.environ.get("CHAT_HISTORY_TOKEN_BUDGET")
+    if override:
+        try:
+            return int(override)
+        except ValueError:
+            logger.warning(f"CHAT_HISTORY_TOKEN_BUDGET 값이 잘못되었습니다: {override}")
+    return HISTORY_TOKEN_BUDGETS.get(model_name, DEFAULT_HISTORY_TOKEN_BUDGET)
+
+
+def estimate_tokens(text):
+    """텍스트의 토큰 수를 UTF-8 바이트 수로 추정합니다."""
+    if not text:
+        return 0
+    return int(len(text.encode("utf-8")) / BYTES_PER_TOKEN) + 1
+
+
+def _entry_role(entry):
+    """이력 항목(dict 또는 Gemini Content)의 role"""
+    if isinstance(entry, dict):
+        return entry.get("role", "user")
+    return getattr(entry, "role", "user")
+
+
+def _entry_parts(entry):
+    """이력 항목의 parts 목록"""
+    if isinstance(entry, dict):
+        return list(entry.get("parts", []))
+    return list(getattr(entry, "parts", []))
+
+
+def _part_text(part):
+    """파트의 텍스트 (이미지 등 텍스트가 아닌 파트는 None)"""
+    if isinstance(part, str):
+        return part
+    if isinstance(part, dict):
+        return part.get("text")
+    text = getattr(part, "text", None)
+    return text if text else None
+
+
+def _entry_text(entry):
+    return "\n".join(t for t in (_part_text(p) for p in _entry_parts(entry)) if t)
+
+
+def _entry_tokens(entry):
+    tokens = 0
+    for part in _entry_parts(entry):
+        text = _part_text(part)
+        tokens += estimate_tokens(text) if text is not None else IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+
+def _split_turns(history):
+    """이력을 턴(user 메시지로 시작하는 항목 묶음) 단위로 나눕니다."""
+    turns = []
+    for entry in history:
+        if _entry_role(entry) == "user" or not turns:
+            turns.append([entry])
+        else:
+            turns[-1].append(entry)
+    return turns
+
+
+def _is_summary_turn(turn):
+    return bool(turn) and _entry_text(turn[0]).startswith(HISTORY_SUMMARY_MARKER)
+
+
+def _one_line(text, limit):
+    text = _WHITESPACE_PATTERN.sub(" ", text or "").strip()
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _summarize_turn(turn):
+    """턴 하나를 요약 한 줄로 변환합니다 (추가 모델 호출 없이 발췌)."""
+    user_text = _one_line(_entry_text(turn[0]), SUMMARY_USER_CHARS)
+    model_text = _one_line(" ".join(_entry_text(e) for e in turn[1:]), SUMMARY_MODEL_CHARS)
+    line = f"- 사용자: {user_text}"
+    if model_text:
+        line += f" → 답변: {model_text}"
+    return line
+
+
+def _merge_summary(summary, turns):
+    """기존 롤링 요약에 밀려난 턴들의 요약 줄을 붙이고 최대 길이를 맞춥니다."""
+    lines = [line for line in (summary or "").split("\n") if line]
+    lines.extend(_summarize_turn(turn) for turn in turns)
+    while lines and sum(len(line) + 1 for line in lines) > HISTORY_SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def _clip_turn(turn, max_tokens):
+    """턴의 텍스트 파트를 비율대로 잘라 max_tokens 이내로 맞춥니다."""
+    turn_tokens = sum(_entry_tokens(e) for e in turn)
+    if turn_tokens <= max_tokens:
+        return turn
+    ratio = max(max_tokens, 0) / turn_tokens
+    clipped = []
+    for entry in turn:
+        parts = []
+        for part in _entry_parts(entry):
+            text = _part_text(part)
+            if text is None:
+                parts.append(part)
+                continue
+            keep = int(len(text) * ratio)
+            parts.append(text if keep >= len(text) else text[:keep] + TRUNCATED_MARKER)
+        clipped.append({"role": _entry_role(entry), "parts": parts})
+    return clipped
+
+
+def compact_history(history, summary="", model_name=DEFAULT_MODEL_NAME, keep_turns=None, budget=None):
+    """
+    채팅 이력을 최근 턴 + 롤링 요약으로 압축합니다.
+
+    Args:
+        history: Gemini 채팅 이력 (dict 또는 Content 목록)
+        summary: 지금까지의 롤링 요약
+        model_name: 토큰 예산을 정할 모델명
+        keep_turns: 그대로 유지할 최근 턴 수 (기본 HISTORY_KEEP_TURNS)
+        budget: 토큰 예산 (기본 get_history_token_budget(model_name))
+
+    Returns:
+        (유지할 이력, 갱신된 요약, 요약을 포함해 start_chat에 넘길 이력)
+    """
+    keep_turns = HISTORY_KEEP_TURNS if keep_turns is None else max(keep_turns, 1)
+    budget = get_history_token_budget(model_name) if budget is None else budget
+
+    turns = _split_turns(history or [])
+    # 이전 턴에서 start_chat에 넣었던 요약 항목은 제거 (요약은 summary로 따로 관리)
+    if turns and _is_summary_turn(turns[0]):
+        if not summary:
+            summary = _entry_text(turns[0][0])[len(HISTORY_SUMMARY_MARKER):].strip()
+        turns = turns[1:]
+
+    older, recent = turns[:-keep_turns], turns[-keep_turns:]
+    turn_tokens = [sum(_entry_tokens(e) for e in turn) for turn in recent]
+
+    summary_tokens = estimate_tokens(_merge_summary(summary, older)) if (summary or older) else 0
+    # 예산을 넘으면 가장 오래된 최근 턴부터 요약으로 밀어냄 (마지막 턴은 유지)
+    while len(recent) > 1 and sum(turn_tokens) + summary_tokens > budget:
+        older.append(recent.pop(0))
+        turn_tokens.pop(0)
+        summary_tokens = estimate_tokens(_merge_summary(summary, older))
+
+    # 턴 하나가 예산보다 크면 (웹페이지/PDF 본문 등) 텍스트를 잘라냄
+    if recent and sum(turn_tokens) + summary_tokens > budget:
+        recent = [_clip_turn(turn, budget - summary_tokens) for turn in recent]
+        turn_tokens = [sum(_entry_tokens(e) for e in turn) for turn in recent]
+
+    if older:
+        summary = _merge_summary(summary, older)
+        logger.info(
+            f"🧾 채팅 이력 압축: {len(older)}턴 요약, {len(recent)}턴 유지 "
+            f"(~{sum(turn_tokens) + estimate_tokens(summary)}/{budget} 토큰)"
+        )
+
+    kept = [entry for turn in recent for entry in turn]
+    if summary:
+        prompt_history = [
+            {"role": "user", "parts": [f"{HISTORY_SUMMARY_MARKER}\n{summary}"]},
+            {"role": "model", "parts": [HISTORY_SUMMARY_ACK]},
+        ] + kept
+    else:
+        prompt_history = list(kept)
+    return kept, summary, prompt_history
+
+
+def get_budgeted_history(model_name=DEFAULT_MODEL_NAME):
+    """
+    세션의 채팅 이력을 예산에 맞게 압축하고 start_chat에 넘길 이력을 반환합니다.
+    압축 결과(유지 이력, 롤링 요약)는 세션 상태에 반영됩니다.
+    """
+    kept, summary, prompt_history = compact_history(
+        st.session_state.get("chat_history", []),
+        st.session_state.get("history_summary", ""),
+        model_name,
+    )
+    st.session_state.chat_history = kept
+    st.session_state.history_summary = summary
+    return prompt_history
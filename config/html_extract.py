@@ -0,0 +1,219 @@
+# config/html_extract.py
+# 웹페이지 HTML 한 번 파싱으로 본문 + 메타데이터 추출
+#
+# - 응답 HTML을 한 번만 파싱해 같은 트리에서 제목/설명/작성자/사이트명/게시일과
+#   본문 텍스트, 네이버 블로그 프레임셋 iframe 주소를 함께 꺼냅니다.
+#   (기존: iframe 확인용 파싱 + 본문 파싱 + 추출된 평문을 다시 파싱하는 메타데이터 추출)
+# - lxml이 설치되어 있으면 lxml 파서를, 없으면 내장 html.parser를 사용합니다.
+# - 메타 태그와 JSON-LD는 본문 정리(script/header 등 제거) 전에 읽습니다.
+# - 네이버 블로그 등 사이트별 본문 선택자/iframe/JSON-LD 처리는 config/site_adapters의 어댑터가 정합니다.
+# - max_chars를 주면 본문 문자열을 앞에서부터 모으다가 충분히 모이면 멈춥니다
+#   (결과는 전체 추출 후 max_chars로 자른 것과 같음).
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from config.site_adapters import adapter_for
+
+logger = logging.getLogger(__name__)
+
+
+def _default_parser():
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+# HTML_PARSER로 강제 지정 가능 ("lxml", "html.parser")
+HTML_PARSER = os.environ.get("HTML_PARSER") or _default_parser()
+
+_STRIP_TAGS = ["script", "style", "nav", "header", "footer", "aside", "advertisement", "noscript"]
+_CONTENT_SELECTORS = ['main', 'article', '.content', '.post-content', '.entry-content', '#content', '.post-view', '.blog-content']
+
+
+def default_metadata(url):
+    """메타데이터를 얻지 못했을 때의 기본값 (사이트명은 URL 호스트)"""
+    return {
+        "title": "Unknown",
+        "description": "No description available",
+        "author": "Unknown",
+        "published_date": "Unknown",
+        "site_name": urlparse(url).netloc or "Unknown",
+    }
+
+
+@dataclass
+class ExtractedPage:
+    """
+    한 번의 파싱으로 추출한 웹페이지.
+
+    Attributes:
+        text: 정리된 본문 (줄 단위, max_chars를 주면 그 길이까지)
+        metadata: title / description / author / published_date / site_name
+        iframe_url: 네이버 블로그 프레임셋이면 실제 본문 iframe 주소
+    """
+    text: str
+    metadata: dict = field(default_factory=dict)
+    iframe_url: Optional[str] = None
+
+
+def _json_ld_objects(soup):
+    objects = []
+    for tag in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        try:
+            data = json.loads(tag.string or tag.get_text() or "")
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if isinstance(data, dict):
+            objects.append(data)
+    return objects
+
+
+def _ld_author(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value if isinstance(value, str) and value else None
+
+
+def _extract_metadata(soup, url, json_ld):
+    metadata = default_metadata(url)
+    metadata["site_name"] = "Unknown"
+
+    # 제목 추출
+    if (title_tag := soup.find('title')) and title_tag.get_text().strip():
+        metadata["title"] = title_tag.get_text().strip()
+    elif (og_title := soup.find('meta', attrs={'property': 'og:title'})) and og_title.get('content'):
+        metadata["title"] = og_title['content'].strip()
+    elif h1_tag := soup.find('h1'):
+        metadata["title"] = h1_tag.get_text().strip()
+
+    # 메타 태그에서 정보 추출
+    for tag in soup.find_all('meta'):
+        name, prop = tag.get('name'), tag.get('property')
+        if name == 'description' or prop == 'og:description':
+            metadata["description"] = tag.get('content', '')[:200]
+        elif name == 'author':
+            metadata["author"] = tag.get('content', '')
+        elif prop == 'og:site_name':
+            metadata["site_name"] = tag.get('content', '')
+        elif name == 'date' or prop == 'article:published_time':
+            metadata["published_date"] = tag.get('content', '')
+
+    # JSON-LD 보완 (네이버 블로그/뉴스 기사)
+    for data in json_ld:
+        if metadata["author"] == "Unknown" and (author := _ld_author(data.get("author"))):
+            metadata["author"] = author
+        if metadata["published_date"] == "Unknown" and isinstance(data.get("datePublished"), str):
+            metadata["published_date"] = data["datePublished"]
+        if metadata["title"] == "Unknown" and isinstance(data.get("headline"), str):
+            metadata["title"] = data["headline"]
+
+    # URL에서 사이트명 추출 (fallback)
+    if metadata["site_name"] == "Unknown":
+        metadata["site_name"] = urlparse(url).netloc
+    return metadata
+
+
+def _clean_lines(strings, max_chars=None):
+    """
+    get_text(separator='\n', strip=True) 결과를 줄 단위로 정리한 것과 같은 텍스트를 만듭니다.
+    max_chars에 도달하면 나머지 문자열은 읽지 않습니다.
+    """
+    lines = []
+    total = -1  # 첫 줄에는 구분자 없음
+    for string in strings:
+        for line in string.split('\n'):
+            line = line.strip()
+            if line and len(line) > 2:
+                lines.append(line)
+                total += len(line) + 1
+        if max_chars is not None and total >= max_chars:
+            return '\n'.join(lines)[:max_chars]
+    return '\n'.join(lines)
+
+
+def _longer_than(element, min_chars):
+    """요소의 get_text(separator='\n', strip=True) 길이가 min_chars를 넘는지 (넘으면 즉시 중단)"""
+    total = -1
+    for string in element.stripped_strings:
+        total += len(string) + 1
+        if total > min_chars:
+            return True
+    return False
+
+
+def _site_body(soup, url, json_ld, site):
+    """어댑터가 지정한 사이트 본문 (요소 또는 JSON 문자열, 없으면 None)"""
+    # 방법 1: 사이트 본문 영역 (CSS 선택자)
+    for selector in site.body_selectors:
+        try:
+            post_body = soup.select_one(selector)
+            if post_body and _longer_than(post_body, site.min_body_chars):
+                logger.info(f"✅ {site.name} 본문 추출 완료 (셀렉터: {selector})")
+                return post_body
+        except Exception as e:
+            logger.debug(f"선택자 실패 {selector}: {e}")
+
+    # 방법 2: JSON 메타데이터에서 추출 (네이버 블로그 등)
+    if site.json_ld_body:
+        for data in json_ld:
+            if 'articleBody' in data:
+                logger.info(f"✅ JSON 메타데이터에서 추출: {len(data['articleBody'])} chars")
+                return data['articleBody']
+            if 'description' in data:
+                logger.info(f"✅ JSON description 추출: {len(data['description'])} chars")
+                return data['description']
+
+    logger.warning(f"⚠️ {site.name} 본문을 추출하지 못함: {url}")
+    return None
+
+
+def extract_page(html, url, parser=None, max_chars=None, adapter=None):
+    """
+    HTML을 한 번 파싱해 본문과 메타데이터를 추출합니다.
+
+    Args:
+        html: 응답 HTML 문자열
+        url: 페이지 URL (네이버 블로그 판별, 사이트명 기본값)
+        parser: BeautifulSoup 파서 (기본 HTML_PARSER)
+        max_chars: 본문 최대 길이 (도달하면 추출 중단)
+        adapter: 사이트 어댑터 (기본: URL 도메인으로 선택)
+
+    Returns:
+        ExtractedPage (네이버 블로그 같은 프레임셋이면 iframe_url만 채워짐)
+    """
+    site = adapter or adapter_for(url)
+    soup = BeautifulSoup(html, parser or HTML_PARSER)
+    json_ld = _json_ld_objects(soup)
+    metadata = _extract_metadata(soup, url, json_ld)
+
+    # 프레임셋 URL 감지 (네이버 블로그: iframe을 통한 리다이렉트)
+    if iframe_url := site.iframe_url(soup, url):
+        return ExtractedPage("", metadata, iframe_url)
+
+    # 불필요한 태그 제거
+    for tag in soup(_STRIP_TAGS):
+        tag.decompose()
+
+    has_site_body = site.body_selectors or site.json_ld_body
+    body = _site_body(soup, url, json_ld, site) if has_site_body else None
+    if isinstance(body, str):
+        return ExtractedPage(_clean_lines([body], max_chars), metadata)
+
+    # 사이트 본문 처리가 없거나 본문을 찾지 못한 경우 주요 컨텐츠 영역 우선 추출
+    if body is None:
+        for selector in _CONTENT_SELECTORS:
+            if content_elem := soup.select_one(selector):
+                body = content_elem
+                break
+    return ExtractedPage(_clean_lines((body or soup).stripped_strings, max_chars), metadata)
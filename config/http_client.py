@@ -0,0 +1,330 @@
+# config/http_client.py
+# 모든 외부 HTTP 호출이 공유하는 커넥션 풀 클라이언트
+#
+# - 프로세스당 requests.Session 하나를 두고 호스트별 커넥션 풀(keep-alive)을 재사용합니다.
+#   호출마다 Session을 만들면 매번 TCP/TLS 핸드셰이크를 새로 합니다.
+# - 재시도 정책(429/5xx, Retry-After 존중 - 최대 HTTP_RETRY_AFTER_MAX초), 기본 타임아웃, 공통 헤더를
+#   한 곳에서 정합니다. 호출 한도가 있는 API(네이버 검색, 날씨)는 retry=False로 재시도 없는 풀을 씁니다
+#   (429에 재시도하면 한도만 더 쓰고, 3초 호출이 Retry-After 대기로 수십 초가 될 수 있음).
+#   호출별 헤더/타임아웃은 요청 인자로 넘기면 됩니다 (공유 Session은 수정하지 않음).
+# - 쿠키는 세션에 저장하지 않습니다 (여러 사용자가 같은 클라이언트를 공유하므로).
+#   리다이렉트 체인 안에서의 쿠키는 requests가 요청 단위로 유지합니다.
+# - 커넥션 재사용 통계: http_client_stats()
+# - http_download: 최대 바이트/전체 시간 제한이 있는 스트리밍 다운로드
+#   (첫 청크에서 content-type 확인, 한도를 넘으면 연결을 끊고 중단하거나 앞부분만 사용)
+
+import http.cookiejar
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", "16"))  # 풀을 유지할 호스트 수
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))  # 호스트당 유지 커넥션 수
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "15"))
+HTTP_RETRY_TOTAL = int(os.environ.get("HTTP_RETRY_TOTAL", "3"))
+HTTP_RETRY_BACKOFF = 1.0
+HTTP_RETRY_AFTER_MAX = float(os.environ.get("HTTP_RETRY_AFTER_MAX", "5"))  # Retry-After 최대 대기 (초)
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_MAX_HTML_BYTES = int(os.environ.get("HTTP_MAX_HTML_BYTES", str(5 * 1024 * 1024)))
+HTTP_MAX_PDF_BYTES = int(os.environ.get("HTTP_MAX_PDF_BYTES", str(30 * 1024 * 1024)))
+HTTP_MAX_IMAGE_BYTES = int(os.environ.get("HTTP_MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+HTTP_DOWNLOAD_DEADLINE = float(os.environ.get("HTTP_DOWNLOAD_DEADLINE", "30"))  # 다운로드 전체 제한 시간 (초)
+HTTP_CHUNK_SIZE = 64 * 1024
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
+PDF_CONTENT_TYPES = ("application/pdf",)
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp", "image/gif", "image/*")
+_GENERIC_CONTENT_TYPES = ("", "application/octet-stream", "binary/octet-stream", "application/download")
+
+DEFAULT_HEADERS = {
+    "User-Agent": os.getenv("CHAT_GEM_USER_AGENT", "Chat_GemBot/1.0"),
+    # 설치된 디코더만 광고 (brotli 미설치 시 br 제외)
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+}
+
+# 웹페이지 본문을 가져올 때 쓰는 브라우저 헤더 (요청별로 전달)
+BROWSER_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://www.naver.com/",
+    "Cache-Control": "no-cache",
+}
+
+
+class _CappedRetry(Retry):
+    """Retry-After를 존중하되 HTTP_RETRY_AFTER_MAX초보다 오래 기다리지 않는 재시도 정책"""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, HTTP_RETRY_AFTER_MAX)
+
+
+class _CountingAdapter(HTTPAdapter):
+    """풀에서 밀려난 커넥션 풀의 요청/연결 수를 누적해 통계가 사라지지 않게 하는 어댑터"""
+
+    def __init__(self, stats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def _retire(pool):
+            self._stats.retire(pool)
+            if dispose:
+                dispose(pool)
+
+        pools.dispose_func = _retire
+
+    def live_pools(self):
+        pools = self.poolmanager.pools
+        with pools.lock:
+            return list(pools._container.values())
+
+
+class _PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retired = {}  # host -> [requests, connections]
+
+    def retire(self, pool):
+        with self._lock:
+            totals = self.retired.setdefault(pool.host, [0, 0])
+            totals[0] += pool.num_requests
+            totals[1] += pool.num_connections
+
+
+class PooledSession(requests.Session):
+    """
+    기본 타임아웃을 적용하고 쿠키를 저장하지 않는 공유 Session.
+
+    Args:
+        retry: False면 재시도하지 않음 (호출 한도가 있는 API용, 429는 호출자가 바로 처리)
+    """
+
+    def __init__(self, retry=True):
+        super().__init__()
+        self.pool_stats = _PoolStats()
+        self.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        self.headers.update(DEFAULT_HEADERS)
+        retry = _CappedRetry(
+            total=HTTP_RETRY_TOTAL,
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ) if retry else 0
+        self.adapters.clear()
+        for prefix in ("https://", "http://"):
+            self.mount(prefix, _CountingAdapter(
+                self.pool_stats,
+                pool_connections=HTTP_POOL_HOSTS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=retry,
+            ))
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+    def stats(self):
+        per_host = {host: list(totals) for host, totals in self.pool_stats.retired.items()}
+        for adapter in self.adapters.values():
+            for pool in adapter.live_pools():
+                totals = per_host.setdefault(pool.host, [0, 0])
+                totals[0] += pool.num_requests
+                totals[1] += pool.num_connections
+        hosts = {
+            host: {"requests": req, "connections": conn, "reused": max(req - conn, 0)}
+            for host, (req, conn) in per_host.items()
+        }
+        total_requests = sum(h["requests"] for h in hosts.values())
+        total_connections = sum(h["connections"] for h in hosts.values())
+        return {
+            "requests": total_requests,
+            "connections": total_connections,
+            "reused": max(total_requests - total_connections, 0),
+            "hosts": hosts,
+        }
+
+
+class DownloadError(Exception):
+    """
+    스트리밍 다운로드 중단.
+
+    Attributes:
+        reason: "too_large" | "content_type" | "deadline"
+        content_type: 확인된 content-type (있으면)
+    """
+
+    def __init__(self, message, reason, content_type=None):
+        super().__init__(message)
+        self.reason = reason
+        self.content_type = content_type
+
+
+@dataclass
+class Download:
+    """http_download 결과 (response 본문은 이미 닫힘, data는 복사 없이 받은 bytearray)"""
+    response: requests.Response
+    data: bytearray
+    content_type: Optional[str]
+    truncated: bool = False
+
+
+def sniff_content_type(head):
+    """본문 앞부분으로 형식 추정 (알 수 없으면 None)"""
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\x89PNG") or head.startswith(b"\xff\xd8\xff") or head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/*"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"
+    text = head[:1024].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<!doctype html", b"<html", b"<head", b"<body")) or (text.startswith(b"<") and b"<html" in text):
+        return "text/html"
+    return None
+
+
+def _resolve_content_type(declared, head):
+    sniffed = sniff_content_type(head)
+    if sniffed == "application/pdf":
+        return sniffed  # PDF 시그니처는 선언된 타입보다 우선
+    if declared in _GENERIC_CONTENT_TYPES:
+        return sniffed  # 일반 바이너리 타입은 본문으로 판단 (None이면 형식 불명)
+    return declared
+
+
+_sessions = {}  # retry 여부 -> PooledSession
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_http_client(retry=True):
+    """
+    프로세스 공유 HTTP 클라이언트를 반환합니다.
+    (fork된 자식 프로세스에서는 부모의 소켓을 공유하지 않도록 새로 만듭니다)
+
+    Args:
+        retry: False면 429/5xx/연결 오류를 재시도하지 않는 클라이언트 (호출 한도가 있는 API용)
+    """
+    global _session_pid
+    pid = os.getpid()
+    session = _sessions.get(retry) if _session_pid == pid else None
+    if session is None:
+        with _session_lock:
+            if _session_pid != pid:
+                _sessions.clear()
+                _session_pid = pid
+            session = _sessions.get(retry)
+            if session is None:
+                session = _sessions[retry] = PooledSession(retry)
+                logger.info(f"🌐 공유 HTTP 클라이언트 생성 (재시도 {'사용' if retry else '없음'}, "
+                            f"호스트 {HTTP_POOL_HOSTS}개, 호스트당 커넥션 {HTTP_POOL_MAXSIZE}개)")
+    return session
+
+
+def http_get(url, retry=True, **kwargs):
+    """
+    공유 클라이언트로 GET 요청을 보냅니다 (requests.get과 같은 인자).
+    retry=False면 재시도 없이 한 번만 보냅니다 (네이버 검색/날씨처럼 호출 한도가 있는 API).
+    """
+    return get_http_client(retry).get(url, **kwargs)
+
+
+def http_client_stats():
+    """
+    커넥션 재사용 통계.
+
+    Returns:
+        {"requests", "connections", "reused", "hosts": {host: {...}}}
+        reused = 새 TCP/TLS 핸드셰이크 없이 보낸 요청 수
+    """
+    stats = {"requests": 0, "connections": 0, "reused": 0, "hosts": {}}
+    if _session_pid != os.getpid():
+        return stats
+    for session in list(_sessions.values()):
+        session_stats = session.stats()
+        for key in ("requests", "connections", "reused"):
+            stats[key] += session_stats[key]
+        for host, counts in session_stats["hosts"].items():
+            totals = stats["hosts"].setdefault(host, {"requests": 0, "connections": 0, "reused": 0})
+            for key, value in counts.items():
+                totals[key] += value
+    return stats
+
+
+def http_download(url, max_bytes, accept=None, allow_unknown=True, truncate=False,
+                  deadline=HTTP_DOWNLOAD_DEADLINE, **kwargs):
+    """
+    공유 클라이언트로 본문을 스트리밍으로 받습니다 (최대 max_bytes).
+
+    Args:
+        url: 요청 URL
+        max_bytes: 최대 본문 바이트 (압축 해제 후 기준)
+        accept: 허용할 content-type 목록 (None이면 확인하지 않음)
+        allow_unknown: 선언/추정 모두 실패한 형식을 허용할지 여부
+        truncate: True면 한도에서 읽기를 멈추고 앞부분을 반환, False면 DownloadError
+        deadline: 다운로드 전체 제한 시간 (초)
+        **kwargs: requests.get 인자 (headers, timeout, ...)
+
+    Returns:
+        Download (304 Not Modified면 data는 빈 바이트)
+
+    Raises:
+        requests.HTTPError: 4xx/5xx 응답
+        DownloadError: 크기 초과 / 허용하지 않는 형식 / 제한 시간 초과
+    """
+    started = time.monotonic()
+    response = get_http_client().get(url, stream=True, **kwargs)
+    try:
+        if response.status_code == 304:
+            return Download(response, b"", None)
+        response.raise_for_status()
+        declared = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        length = response.headers.get("Content-Length")
+        if not truncate and length and length.isdigit() and int(length) > max_bytes:
+            raise DownloadError(f"본문이 너무 큽니다 ({int(length)} > {max_bytes} bytes)", "too_large", declared)
+
+        buffer = bytearray()
+        content_type = declared or None
+        checked = False
+        truncated = False
+        for chunk in response.iter_content(HTTP_CHUNK_SIZE):
+            if not checked:
+                checked = True
+                content_type = _resolve_content_type(declared, chunk)
+                if accept and (content_type not in accept if content_type else not allow_unknown):
+                    raise DownloadError(f"허용하지 않는 형식: {content_type}", "content_type", content_type)
+            if len(buffer) + len(chunk) > max_bytes:
+                if not truncate:
+                    raise DownloadError(f"본문이 너무 큽니다 (> {max_bytes} bytes)", "too_large", content_type)
+                buffer += chunk[:max_bytes - len(buffer)]
+                truncated = True
+                logger.warning(f"⚠️ 다운로드 한도 도달, 앞부분 {max_bytes} bytes만 사용: {url}")
+                break
+            buffer += chunk
+            if time.monotonic() - started > deadline:
+                raise DownloadError(f"다운로드 제한 시간 초과 ({deadline:.0f}s)", "deadline", content_type)
+        return Download(response, buffer, content_type, truncated)
+    finally:
+        # 끝까지 읽지 않은 연결은 풀로 돌려보내지 않고 끊음
+        response.close()
@@ -0,0 +1,164 @@
+# config/image_pipeline.py
+# 첨부 이미지 전처리 파이프라인 (한 번 디코딩 → 모델/저장/썸네일 변형)
+#
+# - 업로드 파일은 한 번만 읽고 한 번만 디코딩합니다 (EXIF 회전 적용).
+# - 긴 변을 IMAGE_MAX_EDGE로 줄인 WebP 하나를 만들어 Gemini 요청, 스토리지 업로드,
+#   메시지 이력이 같은 버퍼를 공유합니다. (모델 크기를 따로 지정하면 모델용만 별도 인코딩)
+# - 미리보기/이력 표시용 썸네일은 축소된 이미지에서 다시 줄여 만듭니다.
+# - PIL 이미지를 그대로 넘기면 SDK가 원본 해상도의 무손실 WebP로 다시 인코딩하므로
+#   Gemini에는 인코딩된 바이트({"mime_type", "data"})를 넘깁니다.
+
+import io
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# IMAGE_PREPROCESS=0 이면 원본 바이트를 그대로 사용 (디코딩은 한 번만)
+IMAGE_PREPROCESS = os.environ.get("IMAGE_PREPROCESS", "1") == "1"
+IMAGE_MAX_EDGE = int(os.environ.get("IMAGE_MAX_EDGE", "1536"))
+IMAGE_MODEL_MAX_EDGE = int(os.environ.get("IMAGE_MODEL_MAX_EDGE", str(IMAGE_MAX_EDGE)))
+IMAGE_WEBP_QUALITY = int(os.environ.get("IMAGE_WEBP_QUALITY", "82"))
+IMAGE_THUMBNAIL_EDGE = 300
+
+_FORMAT_MIME = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+@dataclass
+class PreparedImage:
+    """
+    전처리된 첨부 이미지.
+
+    Attributes:
+        name: 저장용 파일명 (확장자가 content-type과 일치)
+        mime_type: data의 content-type
+        data: 스토리지 업로드/메시지 이력/Gemini가 공유하는 인코딩 바이트
+        size: data의 (가로, 세로)
+        original_bytes: 원본 파일 크기 (바이트)
+        thumbnail: 미리보기용 WebP 바이트
+        model_data: Gemini용 바이트 (None이면 data 공유)
+        model_mime_type: model_data의 content-type
+    """
+    name: str
+    mime_type: str
+    data: bytes
+    size: tuple
+    original_bytes: int
+    thumbnail: bytes
+    model_data: Optional[bytes] = None
+    model_mime_type: Optional[str] = None
+
+    @property
+    def model_part(self):
+        """Gemini send_message에 넘길 blob dict"""
+        if self.model_data is None:
+            return {"mime_type": self.mime_type, "data": self.data}
+        return {"mime_type": self.model_mime_type, "data": self.model_data}
+
+    @property
+    def upload_spec(self):
+        """image_uploader.submit_image_uploads용 (바이트, 파일명, content-type)"""
+        return self.data, self.name, self.mime_type
+
+
+def _downscaled(image, max_edge):
+    """긴 변이 max_edge를 넘으면 줄인 사본, 아니면 원본을 반환합니다."""
+    if max(image.size) <= max_edge:
+        return image
+    resized = image.copy()
+    resized.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    return resized
+
+
+def _encode_webp(image, quality=IMAGE_WEBP_QUALITY):
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def prepare_image_bytes(data, name="image"):
+    """
+    이미지 바이트를 한 번 디코딩해 저장/모델/썸네일 변형을 만듭니다.
+
+    Args:
+        data: 원본 이미지 바이트
+        name: 원본 파일명 (저장용 파일명의 기반)
+
+    Returns:
+        PreparedImage (디코딩 실패 시 None)
+    """
+    t0 = time.perf_counter()
+    try:
+        image = Image.open(io.BytesIO(data))
+        source_format = image.format
+        image.load()
+        rotated = bool(image.getexif().get(0x0112, 1) != 1)
+        image = ImageOps.exif_transpose(image)
+    except Exception as e:
+        logger.error(f"이미지 처리 오류: {str(e)}")
+        return None
+
+    stem = os.path.splitext(os.path.basename(name or "image"))[0] or "image"
+    source_ext = os.path.splitext(name or "")[1].lower() or ".jpg"
+    stored = _downscaled(image, IMAGE_MAX_EDGE) if IMAGE_PREPROCESS else image
+    encoded = _encode_webp(stored) if IMAGE_PREPROCESS else None
+    # 전처리를 끄거나, 회전/축소가 필요 없는 작은 원본이 재인코딩해도 줄지 않으면 원본 바이트 사용
+    keep_original = encoded is None or (
+        stored is image and not rotated and source_format in _FORMAT_MIME and len(encoded) >= len(data)
+    )
+    if keep_original:
+        mime_type = _FORMAT_MIME.get(source_format, "image/jpeg")
+        prepared = PreparedImage(f"{stem}{source_ext}", mime_type, data, image.size, len(data), b"")
+    else:
+        prepared = PreparedImage(f"{stem}.webp", "image/webp", encoded, stored.size, len(data), b"")
+
+    if IMAGE_PREPROCESS and IMAGE_MODEL_MAX_EDGE < max(stored.size):
+        model_image = _downscaled(stored, IMAGE_MODEL_MAX_EDGE)
+        prepared.model_data = _encode_webp(model_image)
+        prepared.model_mime_type = "image/webp"
+        stored = model_image
+    prepared.thumbnail = _encode_webp(_downscaled(stored, IMAGE_THUMBNAIL_EDGE), quality=75)
+
+    logger.info(
+        f"TIMING: image preprocess {name} took {time.perf_counter() - t0:.4f}s "
+        f"({image.size[0]}x{image.size[1]} {len(data)}B → {prepared.size[0]}x{prepared.size[1]} "
+        f"{len(prepared.data)}B {prepared.mime_type})"
+    )
+    return prepared
+
+
+def _file_key(uploaded_file):
+    return getattr(uploaded_file, "file_id", None) or (uploaded_file.name, getattr(uploaded_file, "size", None))
+
+
+def prepare_uploaded_image(uploaded_file, cache=None):
+    """
+    Streamlit 업로드 파일을 전처리합니다 (파일은 한 번만 읽음).
+
+    Args:
+        uploaded_file: st.file_uploader 결과 파일
+        cache: file_id → PreparedImage dict (리런 사이 재사용, 선택)
+    """
+    key = _file_key(uploaded_file)
+    if cache is not None and key in cache:
+        return cache[key]
+    uploaded_file.seek(0)
+    prepared = prepare_image_bytes(uploaded_file.read(), uploaded_file.name)
+    if cache is not None and prepared is not None:
+        cache[key] = prepared
+    return prepared
+
+
+def prune_prepared_cache(cache, uploaded_files):
+    """현재 첨부 목록에 없는 파일의 전처리 결과를 버립니다."""
+    keep = {_file_key(f) for f in uploaded_files or []}
+    for key in list(cache):
+        if key not in keep:
+            del cache[key]
@@ -0,0 +1,254 @@
+# config/image_uploader.py
+# 첨부 이미지 병렬 업로드 (동시 실행 수 제한 + 업로드별 타임아웃)
+#
+# - 턴의 첨부 이미지들을 공유 스레드 풀에 넘기고 바로 반환합니다.
+#   모델(Gemini) 호출은 업로드를 기다리지 않고 동시에 진행됩니다.
+# - 배치의 업로드가 모두 끝나면 URL 목록을 메시지의 image_urls에 채웁니다
+#   (첨부 순서대로 이미지당 한 항목, 실패/타임아웃은 None).
+# - 세션 저장(write-behind 워커)은 업로드를 기다리지 않습니다. 진행 중인 이미지는 빼고
+#   텍스트를 바로 저장한 뒤, on_complete에서 세션 저장을 다시 요청해 URL을 채웁니다.
+# - 실패한 이미지는 retry_image_upload로 세션 저장과 별도로 몇 번만 다시 올립니다
+#   (횟수를 다 쓰면 그 이미지만 이력에서 빠짐).
+# - 타임아웃을 넘긴 업로드는 스레드를 강제 종료할 수 없으므로 결과만 버립니다.
+
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from config.storage_utils import upload_image_to_supabase
+
+logger = logging.getLogger(__name__)
+
+IMAGE_UPLOAD_CONCURRENCY = int(os.environ.get("IMAGE_UPLOAD_CONCURRENCY", "4"))
+IMAGE_UPLOAD_TIMEOUT = float(os.environ.get("IMAGE_UPLOAD_TIMEOUT", "30"))
+# 완료된 배치를 저장 워커가 찾을 수 있도록 최근 배치만 보관
+IMAGE_UPLOAD_MAX_TRACKED = 256
+# 실패한 이미지 재업로드 횟수와 백오프 (권한/크기 오류처럼 계속 실패하는 이미지는 포기)
+IMAGE_UPLOAD_RETRIES = int(os.environ.get("IMAGE_UPLOAD_RETRIES", "3"))
+IMAGE_UPLOAD_RETRY_BACKOFF = 2.0
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+_batches = OrderedDict()  # upload_id -> ImageUploadBatch
+_batches_lock = threading.Lock()
+_retries = OrderedDict()  # 재업로드 키 -> {"attempts", "running", "callbacks"}
+_retries_lock = threading.Lock()
+
+
+def _get_executor():
+    """프로세스 전역 업로드 스레드 풀 (동시 업로드 수 = IMAGE_UPLOAD_CONCURRENCY)"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max(1, IMAGE_UPLOAD_CONCURRENCY),
+                    thread_name_prefix="image-upload",
+                )
+    return _EXECUTOR
+
+
+def _upload_one(file_bytes, filename, content_type, client, bucket_name, user_id):
+    t0 = time.perf_counter()
+    image_io = io.BytesIO(file_bytes)
+    image_io.name = filename
+    image_io.type = content_type
+    url = upload_image_to_supabase(image_io, client, bucket_name, user_id)
+    logger.info(f"TIMING: image upload {filename} took {time.perf_counter() - t0:.4f}s")
+    return url
+
+
+class ImageUploadBatch:
+    """한 메시지에 첨부된 이미지들의 업로드 묶음 (URL 순서는 첨부 순서 유지)"""
+
+    def __init__(self, upload_id, futures, timeout=IMAGE_UPLOAD_TIMEOUT):
+        self.upload_id = upload_id
+        self.futures = futures
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self._remaining = len(futures)
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+    def results(self, timeout=None):
+        """
+        업로드 결과 URL 목록을 반환합니다 (첨부 순서대로 이미지당 한 항목, 실패/타임아웃은 None).
+
+        Args:
+            timeout: 최대 대기 시간(초). 없으면 업로드별 타임아웃(시작 시각 기준)까지 대기
+        """
+        deadline = self.started + self.timeout
+        if timeout is not None:
+            deadline = min(deadline, time.monotonic() + timeout)
+        urls = []
+        for future in self.futures:
+            try:
+                url = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                logger.warning(f"⏱️ 이미지 업로드 타임아웃 ({self.timeout:.1f}s): {self.upload_id}")
+                url = None
+            except Exception as e:
+                logger.error(f"이미지 업로드 오류: {e}")
+                url = None
+            urls.append(url or None)
+        return urls
+
+    def on_complete(self, callback):
+        """모든 업로드가 끝나면 callback(urls)을 (업로드 스레드에서) 호출합니다."""
+        with self._lock:
+            if self._remaining > 0:
+                self._listeners.append(callback)
+                return
+        callback(self.results(timeout=0))
+
+    def _future_done(self, _future):
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining > 0:
+                return
+            listeners, self._listeners = self._listeners, []
+        urls = self.results(timeout=0)
+        logger.info(f"🖼️ 이미지 업로드 완료 {sum(1 for url in urls if url)}/{len(self.futures)}: {self.upload_id}")
+        for callback in listeners:
+            try:
+                callback(urls)
+            except Exception as e:
+                logger.error(f"이미지 업로드 완료 처리 오류: {e}")
+
+
+def submit_image_uploads(images, client, user_id=None, bucket_name="chat-images"):
+    """
+    이미지들을 백그라운드 업로드 풀에 넘깁니다 (즉시 반환).
+
+    Args:
+        images: (바이트, 파일명, content-type) 튜플 목록
+        client: Supabase 클라이언트
+        user_id: 사용자 ID (파일명/인덱스 범위)
+
+    Returns:
+        ImageUploadBatch (이미지가 없으면 None)
+    """
+    if not images:
+        return None
+    executor = _get_executor()
+    futures = [
+        executor.submit(_upload_one, file_bytes, filename, content_type, client, bucket_name, user_id)
+        for file_bytes, filename, content_type in images
+    ]
+    batch = ImageUploadBatch(uuid.uuid4().hex, futures)
+    for future in futures:
+        future.add_done_callback(batch._future_done)
+    with _batches_lock:
+        _batches[batch.upload_id] = batch
+        while len(_batches) > IMAGE_UPLOAD_MAX_TRACKED:
+            _batches.popitem(last=False)
+    return batch
+
+
+def attach_image_uploads(message, batch):
+    """
+    업로드가 끝나면 URL을 메시지에 채웁니다.
+
+    메시지에는 직렬화 가능한 upload_id만 남기고, image_urls 키는 미리 만들어 두어
+    다른 스레드에서 값만 바꾸도록 합니다 (dict 크기 변경 없음).
+    """
+    message["image_upload_id"] = batch.upload_id
+    message.setdefault("image_urls", [])
+
+    def _attach(urls):
+        message["image_urls"] = urls
+
+    batch.on_complete(_attach)
+
+
+def wait_for_image_uploads(upload_id, timeout=None):
+    """
+    진행 중이거나 끝난 업로드 배치의 URL 목록을 반환합니다.
+
+    Returns:
+        이미지당 URL 또는 None인 목록 (배치를 찾을 수 없으면 None)
+    """
+    batch = get_image_upload_batch(upload_id)
+    if batch is None:
+        return None
+    return batch.results(timeout=timeout)
+
+
+def get_image_upload_batch(upload_id):
+    """upload_id의 업로드 배치를 반환합니다 (추적 범위를 벗어났으면 None)."""
+    with _batches_lock:
+        return _batches.get(upload_id)
+
+
+def retry_image_upload(key, file_bytes, filename, content_type, client, user_id=None,
+                       on_uploaded=None, bucket_name="chat-images"):
+    """
+    URL을 얻지 못한 이미지 하나를 세션 저장과 별도로 다시 업로드합니다 (즉시 반환).
+
+    같은 키의 재업로드가 진행 중이면 callback만 추가합니다. 실패하면 백오프 후
+    IMAGE_UPLOAD_RETRIES번까지 다시 시도하고, 그래도 실패하면 그 이미지는 포기합니다.
+
+    Args:
+        key: 이미지 식별 키 (사용자 + 콘텐츠 해시)
+        on_uploaded: 업로드 성공 시 (업로드 스레드에서) 호출되는 callback(url)
+
+    Returns:
+        재업로드가 예약되었거나 진행 중이면 True, 재시도 횟수를 다 써서 포기한 이미지면 False
+    """
+    with _retries_lock:
+        state = _retries.get(key)
+        if state is None:
+            state = _retries[key] = {"attempts": 0, "running": False, "callbacks": []}
+            while len(_retries) > IMAGE_UPLOAD_MAX_TRACKED:
+                oldest = next(iter(_retries))
+                if oldest == key or _retries[oldest]["running"]:
+                    break
+                del _retries[oldest]
+        if on_uploaded is not None and (state["running"] or state["attempts"] < IMAGE_UPLOAD_RETRIES):
+            state["callbacks"].append(on_uploaded)
+        if state["running"]:
+            return True
+        if state["attempts"] >= IMAGE_UPLOAD_RETRIES:
+            return False
+        state["running"] = True
+
+    def attempt():
+        try:
+            url = _upload_one(file_bytes, filename, content_type, client, bucket_name, user_id)
+        except Exception as e:
+            logger.error(f"이미지 재업로드 오류: {e}")
+            url = None
+        with _retries_lock:
+            state["attempts"] += 1
+            if url:
+                _retries.pop(key, None)
+                callbacks, state["callbacks"] = state["callbacks"], []
+            elif state["attempts"] < IMAGE_UPLOAD_RETRIES:
+                delay = IMAGE_UPLOAD_RETRY_BACKOFF * (2 ** (state["attempts"] - 1))
+                logger.warning(f"🔁 이미지 재업로드 실패, {delay:.1f}s 후 재시도 ({state['attempts']}/{IMAGE_UPLOAD_RETRIES}): {filename}")
+                timer = threading.Timer(delay, lambda: _get_executor().submit(attempt))
+                timer.daemon = True
+                timer.start()
+                return
+            else:
+                state["running"] = False
+                state["callbacks"] = []
+                logger.error(f"❌ 이미지 재업로드 포기 ({state['attempts']}회 실패), 이력에서 제외: {filename}")
+                return
+        for callback in callbacks:
+            try:
+                callback(url)
+            except Exception as e:
+                logger.error(f"이미지 재업로드 완료 처리 오류: {e}")
+
+    _get_executor().submit(attempt)
+    return True
@@ -0,0 +1,460 @@
+# config/importer.py
+# 대화 내보내기 파일을 chat_history로 일괄 가져오기
+#
+# - config/exporter.py가 만든 NDJSON(.ndjson / .gz / .zst), zip(세션별 NDJSON + 이미지 사이드카),
+#   기존 export_chat_session JSON(.json) 파일 또는 이런 파일이 든 디렉터리를 가져옵니다.
+# - NDJSON/zip은 한 줄씩 스트리밍으로 읽으며, 메모리에는 세션 하나와 쓰기 대기 중인 배치만 둡니다.
+# - 중복 제거:
+#     같은 실행 안에서 내용 해시(턴 지문)가 같은 세션은 한 번만 가져옵니다.
+#     대상 사용자에게 이미 있는 세션 ID는 건너뛰고(배치당 조회 1회), 행은 (session_id, turn_index)
+#     충돌 시 무시하는 upsert로 써서 다시 실행해도 중복되지 않습니다.
+#     다른 사용자의 세션과 ID가 겹치면(다른 --user-id로 가져오기) uuid5(사용자, 원래 ID)로
+#     새 ID를 만들어 가져오고 stats.remapped에 기록합니다.
+#     이미지는 내용 해시별로 한 번만 업로드합니다 (업로드 URL 인덱스도 함께 사용).
+# - 행은 IMPORT_BATCH_ROWS개씩 여러 세션을 묶어 한 번의 upsert로 씁니다.
+#   실패한 배치는 지수 백오프로 다시 시도하고, 그래도 실패하면 세션 ID를 stats.errors에
+#   남긴 뒤 다음 배치로 계속 진행합니다.
+#
+# 실행: python -m config.importer --user-id <사용자 ID> <파일 또는 디렉터리> [...]
+
+import argparse
+import base64
+import binascii
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from config.image_uploader import IMAGE_UPLOAD_CONCURRENCY
+from config.storage_utils import (
+    CHAT_HISTORY_CONFLICT_KEY,
+    build_chat_history_rows,
+    turn_fingerprint,
+    upload_image_to_supabase,
+)
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_ROWS = int(os.environ.get("IMPORT_BATCH_ROWS", "500"))
+# 기존 세션 확인 쿼리 하나에 넣을 세션 ID 수 (URL 길이 제한)
+IMPORT_EXISTS_CHUNK = 100
+IMPORT_BATCH_RETRIES = int(os.environ.get("IMPORT_BATCH_RETRIES", "3"))
+IMPORT_BACKOFF_BASE = 0.5
+IMPORT_BACKOFF_MAX = 8.0
+IMPORT_FILE_SUFFIXES = (".ndjson", ".ndjson.gz", ".ndjson.zst", ".zip", ".json")
+# 기존 JSON 내보내기(세션 ID 없음)의 세션 ID를 내용 해시로 정할 때 쓰는 네임스페이스
+_IMPORT_NAMESPACE = uuid.UUID("3f0c6c1e-8f0e-4d61-9d3a-6b2d0c9e7a51")
+_IMAGE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+
+@dataclass
+class ImportStats:
+    """가져오기 결과 통계"""
+    files: int = 0
+    sessions: int = 0
+    duplicate_sessions: int = 0
+    existing_sessions: int = 0
+    remapped: dict = field(default_factory=dict)  # 다른 사용자와 겹친 원래 세션 ID → 새 세션 ID
+    rows: int = 0
+    batches: int = 0
+    images_uploaded: int = 0
+    images_reused: int = 0
+    errors: list = field(default_factory=list)
+
+
+@dataclass
+class _PendingSession:
+    session_id: str
+    meta: dict
+    messages: list
+    images: dict  # 이미지 내용 키 → (바이트를 돌려주는 함수, content-type)
+
+
+# ----------------------------------------------------------------------
+# 파일 읽기 (스트리밍)
+# ----------------------------------------------------------------------
+
+def iter_export_files(paths):
+    """파일/디렉터리 경로들에서 가져올 내보내기 파일 경로를 이름 순으로 나열합니다."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(IMPORT_FILE_SUFFIXES):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _open_ndjson(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        import zstandard  # 선택 의존성 (.zst 파일을 가져올 때만 필요)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def _iter_ndjson_sessions(lines, image_source):
+    """NDJSON 레코드 스트림을 세션 단위로 묶습니다. Yields: (세션 정보, 메시지 목록, 이미지 로더)"""
+    meta, messages = None, []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        kind = record.get("type")
+        if kind == "session":
+            if meta is not None:
+                yield meta, messages, image_source
+            meta, messages = record, []
+        elif kind == "message" and meta is not None:
+            messages.append(record)
+    if meta is not None:
+        yield meta, messages, image_source
+
+
+def _inline_image(image):
+    data = image["data"]
+    return base64.b85decode(data) if image.get("encoding") == "base85" else base64.b64decode(data)
+
+
+def iter_export_sessions(path):
+    """
+    내보내기 파일 하나를 세션 단위로 읽습니다.
+
+    Yields:
+        (세션 정보 dict, 메시지 레코드 목록, 이미지 로더) — 이미지 로더는 이미지 항목을 받아 바이트를 반환
+    """
+    if path.endswith(".zip"):
+        def load_image(image):
+            # 배치를 쓸 때(파일을 다 읽은 뒤일 수 있음) 사이드카를 읽으므로 매번 다시 엶
+            if "path" in image:
+                with zipfile.ZipFile(path) as sidecars:
+                    return sidecars.read(image["path"])
+            return _inline_image(image)
+
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.startswith("sessions/") and name.endswith(".ndjson"):
+                    with archive.open(name) as f:
+                        yield from _iter_ndjson_sessions(f, load_image)
+        return
+    if path.endswith(".json"):
+        # 기존 export_chat_session 형식 (세션 하나, 이미지는 base64 문자열 또는 URL)
+        with open(path, "rb") as f:
+            data = json.load(f)
+        messages = []
+        for msg in data.get("messages", []):
+            images = []
+            for image in msg.get("images") or []:
+                if isinstance(image, str) and not image.startswith(("http://", "https://")):
+                    image = {"encoding": "base64", "data": image}
+                images.append(image)
+            messages.append(dict(msg, images=images) if images else msg)
+        meta = {"id": data.get("id"), "title": data.get("title", ""),
+                "created_at": data.get("created_at"), "last_updated": data.get("last_updated")}
+        yield meta, messages, _inline_image
+        return
+    with _open_ndjson(path) as f:
+        yield from _iter_ndjson_sessions(f, _inline_image)
+
+
+# ----------------------------------------------------------------------
+# 가져오기
+# ----------------------------------------------------------------------
+
+def _image_key(image, load_image):
+    """
+    이미지 항목의 내용 키와 (바이트 로더, content-type)을 반환합니다.
+
+    URL은 URL 자체가 키이며 업로드하지 않습니다. zip 사이드카는 파일명이 sha256이므로
+    업로드할 때까지 읽지 않습니다.
+    """
+    if isinstance(image, str):
+        return image, None
+    mime_type = image.get("mime_type") or "image/jpeg"
+    if "path" in image:
+        digest = os.path.splitext(os.path.basename(image["path"]))[0]
+        return f"sha256:{digest}", (lambda: load_image(image), mime_type)
+    data = load_image(image)
+    return f"sha256:{hashlib.sha256(data).hexdigest()}", (lambda: data, mime_type)
+
+
+def _prepare_session(meta, records, load_image, user_id):
+    """세션 레코드를 메시지 목록으로 바꾸고 내용 해시를 계산합니다."""
+    images = {}
+    messages = []
+    for record in records:
+        message = {"role": record.get("role"), "content": record.get("content", "")}
+        if record.get("time_taken") is not None:
+            message["time_taken"] = record["time_taken"]
+        keys = []
+        for image in record.get("images") or []:
+            try:
+                key, payload = _image_key(image, load_image)
+            except (KeyError, ValueError, binascii.Error) as e:
+                logger.warning(f"⚠️ 이미지 항목을 읽을 수 없어 건너뜀: {e}")
+                continue
+            keys.append(key)
+            if payload is not None:
+                images[key] = payload
+        if keys:
+            message["images"] = keys
+        messages.append(message)
+    # 이미지는 내용 키로 지문에 반영되므로 같은 대화는 같은 해시
+    rows = build_chat_history_rows(user_id, "", messages)
+    content_hash = hashlib.sha1("".join(turn_fingerprint(row) for row in rows).encode("utf-8")).hexdigest()
+    session_id = meta.get("id") or str(uuid.uuid5(_IMPORT_NAMESPACE, f"{user_id}:{content_hash}"))
+    return content_hash, _PendingSession(session_id, meta, messages, images)
+
+
+def _parse_time(value):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _spread_created_at(meta, count):
+    """세션 생성/마지막 업데이트 시각 사이에 턴 순서대로 created_at을 배치합니다."""
+    start = _parse_time(meta.get("created_at"))
+    end = _parse_time(meta.get("last_updated"))
+    start = start or datetime.now(timezone.utc)
+    end = end if end and end > start else start
+    step = (end - start) / max(count - 1, 1)
+    # 같은 시각이 되지 않도록 최소 1µs 간격
+    return [(start + max(step * i, timedelta(microseconds=i))).isoformat() for i in range(count)]
+
+
+class SessionImporter:
+    """
+    내보내기 세션을 배치로 모아 chat_history에 씁니다.
+
+    Args:
+        client: Supabase 클라이언트
+        user_id: 가져온 세션을 소유할 사용자 ID
+        batch_rows: 한 번의 upsert로 쓸 최대 행 수
+    """
+
+    def __init__(self, client, user_id, batch_rows=IMPORT_BATCH_ROWS, bucket_name="chat-images",
+                 max_retries=IMPORT_BATCH_RETRIES, backoff_base=IMPORT_BACKOFF_BASE):
+        self.client = client
+        self.user_id = user_id
+        self.batch_rows = batch_rows
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.bucket_name = bucket_name
+        self.stats = ImportStats()
+        self._seen_hashes = set()
+        self._image_urls = {}  # 이미지 내용 키 → 업로드 URL (이번 실행)
+        self._failed_images = set()  # 업로드에 실패한 이미지 키 (배치 재시도 시 오류 중복 기록 방지)
+        self._unresolved_ids = set()  # 새 ID도 다른 사용자와 겹쳐 가져오지 못한 세션 ID
+        self._pending = []
+        self._pending_turns = 0
+
+    def add(self, meta, records, load_image):
+        content_hash, session = _prepare_session(meta, records, load_image, self.user_id)
+        if content_hash in self._seen_hashes:
+            self.stats.duplicate_sessions += 1
+            return
+        self._seen_hashes.add(content_hash)
+        self._pending.append(session)
+        self._pending_turns += sum(1 for msg in session.messages if msg["role"] == "assistant")
+        if self._pending_turns >= self.batch_rows:
+            self.flush()
+
+    def _session_owners(self, session_ids):
+        """대상에 이미 있는 세션 ID → 소유 사용자 ID (세션당 첫 턴 한 행만 조회)"""
+        owners = {}
+        for i in range(0, len(session_ids), IMPORT_EXISTS_CHUNK):
+            response = self.client.table("chat_history") \
+                .select("session_id, user_id") \
+                .in_("session_id", session_ids[i:i + IMPORT_EXISTS_CHUNK]) \
+                .eq("turn_index", 0) \
+                .execute()
+            owners.update((row["session_id"], str(row.get("user_id"))) for row in response.data or [])
+        return owners
+
+    def _existing_session_ids(self, sessions):
+        """
+        대상 사용자에게 이미 있는 세션 ID를 돌려줍니다.
+
+        다른 사용자의 세션과 ID가 겹치는 세션은 uuid5(사용자, 원래 ID)로 session_id를 바꾸고
+        stats.remapped에 기록합니다 (바뀐 ID도 이미 가져왔으면 기존 세션으로 처리).
+        새 ID마저 다른 사용자와 겹치면 오류로 남기고 ID를 결과에 넣어 건너뜁니다.
+        """
+        user_id = str(self.user_id)
+        owners = self._session_owners([session.session_id for session in sessions])
+        existing = {session_id for session_id, owner in owners.items() if owner == user_id}
+        collided = [session for session in sessions if session.session_id in owners and session.session_id not in existing]
+        if not collided:
+            return existing
+        new_ids = {session.session_id: str(uuid.uuid5(_IMPORT_NAMESPACE, f"{user_id}:{session.session_id}")) for session in collided}
+        new_owners = self._session_owners(list(new_ids.values()))
+        for session in collided:
+            new_id = new_ids[session.session_id]
+            owner = new_owners.get(new_id)
+            if owner is not None and owner != user_id:
+                if session.session_id not in self._unresolved_ids:
+                    self._unresolved_ids.add(session.session_id)
+                    self.stats.errors.append(f"세션 ID 충돌 (다른 사용자 소유, 새 ID도 사용 중): {session.session_id}")
+                existing.add(session.session_id)
+                continue
+            logger.info(f"🔀 다른 사용자의 세션과 ID가 겹쳐 새 ID로 가져옴: {session.session_id} → {new_id}")
+            self.stats.remapped[session.session_id] = new_id
+            session.session_id = new_id
+            if owner == user_id:
+                existing.add(new_id)
+        return existing
+
+    def _upload_images(self, sessions):
+        """이번 배치에서 처음 보는 이미지만 병렬 업로드합니다."""
+        unseen = {}
+        for session in sessions:
+            for key, payload in session.images.items():
+                if key in self._image_urls:
+                    self.stats.images_reused += 1
+                elif key not in unseen:
+                    unseen[key] = payload
+        if not unseen:
+            return
+
+        def upload(item):
+            key, (load, mime_type) = item
+            image_io = io.BytesIO(load())
+            image_io.name = f"import{_IMAGE_EXTENSIONS.get(mime_type, '.jpg')}"
+            image_io.type = mime_type
+            return key, upload_image_to_supabase(image_io, self.client, self.bucket_name, self.user_id)
+
+        with ThreadPoolExecutor(max_workers=max(1, IMAGE_UPLOAD_CONCURRENCY), thread_name_prefix="import-upload") as pool:
+            for key, url in pool.map(upload, unseen.items()):
+                if url:
+                    self._image_urls[key] = url
+                    self.stats.images_uploaded += 1
+                elif key not in self._failed_images:
+                    self._failed_images.add(key)
+                    self.stats.errors.append(f"이미지 업로드 실패: {key}")
+
+    def flush(self):
+        """
+        대기 중인 세션들을 한 번의 upsert로 씁니다.
+
+        실패하면 백오프 후 max_retries번까지 다시 시도하고, 그래도 실패하면 배치의 세션 ID를
+        stats.errors에 남깁니다 (예외를 올리지 않음, 다음 배치는 계속 진행).
+        """
+        sessions, self._pending, self._pending_turns = self._pending, [], 0
+        if not sessions:
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._write_batch(sessions)
+                return
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    session_ids = ", ".join(session.session_id for session in sessions)
+                    logger.error(f"❌ 가져오기 배치 저장 최종 실패 ({attempt + 1}회 시도, 세션 {len(sessions)}개): {e}")
+                    self.stats.errors.append(f"배치 저장 실패 (세션 {session_ids}): {e}")
+                    return
+                delay = min(self.backoff_base * (2 ** attempt), IMPORT_BACKOFF_MAX) + random.uniform(0, self.backoff_base)
+                logger.warning(f"🔁 가져오기 배치 저장 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}s 후): {e}")
+                time.sleep(delay)
+
+    def _write_batch(self, sessions):
+        """세션 묶음을 씁니다 (기존 세션 제외 → 이미지 업로드 → upsert). 실패 시 예외 (재시도해도 멱등)."""
+        existing = self._existing_session_ids(sessions)
+        if existing:
+            sessions = [session for session in sessions if session.session_id not in existing]
+        self._upload_images(sessions)
+
+        rows = []
+        for session in sessions:
+            messages = []
+            for msg in session.messages:
+                if msg.get("images"):
+                    # 내용 키 → 업로드 URL (URL 이미지는 그대로, 업로드 실패한 이미지는 제외)
+                    urls = [self._image_urls.get(key, key) for key in msg["images"]]
+                    msg = dict(msg, images=[url for url in urls if not url.startswith("sha256:")])
+                messages.append(msg)
+            session_rows = build_chat_history_rows(self.user_id, session.session_id, messages)
+            for row, created_at in zip(session_rows, _spread_created_at(session.meta, len(session_rows))):
+                row["created_at"] = created_at
+            rows.extend(session_rows)
+        t0 = time.perf_counter()
+        if rows:
+            self.client.table("chat_history").upsert(
+                rows, on_conflict=CHAT_HISTORY_CONFLICT_KEY, ignore_duplicates=True
+            ).execute()
+            self.stats.batches += 1
+        self.stats.existing_sessions += len(existing - self._unresolved_ids)
+        self.stats.sessions += len(sessions)
+        self.stats.rows += len(rows)
+        logger.info(f"TIMING: import batch {len(sessions)} sessions / {len(rows)} rows took {time.perf_counter() - t0:.4f}s")
+
+
+def import_exports(paths, client, user_id, batch_rows=IMPORT_BATCH_ROWS):
+    """
+    내보내기 파일(또는 디렉터리)들을 가져옵니다.
+
+    Args:
+        paths: 파일/디렉터리 경로 목록
+        client: Supabase 클라이언트
+        user_id: 가져온 세션을 소유할 사용자 ID
+        batch_rows: 한 번의 upsert로 쓸 최대 행 수
+
+    Returns:
+        ImportStats
+    """
+    t0 = time.perf_counter()
+    importer = SessionImporter(client, user_id, batch_rows)
+    for path in iter_export_files(paths):
+        importer.stats.files += 1
+        try:
+            for meta, records, load_image in iter_export_sessions(path):
+                importer.add(meta, records, load_image)
+        except Exception as e:
+            logger.error(f"❌ 가져오기 실패: {path} ({e})")
+            importer.stats.errors.append(f"{path}: {e}")
+    try:
+        importer.flush()
+    except Exception as e:
+        logger.error(f"❌ 가져오기 마지막 배치 저장 실패: {e}")
+        importer.stats.errors.append(f"마지막 배치: {e}")
+    stats = importer.stats
+    logger.info(
+        f"TIMING: import took {time.perf_counter() - t0:.4f}s (files={stats.files}, sessions={stats.sessions}, "
+        f"rows={stats.rows}, batches={stats.batches}, duplicates={stats.duplicate_sessions}, "
+        f"existing={stats.existing_sessions}, remapped={len(stats.remapped)}, images uploaded={stats.images_uploaded} reused={stats.images_reused})"
+    )
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대화 내보내기 파일을 chat_history로 가져옵니다.")
+    parser.add_argument("paths", nargs="+", help="내보내기 파일 또는 디렉터리")
+    parser.add_argument("--user-id", required=True, help="가져온 세션을 소유할 사용자 ID")
+    parser.add_argument("--batch-rows", type=int, default=IMPORT_BATCH_ROWS, help="upsert 한 번에 쓸 행 수")
+    args = parser.parse_args(argv)
+
+    from config.imports import supabase
+    client = supabase.get_client()
+    if client is None:
+        parser.error("Supabase 클라이언트를 만들 수 없습니다. SUPABASE_URL/SUPABASE_KEY를 확인하세요.")
+    stats = import_exports(args.paths, client, args.user_id, args.batch_rows)
+    print(json.dumps(stats.__dict__, ensure_ascii=False, indent=2))
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,7 @@
 import re
 
+from config.keyword_engine import KeywordScoringEngine
+
 # langdetect is optional in this environment; provide a lightweight fallback
 try:
     from langdetect import detect, DetectorFactory
@@ -78,45 +80,53 @@ INTENT_PATTERNS = {
 }
 
 
+# (lang, pattern) pairs flattened in INTENT_PATTERNS order
+_INTENT_PATTERN_LANGS = [lang for lang, patterns in INTENT_PATTERNS.items() for _ in patterns]
+
+_YEAR_PATTERN = re.compile(r"(20\d{2})(?=년|\b)")
+_SHORT_YEAR_PATTERN = re.compile(r"\b(\d{2})년\b")
+_PLAIN_YEAR_PATTERN = re.compile(r"\b(20\d{2})\b")
+
+
+def _extract_year(t: str):
+    """Robust year extraction (matches '2024', '2024년', '24년')."""
+    # match full 20xx optionally followed by '년'
+    m = _YEAR_PATTERN.search(t)
+    if m:
+        return int(m.group(1))
+    # match two-digit year with '년' suffix e.g. '24년' -> 2024
+    m2 = _SHORT_YEAR_PATTERN.search(t)
+    if m2:
+        yy = int(m2.group(1))
+        return 2000 + yy
+    # fallback to plain four-digit
+    m3 = _PLAIN_YEAR_PATTERN.search(t)
+    if m3:
+        return int(m3.group(1))
+    return None
+
+
 def detect_f1_intent(text: str):
     """Detect F1 standings intent and language.
 
     Returns: dict {lang, intent, year, pattern}
     """
     text_lower = (text or "").lower()
+    scan = F1_SCORING_ENGINE.scan(text_lower)
 
     # 0) 부정 키워드 체크 - 순위가 아닌 다른 주제를 물어보는 경우
-    for neg_kw in NEGATIVE_KEYWORDS:
-        if re.search(neg_kw, text_lower):
-            # 순위가 아닌 다른 주제이므로 즉시 None 반환
-            return {"lang": None, "intent": None, "year": None, "pattern": None}
+    if scan.first_index("negative") is not None:
+        # 순위가 아닌 다른 주제이므로 즉시 None 반환
+        return {"lang": None, "intent": None, "year": None, "pattern": None}
 
     # 1) Exact pattern check (quick confidence)
-    # helper: robust year extraction (matches '2024', '2024년', '24년')
-    def _extract_year(t: str):
-        # match full 20xx optionally followed by '년'
-        m = re.search(r"(20\d{2})(?=년|\b)", t)
-        if m:
-            return int(m.group(1))
-        # match two-digit year with '년' suffix e.g. '24년' -> 2024
-        m2 = re.search(r"\b(\d{2})년\b", t)
-        if m2:
-            yy = int(m2.group(1))
-            return 2000 + yy
-        # fallback to plain four-digit
-        m3 = re.search(r"\b(20\d{2})\b", t)
-        if m3:
-            return int(m3.group(1))
-        return None
-
-    for lang, patterns in INTENT_PATTERNS.items():
-        for p in patterns:
-            if re.search(p, text_lower):
-                year = _extract_year(text_lower)
-                return {"lang": lang, "intent": "f1_rank", "year": year, "pattern": p}
+    idx = scan.first_index("intent")
+    if idx is not None:
+        year = _extract_year(text_lower)
+        return {"lang": _INTENT_PATTERN_LANGS[idx], "intent": "f1_rank", "year": year, "pattern": scan.first("intent")}
 
     # 2) Scoring-based fallback (helpful for short / colloquial queries)
-    scored = detect_f1_intent_scored(text_lower)
+    scored = _score_f1_scan(scan, text_lower)
     if scored.get("intent"):
         return scored
 
@@ -187,6 +197,23 @@ NEGATIVE_KW_WEIGHTS = {
 }
 
 
+# All F1 keyword/pattern tables compiled once; one scan per query serves
+# detect_f1_intent and detect_f1_intent_scored.
+F1_SCORING_ENGINE = KeywordScoringEngine(
+    literal_tables={
+        "keyword": KW_WEIGHTS,
+        "negative_keyword": NEGATIVE_KW_WEIGHTS,
+        "formula1": {"formula 1": 0.0, "formula1": 0.0},
+    },
+    pattern_tables={
+        "negative": NEGATIVE_KEYWORDS,
+        "intent": [p for patterns in INTENT_PATTERNS.values() for p in patterns],
+        "f1_presence": [r"\bf-?1\b|에프원|formula\s*1"],
+    },
+    name="f1_intent",
+)
+
+
 def detect_f1_intent_scored(text: str, threshold: float = 2.2):
     """Score-based intent detection. Returns dict similar to detect_f1_intent.
 
@@ -194,13 +221,18 @@ def detect_f1_intent_scored(text: str, threshold: float = 2.2):
     Negative keywords subtract from the score.
     """
     t = (text or "").lower()
+    return _score_f1_scan(F1_SCORING_ENGINE.scan(t), t, threshold)
+
+
+def _score_f1_scan(scan, t: str, threshold: float = 2.2):
+    """Compute the F1 standings score from an existing engine scan of ``t``."""
     score = 0.0
     matched = []
 
     # presence of F1
-    if re.search(r"\bf-?1\b|에프원|formula\s*1", t):
+    if scan.first_index("f1_presence") is not None:
         # F1만으로는 낮은 점수
-        if "formula 1" in t or "formula1" in t:
+        if scan.matched("formula1"):
             score += 1.0
             matched.append('formula_1')
         else:
@@ -208,30 +240,17 @@ def detect_f1_intent_scored(text: str, threshold: float = 2.2):
             matched.append('f1')
 
     # keyword weights
-    for kw, w in KW_WEIGHTS.items():
-        if kw in t:
-            score += w
-            matched.append(kw)
+    kw_score, kw_matched = scan.score("keyword")
+    score += kw_score
+    matched.extend(kw for _, kw, _ in kw_matched)
 
-    # negative keyword penalties
-    for neg_kw, penalty in NEGATIVE_KW_WEIGHTS.items():
-        if neg_kw in t:
-            score += penalty  # penalty는 음수
-            matched.append(f'negative:{neg_kw}')
+    # negative keyword penalties (penalty는 음수)
+    neg_score, neg_matched = scan.score("negative_keyword")
+    score += neg_score
+    matched.extend(f'negative:{kw}' for _, kw, _ in neg_matched)
 
     # year extraction boosts confidence
-    year = None
-    m = re.search(r"(20\d{2})(?=년|\b)", t)
-    if m:
-        year = int(m.group(1))
-    else:
-        m2 = re.search(r"\b(\d{2})년\b", t)
-        if m2:
-            year = 2000 + int(m2.group(1))
-        else:
-            m3 = re.search(r"\b(20\d{2})\b", t)
-            if m3:
-                year = int(m3.group(1))
+    year = _extract_year(t)
     if year:
         score += 0.5
         matched.append('year')
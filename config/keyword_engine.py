@@ -0,0 +1,161 @@
+# config/keyword_engine.py
+# 가중치 키워드 / 정규식 테이블을 import 시점에 한 번만 컴파일하는 스코어링 엔진
+#
+# - 부분 문자열 키워드 테이블(가중치)은 중복 제거된 모든 키워드를 하나의 트라이 정규식으로
+#   컴파일하여 텍스트를 한 번만 스캔합니다. 매칭된 시작 위치 다음 글자부터 다시 search하므로
+#   겹치는 키워드도 모두 찾고, 같은 위치에서 시작하는 더 짧은 키워드(가장 긴 매칭의 접두사)는
+#   미리 계산한 목록으로 더해 키워드마다 `kw in text` 한 결과와 같습니다.
+# - 정규식 테이블(부정 키워드, 인텐트 패턴 등)은 테이블마다 하나의 alternation으로
+#   컴파일되어 한 번의 search로 매칭 여부를 판단하고, 매칭된 경우에만 미리 컴파일된
+#   개별 패턴으로 목록 순서상 첫 번째 패턴을 찾습니다
+#   (기존 `for p in patterns: if re.search(p, text)` 와 동일한 결과).
+
+import logging
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+def keyword_trie_pattern(keywords):
+    """
+    부분 문자열 키워드 목록을 공통 접두사를 묶은 트라이 정규식으로 변환합니다.
+    단순 alternation은 위치마다 모든 키워드를 차례로 시도하지만, 트라이는 현재 글자로
+    갈 수 있는 가지만 시도합니다. 한 위치에서는 가장 긴 키워드가 매칭됩니다.
+    """
+    trie = {}
+    for keyword in set(keywords):
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # 키워드 끝
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class ScanResult:
+    """한 번의 스캔 결과 (키워드 매칭 + 패턴 매칭)"""
+
+    def __init__(self, engine, text, literal_hits):
+        self._engine = engine
+        self._text = text
+        self._literal_hits = literal_hits  # table -> set(keyword)
+        self._pattern_hits = {}  # table -> 첫 매칭 인덱스 또는 None (처음 조회 시 계산)
+
+    def matched(self, table):
+        """테이블에 정의된 순서대로 매칭된 키워드 목록"""
+        hits = self._literal_hits.get(table)
+        if not hits:
+            return []
+        return [kw for kw in self._engine.literal_tables[table] if kw in hits]
+
+    def score(self, *tables):
+        """
+        테이블들의 가중치 합계와 매칭 목록을 반환합니다.
+
+        Returns:
+            (score, [(table, keyword, weight), ...])
+        """
+        total = 0.0
+        matched = []
+        for table in tables:
+            weights = self._engine.literal_tables[table]
+            for kw in self.matched(table):
+                total += weights[kw]
+                matched.append((table, kw, weights[kw]))
+        return total, matched
+
+    def first_index(self, table):
+        """패턴 테이블에서 목록 순서상 첫 번째로 매칭된 패턴의 인덱스"""
+        if table not in self._pattern_hits:
+            self._pattern_hits[table] = self._engine._first_pattern(table, self._text)
+        return self._pattern_hits[table]
+
+    def first(self, table):
+        """패턴 테이블에서 목록 순서상 첫 번째로 매칭된 패턴 문자열"""
+        idx = self.first_index(table)
+        if idx is None:
+            return None
+        return self._engine.pattern_tables[table][idx]
+
+
+class KeywordScoringEngine:
+    """
+    가중치 키워드 테이블과 정규식 테이블을 묶어 컴파일한 스코어링 엔진.
+
+    Args:
+        literal_tables: {테이블명: {키워드: 가중치}} - 부분 문자열(`kw in text`와 같은 결과) 매칭
+        pattern_tables: {테이블명: [정규식, ...]} - 순서가 의미 있는 정규식 목록
+        name: 로그용 엔진 이름
+    """
+
+    def __init__(self, literal_tables=None, pattern_tables=None, name="keywords"):
+        self.name = name
+        self.literal_tables = {t: dict(w) for t, w in (literal_tables or {}).items()}
+        self.pattern_tables = {t: list(p) for t, p in (pattern_tables or {}).items()}
+
+        # 1) 모든 키워드 → 하나의 트라이 정규식 (키워드 → 소속 테이블, 같은 위치의 더 짧은 키워드)
+        self._keyword_tables = {}
+        for table, weights in self.literal_tables.items():
+            for kw in weights:
+                self._keyword_tables.setdefault(kw, []).append(table)
+        self._keywords = tuple(self._keyword_tables)
+        self._keyword_any = None
+        if self._keywords:
+            self._keyword_any = re.compile(keyword_trie_pattern(self._keywords))
+        self._keyword_prefixes = {
+            kw: tuple(other for other in self._keywords if kw.startswith(other)) for kw in self._keywords
+        }
+
+        # 2) 패턴 테이블 → 테이블당 하나의 alternation + 개별 컴파일 패턴
+        self._pattern_any = {}
+        self._pattern_compiled = {}
+        for table, patterns in self.pattern_tables.items():
+            if not patterns:
+                continue
+            self._pattern_any[table] = re.compile("|".join(f"(?:{p})" for p in patterns))
+            self._pattern_compiled[table] = [re.compile(p) for p in patterns]
+
+        self.scan = lru_cache(maxsize=256)(self._scan)
+        logger.debug(
+            f"KeywordScoringEngine[{name}] 컴파일: 키워드 {len(self._keywords)}개, "
+            f"패턴 테이블 {len(self._pattern_any)}개"
+        )
+
+    def _scan(self, text):
+        """텍스트를 스캔하여 ScanResult를 반환합니다 (동일 텍스트는 LRU 재사용)."""
+        text = text or ""
+
+        literal_hits = {}
+        if self._keyword_any is not None:
+            # 키워드가 시작하는 위치마다 가장 긴 키워드 (다음 글자부터 다시 찾아 겹치는 키워드 포함)
+            longest = set()
+            m = self._keyword_any.search(text)
+            while m is not None:
+                longest.add(m.group())
+                m = self._keyword_any.search(text, m.start() + 1)
+            for hit in longest:
+                for kw in self._keyword_prefixes[hit]:
+                    for table in self._keyword_tables[kw]:
+                        literal_hits.setdefault(table, set()).add(kw)
+
+        # 패턴 테이블은 조회하는 테이블만 평가 (조기 반환 경로에서 불필요한 스캔 방지)
+        return ScanResult(self, text, literal_hits)
+
+    def _first_pattern(self, table, text):
+        """패턴 테이블에서 목록 순서상 첫 번째로 매칭되는 패턴의 인덱스"""
+        combined = self._pattern_any.get(table)
+        # 대부분의 쿼리는 매칭이 없으므로 결합 패턴 한 번으로 끝남
+        if combined is None or not combined.search(text):
+            return None
+        for idx, regex in enumerate(self._pattern_compiled[table]):
+            if regex.search(text):
+                return idx
+        return None
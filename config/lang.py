@@ -1,6 +1,8 @@
 # config/lang.py: 다국어 지원 설정
 
 import re
+from collections import Counter
+from functools import lru_cache
 from typing import Tuple, Dict, Optional
 
 # 다국어 텍스트 딕셔너리
@@ -21,12 +23,20 @@ TEXTS = {
         "new_chat_help": "새로운 대화 세션을 시작합니다",
         "chat_history": "📚 대화 기록",
         "no_chat_history": "*대화 기록이 없습니다*",
+        "load_more_sessions": "더 보기",
+        "load_older_messages": "⬆️ 이전 대화 더 불러오기",
         "language_selection": "🔤 언어 선택",
         "language_label": "언어 선택",
         "today_usage": "📊 오늘 사용량",
         "quick_functions": "🛠️ 빠른 기능",
         "export": "📤 내보내기",
-        "export_help": "현재 대화를 JSON 파일로 내보냅니다",
+        "export_help": "대화를 NDJSON 또는 zip 파일로 내보냅니다",
+        "export_scope": "내보낼 범위",
+        "export_scope_current": "현재 대화",
+        "export_scope_all": "모든 대화",
+        "export_format": "파일 형식",
+        "export_compression": "압축",
+        "export_compact": "이미지를 더 작게 인코딩 (base85)",
         "download": "⬇️ 다운로드",
         "delete_all": "🧹 전체삭제",
         "delete_all_help": "모든 대화 기록을 삭제합니다",
@@ -137,12 +147,20 @@ TEXTS = {
         "new_chat_help": "Start a new conversation session",
         "chat_history": "📚 Chat History",
         "no_chat_history": "*No chat history*",
+        "load_more_sessions": "Load more",
+        "load_older_messages": "⬆️ Load earlier messages",
         "language_selection": "🔤 Language Selection",
         "language_label": "Select Language",
         "today_usage": "📊 Today's Usage",
         "quick_functions": "🛠️ Quick Functions",
         "export": "📤 Export",
-        "export_help": "Export current conversation as JSON file",
+        "export_help": "Export conversations as an NDJSON or zip file",
+        "export_scope": "Export scope",
+        "export_scope_current": "Current conversation",
+        "export_scope_all": "All conversations",
+        "export_format": "File format",
+        "export_compression": "Compression",
+        "export_compact": "Compact image encoding (base85)",
         "download": "⬇️ Download",
         "delete_all": "🧹 Delete All",
         "delete_all_help": "Delete all chat history",
@@ -253,12 +271,20 @@ TEXTS = {
         "new_chat_help": "Iniciar una nueva sesión de conversación",
         "chat_history": "📚 Historial de Chat",
         "no_chat_history": "*Sin historial de chat*",
+        "load_more_sessions": "Cargar más",
+        "load_older_messages": "⬆️ Cargar mensajes anteriores",
         "language_selection": "🔤 Selección de Idioma",
         "language_label": "Seleccionar Idioma",
         "today_usage": "📊 Uso de Hoy",
         "quick_functions": "🛠️ Funciones Rápidas",
         "export": "📤 Exportar",
-        "export_help": "Exportar conversación actual como archivo JSON",
+        "export_help": "Exportar conversaciones como archivo NDJSON o zip",
+        "export_scope": "Alcance de exportación",
+        "export_scope_current": "Conversación actual",
+        "export_scope_all": "Todas las conversaciones",
+        "export_format": "Formato de archivo",
+        "export_compression": "Compresión",
+        "export_compact": "Codificación compacta de imágenes (base85)",
         "download": "⬇️ Descargar",
         "delete_all": "🧹 Eliminar Todo",
         "delete_all_help": "Eliminar todo el historial de chat",
@@ -365,145 +391,162 @@ SUPPORTED_LANGUAGES = ["ko", "en", "es"]
 # 개선된 언어 감지 함수들
 # =============================================================================
 
+# 언어 학습 맥락 키워드
+LEARNING_KEYWORDS = {
+    "ko": [
+        "공부", "배우", "학습", "의미", "뜻", "알려줘", "설명해줘", "번역", 
+        "어떻게 말해", "뭐라고 해", "표현", "단어", "회화", "문법", "언어"
+    ],
+    "en": [
+        "study", "learn", "learning", "meaning", "means", "translate", "translation",
+        "how to say", "what does", "expression", "word", "conversation", "grammar", 
+        "practice", "language"
+    ],
+    "es": [
+        "estudiar", "aprender", "significado", "significa", "traducir", "traducción",
+        "cómo se dice", "qué significa", "expresión", "palabra", "conversación", 
+        "gramática", "idioma"
+    ]
+}
+_LEARNING_KEYWORDS_FLAT = tuple(kw for kws in LEARNING_KEYWORDS.values() for kw in kws)
+
 def detect_language_learning_context(text: str) -> bool:
     """언어 학습 맥락인지 판단"""
-    learning_keywords = {
-        "ko": [
-            "공부", "배우", "학습", "의미", "뜻", "알려줘", "설명해줘", "번역", 
-            "어떻게 말해", "뭐라고 해", "표현", "단어", "회화", "문법", "언어"
-        ],
-        "en": [
-            "study", "learn", "learning", "meaning", "means", "translate", "translation",
-            "how to say", "what does", "expression", "word", "conversation", "grammar", 
-            "practice", "language"
-        ],
-        "es": [
-            "estudiar", "aprender", "significado", "significa", "traducir", "traducción",
-            "cómo se dice", "qué significa", "expresión", "palabra", "conversación", 
-            "gramática", "idioma"
-        ]
-    }
-    
     text_lower = text.lower()
-    for lang_keywords in learning_keywords.values():
-        if any(keyword in text_lower for keyword in lang_keywords):
-            return True
-    return False
+    return any(keyword in text_lower for keyword in _LEARNING_KEYWORDS_FLAT)
+
+# -----------------------------------------------------------------------------
+# 언어 구성 분석용 사전 컴파일 테이블
+# (단어 단위 정규식 17개를 매번 검사하던 방식 → 단어 집합 조회)
+# -----------------------------------------------------------------------------
+_URL_PATTERN = re.compile(r'https?://[^\s]+')
+_NON_WORD_PATTERN = re.compile(r'[^\w\s가-힣ñáéíóúü¿¡]')
+_HANGUL_PATTERN = re.compile(r'[\uac00-\ud7af]')
+_WORD_RUN_PATTERN = re.compile(r'\w+')
+_SPANISH_SPECIAL_CHARS = 'ñáéíóúü¿¡'
+_SPANISH_ACCENT_CHARS = frozenset('ñáéíóúü')
+_ENGLISH_EXCLUDE_PATTERN = re.compile(r'[가-힣ñáéíóúü]')
+
+# 스페인어 단어 (여러 단어로 된 표현 "por favor" 등은 공백 분리 후 단어 단위
+# 검사에서 매칭될 수 없으므로 제외)
+SPANISH_WORDS = frozenset(
+    # 기본 관사, 전치사, 접속사
+    "el la los las un una del al y o de en por para con sin que se te me le lo su mi tu".split()
+    # 동사 (be동사, 일반동사)
+    + "es son está están ser estar tiene tengo hay va voy fue era dice dijo hace hizo puede quiere sabe conoce".split()
+    # 형용사 (중요한 buenos, buenas 포함)
+    + "bueno buena buenos buenas malo mala malos malas grande grandes pequeño pequeña nuevo nueva viejo vieja mejor peor".split()
+    # 시간 관련 (핵심: días, tardes, noches)
+    + "días día tardes tarde noches noche mañana mañanas hoy ayer tiempo año años".split()
+    # 인사말 및 정중 표현
+    + "hola adiós gracias disculpe perdón".split()
+    # 의문사 및 기본 대화
+    + "qué quién quiénes dónde cuándo cómo cuánto cuánta cuántos cuántas cuál cuáles".split()
+    # 기본 부사/형용사
+    + "muy más menos bien mal sí no también siempre nunca aquí allí donde".split()
+    # 일반 명사
+    + "casa trabajo persona personas gente hombre mujer niño niña agua comida dinero".split()
+)
+
+# 영어 단어
+ENGLISH_WORDS = frozenset(
+    # 기본 관사, 전치사, 접속사
+    "the a an and or but if when where how what who which that this these those".split()
+    # be동사, 조동사, 일반동사
+    + "is are was were be been being have has had will would can could should must may might".split()
+    + "do does did get got make made take took go went come came see saw know knew".split()
+    + "think thought say said tell told give gave find found help want need like love".split()
+    # 형용사
+    + "good bad big small new old first last long short high low early late fast slow hot cold".split()
+    # 인사말, 정중표현
+    + "hello hi goodbye bye please thank you thanks sorry excuse welcome".split()
+    # 기본 부사
+    + "yes no not very much more less well here there now then always never".split()
+    # 일반 명사
+    + "time day year work home people person man woman child water food money".split()
+)
+
+# 정규화된 텍스트 기준 분석 결과 캐시 크기 (한 턴에 같은 메시지를 여러 번 분석)
+LANGUAGE_COMPOSITION_CACHE_SIZE = 128
+
+def _classify_word(word: str) -> Tuple[bool, bool]:
+    """단어 하나가 (스페인어 단어, 영어 단어)로 인정되는지 판단"""
+    word_lower = word.lower()
+    # \b(...)\b 패턴과 동일하게 단어 문자 연속 구간 단위로 비교
+    runs = _WORD_RUN_PATTERN.findall(word_lower)
+
+    is_spanish = (
+        not _SPANISH_ACCENT_CHARS.isdisjoint(word_lower)
+        or any(run in SPANISH_WORDS for run in runs)
+    )
+    # 한글이나 스페인어 특수문자가 포함된 단어는 영어에서 제외
+    is_english = (
+        not _ENGLISH_EXCLUDE_PATTERN.search(word)
+        and any(run in ENGLISH_WORDS for run in runs)
+    )
+    return is_spanish, is_english
 
 def analyze_language_composition(text: str) -> Dict[str, float]:
     """텍스트의 언어별 구성 비율을 정밀 분석"""
     # URL과 특수문자 제거
-    url_pattern = r'https?://[^\s]+'
-    text_clean = re.sub(url_pattern, '', text)
-    text_clean = re.sub(r'[^\w\s가-힣ñáéíóúü¿¡]', ' ', text_clean)
+    text_clean = _URL_PATTERN.sub('', text)
+    text_clean = _NON_WORD_PATTERN.sub(' ', text_clean)
     text_clean = text_clean.strip()
-    
+
+    # 같은 메시지는 한 번만 분석 (handle_language_switching / detect_response_language)
+    return dict(_analyze_clean_text(text_clean))
+
+@lru_cache(maxsize=LANGUAGE_COMPOSITION_CACHE_SIZE)
+def _analyze_clean_text(text_clean: str) -> Tuple[Tuple[str, float], ...]:
+    """정규화된 텍스트의 언어 구성 비율 ((언어, 비율), ...) - LRU 캐시"""
     if not text_clean:
-        return {"ko": 0, "en": 0, "es": 0}
-    
-    total_chars = len(text_clean.replace(' ', ''))
+        return (("ko", 0), ("en", 0), ("es", 0))
+
+    total_chars = len(text_clean) - text_clean.count(' ')
     if total_chars == 0:
-        return {"ko": 0, "en": 0, "es": 0}
-    
+        return (("ko", 0), ("en", 0), ("es", 0))
+
     # 한글 문자 카운트
-    korean_chars = sum(1 for char in text_clean if '\uac00' <= char <= '\ud7af')
+    korean_chars = len(_HANGUL_PATTERN.findall(text_clean))
     korean_ratio = korean_chars / total_chars
-    
+
     # 스페인어 특수문자
-    spanish_special_chars = sum(1 for char in text_clean if char in 'ñáéíóúü¿¡')
-    
-    # 단어 단위 분석
-    words = text_clean.split()
-    total_words = len(words)
-    
+    spanish_special_chars = sum(text_clean.count(char) for char in _SPANISH_SPECIAL_CHARS)
+
+    # 단어 단위 분석 (반복되는 단어는 한 번만 분류)
+    word_counts = Counter(text_clean.split())
+    total_words = sum(word_counts.values())
+
     if total_words == 0:
-        return {"ko": korean_ratio, "en": 0, "es": 0}
-    
-    # 스페인어 단어 패턴 (대폭 개선)
-    spanish_patterns = [
-        # 스페인어 특수문자 포함 단어
-        r'[a-zA-Z]*[ñáéíóúü][a-zA-Z]*',  
-        
-        # 기본 관사, 전치사, 접속사
-        r'\b(el|la|los|las|un|una|del|al|y|o|de|en|por|para|con|sin|que|se|te|me|le|lo|su|mi|tu)\b',
-        
-        # 동사 (be동사, 일반동사)
-        r'\b(es|son|está|están|ser|estar|tiene|tengo|hay|va|voy|fue|era|dice|dijo|hace|hizo|puede|quiere|sabe|conoce)\b',
-        
-        # 형용사 (중요한 buenos, buenas 포함)
-        r'\b(bueno|buena|buenos|buenas|malo|mala|malos|malas|grande|grandes|pequeño|pequeña|nuevo|nueva|viejo|vieja|mejor|peor)\b',
-        
-        # 시간 관련 (핵심: días, tardes, noches)
-        r'\b(días|día|tardes|tarde|noches|noche|mañana|mañanas|hoy|ayer|tiempo|año|años)\b',
-        
-        # 인사말 및 정중 표현
-        r'\b(hola|adiós|gracias|por\s+favor|disculpe|perdón|lo\s+siento|de\s+nada)\b',
-        
-        # 의문사 및 기본 대화
-        r'\b(qué|quién|quiénes|dónde|cuándo|cómo|por\s+qué|cuánto|cuánta|cuántos|cuántas|cuál|cuáles)\b',
-        
-        # 기본 부사/형용사
-        r'\b(muy|más|menos|bien|mal|sí|no|también|siempre|nunca|aquí|allí|donde)\b',
-        
-        # 일반 명사
-        r'\b(casa|trabajo|persona|personas|gente|hombre|mujer|niño|niña|agua|comida|dinero)\b'
-    ]
-    
+        return (("ko", korean_ratio), ("en", 0), ("es", 0))
+
     spanish_word_count = 0
-    for word in words:
-        word_lower = word.lower()
-        if any(re.search(pattern, word_lower) for pattern in spanish_patterns):
-            spanish_word_count += 1
-    
+    english_word_count = 0
+    for word, count in word_counts.items():
+        is_spanish, is_english = _classify_word(word)
+        if is_spanish:
+            spanish_word_count += count
+        if is_english:
+            english_word_count += count
+
     spanish_word_ratio = spanish_word_count / total_words
     spanish_char_ratio = spanish_special_chars / total_chars
     spanish_total_score = max(spanish_word_ratio * 0.7 + spanish_char_ratio * 0.3, spanish_char_ratio)
-    
-    # 영어 단어 패턴 (개선)
-    english_patterns = [
-        # 기본 관사, 전치사, 접속사
-        r'\b(the|a|an|and|or|but|if|when|where|how|what|who|which|that|this|these|those)\b',
-        
-        # be동사, 조동사, 일반동사
-        r'\b(is|are|was|were|be|been|being|have|has|had|will|would|can|could|should|must|may|might)\b',
-        r'\b(do|does|did|get|got|make|made|take|took|go|went|come|came|see|saw|know|knew)\b',
-        r'\b(think|thought|say|said|tell|told|give|gave|find|found|help|want|need|like|love)\b',
-        
-        # 형용사
-        r'\b(good|bad|big|small|new|old|first|last|long|short|high|low|early|late|fast|slow|hot|cold)\b',
-        
-        # 인사말, 정중표현
-        r'\b(hello|hi|goodbye|bye|please|thank|you|thanks|sorry|excuse|welcome)\b',
-        
-        # 기본 부사
-        r'\b(yes|no|not|very|much|more|less|well|here|there|now|then|always|never)\b',
-        
-        # 일반 명사
-        r'\b(time|day|year|work|home|people|person|man|woman|child|water|food|money)\b'
-    ]
-    
-    english_word_count = 0
-    for word in words:
-        word_lower = word.lower()
-        # 한글이나 스페인어 특수문자가 포함된 단어는 제외
-        if not re.search(r'[가-힣ñáéíóúü]', word):
-            if any(re.search(pattern, word_lower) for pattern in english_patterns):
-                english_word_count += 1
-    
+
     english_ratio = english_word_count / total_words
-    
+
     # 나머지는 영어로 간주 (한국어, 스페인어가 아닌 라틴 문자)
     remaining_chars = total_chars - korean_chars - spanish_special_chars
     remaining_ratio = remaining_chars / total_chars if remaining_chars > 0 else 0
-    
+
     # 영어 점수는 영어 단어 패턴과 나머지 라틴 문자를 고려
     english_total_score = max(english_ratio * 0.8 + remaining_ratio * 0.2, english_ratio)
-    
-    return {
-        "ko": korean_ratio,
-        "en": english_total_score,
-        "es": spanish_total_score
-    }
+
+    return (
+        ("ko", korean_ratio),
+        ("en", english_total_score),
+        ("es", spanish_total_score),
+    )
 
 def detect_dominant_language(text: str, current_language: str = "ko") -> Tuple[str, float]:
     """
@@ -516,8 +559,9 @@ def detect_dominant_language(text: str, current_language: str = "ko") -> Tuple[s
     Returns:
         (감지된_언어, 신뢰도) 튜플
     """
-    # 언어 학습 맥락인지 확인
-    is_learning_context = detect_language_learning_context(text)
+    # 언어 학습 맥락이면 현재 언어 유지 (구성 분석 불필요)
+    if detect_language_learning_context(text):
+        return current_language, 0.9
     
     # 언어별 구성 비율 분석
     composition = analyze_language_composition(text)
@@ -533,10 +577,6 @@ def detect_dominant_language(text: str, current_language: str = "ko") -> Tuple[s
     second_max_score = sorted(composition.values(), reverse=True)[1] if len(composition) > 1 else 0
     confidence = max_score - second_max_score
     
-    # 언어 학습 맥락이면 현재 언어 유지
-    if is_learning_context:
-        return current_language, 0.9
-    
     # 주요 언어가 명확한 경우 (60% 이상)
     if max_score >= DOMINANT_THRESHOLD:
         return max_lang, confidence
@@ -0,0 +1,880 @@
+# config/local_store.py
+# 채팅 이력 로컬 SQLite(WAL) 미러
+#
+# - Supabase chat_history 스키마(session_id, turn_index, question, answer, images, ...)를
+#   그대로 로컬 SQLite에 보관합니다.
+# - 세션 목록과 세션 로드는 로컬에서 먼저 읽습니다 (초기 동기화가 끝났거나 Supabase를
+#   쓸 수 없을 때). SKIP_SUPABASE_LOAD=1 이거나 Supabase 장애 중에도 이력이 유지됩니다.
+# - 저장은 로컬에 먼저 기록(dirty=1)하고, Supabase 저장이 성공하면 dirty를 해제합니다.
+# - 백그라운드 동기화 워커가 양방향으로 맞춥니다:
+#     push: dirty 행 일괄 upsert + 삭제 표식(tombstone) 반영
+#     pull: 사용자별 (updated_at, session_id, turn_index) 커서 이후 변경된 행만 조회
+#           (한 문장으로 쓴 행은 updated_at이 같으므로 타임스탬프만으로는 페이지 경계에서 누락됨)
+#           updated_at = now()는 트랜잭션 시작 시각이라 늦게 커밋된 행이 커서 뒤에 들어올 수
+#           있으므로, 매 동기화는 커서보다 LOCAL_SYNC_PULL_OVERLAP초 앞에서 다시 시작
+#           (다시 받은 행은 mirror_rows가 흡수)
+#           (supabase/migrations/20261018000200_chat_history_updated_at.sql,
+#            20261018000300_chat_history_sync_cursor.sql 필요)
+#     다른 기기에서 삭제된 세션은 chat_sessions 요약 테이블과 비교하여 제거
+#   주기 동기화는 최근 활동한 사용자만 대상으로 하며, LOCAL_SYNC_IDLE_TTL초 넘게 활동이 없고
+#   push할 행/삭제 표식도 없는 사용자는 목록(과 Supabase 클라이언트)에서 뺍니다.
+# - 세션 열기는 Supabase 왕복 없이 로컬에서 읽습니다. 마지막 pull이 LOCAL_SYNC_TRUST_AGE초
+#   안이면 그대로 신뢰하고, 더 오래되었으면 백그라운드에서 원격 턴 수와 비교해 다른 기기에서
+#   추가된 턴이 있으면 그 세션을 다시 받아 표시합니다 (pop_stale_session → 세션 다시 로드).
+#   내보내기는 로컬에서 읽기 전에 원격 턴 수를 확인하며, 전체 내보내기는 세션 목록 페이지마다
+#   remote_turn_counts로 한 번에 조회합니다.
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from config.storage_utils import (
+    CHAT_HISTORY_CONFLICT_KEY,
+    EXPORT_PAGE_TURNS,
+    LOAD_SESSION_PAGE_TURNS,
+    SESSION_PAGE_SIZE,
+    build_chat_history_rows,
+    created_at_sequence,
+    get_chat_sessions_page_from_supabase,
+    iter_chat_history_pages,
+    load_chat_history_page_from_supabase,
+    remember_persisted_turns,
+    rows_to_messages,
+    turn_fingerprint,
+)
+
+logger = logging.getLogger(__name__)
+
+# LOCAL_STORE=0 이면 로컬 미러 없이 Supabase만 사용
+LOCAL_STORE_ENABLED = os.environ.get("LOCAL_STORE", "1") == "1"
+LOCAL_STORE_PATH = os.environ.get("LOCAL_STORE_PATH", os.path.join("local_store", "chat_history.db"))
+LOCAL_SYNC_INTERVAL = float(os.environ.get("LOCAL_SYNC_INTERVAL", "60"))
+LOCAL_SYNC_PULL_PAGE = 500
+# 이 시간(초) 넘게 동기화 요청/활동이 없는 사용자는 주기 동기화에서 제외 (미반영 행이 남아 있으면 유지)
+LOCAL_SYNC_IDLE_TTL = float(os.environ.get("LOCAL_SYNC_IDLE_TTL", "1800"))
+# pull 시작점을 커서보다 앞당기는 시간 (초): 커서보다 먼저 시작해 늦게 커밋된 트랜잭션의 행을 다시 받음
+LOCAL_SYNC_PULL_OVERLAP = float(os.environ.get("LOCAL_SYNC_PULL_OVERLAP", "300"))
+# 마지막 pull이 이 시간(초) 안이면 세션을 원격 확인 없이 로컬에서 읽음 (더 오래되면 백그라운드에서 확인)
+LOCAL_SYNC_TRUST_AGE = float(os.environ.get("LOCAL_SYNC_TRUST_AGE", str(LOCAL_SYNC_INTERVAL)))
+# 백그라운드 확인에서 오래된 것으로 드러나 다시 로드해야 하는 세션 (최근 것만 보관)
+LOCAL_STALE_SESSIONS_MAX = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_history (
+    session_id  TEXT NOT NULL,
+    turn_index  INTEGER NOT NULL,
+    user_id     TEXT NOT NULL,
+    question    TEXT NOT NULL DEFAULT '',
+    answer      TEXT NOT NULL DEFAULT '',
+    time_taken  REAL,
+    images      TEXT,               -- URL 배열 JSON
+    created_at  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    dirty       INTEGER NOT NULL DEFAULT 0,   -- Supabase에 아직 반영되지 않은 행
+    version     INTEGER NOT NULL DEFAULT 0,   -- 로컬 쓰기마다 증가 (동기화 중 수정 감지)
+    PRIMARY KEY (session_id, turn_index)
+);
+CREATE INDEX IF NOT EXISTS chat_history_user_session_idx ON chat_history (user_id, session_id);
+CREATE INDEX IF NOT EXISTS chat_history_dirty_idx ON chat_history (user_id, dirty);
+
+-- Supabase에 반영할 삭제 (from_turn 이상 turn 삭제, 0이면 세션 전체)
+CREATE TABLE IF NOT EXISTS pending_deletes (
+    session_id TEXT NOT NULL,
+    from_turn  INTEGER NOT NULL,
+    user_id    TEXT NOT NULL,
+    PRIMARY KEY (session_id, from_turn)
+);
+
+-- 사용자별 pull 워터마크 (행이 있으면 초기 전체 동기화 완료)
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id   TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL DEFAULT '',
+    synced_at TEXT NOT NULL
+);
+"""
+
+_ROW_COLUMNS = "session_id, turn_index, user_id, question, answer, time_taken, images, created_at"
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _row_to_dict(row):
+    """SQLite 행 → chat_history 행 dict (Supabase 응답과 같은 형태)"""
+    data = dict(row)
+    data["images"] = json.loads(data["images"]) if data.get("images") else None
+    return data
+
+
+def _encode_watermark(cursor):
+    """pull 커서 (updated_at, session_id, turn_index) → sync_state.watermark 문자열"""
+    return json.dumps(list(cursor), ensure_ascii=False) if cursor else ""
+
+
+def _decode_watermark(value):
+    """sync_state.watermark → pull 커서 (이전 형식인 updated_at 문자열만 있으면 session_id/turn_index는 None)"""
+    if not value:
+        return None
+    if value.startswith("["):
+        try:
+            updated_at, session_id, turn_index = json.loads(value)
+            return updated_at, session_id, turn_index
+        except (ValueError, TypeError):
+            return None
+    return value, None, None
+
+
+def _pull_keyset_filter(cursor):
+    """(updated_at, session_id, turn_index) > 커서 조건을 PostgREST or 필터로 변환"""
+    updated_at, session_id, turn_index = cursor
+    return (
+        f'updated_at.gt."{updated_at}",'
+        f'and(updated_at.eq."{updated_at}",session_id.gt."{session_id}"),'
+        f'and(updated_at.eq."{updated_at}",session_id.eq."{session_id}",turn_index.gt.{int(turn_index)})'
+    )
+
+
+def _cursor_key(cursor):
+    """pull 커서 비교용 키 (서버 타임스탬프 문자열은 형식이 달라도 시각으로 비교)"""
+    updated_at, session_id, turn_index = cursor
+    return _parse_timestamp(updated_at), session_id or "", turn_index if turn_index is not None else -1
+
+
+def _parse_timestamp(value):
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    except (ValueError, AttributeError):
+        return datetime.now(timezone.utc)
+
+
+class LocalSessionStore:
+    """chat_history의 로컬 SQLite(WAL) 미러 (스레드별 연결)"""
+
+    def __init__(self, path=LOCAL_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # 트랜잭션은 _write()에서 직접 관리 (autocommit 모드)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """쓰기 트랜잭션 (프로세스 내 쓰기 직렬화 + BEGIN IMMEDIATE)"""
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+
+    def save_turns(self, user_id, session_id, messages, first_turn_index=0):
+        """
+        세션 메시지를 로컬에 기록합니다 (바뀐 턴만 dirty=1).
+
+        Returns:
+            {turn_index: version} - Supabase 저장 성공 후 mark_clean에 넘길 dirty 턴
+        """
+        rows = build_chat_history_rows(user_id, session_id, messages, first_turn_index)
+        end_turn_index = first_turn_index + len(rows)
+        now = _now_iso()
+        with self._write() as conn:
+            existing = {
+                r["turn_index"]: r["fingerprint"]
+                for r in conn.execute(
+                    "SELECT turn_index, fingerprint FROM chat_history WHERE session_id = ? AND turn_index >= ?",
+                    (session_id, first_turn_index),
+                )
+            }
+            changed = []
+            for row, created_at in zip(rows, created_at_sequence(len(rows))):
+                fingerprint = turn_fingerprint(row)
+                if existing.get(row["turn_index"]) == fingerprint:
+                    continue
+                changed.append((
+                    session_id, row["turn_index"], user_id, row["question"], row["answer"],
+                    row.get("time_taken"), json.dumps(row["images"]) if row.get("images") else None,
+                    created_at, now, fingerprint,
+                ))
+            if changed:
+                conn.executemany(
+                    """INSERT INTO chat_history
+                           (session_id, turn_index, user_id, question, answer, time_taken, images,
+                            created_at, updated_at, fingerprint, dirty, version)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, 1)
+                       ON CONFLICT (session_id, turn_index) DO UPDATE SET
+                           user_id = excluded.user_id, question = excluded.question,
+                           answer = excluded.answer, time_taken = excluded.time_taken,
+                           images = excluded.images, updated_at = excluded.updated_at,
+                           fingerprint = excluded.fingerprint, dirty = 1,
+                           version = chat_history.version + 1""",
+                    changed,
+                )
+            if any(idx >= end_turn_index for idx in existing):
+                conn.execute(
+                    "DELETE FROM chat_history WHERE session_id = ? AND turn_index >= ?",
+                    (session_id, end_turn_index),
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO pending_deletes (session_id, from_turn, user_id) VALUES (?, ?, ?)",
+                    (session_id, end_turn_index, user_id),
+                )
+            dirty = {
+                r["turn_index"]: r["version"]
+                for r in conn.execute(
+                    "SELECT turn_index, version FROM chat_history WHERE session_id = ? AND dirty = 1",
+                    (session_id,),
+                )
+            }
+        return dirty
+
+    def mark_clean(self, session_id, versions):
+        """Supabase에 반영된 턴의 dirty를 해제합니다 (그 사이 다시 수정된 턴은 유지)."""
+        if not versions:
+            return
+        with self._write() as conn:
+            conn.executemany(
+                "UPDATE chat_history SET dirty = 0 WHERE session_id = ? AND turn_index = ? AND version = ?",
+                [(session_id, idx, version) for idx, version in versions.items()],
+            )
+
+    def mirror_rows(self, user_id, rows, updated_at=None):
+        """Supabase에서 읽은 행을 로컬에 반영합니다 (로컬 dirty 행은 덮어쓰지 않음)."""
+        records = []
+        for row in rows:
+            if row.get("turn_index") is None or not row.get("session_id"):
+                continue
+            records.append((
+                row["session_id"], row["turn_index"], row.get("user_id") or user_id,
+                row.get("question") or "", row.get("answer") or "", row.get("time_taken"),
+                json.dumps(row["images"]) if row.get("images") else None,
+                row.get("created_at") or _now_iso(), row.get("updated_at") or updated_at or _now_iso(),
+                turn_fingerprint(row),
+            ))
+        if not records:
+            return 0
+        with self._write() as conn:
+            conn.executemany(
+                """INSERT INTO chat_history
+                       (session_id, turn_index, user_id, question, answer, time_taken, images,
+                        created_at, updated_at, fingerprint, dirty, version)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0)
+                   ON CONFLICT (session_id, turn_index) DO UPDATE SET
+                       user_id = excluded.user_id, question = excluded.question,
+                       answer = excluded.answer, time_taken = excluded.time_taken,
+                       images = excluded.images, created_at = excluded.created_at,
+                       updated_at = excluded.updated_at, fingerprint = excluded.fingerprint,
+                       version = chat_history.version + 1
+                   WHERE chat_history.dirty = 0""",
+                records,
+            )
+        return len(records)
+
+    def delete_session(self, user_id, session_id, remote_deleted=False):
+        """세션을 로컬에서 삭제합니다 (Supabase 삭제 전이면 삭제 표식을 남김)."""
+        with self._write() as conn:
+            conn.execute("DELETE FROM chat_history WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM pending_deletes WHERE session_id = ?", (session_id,))
+            if not remote_deleted:
+                conn.execute(
+                    "INSERT OR IGNORE INTO pending_deletes (session_id, from_turn, user_id) VALUES (?, 0, ?)",
+                    (session_id, user_id),
+                )
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+
+    def is_synced(self, user_id):
+        """사용자의 초기 전체 동기화(pull)가 끝났는지"""
+        row = self._connect().execute("SELECT 1 FROM sync_state WHERE user_id = ?", (user_id,)).fetchone()
+        return row is not None
+
+    def has_sessions(self, user_id):
+        row = self._connect().execute("SELECT 1 FROM chat_history WHERE user_id = ? LIMIT 1", (user_id,)).fetchone()
+        return row is not None
+
+    def last_pull_age(self, user_id):
+        """마지막 pull 이후 지난 시간(초), pull한 적이 없으면 None"""
+        row = self._connect().execute("SELECT synced_at FROM sync_state WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        return (datetime.now(timezone.utc) - _parse_timestamp(row["synced_at"])).total_seconds()
+
+    def is_complete(self, session_id, remote_turn_count=None):
+        """
+        세션의 턴이 0번부터 빠짐없이 로컬에 있는지.
+        remote_turn_count를 주면 원격보다 턴이 적을 때(아직 pull되지 않은 턴이 있음)도 False
+        """
+        row = self._connect().execute(
+            "SELECT COUNT(*) AS n, MAX(turn_index) AS last FROM chat_history WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if not (row["n"] > 0 and row["last"] == row["n"] - 1):
+            return False
+        return remote_turn_count is None or row["n"] >= remote_turn_count
+
+    def list_sessions(self, user_id, cursor=None, limit=SESSION_PAGE_SIZE):
+        """
+        세션 목록 한 페이지 (get_chat_sessions_page_from_supabase와 같은 반환 형식)
+
+        Returns:
+            (sessions, next_cursor)
+        """
+        params = [user_id]
+        having = ""
+        if cursor:
+            having = "HAVING last_updated < ? OR (last_updated = ? AND session_id < ?)"
+            params += [cursor[0], cursor[0], cursor[1]]
+        params.append(limit + 1)
+        rows = self._connect().execute(
+            f"""SELECT session_id, MIN(created_at) AS created_at, MAX(created_at) AS last_updated,
+                       COUNT(*) AS turn_count,
+                       (SELECT question FROM chat_history t
+                        WHERE t.session_id = h.session_id ORDER BY turn_index LIMIT 1) AS title
+                FROM chat_history h
+                WHERE user_id = ?
+                GROUP BY session_id
+                {having}
+                ORDER BY last_updated DESC, session_id DESC
+                LIMIT ?""",
+            params,
+        ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        sessions = []
+        for row in rows:
+            question = row["title"] or ""
+            sessions.append({
+                "id": row["session_id"],
+                "title": question[:30] + "..." if len(question) > 30 else question,
+                "created_at": _parse_timestamp(row["created_at"]),
+                "last_updated": _parse_timestamp(row["last_updated"]),
+                "turn_count": row["turn_count"],
+            })
+        next_cursor = (rows[-1]["last_updated"], rows[-1]["session_id"]) if has_more and rows else None
+        return sessions, next_cursor
+
+    def load_page(self, session_id, before_turn=None, limit=LOAD_SESSION_PAGE_TURNS):
+        """
+        세션의 최근 턴 한 페이지 (load_chat_history_page_from_supabase와 같은 반환 형식)
+
+        Returns:
+            (messages, first_turn_index, has_more, rows)
+        """
+        query = f"SELECT {_ROW_COLUMNS}, dirty FROM chat_history WHERE session_id = ?"
+        params = [session_id]
+        if before_turn is not None:
+            query += " AND turn_index < ?"
+            params.append(before_turn)
+        query += " ORDER BY turn_index DESC LIMIT ?"
+        params.append(limit)
+        rows = [_row_to_dict(r) for r in reversed(self._connect().execute(query, params).fetchall())]
+        first_turn_index = rows[0]["turn_index"] if rows else (before_turn or 0)
+        return rows_to_messages(rows), first_turn_index, first_turn_index > 0, rows
+
+    def iter_pages(self, session_id, before_turn=None, page_size=EXPORT_PAGE_TURNS):
+        """세션의 턴을 turn_index 오름차순으로 페이지 단위로 읽습니다 (내보내기용, 메시지 목록 yield)."""
+        after_turn = -1
+        while True:
+            query = f"SELECT {_ROW_COLUMNS} FROM chat_history WHERE session_id = ? AND turn_index > ?"
+            params = [session_id, after_turn]
+            if before_turn is not None:
+                query += " AND turn_index < ?"
+                params.append(before_turn)
+            query += " ORDER BY turn_index LIMIT ?"
+            params.append(page_size)
+            rows = [_row_to_dict(r) for r in self._connect().execute(query, params).fetchall()]
+            if not rows:
+                return
+            yield rows_to_messages(rows)
+            if len(rows) < page_size:
+                return
+            after_turn = rows[-1]["turn_index"]
+
+    def dirty_rows(self, user_id):
+        rows = self._connect().execute(
+            f"SELECT {_ROW_COLUMNS}, version FROM chat_history WHERE user_id = ? AND dirty = 1 "
+            "ORDER BY session_id, turn_index",
+            (user_id,),
+        ).fetchall()
+        return [_row_to_dict(r) for r in rows]
+
+    def has_unsynced(self, user_id):
+        """Supabase에 아직 반영하지 않은 dirty 행이나 삭제 표식이 있는지"""
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM chat_history WHERE user_id = ? AND dirty = 1 LIMIT 1", (user_id,)).fetchone():
+            return True
+        return conn.execute("SELECT 1 FROM pending_deletes WHERE user_id = ? LIMIT 1", (user_id,)).fetchone() is not None
+
+    def pending_deletes(self, user_id):
+        return [
+            (r["session_id"], r["from_turn"])
+            for r in self._connect().execute(
+                "SELECT session_id, from_turn FROM pending_deletes WHERE user_id = ?", (user_id,)
+            )
+        ]
+
+    def clear_pending_delete(self, session_id, from_turn):
+        with self._write() as conn:
+            conn.execute(
+                "DELETE FROM pending_deletes WHERE session_id = ? AND from_turn = ?", (session_id, from_turn)
+            )
+
+    def get_watermark(self, user_id):
+        """pull 커서 (updated_at, session_id, turn_index) — 초기 동기화 전이면 None, 완료 후 빈 이력이면 ()"""
+        row = self._connect().execute("SELECT watermark FROM sync_state WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        return _decode_watermark(row["watermark"]) or ()
+
+    def set_watermark(self, user_id, cursor):
+        watermark = _encode_watermark(cursor)
+        with self._write() as conn:
+            conn.execute(
+                """INSERT INTO sync_state (user_id, watermark, synced_at) VALUES (?, ?, ?)
+                   ON CONFLICT (user_id) DO UPDATE SET watermark = excluded.watermark, synced_at = excluded.synced_at""",
+                (user_id, watermark, _now_iso()),
+            )
+
+    def prune_sessions(self, user_id, remote_session_ids):
+        """다른 기기에서 삭제된 세션 제거 (로컬에만 있는 미동기화 세션은 유지)"""
+        local_ids = {
+            r["session_id"]: r["dirty"]
+            for r in self._connect().execute(
+                "SELECT session_id, MAX(dirty) AS dirty FROM chat_history WHERE user_id = ? GROUP BY session_id",
+                (user_id,),
+            )
+        }
+        stale = [sid for sid, dirty in local_ids.items() if not dirty and sid not in remote_session_ids]
+        if stale:
+            with self._write() as conn:
+                conn.executemany("DELETE FROM chat_history WHERE session_id = ? AND dirty = 0", [(s,) for s in stale])
+        return len(stale)
+
+
+class LocalSyncWorker:
+    """로컬 미러 ↔ Supabase 백그라운드 양방향 동기화 (주기 실행 + 요청 시 즉시 실행)"""
+
+    def __init__(self, store, interval=LOCAL_SYNC_INTERVAL, idle_ttl=LOCAL_SYNC_IDLE_TTL):
+        self.store = store
+        self.interval = interval
+        self.idle_ttl = idle_ttl
+        self._users = {}  # user_id -> supabase_client
+        self._last_active = {}  # user_id -> 마지막 요청/활동 시각 (monotonic)
+        self._requested = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pull_supported = True
+        self.stats = {"pushed": 0, "pulled": 0, "deleted": 0, "pruned": 0, "errors": 0, "evicted": 0}
+
+    def request_sync(self, user_id, supabase_client, immediate=True):
+        """
+        사용자 동기화를 등록합니다.
+
+        Args:
+            immediate: True면 즉시 한 번 실행, False면 활동 시각만 갱신 (주기 동기화 대상 유지)
+        """
+        with self._cond:
+            self._users[user_id] = supabase_client
+            self._last_active[user_id] = time.monotonic()
+            if immediate:
+                self._requested.add(user_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="local-store-sync", daemon=True)
+                self._thread.start()
+            if immediate:
+                self._cond.notify_all()
+
+    def _evict_idle(self, user_ids):
+        """활동이 없고 push할 것도 없는 사용자를 주기 동기화 대상에서 뺍니다."""
+        now = time.monotonic()
+        for user_id in user_ids:
+            with self._cond:
+                last_active = self._last_active.get(user_id)
+            if last_active is None or now - last_active < self.idle_ttl:
+                continue
+            try:
+                if self.store.has_unsynced(user_id):
+                    continue
+            except sqlite3.Error:
+                continue
+            with self._cond:
+                # 확인하는 사이 다시 요청된 사용자는 유지
+                if self._last_active.get(user_id) == last_active:
+                    self._users.pop(user_id, None)
+                    self._last_active.pop(user_id, None)
+                    self.stats["evicted"] += 1
+                    logger.debug(f"로컬 미러 동기화 대상에서 제외 (유휴): {user_id}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._requested:
+                    self._cond.wait(self.interval)
+                targets = dict(self._users)
+                self._requested.clear()
+            for user_id, client in targets.items():
+                try:
+                    self.sync_once(user_id, client)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.warning(f"⚠️ 로컬 미러 동기화 실패 (다음 주기에 재시도): {e}")
+            self._evict_idle(targets)
+
+    def sync_once(self, user_id, supabase_client):
+        """push(삭제 → dirty 행) 후 pull(워터마크 이후 변경분)을 한 번 실행합니다."""
+        t0 = time.perf_counter()
+        table = supabase_client.table("chat_history")
+
+        # 1) 삭제 표식 반영
+        for session_id, from_turn in self.store.pending_deletes(user_id):
+            query = table.delete().eq("session_id", session_id)
+            if from_turn > 0:
+                query = query.gte("turn_index", from_turn)
+            query.execute()
+            self.store.clear_pending_delete(session_id, from_turn)
+            self.stats["deleted"] += 1
+
+        # 2) dirty 행 세션별 일괄 upsert
+        by_session = {}
+        for row in self.store.dirty_rows(user_id):
+            by_session.setdefault(row["session_id"], []).append(row)
+        for session_id, rows in by_session.items():
+            payload = [{k: v for k, v in row.items() if k != "version"} for row in rows]
+            table.upsert(payload, on_conflict=CHAT_HISTORY_CONFLICT_KEY).execute()
+            self.store.mark_clean(session_id, {row["turn_index"]: row["version"] for row in rows})
+            remember_persisted_turns(session_id, payload, replace=False)
+            self.stats["pushed"] += len(rows)
+
+        # 3) 워터마크 이후 원격 변경분 pull
+        if self._pull_supported:
+            pulled = self._pull(user_id, supabase_client)
+        else:
+            pulled = 0
+
+        logger.info(
+            f"TIMING: local store sync {user_id} took {time.perf_counter() - t0:.4f}s "
+            f"(pushed={sum(len(r) for r in by_session.values())}, pulled={pulled})"
+        )
+
+    def _pull(self, user_id, supabase_client):
+        watermark = self.store.get_watermark(user_id)
+        first_sync = watermark is None
+        # 커서보다 LOCAL_SYNC_PULL_OVERLAP초 앞에서 시작 (늦게 커밋된 행 재수신, 중복은 mirror_rows가 흡수)
+        since = None
+        if watermark:
+            since = (_parse_timestamp(watermark[0]) - timedelta(seconds=LOCAL_SYNC_PULL_OVERLAP)).isoformat()
+        cursor = None
+        pulled = 0
+        try:
+            while True:
+                query = supabase_client.table("chat_history") \
+                    .select(f"{_ROW_COLUMNS}, updated_at") \
+                    .eq("user_id", user_id)
+                if cursor:
+                    query = query.or_(_pull_keyset_filter(cursor))
+                elif since:
+                    query = query.gte("updated_at", since)
+                rows = query \
+                    .order("updated_at") \
+                    .order("session_id") \
+                    .order("turn_index") \
+                    .limit(LOCAL_SYNC_PULL_PAGE) \
+                    .execute().data or []
+                if rows:
+                    pulled += self.store.mirror_rows(user_id, rows)
+                    last = rows[-1]
+                    if last.get("updated_at"):
+                        cursor = (last["updated_at"], last["session_id"], last["turn_index"])
+                # 다시 받은 구간에서 워터마크가 뒤로 가지 않도록 더 앞선 커서만 저장
+                if cursor and (not watermark or _cursor_key(cursor) > _cursor_key(watermark)):
+                    watermark = cursor
+                self.store.set_watermark(user_id, watermark)
+                if len(rows) < LOCAL_SYNC_PULL_PAGE:
+                    break
+        except Exception as e:
+            if first_sync and "updated_at" in str(e):
+                # 마이그레이션 미적용: pull 없이 push만 수행
+                self._pull_supported = False
+                logger.warning("⚠️ chat_history.updated_at 컬럼이 없어 로컬 미러 pull을 비활성화합니다.")
+                return 0
+            raise
+        self.stats["pulled"] += pulled
+
+        # 다른 기기에서 삭제된 세션 정리 (세션 요약 테이블이 있을 때만)
+        try:
+            response = supabase_client.table("chat_sessions").select("id").eq("user_id", user_id).execute()
+            remote_ids = {r["id"] for r in response.data or []}
+            # 요약 테이블이 비어 있으면 (백필 전 등) 판단할 수 없으므로 정리하지 않음
+            if remote_ids:
+                self.stats["pruned"] += self.store.prune_sessions(user_id, remote_ids)
+        except Exception as e:
+            logger.debug(f"세션 삭제 동기화 생략: {e}")
+        return pulled
+
+
+# 프로세스 전역 로컬 미러 / 동기화 워커
+local_session_store = LocalSessionStore()
+local_sync_worker = LocalSyncWorker(local_session_store)
+
+
+def request_local_sync(user_id, supabase_client, immediate=True):
+    """로컬 미러 백그라운드 동기화 요청 (비활성화 시 무시, immediate=False면 활동 시각만 갱신)"""
+    if LOCAL_STORE_ENABLED and user_id and supabase_client:
+        local_sync_worker.request_sync(user_id, supabase_client, immediate=immediate)
+
+
+def _remote_turn_count(supabase_client, session_id):
+    """원격 세션의 턴 수 (chat_sessions 요약, 없으면 chat_history count). 조회 실패 시 None"""
+    try:
+        response = supabase_client.table("chat_sessions").select("turn_count").eq("id", session_id).limit(1).execute()
+        if response.data:
+            return response.data[0].get("turn_count") or 0
+        response = supabase_client.table("chat_history") \
+            .select("turn_index", count="exact") \
+            .eq("session_id", session_id) \
+            .limit(1) \
+            .execute()
+        return response.count or 0
+    except Exception as e:
+        logger.debug(f"원격 턴 수 조회 실패: {e}")
+        return None
+
+
+def remote_turn_counts(supabase_client, session_ids):
+    """
+    여러 세션의 원격 턴 수를 chat_sessions 요약에서 한 번에 조회합니다 (전체 내보내기용).
+
+    Returns:
+        {세션 ID: 턴 수} (요약에 없는 세션은 빠짐, 조회 실패 시 빈 dict)
+    """
+    if not session_ids:
+        return {}
+    try:
+        response = supabase_client.table("chat_sessions") \
+            .select("id, turn_count") \
+            .in_("id", list(session_ids)) \
+            .execute()
+        return {row["id"]: row.get("turn_count") or 0 for row in response.data or []}
+    except Exception as e:
+        logger.debug(f"원격 턴 수 일괄 조회 실패: {e}")
+        return {}
+
+
+_verify_executor = None
+_verify_lock = threading.Lock()
+_verifying = set()  # 백그라운드 확인 중인 세션
+_stale_sessions = OrderedDict()  # 다시 로드해야 하는 세션 ID (값 없음)
+
+
+def _get_verify_executor():
+    """세션 최신 여부 백그라운드 확인용 스레드 풀"""
+    global _verify_executor
+    if _verify_executor is None:
+        with _verify_lock:
+            if _verify_executor is None:
+                _verify_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="local-store-verify")
+    return _verify_executor
+
+
+def _mirror_remote_session(supabase_client, user_id, session_id):
+    """원격 세션의 모든 턴을 turn_index 순으로 받아 로컬에 반영합니다."""
+    after_turn = -1
+    mirrored = 0
+    while True:
+        rows = supabase_client.table("chat_history") \
+            .select(f"{_ROW_COLUMNS}, updated_at") \
+            .eq("session_id", session_id) \
+            .gt("turn_index", after_turn) \
+            .order("turn_index") \
+            .limit(LOCAL_SYNC_PULL_PAGE) \
+            .execute().data or []
+        if rows:
+            mirrored += local_session_store.mirror_rows(user_id, rows)
+        if len(rows) < LOCAL_SYNC_PULL_PAGE:
+            return mirrored
+        after_turn = rows[-1]["turn_index"]
+
+
+def _verify_session(supabase_client, user_id, session_id):
+    """로컬에서 연 세션을 원격 턴 수와 비교하고, 오래되었으면 다시 받아 재로드 대상으로 표시합니다."""
+    try:
+        remote_turns = _remote_turn_count(supabase_client, session_id)
+        if remote_turns is None or local_session_store.is_complete(session_id, remote_turns):
+            return
+        logger.info(f"🔄 로컬 미러가 원격보다 오래됨 ({session_id}, 원격 {remote_turns}턴), 백그라운드에서 다시 받음")
+        _mirror_remote_session(supabase_client, user_id, session_id)
+        with _verify_lock:
+            _stale_sessions[session_id] = None
+            _stale_sessions.move_to_end(session_id)
+            while len(_stale_sessions) > LOCAL_STALE_SESSIONS_MAX:
+                _stale_sessions.popitem(last=False)
+    except Exception as e:
+        logger.warning(f"⚠️ 로컬 미러 세션 확인 실패: {e}")
+    finally:
+        with _verify_lock:
+            _verifying.discard(session_id)
+
+
+def _verify_in_background(supabase_client, user_id, session_id):
+    with _verify_lock:
+        if session_id in _verifying:
+            return
+        _verifying.add(session_id)
+    _get_verify_executor().submit(_verify_session, supabase_client, user_id, session_id)
+
+
+def pop_stale_session(session_id):
+    """백그라운드 확인에서 원격보다 오래된 것으로 드러난 세션이면 True (표시는 지움)"""
+    with _verify_lock:
+        if session_id not in _stale_sessions:
+            return False
+        del _stale_sessions[session_id]
+        return True
+
+
+def _serve_locally(supabase_client, user_id, session_id, remote_available, check_remote,
+                   remote_turns=None, verify_in_background=False):
+    """
+    세션을 로컬에서 읽어도 되는지: 로컬이 0번부터 온전하고, check_remote면 원격 턴 수 이상인지
+    (다른 기기에서 추가된 턴이 아직 pull되지 않은 세션을 로컬에서 읽고 저장 기록을 만들면
+    다음 저장이 원격 턴을 덮어씀). Supabase를 쓸 수 없으면 항상 로컬
+    마지막 pull이 LOCAL_SYNC_TRUST_AGE초 안이면 원격 확인 없이 로컬
+    remote_turns: 미리 조회한 원격 턴 수 (있으면 원격 조회 생략)
+    verify_in_background: 원격 확인을 기다리지 않고 로컬에서 읽은 뒤 백그라운드에서 확인
+    """
+    if not remote_available:
+        return True
+    if not local_session_store.is_complete(session_id):
+        return False
+    if not check_remote:
+        return True
+    if remote_turns is None:
+        pull_age = local_session_store.last_pull_age(user_id)
+        if pull_age is not None and pull_age <= LOCAL_SYNC_TRUST_AGE:
+            return True
+        if verify_in_background:
+            _verify_in_background(supabase_client, user_id, session_id)
+            return True
+        remote_turns = _remote_turn_count(supabase_client, session_id)
+    if remote_turns is None:
+        return False  # 확인할 수 없으면 Supabase에서 읽음
+    fresh = local_session_store.is_complete(session_id, remote_turns)
+    if not fresh:
+        logger.info(f"🔄 로컬 미러가 원격보다 오래됨 ({session_id}, 원격 {remote_turns}턴), Supabase에서 로드")
+    return fresh
+
+
+def get_sessions_page(supabase_client, user_id, cursor=None, remote_available=True):
+    """
+    세션 목록 한 페이지: 초기 동기화가 끝났거나 Supabase를 쓸 수 없으면 로컬에서 읽음
+
+    Returns:
+        (sessions, next_cursor)
+    """
+    if LOCAL_STORE_ENABLED:
+        try:
+            if local_session_store.is_synced(user_id) or not remote_available:
+                t0 = time.perf_counter()
+                result = local_session_store.list_sessions(user_id, cursor)
+                logger.info(f"TIMING: local store list_sessions took {time.perf_counter() - t0:.4f}s")
+                return result
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 로컬 미러 세션 목록 조회 실패: {e}")
+    if not remote_available:
+        return [], None
+    return get_chat_sessions_page_from_supabase(supabase_client, user_id, cursor=cursor)
+
+
+def load_session_page(supabase_client, user_id, session_id, before_turn=None,
+                      limit=LOAD_SESSION_PAGE_TURNS, remote_available=True):
+    """
+    세션 메시지 한 페이지: 로컬에 세션이 온전히 있으면 로컬에서, 아니면 Supabase에서 읽고 미러링
+    (첫 페이지는 마지막 pull이 오래되었으면 백그라운드에서 원격 턴 수를 확인)
+
+    Returns:
+        (messages, first_turn_index, has_more)
+    """
+    if LOCAL_STORE_ENABLED:
+        try:
+            if _serve_locally(supabase_client, user_id, session_id, remote_available,
+                              check_remote=before_turn is None, verify_in_background=True):
+                t0 = time.perf_counter()
+                messages, first_turn_index, has_more, rows = local_session_store.load_page(
+                    session_id, before_turn, limit
+                )
+                # Supabase에 이미 반영된 턴은 증분 저장 기록에 반영 (다음 저장에서 재전송 방지)
+                remember_persisted_turns(
+                    session_id, [row for row in rows if not row.get("dirty")], replace=before_turn is None
+                )
+                logger.info(f"TIMING: local store load_page({session_id}) took {time.perf_counter() - t0:.4f}s")
+                return messages, first_turn_index, has_more
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 로컬 미러 세션 로드 실패: {e}")
+    if not remote_available:
+        return [], before_turn or 0, False
+
+    def mirror(rows):
+        if LOCAL_STORE_ENABLED:
+            try:
+                local_session_store.mirror_rows(user_id, rows)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ 로컬 미러 기록 실패: {e}")
+
+    return load_chat_history_page_from_supabase(
+        supabase_client, session_id, before_turn=before_turn, limit=limit, on_rows=mirror
+    )
+
+
+def iter_session_pages(supabase_client, user_id, session_id, before_turn=None, remote_available=True, remote_turns=None):
+    """
+    세션 턴을 오름차순 페이지로 읽음 (내보내기용): 로컬에 세션이 온전히 있고 원격보다 오래되지 않았으면
+    로컬에서, 아니면 Supabase에서
+    remote_turns: remote_turn_counts로 미리 조회한 원격 턴 수 (없으면 세션마다 조회)
+
+    Yields:
+        메시지 목록 (페이지 단위)
+    """
+    if LOCAL_STORE_ENABLED:
+        try:
+            if _serve_locally(supabase_client, user_id, session_id, remote_available, check_remote=True,
+                              remote_turns=remote_turns):
+                yield from local_session_store.iter_pages(session_id, before_turn)
+                return
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 로컬 미러 세션 조회 실패: {e}")
+    if not remote_available:
+        return
+    yield from iter_chat_history_pages(supabase_client, session_id, before_turn)
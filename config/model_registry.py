@@ -0,0 +1,123 @@
+# config/model_registry.py
+# 프로세스 전역 Gemini 모델 레지스트리 (세션 간 GenerativeModel 재사용)
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from config.imports import genai
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "gemini-2.5-flash"
+
+# (language, system_prompt_hash, model_name, generation_config) -> GenerativeModel
+_MODEL_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+_REGISTRY_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "build_time_total": 0.0,
+}
+
+
+def _hash_text(text):
+    """시스템 프롬프트를 레지스트리 키용 짧은 해시로 변환합니다."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _freeze_config(config):
+    """generation_config/safety_settings를 해시 가능한 문자열로 정규화합니다."""
+    if not config:
+        return ""
+    return json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def make_model_key(language, system_instruction, model_name=DEFAULT_MODEL_NAME, generation_config=None):
+    """레지스트리 키 생성: (언어, 시스템 프롬프트 해시, 모델명, generation config)"""
+    return (language, _hash_text(system_instruction), model_name, _freeze_config(generation_config))
+
+
+def get_model(language, system_instruction=None, model_name=DEFAULT_MODEL_NAME,
+              generation_config=None, safety_settings=None):
+    """
+    레지스트리에서 모델을 가져오고, 없으면 최초 1회만 생성합니다.
+
+    Args:
+        language: 언어 코드 (키 구분용, 언어 무관 모델은 None)
+        system_instruction: 시스템 프롬프트
+        model_name: Gemini 모델명
+        generation_config: generation config dict (선택)
+        safety_settings: safety settings dict (선택)
+
+    Returns:
+        genai.GenerativeModel 인스턴스 (모든 세션이 공유)
+    """
+    key = make_model_key(language, system_instruction, model_name, generation_config)
+    # safety_settings도 모델 동작에 영향을 주므로 키에 포함
+    if safety_settings:
+        key = key + (_freeze_config(safety_settings),)
+
+    model = _MODEL_REGISTRY.get(key)
+    if model is not None:
+        with _REGISTRY_LOCK:
+            _REGISTRY_STATS["hits"] += 1
+        saved = get_average_build_time()
+        logger.debug(f"♻️ 모델 재사용: {model_name}/{language} (턴당 절약 ~{saved * 1000:.2f}ms)")
+        return model
+
+    with _REGISTRY_LOCK:
+        # 다른 스레드가 먼저 생성했을 수 있으므로 다시 확인
+        model = _MODEL_REGISTRY.get(key)
+        if model is not None:
+            _REGISTRY_STATS["hits"] += 1
+            return model
+
+        t0 = time.perf_counter()
+        kwargs = {}
+        if system_instruction:
+            kwargs["system_instruction"] = system_instruction
+        if safety_settings:
+            kwargs["safety_settings"] = safety_settings
+        if generation_config:
+            kwargs["generation_config"] = generation_config
+        model = genai.GenerativeModel(model_name, **kwargs)
+        elapsed = time.perf_counter() - t0
+
+        _MODEL_REGISTRY[key] = model
+        _REGISTRY_STATS["misses"] += 1
+        _REGISTRY_STATS["build_time_total"] += elapsed
+
+    logger.info(f"🧩 모델 생성 및 등록: {model_name}/{language} ({elapsed * 1000:.2f}ms)")
+    return model
+
+
+def get_average_build_time():
+    """모델 1회 생성에 걸린 평균 시간(초) - 재사용 시 턴당 절약되는 시간"""
+    misses = _REGISTRY_STATS["misses"]
+    if not misses:
+        return 0.0
+    return _REGISTRY_STATS["build_time_total"] / misses
+
+
+def get_model_registry_stats():
+    """레지스트리 통계를 반환합니다."""
+    avg_build = get_average_build_time()
+    return {
+        "models": len(_MODEL_REGISTRY),
+        "hits": _REGISTRY_STATS["hits"],
+        "misses": _REGISTRY_STATS["misses"],
+        "avg_build_ms": round(avg_build * 1000, 3),
+        "saved_per_turn_ms": round(avg_build * 1000, 3),
+        "saved_total_ms": round(avg_build * _REGISTRY_STATS["hits"] * 1000, 3),
+    }
+
+
+def clear_model_registry():
+    """등록된 모델을 모두 제거합니다 (API 키 변경 등)."""
+    with _REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+        _REGISTRY_STATS.update({"hits": 0, "misses": 0, "build_time_total": 0.0})
+    logger.info("모델 레지스트리 초기화 완료")
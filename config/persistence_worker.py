@@ -0,0 +1,221 @@
+# config/persistence_worker.py
+# 세션 저장(write-behind) 백그라운드 워커
+#
+# - save_current_session은 메모리 상태만 갱신하고 Supabase 저장 작업을 이 워커에 넘깁니다.
+# - 세션별 대기열은 깊이 1로 합쳐집니다: 같은 세션의 저장 요청이 여러 번 들어오면
+#   가장 최신 스냅샷 하나만 저장합니다 (대기 순서는 처음 요청 위치 유지).
+# - 실패한 저장은 지수 백오프로 재시도하며, 그 사이 더 새로운 스냅샷이 들어오면
+#   오래된 재시도는 버리고 최신 스냅샷을 저장합니다.
+# - PERSISTENCE_WORKERS개의 스레드가 서로 다른 세션을 동시에 저장합니다. 세션당 진행 중인
+#   작업은 하나뿐이라 세션 안의 저장 순서는 유지되고, 느리거나 재시도 중인 세션이
+#   다른 세션의 저장(과 그 세션의 flush)을 막지 않습니다.
+# - 프로세스 종료 시 atexit로 남은 작업을 비웁니다.
+
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# PERSISTENCE_WRITE_BEHIND=0 이면 기존처럼 호출 스레드에서 바로 저장
+PERSISTENCE_WRITE_BEHIND = os.environ.get("PERSISTENCE_WRITE_BEHIND", "1") == "1"
+PERSISTENCE_MAX_RETRIES = int(os.environ.get("PERSISTENCE_MAX_RETRIES", "3"))
+PERSISTENCE_BACKOFF_BASE = 0.5
+PERSISTENCE_BACKOFF_MAX = 8.0
+PERSISTENCE_FLUSH_TIMEOUT = float(os.environ.get("PERSISTENCE_FLUSH_TIMEOUT", "15"))
+PERSISTENCE_WORKERS = int(os.environ.get("PERSISTENCE_WORKERS", "4"))
+
+
+class SessionPersistenceWorker:
+    """세션 ID별로 최신 저장 작업만 유지하는 write-behind 워커 (작은 스레드 풀, 세션당 진행 중 작업 1개)"""
+
+    def __init__(self, max_retries=PERSISTENCE_MAX_RETRIES,
+                 backoff_base=PERSISTENCE_BACKOFF_BASE, backoff_max=PERSISTENCE_BACKOFF_MAX,
+                 workers=PERSISTENCE_WORKERS):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.workers = max(1, workers)
+        self._pending = OrderedDict()  # session_id -> job (최신 스냅샷 저장 함수)
+        self._in_flight = set()  # 저장 중인 session_id
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+        self.stats = {"submitted": 0, "coalesced": 0, "saved": 0, "retries": 0, "failed": 0, "superseded": 0}
+
+    def _ensure_thread(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if len(self._threads) < self.workers:
+            self._stopping = False
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._run, name=f"session-persistence-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, session_id, job):
+        """
+        세션 저장 작업을 등록합니다 (즉시 반환).
+
+        Args:
+            session_id: 세션 ID (같은 세션의 대기 작업은 최신 것으로 교체)
+            job: 인자 없이 호출되는 저장 함수. 실패 시 예외를 발생시켜야 재시도됩니다.
+        """
+        with self._cond:
+            self.stats["submitted"] += 1
+            if session_id in self._pending:
+                self.stats["coalesced"] += 1
+                logger.debug(f"💾 세션 저장 요청 병합: {session_id}")
+            self._pending[session_id] = job
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def discard(self, session_id, timeout=PERSISTENCE_FLUSH_TIMEOUT):
+        """대기 중인 세션 저장을 취소하고, 진행 중인 저장이 끝날 때까지 기다립니다 (세션 삭제 전)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._pending.pop(session_id, None)
+            while session_id in self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def flush(self, session_id=None, timeout=PERSISTENCE_FLUSH_TIMEOUT):
+        """
+        대기 중인 저장이 끝날 때까지 기다립니다.
+
+        Args:
+            session_id: 지정하면 해당 세션만, 없으면 전체
+            timeout: 최대 대기 시간(초)
+
+        Returns:
+            제한 시간 안에 모두 저장되었는지 여부
+        """
+        deadline = time.monotonic() + timeout
+
+        def busy():
+            if session_id is None:
+                return bool(self._pending) or bool(self._in_flight)
+            return session_id in self._pending or session_id in self._in_flight
+
+        with self._cond:
+            if busy():
+                self._ensure_thread()
+            while busy():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+
+    def shutdown(self, timeout=PERSISTENCE_FLUSH_TIMEOUT):
+        """남은 저장 작업을 비우고 워커를 종료합니다."""
+        flushed = self.flush(timeout=timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if not flushed:
+            logger.warning(f"⚠️ 종료 시 저장되지 않은 세션 {len(self._pending)}개")
+        return flushed
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay + random.uniform(0, self.backoff_base)
+
+    def _next_job(self):
+        """저장 중이 아닌 세션 중 가장 먼저 요청된 작업을 꺼냅니다 (없으면 None, 락 안에서 호출)."""
+        for session_id in self._pending:
+            if session_id not in self._in_flight:
+                job = self._pending.pop(session_id)
+                self._in_flight.add(session_id)
+                return session_id, job
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    item = self._next_job()
+                    if item is not None:
+                        break
+                    if self._stopping and not self._pending:
+                        return
+                    self._cond.wait()
+            session_id, job = item
+
+            try:
+                self._run_job(session_id, job)
+            finally:
+                with self._cond:
+                    self._in_flight.discard(session_id)
+                    self._cond.notify_all()
+
+    def _run_job(self, session_id, job):
+        for attempt in range(self.max_retries + 1):
+            t0 = time.perf_counter()
+            try:
+                job()
+                self.stats["saved"] += 1
+                logger.info(f"TIMING: write-behind save {session_id} took {time.perf_counter() - t0:.4f}s")
+                return
+            except Exception as e:
+                with self._cond:
+                    superseded = session_id in self._pending
+                if superseded:
+                    # 더 새로운 스냅샷이 대기 중이면 오래된 스냅샷 재시도는 의미 없음
+                    self.stats["superseded"] += 1
+                    logger.warning(f"⚠️ 세션 저장 실패, 최신 스냅샷으로 대체: {session_id} ({e})")
+                    return
+                if attempt >= self.max_retries:
+                    self.stats["failed"] += 1
+                    logger.error(f"❌ 세션 저장 최종 실패 ({attempt + 1}회 시도): {session_id} ({e})")
+                    return
+                delay = self._backoff(attempt)
+                self.stats["retries"] += 1
+                logger.warning(f"🔁 세션 저장 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}s 후): {session_id} ({e})")
+                deadline = time.monotonic() + delay
+                with self._cond:
+                    # 종료 중이면 대기 없이 바로 재시도, 최신 스냅샷이 오면 대기 중단
+                    # (다른 세션 저장 완료 알림으로 깨어나도 남은 시간만큼 다시 대기)
+                    while not self._stopping and session_id not in self._pending:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if session_id in self._pending:
+                        self.stats["superseded"] += 1
+                        logger.info(f"💾 재시도 대기 중 최신 스냅샷 도착, 재시도 생략: {session_id}")
+                        return
+
+
+# 프로세스 전역 워커
+session_persistence_worker = SessionPersistenceWorker()
+
+
+def submit_session_save(session_id, job):
+    """세션 저장 작업을 write-behind 워커에 넘깁니다 (비활성화 시 즉시 실행)."""
+    if not PERSISTENCE_WRITE_BEHIND:
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"세션 저장 오류: {e}")
+        return
+    session_persistence_worker.submit(session_id, job)
+
+
+@atexit.register
+def _flush_on_exit():
+    if session_persistence_worker.pending_count():
+        logger.info("💾 종료 전 대기 중인 세션 저장 처리")
+    session_persistence_worker.shutdown()
@@ -17,6 +17,10 @@ from config.utils import (
     analyze_youtube_with_gemini,  
 )
 
+# Token streaming + TTFT metrics for Gemini answers
+from config.streaming import send_message_with_metrics
+from config.document_context import prepare_document_context
+
 # Set logging configuration
 logger = logging.getLogger(__name__)
 
@@ -263,7 +267,7 @@ Format:
 #         error_msg = "이미지 분석 중 오류가 발생했습니다." if detected_lang == "ko" else "An error occurred during image analysis."
 #         return error_msg
 
-def analyze_image_with_gemini_multiturn(images, user_input, chat_session, detected_lang="ko"):
+def analyze_image_with_gemini_multiturn(images, user_input, chat_session, detected_lang="ko", stream_target=None):
     """이미지 분석을 기존 채팅 세션에 연결하여 멀티턴 대화 지원 (한국어/영어/스페인어)"""
     try:
         system_prompt = get_system_prompt(detected_lang)
@@ -423,8 +427,7 @@ Guidelines:
             if image is not None:
                 content.append(image)
                 
-        response = chat_session.send_message(content)
-        return response.text
+        return send_message_with_metrics(chat_session, content, stream_target, kind="image")
     
     except Exception as e:
         logger.error(f"이미지 분석 오류: {e}")
@@ -534,7 +537,7 @@ Guidelines:
 #         logger.error(f"유튜브 분석 오류: {e}")
 #         return "유튜브 영상 분석 중 오류가 발생했습니다." if detected_lang == "ko" else "An error occurred during YouTube analysis."
 
-def analyze_youtube_with_gemini_multiturn(youtube_url, user_query, chat_session, detected_lang="ko"):
+def analyze_youtube_with_gemini_multiturn(youtube_url, user_query, chat_session, detected_lang="ko", stream_target=None):
     """유튜브 영상을 한 번의 API 호출로 모든 처리 (한국어/영어/스페인어)"""
     try:
         system_prompt = get_system_prompt(detected_lang)
@@ -684,7 +687,7 @@ Guidelines:
 - Respond only in English"""
 
         # 한 번의 API 호출로 모든 처리
-        response = chat_session.send_message([
+        return send_message_with_metrics(chat_session, [
             {
                 "file_data": {
                     "file_uri": youtube_url,
@@ -692,9 +695,7 @@ Guidelines:
                 }
             },
             {"text": prompt}
-        ])
-        
-        return response.text
+        ], stream_target, kind="youtube")
     except Exception as e:
         logger.error(f"유튜브 분석 오류: {e}")
         
@@ -917,7 +918,7 @@ Format:
 #         return error_msg
 
 
-def summarize_webpage_with_gemini_multiturn(webpage_content, metadata, user_query, chat_session, detected_lang="ko", webpage_url=""):
+def summarize_webpage_with_gemini_multiturn(webpage_content, metadata, user_query, chat_session, detected_lang="ko", webpage_url="", stream_target=None):
     """웹페이지 내용을 기존 채팅 세션에 연결하여 멀티턴 대화로 분석 또는 요약 (한국어/영어/스페인어)"""
     try:
         system_prompt = get_system_prompt(detected_lang)
@@ -938,6 +939,8 @@ def summarize_webpage_with_gemini_multiturn(webpage_content, metadata, user_quer
         
         # 관련 내용 선택 (키워드 기반)
         relevant_content = webpage_content[:12000]  # 기본 길이
+        # 같은 문서의 후속 질문이면 본문 대신 이력 속 문서 참조만 전송
+        relevant_content = prepare_document_context(relevant_content, chat_session, detected_lang).block
         
         # 프롬프트 구성
         if detected_lang == "ko":
@@ -1097,8 +1100,7 @@ Guidelines:
 4. Use appropriate emojis for readability
 5. Respond only in English"""
         
-        response = chat_session.send_message(prompt)
-        return response.text
+        return send_message_with_metrics(chat_session, prompt, stream_target, kind="webpage")
     except Exception as e:
         logger.error(f"웹페이지 분석 오류: {e}")
         
@@ -1264,7 +1266,7 @@ Guidelines:
 #             error_msg = "PDF 분석 중 오류가 발생했습니다." if detected_lang == "ko" else "An error occurred during PDF analysis."
 #         return error_msg
 
-def analyze_pdf_with_gemini_multiturn(pdf_content, metadata, user_query, chat_session, detected_lang="ko", pdf_url="", sections=None):
+def analyze_pdf_with_gemini_multiturn(pdf_content, metadata, user_query, chat_session, detected_lang="ko", pdf_url="", sections=None, stream_target=None):
     """PDF 내용을 기존 채팅 세션에 연결하여 멀티턴 대화로 분석 또는 요약 (한국어/영어/스페인어)"""
     try:
         metadata_info = {
@@ -1295,6 +1297,8 @@ def analyze_pdf_with_gemini_multiturn(pdf_content, metadata, user_query, chat_se
                 relevant_content = next((s for s in sections if "결론" in s or "conclusion" in s.lower() or "conclusión" in s.lower()), pdf_content[:8000])
             elif "소개" in user_query or "introduction" in user_query.lower() or "introducción" in user_query.lower():
                 relevant_content = next((s for s in sections if "소개" in s or "introduction" in s.lower() or "introducción" in s.lower()), pdf_content[:8000])
+        # 같은 문서의 후속 질문이면 본문 대신 이력 속 문서 참조만 전송
+        relevant_content = prepare_document_context(relevant_content, chat_session, detected_lang).block
         
         # 프롬프트 구성
         if detected_lang == "ko":
@@ -1451,8 +1455,7 @@ Guidelines:
 4. Use appropriate emojis for readability
 5. Respond only in English"""
         
-        response = chat_session.send_message(prompt)
-        return response.text
+        return send_message_with_metrics(chat_session, prompt, stream_target, kind="pdf")
     except Exception as e:
         logger.error(f"PDF 분석 오류: {e}")
         
@@ -4,11 +4,12 @@ Primary goal: return structured rows (header + data rows) for a given year.
 No CSV writing here; storage/caching handled elsewhere.
 """
 import os
-import requests
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 
+from config.http_client import http_get
+
 USER_AGENT = os.getenv("CHAT_GEM_USER_AGENT", "Chat_GemBot/1.0")
 
 
@@ -16,7 +17,7 @@ def fetch_drivers(year: int, max_length: int = 5000, timeout: int = 15):
     url = f"https://www.formula1.com/en/results/{year}/drivers"
     headers = {"User-Agent": USER_AGENT}
     try:
-        resp = requests.get(url, headers=headers, timeout=timeout)
+        resp = http_get(url, headers=headers, timeout=timeout)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
 
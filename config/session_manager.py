@@ -3,9 +3,16 @@
 from datetime import timezone
 import uuid
 import os
-import io
 import json
-from config.storage_utils import save_chat_history_to_supabase, load_chat_history_from_supabase, get_chat_sessions_from_supabase, upload_image_to_supabase
+import hashlib
+import threading
+from collections import OrderedDict
+from config.storage_utils import save_chat_history_to_supabase, lookup_image_url, forget_persisted_turns
+from config.local_store import LOCAL_STORE_ENABLED, local_session_store, get_sessions_page, load_session_page, iter_session_pages, pop_stale_session, remote_turn_counts, request_local_sync
+from config.persistence_worker import session_persistence_worker, submit_session_save
+from config.image_uploader import get_image_upload_batch, retry_image_upload
+from config.blob_store import resolve_image
+from config.exporter import build_export_bytes
 from config.imports import st, logger, Image, datetime, re, supabase
 import os
 
@@ -17,6 +24,23 @@ from config.lang import get_text  # get_text 함수 임포트 추가
 import time
 import os
 
+# 사이드바에 한 번에 더 보여줄 세션 수 ("더 보기" 단위)
+SIDEBAR_SESSION_STEP = 5
+# 블롭 참조 content-type → 업로드 파일 확장자
+_BLOB_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+# 이미지 업로드 완료 후 다시 저장할 세션별 최신 저장 작업 (최근 세션만 보관)
+LATEST_SESSION_SAVES_MAX = 64
+_latest_session_saves = OrderedDict()  # session_id -> 저장 함수
+_latest_session_saves_lock = threading.Lock()
+
+def _remote_history_available():
+    """Supabase 이력 읽기/삭제를 할 수 있는지 (로그인 + 클라이언트 + SKIP 토글 꺼짐)"""
+    return bool(st.session_state.is_logged_in and st.session_state.user_id and supabase and not SKIP_SUPABASE_LOAD)
+
+def _history_available():
+    """이력을 읽을 수 있는지 (Supabase 또는 로컬 미러)"""
+    return bool(st.session_state.is_logged_in and st.session_state.user_id and (LOCAL_STORE_ENABLED or _remote_history_available()))
+
 def initialize_session_state():
     """세션 상태 초기화"""
     if "is_logged_in" not in st.session_state:
@@ -31,10 +55,18 @@ def initialize_session_state():
         st.session_state.messages = []
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    # 토큰 예산을 넘어 밀려난 이전 턴들의 롤링 요약
+    if "history_summary" not in st.session_state:
+        st.session_state.history_summary = ""
+    # 메모리에 로드된 첫 턴의 turn_index (0보다 크면 이전 턴은 아직 로드하지 않음)
+    if "loaded_turn_offset" not in st.session_state:
+        st.session_state.loaded_turn_offset = 0
     if "system_language" not in st.session_state:
         st.session_state.system_language = "ko"
     if "uploaded_images" not in st.session_state:
         st.session_state.uploaded_images = []
+    if "prepared_images" not in st.session_state:
+        st.session_state.prepared_images = {}  # 첨부 이미지 전처리 결과 (file_id → PreparedImage)
     if "welcome_dismissed" not in st.session_state:
         st.session_state.welcome_dismissed = False
     if "usage_data" not in st.session_state:
@@ -61,32 +93,45 @@ def initialize_session_state():
         st.session_state.current_webpage_metadata = None
     if "uploader_key" not in st.session_state:
         st.session_state.uploader_key = 0
+    # 세션 목록 키셋 페이지네이션 상태 (None이면 서버에 더 가져올 세션 없음)
+    if "session_list_cursor" not in st.session_state:
+        st.session_state.session_list_cursor = None
+    if "sidebar_session_limit" not in st.session_state:
+        st.session_state.sidebar_session_limit = SIDEBAR_SESSION_STEP
 
     # Supabase 연결 상태에 따른 경고 메시지 표시 (다국어 적용)
     if not supabase:
         st.warning(get_text("supabase_warning", st.session_state.system_language))  # e 변수 제거 (초기화 실패 시)
 
+    # 세션이 열려 있는 사용자는 로컬 미러 주기 동기화 대상으로 유지 (유휴 사용자는 워커가 제외)
+    if st.session_state.current_session_id and _remote_history_available():
+        request_local_sync(st.session_state.user_id, supabase, immediate=False)
+        # 로컬에서 연 현재 세션이 백그라운드 확인에서 원격보다 오래된 것으로 드러났으면 다시 로드
+        if pop_stale_session(st.session_state.current_session_id):
+            _reload_current_session()
+
     # 로그인 상태인데 현재 세션이 없으면 세션 목록 로드 후 첫 세션 열기
     if st.session_state.is_logged_in and not st.session_state.current_session_id:
-        # Supabase에서 사용자의 세션 목록 가져오기
-        if st.session_state.user_id and supabase and not SKIP_SUPABASE_LOAD:
+        # 사용자의 세션 목록 가져오기 (로컬 미러 우선, 없으면 Supabase)
+        if _history_available():
             try:
                 debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
                 t0 = time.perf_counter() if debug_timings else None
-                # Supabase에서 세션 목록 로드
-                supabase_sessions = get_chat_sessions_from_supabase(supabase, st.session_state.user_id)
+                remote = _remote_history_available()
+                # 세션 목록 첫 페이지 로드 (나머지는 "더 보기"로 이어서 로드)
+                supabase_sessions, st.session_state.session_list_cursor = get_sessions_page(
+                    supabase, st.session_state.user_id, remote_available=remote
+                )
                 if debug_timings:
                     t1 = time.perf_counter()
-                    logger.info(f"TIMING: get_chat_sessions_from_supabase took {t1 - t0:.4f}s")
+                    logger.info(f"TIMING: get_sessions_page took {t1 - t0:.4f}s")
+                # 로컬 미러를 백그라운드에서 Supabase와 동기화
+                if remote:
+                    request_local_sync(st.session_state.user_id, supabase)
                 
                 if supabase_sessions:
-                    # 로컬 세션 목록에 추가 (기존에 없는 세션만)
-                    existing_session_ids = {s["id"] for s in st.session_state.chat_sessions}
-                    for session in supabase_sessions:
-                        if session["id"] not in existing_session_ids:
-                            st.session_state.chat_sessions.append(session)
-                    
-                    logger.info(f"Supabase에서 {len(supabase_sessions)}개 세션 로드")
+                    added = _merge_sessions(supabase_sessions)
+                    logger.info(f"저장된 세션 {added}개 로드")
             except Exception as e:
                 logger.error(f"세션 목록 로드 오류: {str(e)}")
         
@@ -112,6 +157,45 @@ def initialize_session_state():
             create_new_chat_session()
             save_current_session()
 
+def _merge_sessions(sessions):
+    """로컬 세션 목록에 없는 세션만 추가하고 추가된 수를 반환"""
+    existing_session_ids = {s["id"] for s in st.session_state.chat_sessions}
+    added = 0
+    for session in sessions:
+        if session["id"] not in existing_session_ids:
+            st.session_state.chat_sessions.append(session)
+            existing_session_ids.add(session["id"])
+            added += 1
+    return added
+
+def has_more_sessions():
+    """사이드바에 더 보여줄 세션이 있는지 (로컬 목록 또는 서버 다음 페이지)"""
+    return (
+        len(st.session_state.chat_sessions) > st.session_state.sidebar_session_limit
+        or st.session_state.session_list_cursor is not None
+    )
+
+def load_more_sessions():
+    """사이드바 "더 보기": 표시 개수를 늘리고, 로컬 목록이 모자라면 서버에서 다음 페이지 로드"""
+    st.session_state.sidebar_session_limit += SIDEBAR_SESSION_STEP
+    cursor = st.session_state.session_list_cursor
+    if cursor is None or len(st.session_state.chat_sessions) >= st.session_state.sidebar_session_limit:
+        return
+    if not _history_available():
+        return
+    try:
+        debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
+        t0 = time.perf_counter() if debug_timings else None
+        sessions, st.session_state.session_list_cursor = get_sessions_page(
+            supabase, st.session_state.user_id, cursor=cursor, remote_available=_remote_history_available()
+        )
+        if debug_timings:
+            logger.info(f"TIMING: get_sessions_page(cursor) took {time.perf_counter() - t0:.4f}s")
+        added = _merge_sessions(sessions)
+        logger.info(f"저장된 세션 {added}개 추가 로드")
+    except Exception as e:
+        logger.error(f"세션 목록 추가 로드 오류: {str(e)}")
+
 def create_new_chat_session():
     """새 채팅 세션 생성"""
     lang = st.session_state.system_language
@@ -123,6 +207,8 @@ def create_new_chat_session():
         "title": session_title,
         "messages": [],
         "chat_history": [],
+        "history_summary": "",
+        "turn_offset": 0,
         "created_at": current_time,
         "last_updated": current_time
     }
@@ -130,7 +216,10 @@ def create_new_chat_session():
     st.session_state.current_session_id = session_id
     st.session_state.messages = []
     st.session_state.chat_history = []
+    st.session_state.history_summary = ""
+    st.session_state.loaded_turn_offset = 0
     st.session_state.uploaded_images = []
+    st.session_state.prepared_images = {}
     st.session_state.uploaded_pdf_file = None
     
     # 캐시된 콘텐츠 정리
@@ -153,8 +242,11 @@ def save_current_session():
             if session["id"] == st.session_state.current_session_id:
                 session["messages"] = st.session_state.messages.copy()
                 session["chat_history"] = st.session_state.chat_history.copy()
+                session["history_summary"] = st.session_state.get("history_summary", "")
+                session["turn_offset"] = st.session_state.get("loaded_turn_offset", 0)
                 session["last_updated"] = datetime.now(timezone.utc)
-                if st.session_state.messages:
+                # 최근 턴만 로드된 세션은 첫 질문이 메모리에 없으므로 제목 유지
+                if st.session_state.messages and session["turn_offset"] == 0:
                     first_user_message = next((msg["content"] for msg in st.session_state.messages if msg["role"] == "user"), "")
                     if first_user_message:
                         session["title"] = first_user_message[:30] + "..." if len(first_user_message) > 30 else first_user_message
@@ -163,74 +255,121 @@ def save_current_session():
                 break
                 
         # Supabase에 채팅 이력 저장 (이미지 업로드 및 URL 변환 처리)
-        if st.session_state.is_logged_in and st.session_state.user_id and st.session_state.messages and supabase:
-            try:
-                # 메시지 복사본 생성 (이미지 URL 변환을 위해)
-                messages_to_save = []
-                for msg in st.session_state.messages:
-                    msg_copy = msg.copy()
-                    
-                    # 이미지가 있는 메시지인 경우 처리
-                    if "images" in msg and msg["images"]:
-                        # 이미 image_urls가 있으면 그것을 사용
-                        if "image_urls" in msg and msg["image_urls"]:
-                            msg_copy["images"] = msg["image_urls"]
-                        # 그렇지 않으면 이미지 데이터를 URL로 변환
-                        else:
-                            # 이미지 데이터를 URL로 변환
-                            image_urls = []
-                            for img_data in msg["images"]:
-                                # 이미 URL 문자열인 경우 그대로 사용
-                                if isinstance(img_data, str):
-                                    image_urls.append(img_data)
-                                # 이진 데이터인 경우 업로드 처리
-                                else:
-                                    # 임시 파일로 저장 후 업로드
-                                    try:
-                                        from tempfile import NamedTemporaryFile
-                                        
-                                        # 임시 파일 생성 및 이미지 데이터 저장
-                                        with NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-                                            tmp.write(img_data)
-                                            tmp_path = tmp.name
-                                        
-                                        # 임시 파일을 다시 열어서 BytesIO로 변환
-                                        with open(tmp_path, 'rb') as f:
-                                            image_bytes = f.read()
-                                        
-                                        # BytesIO 객체 생성 (UploadedFile처럼 사용 가능)
-                                        image_io = io.BytesIO(image_bytes)
-                                        image_io.name = f"image_{uuid.uuid4()}.jpg"
-                                        image_io.type = "image/jpeg"
-                                        
-                                        # Supabase에 업로드
-                                        image_url = upload_image_to_supabase(image_io, supabase, "chat-images", st.session_state.user_id)
-                                        if image_url:
-                                            image_urls.append(image_url)
-                                            
-                                        # 임시 파일 정리
-                                        os.unlink(tmp_path)
-                                    except Exception as e:
-                                        logger.error(f"이미지 업로드 중 오류: {str(e)}")
-                                        st.warning(f"이미지 업로드 실패: {str(e)}")
-                                        continue
-                            
-                            # 메시지 복사본의 이미지 데이터를 URL로 대체
-                            msg_copy["images"] = image_urls
-                    
-                    messages_to_save.append(msg_copy)
-                
-                # Supabase에 채팅 이력 저장
-                save_chat_history_to_supabase(
-                    supabase,
-                    st.session_state.user_id,
-                    st.session_state.current_session_id,
-                    messages_to_save
-                )
-                
-                logger.info(f"채팅 이력 저장 완료: 세션 ID {st.session_state.current_session_id}")
-            except Exception as e:
-                logger.error(f"채팅 이력 저장 오류: {str(e)}")
+        # → 메모리 스냅샷만 만들고 실제 저장은 write-behind 워커에서 처리
+        if st.session_state.is_logged_in and st.session_state.user_id and st.session_state.messages and (supabase or LOCAL_STORE_ENABLED):
+            user_id = st.session_state.user_id
+            session_id = st.session_state.current_session_id
+            messages_snapshot = [msg.copy() for msg in st.session_state.messages]
+            first_turn_index = st.session_state.get("loaded_turn_offset", 0)
+            job = lambda: _persist_session_snapshot(user_id, session_id, messages_snapshot, first_turn_index)
+            # 이미지 업로드가 늦게 끝나면 그때의 최신 스냅샷으로 다시 저장
+            _remember_session_save(session_id, job)
+            submit_session_save(session_id, job)
+
+def _image_url_for_save(img_data, user_id, on_uploaded):
+    """
+    저장용 이미지 URL: URL 문자열은 그대로, 블롭 참조/이진 데이터는 이미 업로드된 URL(해시 인덱스).
+
+    아직 URL이 없는 이미지는 None을 반환하고 세션 저장과 별도로 재업로드를 예약합니다
+    (성공하면 on_uploaded가 세션 저장을 다시 요청). 업로드할 수 없는 이미지(Supabase 없음,
+    블롭 만료, 재시도 횟수 초과)도 None이며 그 이미지만 저장에서 빠집니다.
+    """
+    # 이미 URL 문자열인 경우 그대로 사용
+    if isinstance(img_data, str):
+        return img_data
+    if not supabase:
+        return None
+    img_bytes = resolve_image(img_data)
+    if img_bytes is None:
+        logger.warning("⚠️ 저장할 이미지 데이터가 없어 제외합니다 (블롭 만료)")
+        return None
+    # 해시 → URL 인덱스에 있으면 스토리지 호출 없이 사용
+    image_url = lookup_image_url(img_bytes, "chat-images", user_id)
+    if image_url:
+        return image_url
+    mime_type = getattr(img_data, "mime_type", "image/jpeg")
+    filename = f"image_{uuid.uuid4()}{_BLOB_EXTENSIONS.get(mime_type, '.jpg')}"
+    key = f"{user_id}:{hashlib.md5(img_bytes).hexdigest()}"
+    if retry_image_upload(key, img_bytes, filename, mime_type, supabase, user_id, on_uploaded=on_uploaded):
+        logger.info(f"🖼️ 이미지 URL 없음, 재업로드 후 다시 저장: {filename}")
+    return None
+
+def _resubmit_session_save(session_id):
+    """세션의 최신 저장 작업을 다시 요청합니다 (이미지 URL이 준비된 뒤, 업로드 스레드에서 호출)."""
+    with _latest_session_saves_lock:
+        job = _latest_session_saves.get(session_id)
+    if job is not None:
+        submit_session_save(session_id, job)
+
+def _remember_session_save(session_id, job):
+    with _latest_session_saves_lock:
+        _latest_session_saves[session_id] = job
+        _latest_session_saves.move_to_end(session_id)
+        while len(_latest_session_saves) > LATEST_SESSION_SAVES_MAX:
+            _latest_session_saves.popitem(last=False)
+
+def _forget_session_save(session_id):
+    with _latest_session_saves_lock:
+        _latest_session_saves.pop(session_id, None)
+
+def _persist_session_snapshot(user_id, session_id, messages, first_turn_index=0):
+    """
+    세션 스냅샷을 저장합니다 (백그라운드 워커 스레드에서 실행, st 호출 금지).
+
+    이미지 업로드는 기다리지 않습니다: URL이 아직 없는 이미지는 빼고 턴을 바로 저장하고,
+    업로드가 끝나면 세션 저장을 다시 요청해 URL을 채웁니다.
+    """
+    def on_uploaded(_urls):
+        _resubmit_session_save(session_id)
+
+    # 메시지 복사본 생성 (이미지 URL 변환을 위해)
+    messages_to_save = []
+    for msg in messages:
+        msg_copy = msg.copy()
+        
+        # 이미지가 있는 메시지인 경우 처리
+        if "images" in msg and msg["images"]:
+            # 백그라운드 업로드 결과 (첨부 순서대로 이미지당 URL, 실패/타임아웃은 None)
+            uploaded_urls = msg.get("image_urls") or []
+            pending = False
+            if msg.get("image_upload_id") and not uploaded_urls:
+                batch = get_image_upload_batch(msg["image_upload_id"])
+                if batch is not None and not batch.done():
+                    # 업로드 중인 이미지는 이번 저장에서 빼고, 끝나면 다시 저장
+                    pending = True
+                    batch.on_complete(on_uploaded)
+                elif batch is not None:
+                    uploaded_urls = batch.results(timeout=0)
+            # 업로드된 이미지는 그 URL을, 실패했거나 업로드 전인 이미지는 재업로드 예약 (순서 유지)
+            image_urls = []
+            for position, img_data in enumerate(msg["images"]):
+                image_url = uploaded_urls[position] if position < len(uploaded_urls) else None
+                if not image_url and not pending:
+                    image_url = _image_url_for_save(img_data, user_id, on_uploaded)
+                if image_url:
+                    image_urls.append(image_url)
+            # 메시지 복사본의 이미지 데이터를 URL로 대체
+            msg_copy["images"] = image_urls
+        
+        messages_to_save.append(msg_copy)
+    
+    # 로컬 미러에 먼저 기록 (Supabase 장애 중에도 이력 유지, 미반영 턴은 동기화 워커가 나중에 push)
+    local_versions = None
+    if LOCAL_STORE_ENABLED:
+        try:
+            local_versions = local_session_store.save_turns(user_id, session_id, messages_to_save, first_turn_index)
+        except Exception as e:
+            logger.error(f"로컬 미러 저장 오류: {str(e)}")
+    if not supabase:
+        return
+    
+    # Supabase에 채팅 이력 저장 (실패 시 예외 → 워커가 백오프 재시도)
+    if not save_chat_history_to_supabase(supabase, user_id, session_id, messages_to_save, first_turn_index):
+        raise RuntimeError(f"채팅 이력 저장 실패: 세션 ID {session_id}")
+    if local_versions:
+        local_session_store.mark_clean(session_id, local_versions)
+    
+    logger.info(f"채팅 이력 저장 완료: 세션 ID {session_id}")
 
 def load_session(session_id):
     """세션 로드"""
@@ -244,19 +383,25 @@ def load_session(session_id):
             # 안전하게 메시지 복사 (빈 리스트로 초기화 후 복사)
             st.session_state.messages = session.get("messages", []).copy() if session.get("messages") else []
             st.session_state.chat_history = session.get("chat_history", []).copy() if session.get("chat_history") else []
+            st.session_state.history_summary = session.get("history_summary", "")
+            st.session_state.loaded_turn_offset = session.get("turn_offset", 0)
             local_session_found = True
             break
             
-    # Supabase에서 세션 로드 (로그인된 사용자인 경우)
-    if st.session_state.is_logged_in and st.session_state.user_id and supabase and not SKIP_SUPABASE_LOAD:
+    # 저장된 세션 로드 (로그인된 사용자인 경우, 로컬 미러 우선)
+    if _history_available():
+        # 아직 저장되지 않은 같은 세션의 스냅샷이 있으면 먼저 반영 (오래된 이력 로드 방지)
+        session_persistence_worker.flush(session_id)
         try:
             debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
             t0 = time.perf_counter() if debug_timings else None
-            # Supabase에서 채팅 이력 로드
-            messages = load_chat_history_from_supabase(supabase, session_id)
+            # 최근 턴만 로드 (이전 턴은 "이전 대화 더 불러오기"로 로드)
+            messages, first_turn_index, _ = load_session_page(
+                supabase, st.session_state.user_id, session_id, remote_available=_remote_history_available()
+            )
             if debug_timings:
                 t1 = time.perf_counter()
-                logger.info(f"TIMING: load_chat_history_from_supabase({session_id}) took {t1 - t0:.4f}s")
+                logger.info(f"TIMING: load_session_page({session_id}) took {t1 - t0:.4f}s")
             
             if messages:
                 # 로컬 세션이 없는 경우 새로 생성
@@ -274,6 +419,7 @@ def load_session(session_id):
                         "title": session_title,
                         "messages": messages,
                         "chat_history": [],  # Gemini 채팅 이력은 따로 관리
+                        "turn_offset": first_turn_index,
                         "created_at": current_time,
                         "last_updated": current_time
                     }
@@ -281,9 +427,11 @@ def load_session(session_id):
                     st.session_state.current_session_id = session_id
                     st.session_state.messages = messages
                     st.session_state.chat_history = []
+                    st.session_state.history_summary = ""
                 else:
                     # 이미 로컬에 세션이 있더라도 Supabase 데이터로 덮어쓰기
                     st.session_state.messages = messages
+                st.session_state.loaded_turn_offset = first_turn_index
                 
                 logger.info(f"Supabase에서 세션 로드 완료: {session_id}")
         except Exception as e:
@@ -291,23 +439,76 @@ def load_session(session_id):
     
     # 이미지와 PDF 파일 초기화
     st.session_state.uploaded_images = []
+    st.session_state.prepared_images = {}
     st.session_state.uploaded_pdf_file = None
     
     # 캐시된 콘텐츠 정리
     clear_cached_content()
 
+def _reload_current_session():
+    """현재 세션의 최근 턴을 다시 로드합니다 (다른 기기에서 추가된 턴 반영, 저장하지 않음)."""
+    session_id = st.session_state.current_session_id
+    try:
+        messages, first_turn_index, _ = load_session_page(
+            supabase, st.session_state.user_id, session_id, remote_available=_remote_history_available()
+        )
+    except Exception as e:
+        logger.error(f"세션 다시 로드 오류: {str(e)}")
+        return
+    if not messages:
+        return
+    st.session_state.messages = messages
+    st.session_state.loaded_turn_offset = first_turn_index
+    for session in st.session_state.chat_sessions:
+        if session["id"] == session_id:
+            session["messages"] = messages.copy()
+            session["turn_offset"] = first_turn_index
+            break
+    logger.info(f"🔄 원격 변경 반영을 위해 세션 다시 로드: {session_id}")
+
+def load_older_messages():
+    """현재 세션에서 아직 로드하지 않은 이전 턴 한 페이지를 앞에 붙입니다."""
+    offset = st.session_state.get("loaded_turn_offset", 0)
+    if offset <= 0:
+        return
+    if not _history_available():
+        return
+    session_id = st.session_state.current_session_id
+    try:
+        debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
+        t0 = time.perf_counter() if debug_timings else None
+        older, first_turn_index, _ = load_session_page(
+            supabase, st.session_state.user_id, session_id, before_turn=offset,
+            remote_available=_remote_history_available(),
+        )
+        if debug_timings:
+            logger.info(f"TIMING: load_session_page({session_id}, before={offset}) took {time.perf_counter() - t0:.4f}s")
+        if older:
+            st.session_state.messages = older + st.session_state.messages
+            st.session_state.loaded_turn_offset = first_turn_index
+            logger.info(f"이전 대화 {len(older) // 2}턴 추가 로드: {session_id}")
+    except Exception as e:
+        logger.error(f"이전 대화 로드 오류: {str(e)}")
+
 def delete_session(session_id):
     """세션 삭제"""
     # 로컬 세션 목록에서 삭제
     st.session_state.chat_sessions = [s for s in st.session_state.chat_sessions if s["id"] != session_id]
     
+    # 대기 중인 저장이 삭제 후에 실행되어 세션이 되살아나지 않도록 취소
+    _forget_session_save(session_id)
+    session_persistence_worker.discard(session_id)
+    
     # Supabase에서 세션 삭제
-    if st.session_state.is_logged_in and st.session_state.user_id and supabase and not SKIP_SUPABASE_LOAD:
+    remote_deleted = False
+    if _remote_history_available():
         try:
             # 채팅 이력 삭제
             debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
             t0 = time.perf_counter() if debug_timings else None
             supabase.table("chat_history").delete().eq("session_id", session_id).execute()
+            forget_persisted_turns(session_id)
+            remote_deleted = True
             if debug_timings:
                 t1 = time.perf_counter()
                 logger.info(f"TIMING: supabase.delete chat_history for {session_id} took {t1 - t0:.4f}s")
@@ -319,6 +520,13 @@ def delete_session(session_id):
         if SKIP_SUPABASE_LOAD:
             logger.info("SKIP_SUPABASE_LOAD=1: Supabase session/history operations skipped")
     
+    # 로컬 미러에서 삭제 (Supabase 삭제 전이면 동기화 워커가 나중에 반영)
+    if LOCAL_STORE_ENABLED and st.session_state.is_logged_in and st.session_state.user_id:
+        try:
+            local_session_store.delete_session(st.session_state.user_id, session_id, remote_deleted=remote_deleted)
+        except Exception as e:
+            logger.error(f"로컬 미러 세션 삭제 오류: {str(e)}")
+    
     # 현재 세션이 삭제된 세션이면 다른 세션 로드 또는 새 세션 생성
     if st.session_state.current_session_id == session_id:
         if st.session_state.chat_sessions:
@@ -331,11 +539,25 @@ def export_chat_session():
     if st.session_state.current_session_id:
         for session in st.session_state.chat_sessions:
             if session["id"] == st.session_state.current_session_id:
+                messages = session["messages"]
+                # 최근 턴만 로드된 세션은 이전 턴을 함께 불러와 전체를 내보냄
+                offset = session.get("turn_offset", 0)
+                if offset > 0 and _history_available():
+                    older, _, _ = load_session_page(
+                        supabase, st.session_state.user_id, session["id"], before_turn=offset, limit=offset,
+                        remote_available=_remote_history_available(),
+                    )
+                    messages = older + messages
                 serialized_messages = []
-                for msg in session["messages"]:
+                for msg in messages:
                     msg_copy = msg.copy()
                     if "images" in msg_copy and msg_copy["images"]:
-                        msg_copy["images"] = [base64.b64encode(img).decode('utf-8') for img in msg_copy["images"]]
+                        # URL은 그대로, 블롭 참조/바이트는 base64로 (블롭은 내보낼 때 다시 읽어옴)
+                        images = [img if isinstance(img, str) else resolve_image(img) for img in msg_copy["images"]]
+                        msg_copy["images"] = [
+                            img if isinstance(img, str) else base64.b64encode(img).decode('utf-8')
+                            for img in images if img is not None
+                        ]
                     serialized_messages.append(msg_copy)
                 export_data = {
                     "title": session["title"],
@@ -349,6 +571,74 @@ def export_chat_session():
                 return result
     return None
 
+def prepare_export(scope="current", fmt="ndjson", compression="gzip", compact=False):
+    """
+    스트리밍 내보내기 함수를 만듭니다 (st.download_button의 지연 생성 data로 사용).
+
+    세션 상태는 지금 스냅샷으로 잡아 두고, 실제 조회/쓰기는 다운로드 시
+    별도 스레드에서 수행하므로 반환된 함수 안에서는 st를 호출하지 않습니다.
+
+    Args:
+        scope: "current"(현재 세션) 또는 "all"(사용자의 모든 세션, Supabase/로컬 미러에서 페이지 단위 조회)
+        fmt: "ndjson" 또는 "zip"
+        compression: NDJSON 압축 ("gzip", "zstd", "none")
+        compact: NDJSON 이미지 인라인에 base85 사용
+
+    Returns:
+        인자 없이 호출하면 내보내기 파일 객체를 반환하는 함수
+    """
+    user_id = st.session_state.user_id if st.session_state.is_logged_in else None
+    history_available = _history_available()
+    remote_available = _remote_history_available()
+    current_id = st.session_state.current_session_id
+    # 메시지 목록은 얕은 복사 (이미지는 블롭 참조라 복사 비용이 작음)
+    snapshots = []
+    for session in st.session_state.chat_sessions:
+        if session["id"] == current_id:
+            messages = list(st.session_state.messages)
+            offset = st.session_state.get("loaded_turn_offset", 0)
+        elif scope == "all" and not history_available:
+            messages, offset = list(session.get("messages", [])), session.get("turn_offset", 0)
+        else:
+            continue
+        snapshots.append((dict(session, messages=None), messages, offset))
+    # 현재 세션을 맨 앞에
+    snapshots.sort(key=lambda snapshot: snapshot[0]["id"] != current_id)
+
+    def session_pages(session_id, messages, offset):
+        # 최근 턴만 로드된 세션은 이전 턴을 저장소에서 페이지 단위로 읽음
+        if offset > 0 and history_available:
+            yield from iter_session_pages(supabase, user_id, session_id, before_turn=offset, remote_available=remote_available)
+        yield messages
+
+    def sessions():
+        exported = set()
+        for meta, messages, offset in snapshots:
+            exported.add(meta["id"])
+            yield meta, session_pages(meta["id"], messages, offset)
+        if scope != "all" or not history_available:
+            return
+        # 메모리의 현재 세션이 아직 저장되지 않았을 수 있으므로 현재 세션은 위에서 메모리 기준으로 내보냄
+        cursor = None
+        while True:
+            page, cursor = get_sessions_page(supabase, user_id, cursor, remote_available=remote_available)
+            page = [meta for meta in page if meta["id"] not in exported]
+            # 로컬 미러가 최신인지 확인할 원격 턴 수를 페이지당 한 번에 조회 (세션마다 조회하지 않음)
+            counts = remote_turn_counts(supabase, [meta["id"] for meta in page]) if remote_available and LOCAL_STORE_ENABLED else {}
+            for meta in page:
+                exported.add(meta["id"])
+                yield meta, iter_session_pages(
+                    supabase, user_id, meta["id"], remote_available=remote_available, remote_turns=counts.get(meta["id"])
+                )
+            if not cursor:
+                return
+
+    def build():
+        logger.info(f"대화 내보내기 시작 ({scope}, {fmt})")
+        return build_export_bytes(sessions(), fmt, compression, compact)
+
+    return build
+
 def clear_cached_content():
     """캐시된 콘텐츠 정리"""
     st.session_state.current_pdf_url = None
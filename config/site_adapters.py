@@ -0,0 +1,202 @@
+# config/site_adapters.py
+# 도메인별 웹페이지 어댑터 레지스트리
+#
+# - 사이트별 처리(본문 선택자, JSON-LD 본문 폴백, iframe 따라가기, 캐시 TTL)를
+#   fetch_webpage_content 안의 분기 대신 어댑터 클래스로 선언합니다.
+# - 어댑터는 가져오기 전략(요청할 URL과 방법: http / browser)을 싼 순서대로 나열하고,
+#   성공한 전략을 기억해 이후 호출은 그 전략부터 시도합니다 (SITE_ADAPTER_PREFERENCE_TTL 동안).
+# - 네이버 블로그: blog.naver.com/{id}/{logNo}를 프레임셋 GET + iframe GET 대신
+#   PostView 주소(실패 시 모바일 주소)로 바로 한 번에 가져오고, 둘 다 안 되면 브라우저를 씁니다.
+# - 새 사이트는 SiteAdapter를 상속해 register_adapter()로 등록합니다 (나중에 등록한 것이 우선).
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+SITE_ADAPTER_PREFERENCE_TTL = int(os.environ.get("SITE_ADAPTER_PREFERENCE_TTL", "3600"))  # 성공 전략 기억 기간 (초)
+
+HTTP = "http"
+BROWSER = "browser"
+
+
+@dataclass(frozen=True)
+class FetchStrategy:
+    """
+    가져오기 전략 하나.
+
+    Attributes:
+        name: 기록용 이름
+        method: "http" (스트리밍 GET + HTML 추출) 또는 "browser" (Playwright 렌더링)
+        rewrite: 요청 URL → 실제로 가져올 URL (이 전략을 쓸 수 없으면 None, 없으면 원래 URL)
+    """
+    name: str
+    method: str = HTTP
+    rewrite: Optional[Callable[[str], Optional[str]]] = None
+
+    def target(self, url):
+        return self.rewrite(url) if self.rewrite else url
+
+
+class SiteAdapter:
+    """기본 어댑터: 원래 URL을 한 번 GET하고 일반 본문 선택자로 추출"""
+
+    name = "default"
+    domains = ()
+    strategies = (FetchStrategy("direct"),)
+    body_selectors = ()  # 일반 선택자보다 먼저 시도할 사이트 본문 선택자
+    min_body_chars = 100  # 사이트 선택자 결과가 이보다 짧으면 다음 선택자로
+    json_ld_body = False  # 선택자로 못 찾으면 JSON-LD articleBody/description 사용
+    cache_ttl = None  # 웹페이지 캐시 신선 기간 (None이면 WEBPAGE_CACHE_TTL)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._preferred = None  # (전략 이름, 만료 시각)
+        self.stats = {}
+
+    def matches(self, host):
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+    def iframe_url(self, soup, url):
+        """본문이 iframe 안에 있는 프레임셋이면 iframe 주소 (기본: 없음)"""
+        return None
+
+    @property
+    def preferred(self):
+        preferred = self._preferred
+        if preferred and preferred[1] > time.monotonic():
+            return preferred[0]
+        return None
+
+    def plan(self, url):
+        """
+        시도할 (전략, 요청 URL) 목록. 최근 성공한 전략을 맨 앞에 둡니다.
+        """
+        candidates = [(strategy, target) for strategy in self.strategies if (target := strategy.target(url))]
+        preferred = self.preferred
+        if preferred:
+            candidates.sort(key=lambda candidate: candidate[0].name != preferred)
+        return candidates
+
+    def record(self, strategy, ok):
+        """전략 결과를 기록합니다. 성공하면 이후 호출에서 그 전략을 먼저 시도합니다."""
+        with self._lock:
+            counts = self.stats.setdefault(strategy.name, {"ok": 0, "failed": 0})
+            counts["ok" if ok else "failed"] += 1
+            if ok:
+                if self.preferred != strategy.name:
+                    logger.info(f"🧭 {self.name} 어댑터: '{strategy.name}' 전략을 우선 사용")
+                self._preferred = (strategy.name, time.monotonic() + SITE_ADAPTER_PREFERENCE_TTL)
+            elif self.preferred == strategy.name:
+                self._preferred = None
+
+
+# ---- 네이버 블로그 ----
+
+_NAVER_BLOG_HOSTS = ("blog.naver.com", "m.blog.naver.com")
+_NAVER_POST_PATH = re.compile(r"^/([A-Za-z0-9_-]+)/(\d+)/?$")
+
+
+def parse_naver_post(url):
+    """네이버 블로그 글 URL에서 (blogId, logNo) 추출 (글 주소가 아니면 None)"""
+    parts = urlsplit(url)
+    if (parts.hostname or "").lower() not in _NAVER_BLOG_HOSTS:
+        return None
+    if match := _NAVER_POST_PATH.match(parts.path):
+        return match.group(1), match.group(2)
+    if parts.path.startswith("/PostView"):
+        query = parse_qs(parts.query)
+        blog_id, log_no = query.get("blogId", [""])[0], query.get("logNo", [""])[0]
+        if blog_id and log_no.isdigit():
+            return blog_id, log_no
+    return None
+
+
+def _naver_postview_url(url):
+    if post := parse_naver_post(url):
+        # 프레임셋 iframe과 같은 주소 (캐시 키도 같아짐)
+        return f"https://blog.naver.com/PostView.naver?blogId={post[0]}&logNo={post[1]}&redirect=Dlog&widgetTypeCall=true"
+    return None
+
+
+def _naver_mobile_url(url):
+    if post := parse_naver_post(url):
+        return f"https://m.blog.naver.com/{post[0]}/{post[1]}"
+    return None
+
+
+def _naver_frameset_url(url):
+    # 글 주소로 바꿀 수 없는 URL만 원래 주소로 (iframe 따라가기)
+    return None if parse_naver_post(url) else url
+
+
+class NaverBlogAdapter(SiteAdapter):
+    name = "naver_blog"
+    domains = ("blog.naver.com",)
+    strategies = (
+        FetchStrategy("postview", HTTP, _naver_postview_url),
+        FetchStrategy("mobile", HTTP, _naver_mobile_url),
+        FetchStrategy("frameset", HTTP, _naver_frameset_url),
+        FetchStrategy("browser", BROWSER),
+    )
+    body_selectors = (
+        'div.se-main-container',
+        'div#postListBody',
+        'div.post-body',
+        'div.se-viewer',
+        'div.se-component',
+        'div[role="main"]',
+        'article',
+        'div#viewTypeSelector',  # 모바일 구 에디터
+    )
+    json_ld_body = True
+    cache_ttl = 24 * 3600  # 블로그 글은 거의 바뀌지 않음
+
+    def iframe_url(self, soup, url):
+        # 데스크톱 프레임셋(blog.naver.com의 글 주소가 아닌 URL)의 본문 iframe#mainFrame만 따라감
+        # (모바일 페이지나 글 본문 안의 광고/임베드 iframe은 무시)
+        if (urlsplit(url).hostname or "").lower() != "blog.naver.com" or parse_naver_post(url):
+            return None
+        iframe = soup.select_one('iframe#mainFrame')
+        if not iframe or not iframe.get('src'):
+            return None
+        src = iframe.get('src')
+        # 상대 경로를 절대 경로로 변환
+        return 'https://blog.naver.com' + src if src.startswith('/') else src
+
+
+# ---- 레지스트리 ----
+
+DEFAULT_ADAPTER = SiteAdapter()
+_ADAPTERS = []
+
+
+def register_adapter(adapter):
+    """어댑터 등록 (나중에 등록한 어댑터가 우선)"""
+    _ADAPTERS.insert(0, adapter)
+    return adapter
+
+
+def adapter_for(url):
+    host = (urlsplit(url).hostname or "").lower()
+    for adapter in _ADAPTERS:
+        if adapter.matches(host):
+            return adapter
+    return DEFAULT_ADAPTER
+
+
+def adapter_stats():
+    """어댑터별 우선 전략과 전략별 성공/실패 횟수"""
+    return {
+        adapter.name: {"preferred": adapter.preferred, "strategies": dict(adapter.stats)}
+        for adapter in [*_ADAPTERS, DEFAULT_ADAPTER]
+    }
+
+
+register_adapter(NaverBlogAdapter())
@@ -4,7 +4,9 @@ import json
 import io
 import os
 import hashlib
-from datetime import datetime, timezone
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from PIL import Image
 import time
 
@@ -16,6 +18,60 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# 이미지 업로드 캐시: 콘텐츠 해시 → 공개 URL (diskcache, 프로세스/Streamlit 세션 간 공유)
+# 같은 이미지를 다시 보내거나 세션을 다시 저장할 때 스토리지 업로드를 건너뜀
+IMAGE_URL_INDEX_DIR = os.environ.get("IMAGE_URL_INDEX_DIR", "api_cache")
+IMAGE_URL_INDEX_TTL = int(os.environ.get("IMAGE_URL_INDEX_TTL", str(30 * 86400)))
+
+_image_url_index = None
+_image_url_index_lock = threading.Lock()
+image_upload_stats = {"index_hits": 0, "uploads": 0}
+
+
+def _get_image_url_index():
+    """해시 → URL 인덱스 (diskcache를 쓸 수 없으면 프로세스 메모리 dict)"""
+    global _image_url_index
+    if _image_url_index is None:
+        with _image_url_index_lock:
+            if _image_url_index is None:
+                try:
+                    from diskcache import Cache
+                    _image_url_index = Cache(IMAGE_URL_INDEX_DIR)
+                except Exception as e:
+                    logger.warning(f"⚠️ 이미지 URL 인덱스 디스크 캐시 초기화 실패, 메모리 사용: {e}")
+                    _image_url_index = {}
+    return _image_url_index
+
+
+def _image_index_key(bucket_name, user_id, image_hash):
+    # 확장자는 키에서 제외 (같은 내용이 다른 이름/타입으로 들어와도 재사용)
+    return f"image_url:{bucket_name}:{user_id or 'shared'}:{image_hash}"
+
+
+def _lookup_image_url_by_key(key):
+    try:
+        return _get_image_url_index().get(key)
+    except Exception as e:
+        logger.warning(f"⚠️ 이미지 URL 인덱스 조회 실패: {e}")
+        return None
+
+
+def lookup_image_url(file_bytes, bucket_name="chat-images", user_id=None):
+    """이미 업로드된 이미지면 공개 URL을, 아니면 None을 반환합니다 (스토리지 호출 없음)."""
+    return _lookup_image_url_by_key(_image_index_key(bucket_name, user_id, hashlib.md5(file_bytes).hexdigest()))
+
+
+def _remember_image_url(key, url):
+    index = _get_image_url_index()
+    try:
+        if isinstance(index, dict):
+            index[key] = url
+        else:
+            index.set(key, url, expire=IMAGE_URL_INDEX_TTL)
+    except Exception as e:
+        logger.warning(f"⚠️ 이미지 URL 인덱스 저장 실패: {e}")
+
+
 def upload_image_to_supabase(image_file, supabase_client, bucket_name="chat-images", user_id=None):
     try:
         debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
@@ -48,6 +104,14 @@ def upload_image_to_supabase(image_file, supabase_client, bucket_name="chat-imag
         
         logger.info(f"업로드할 파일명: {hash_filename}")
         
+        # 해시 → URL 인덱스 확인 (이미 업로드된 이미지는 업로드 생략)
+        index_key = _image_index_key(bucket_name, user_id, image_hash)
+        cached_url = _lookup_image_url_by_key(index_key)
+        if cached_url:
+            image_upload_stats["index_hits"] += 1
+            logger.info(f"♻️ 이미지 업로드 생략 (해시 인덱스 적중): {hash_filename}")
+            return cached_url
+        
         # 수정된 업로드 옵션 (upsert를 문자열로 변경)
         upload_options = {
             "content-type": content_type, 
@@ -84,6 +148,8 @@ def upload_image_to_supabase(image_file, supabase_client, bucket_name="chat-imag
                         t1_url = time.perf_counter()
                         logger.info(f"TIMING: supabase.storage.get_public_url({bucket_name}/{hash_filename}) took {t1_url - t0_url:.4f}s")
                     logger.info(f"업로드 성공, URL: {image_url}")
+                    image_upload_stats["uploads"] += 1
+                    _remember_image_url(index_key, image_url)
                     return image_url
                 except Exception as url_error:
                     logger.error(f"URL 생성 실패: {url_error}")
@@ -149,15 +215,206 @@ def upload_pdf_to_supabase(pdf_file, supabase_client, bucket_name="chat-pdfs"):
         logger.error(f"PDF 업로드 실패: {str(e)}")
         return None
 
-def save_chat_history_to_supabase(supabase_client, user_id, session_id, messages):
+# 채팅 이력 저장: (session_id, turn_index) 키로 새 턴/변경된 턴만 upsert
+# (supabase/migrations/20261018000000_chat_history_turn_index.sql 적용 필요)
+# CHAT_HISTORY_INCREMENTAL=0 이면 기존처럼 세션 전체를 지우고 다시 씀
+CHAT_HISTORY_INCREMENTAL = os.environ.get("CHAT_HISTORY_INCREMENTAL", "1") == "1"
+CHAT_HISTORY_CONFLICT_KEY = "session_id,turn_index"
+
+# 세션 로드 시 처음 가져올 최근 턴 수 (이전 턴은 요청 시 페이지 단위로 로드)
+LOAD_SESSION_PAGE_TURNS = int(os.environ.get("LOAD_SESSION_PAGE_TURNS", "20"))
+CHAT_HISTORY_COLUMNS = "turn_index, question, answer, images, time_taken, created_at"
+# 내보내기 시 한 번에 조회할 턴 수
+EXPORT_PAGE_TURNS = 200
+
+# 세션별로 Supabase에 저장된 턴 지문 ({turn_index: 지문}), 최근 사용한 세션만 보관 (LRU)
+# 밀려난 세션은 다음 저장에서 전체 upsert (저장 상태를 모르는 세션과 같음)
+PERSISTED_TURNS_MAX = 256
+_persisted_turns = OrderedDict()
+_persisted_turns_lock = threading.Lock()
+
+
+def turn_fingerprint(row):
+    """저장 행의 내용 지문 (created_at 등 메타데이터 제외)"""
+    payload = json.dumps(
+        [row.get("question"), row.get("answer"), float(row.get("time_taken") or 0.0), row.get("images") or None],
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def remember_persisted_turns(session_id, rows, first_turn_index=0, replace=True):
+    """
+    Supabase에 저장된(또는 로드된) 턴들의 지문을 기록합니다.
+
+    Args:
+        rows: turn_index 순서의 chat_history 행 목록
+        first_turn_index: rows[0]의 turn_index (행에 turn_index가 없을 때 사용)
+        replace: False면 기존 기록에 합침 (이전 턴 페이지 로드)
+    """
+    fingerprints = {}
+    for i, row in enumerate(rows):
+        turn_index = row.get("turn_index")
+        fingerprints[first_turn_index + i if turn_index is None else turn_index] = turn_fingerprint(row)
+    with _persisted_turns_lock:
+        if replace or session_id not in _persisted_turns:
+            _store_persisted_turns(session_id, fingerprints)
+        else:
+            _persisted_turns[session_id].update(fingerprints)
+            _persisted_turns.move_to_end(session_id)
+
+
+def _store_persisted_turns(session_id, fingerprints):
+    """세션의 턴 지문 기록을 교체하고 오래된 세션 기록을 밀어냅니다 (_persisted_turns_lock 안에서 호출)."""
+    _persisted_turns[session_id] = fingerprints
+    _persisted_turns.move_to_end(session_id)
+    while len(_persisted_turns) > PERSISTED_TURNS_MAX:
+        _persisted_turns.popitem(last=False)
+
+
+def forget_persisted_turns(session_id):
+    """세션의 저장 상태 기록을 지웁니다 (세션 삭제 시)."""
+    with _persisted_turns_lock:
+        _persisted_turns.pop(session_id, None)
+
+
+def build_chat_history_rows(user_id, session_id, messages, first_turn_index=0):
+    """
+    메시지 목록을 질문-답변 쌍 행 목록으로 변환합니다.
+
+    Args:
+        first_turn_index: messages 첫 턴의 turn_index (최근 턴만 로드한 세션은 0보다 큼)
+
+    Returns:
+        turn_index가 first_turn_index부터 매겨진 chat_history 행 목록 (created_at 제외)
+    """
+    rows = []
+    current_question = None
+    current_question_images = None
+
+    for msg in messages:
+        if msg.get("role") == "user":
+            # 사용자 메시지 (질문)
+            current_question = msg.get("content", "")
+            current_question_images = msg.get("images", []) if "images" in msg else []
+        elif msg.get("role") == "assistant" and current_question is not None:
+            # AI 메시지 (답변) - 질문과 함께 저장
+            # 이미지는 URL 문자열만 저장 (이진 데이터는 업로드 후 URL로 바뀐 상태여야 함)
+            image_urls = [img for img in (current_question_images or []) if isinstance(img, str)]
+            rows.append({
+                "user_id": user_id,
+                "session_id": session_id,
+                "turn_index": first_turn_index + len(rows),
+                "question": current_question,
+                "answer": msg.get("content", ""),
+                "time_taken": msg.get("time_taken", 0.0),  # Gemini 응답 생성 시간 (초)
+                # 일괄 upsert는 모든 행의 키가 같아야 하므로 이미지가 없으면 None
+                "images": image_urls or None,
+            })
+
+            # 현재 질문 초기화
+            current_question = None
+            current_question_images = None
+
+    return rows
+
+
+def created_at_sequence(count):
+    """한 번에 삽입하는 행들의 created_at (생성일 정렬 순서가 턴 순서와 같도록 1µs씩 증가)"""
+    base = datetime.now(timezone.utc)
+    return [(base + timedelta(microseconds=i)).isoformat() for i in range(count)]
+
+
+def _save_chat_history_full(supabase_client, user_id, session_id, messages, debug_timings):
+    """기존 방식: 세션 전체 삭제 후 한 번에 다시 삽입 (CHAT_HISTORY_INCREMENTAL=0)"""
+    t_del0 = time.perf_counter() if debug_timings else None
+    supabase_client.table("chat_history").delete().eq("session_id", session_id).execute()
+    if debug_timings:
+        logger.info(f"TIMING: supabase.table.delete chat_history for {session_id} took {time.perf_counter() - t_del0:.4f}s")
+
+    rows = build_chat_history_rows(user_id, session_id, messages)
+    if rows:
+        for row, created_at in zip(rows, created_at_sequence(len(rows))):
+            row.pop("turn_index", None)
+            row["created_at"] = created_at
+        t_ins0 = time.perf_counter() if debug_timings else None
+        supabase_client.table("chat_history").insert(rows).execute()
+        if debug_timings:
+            logger.info(f"TIMING: supabase.table.insert chat_history x{len(rows)} for {session_id} took {time.perf_counter() - t_ins0:.4f}s")
+
+
+def _save_chat_history_incremental(supabase_client, user_id, session_id, messages, first_turn_index, debug_timings):
+    """저장된 턴 지문과 비교하여 새 턴/변경된 턴만 upsert하고, 사라진 뒤쪽 턴은 삭제"""
+    rows = build_chat_history_rows(user_id, session_id, messages, first_turn_index)
+    fingerprints = {row["turn_index"]: turn_fingerprint(row) for row in rows}
+    end_turn_index = first_turn_index + len(rows)
+    with _persisted_turns_lock:
+        stored = _persisted_turns.get(session_id)
+        if stored is not None:
+            _persisted_turns.move_to_end(session_id)
+            stored = dict(stored)
+
+    if stored is None:
+        # 저장 상태를 모르는 세션 (앱 재시작, LRU에서 밀려남 등): 전체를 한 번에 upsert (멱등)
+        new_rows, changed_rows, stale_from = rows, [], None
+        stored = {}
+    else:
+        new_rows = [row for row in rows if row["turn_index"] not in stored]
+        changed_rows = [
+            row for row in rows
+            if row["turn_index"] in stored and stored[row["turn_index"]] != fingerprints[row["turn_index"]]
+        ]
+        stale_from = end_turn_index if any(idx >= end_turn_index for idx in stored) else None
+
+    table = supabase_client.table("chat_history")
+    if stale_from is not None:
+        t0 = time.perf_counter() if debug_timings else None
+        table.delete().eq("session_id", session_id).gte("turn_index", stale_from).execute()
+        if debug_timings:
+            logger.info(f"TIMING: supabase.table.delete chat_history turn>={stale_from} for {session_id} took {time.perf_counter() - t0:.4f}s")
+
+    if new_rows:
+        payload = [
+            dict(row, created_at=created_at)
+            for row, created_at in zip(new_rows, created_at_sequence(len(new_rows)))
+        ]
+        t0 = time.perf_counter() if debug_timings else None
+        # 재시도 시 중복 행이 생기지 않도록 insert 대신 upsert
+        table.upsert(payload, on_conflict=CHAT_HISTORY_CONFLICT_KEY).execute()
+        if debug_timings:
+            logger.info(f"TIMING: supabase.table.upsert chat_history new x{len(new_rows)} for {session_id} took {time.perf_counter() - t0:.4f}s")
+
+    if changed_rows:
+        # 수정된 턴은 created_at을 유지 (정렬 순서 보존)
+        t0 = time.perf_counter() if debug_timings else None
+        table.upsert(changed_rows, on_conflict=CHAT_HISTORY_CONFLICT_KEY).execute()
+        if debug_timings:
+            logger.info(f"TIMING: supabase.table.upsert chat_history changed x{len(changed_rows)} for {session_id} took {time.perf_counter() - t0:.4f}s")
+
+    if not (new_rows or changed_rows or stale_from is not None):
+        logger.debug(f"채팅 이력 변경 없음, 저장 생략: 세션 ID {session_id}")
+
+    # 메모리에 로드되지 않은 이전 턴의 기록은 유지
+    persisted = {idx: fp for idx, fp in stored.items() if idx < first_turn_index}
+    persisted.update(fingerprints)
+    with _persisted_turns_lock:
+        _store_persisted_turns(session_id, persisted)
+
+
+def save_chat_history_to_supabase(supabase_client, user_id, session_id, messages, first_turn_index=0):
     """
     채팅 이력을 Supabase에 저장
     
+    이미 저장된 턴은 건너뛰고 새 턴은 한 번의 일괄 upsert로, 수정된 턴은
+    (session_id, turn_index) 키 upsert로 저장합니다.
+    
     Args:
         supabase_client: Supabase 클라이언트 인스턴스
         user_id: 사용자 ID
         session_id: 채팅 세션 ID
         messages: 메시지 목록
+        first_turn_index: messages 첫 턴의 turn_index (최근 턴만 로드한 세션)
         
     Returns:
         success: 저장 성공 여부
@@ -165,53 +422,10 @@ def save_chat_history_to_supabase(supabase_client, user_id, session_id, messages
     try:
         debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
         t_total0 = time.perf_counter() if debug_timings else None
-        # 기존 채팅 이력 삭제 후 재생성 (업데이트 대신 덮어쓰기 방식)
-        t_del0 = time.perf_counter() if debug_timings else None
-        supabase_client.table("chat_history").delete().eq("session_id", session_id).execute()
-        if debug_timings:
-            t_del1 = time.perf_counter()
-            logger.info(f"TIMING: supabase.table.delete chat_history for {session_id} took {t_del1 - t_del0:.4f}s")
-        
-        # 메시지들을 질문-답변 쌍으로 그룹화
-        current_question = None
-        current_question_images = None
-        
-        for msg in messages:
-            if msg.get("role") == "user":
-                # 사용자 메시지 (질문)
-                current_question = msg.get("content", "")
-                current_question_images = msg.get("images", []) if "images" in msg else []
-            elif msg.get("role") == "assistant" and current_question is not None:
-                # AI 메시지 (답변) - 질문과 함께 저장
-                message_data = {
-                    "user_id": user_id,
-                    "session_id": session_id,
-                    "question": current_question,
-                    "answer": msg.get("content", ""),
-                    "time_taken": 0.0,  # 현재는 시간 측정 안함
-                    "created_at": datetime.now(timezone.utc).isoformat()
-                }
-                
-                # 이미지가 있는 경우 URL 배열로 저장
-                if current_question_images:
-                    image_urls = []
-                    for img_data in current_question_images:
-                        # 이미 URL 문자열인 경우 그대로 사용
-                        if isinstance(img_data, str):
-                            image_urls.append(img_data)
-                    if image_urls:
-                        message_data["images"] = image_urls
-                
-                # Supabase에 질문-답변 쌍 저장
-                t_ins0 = time.perf_counter() if debug_timings else None
-                supabase_client.table("chat_history").insert(message_data).execute()
-                if debug_timings:
-                    t_ins1 = time.perf_counter()
-                    logger.info(f"TIMING: supabase.table.insert chat_history for {session_id} took {t_ins1 - t_ins0:.4f}s")
-                
-                # 현재 질문 초기화
-                current_question = None
-                current_question_images = None
+        if CHAT_HISTORY_INCREMENTAL:
+            _save_chat_history_incremental(supabase_client, user_id, session_id, messages, first_turn_index, debug_timings)
+        else:
+            _save_chat_history_full(supabase_client, user_id, session_id, messages, debug_timings)
             
         if debug_timings:
             t_total1 = time.perf_counter()
@@ -220,12 +434,40 @@ def save_chat_history_to_supabase(supabase_client, user_id, session_id, messages
         return True
     
     except Exception as e:
+        # 실패한 저장은 서버 상태를 알 수 없으므로 다음 저장에서 전체 upsert
+        forget_persisted_turns(session_id)
         logger.error(f"채팅 이력 저장 실패: {str(e)}")
         return False
 
+def rows_to_messages(rows):
+    """chat_history 행 목록을 질문/답변 메시지 목록으로 변환"""
+    messages = []
+    for item in rows:
+        # 질문 메시지 추가
+        user_message = {
+            "role": "user",
+            "content": item["question"]
+        }
+        
+        # 이미지가 있는 경우 추가
+        if item.get("images") and item["images"]:
+            user_message["images"] = item["images"]  # URL 배열
+        
+        messages.append(user_message)
+        
+        # 답변 메시지 추가
+        assistant_message = {
+            "role": "assistant",
+            "content": item["answer"]
+        }
+        if item.get("time_taken") is not None:
+            assistant_message["time_taken"] = item["time_taken"]
+        messages.append(assistant_message)
+    return messages
+
 def load_chat_history_from_supabase(supabase_client, session_id):
     """
-    Supabase에서 채팅 이력을 불러옴
+    Supabase에서 채팅 이력 전체를 불러옴 (내보내기 등)
     
     Args:
         supabase_client: Supabase 클라이언트 인스턴스
@@ -235,42 +477,111 @@ def load_chat_history_from_supabase(supabase_client, session_id):
         messages: 메시지 목록
     """
     try:
-        # 채팅 이력 조회 (생성일 순으로 정렬)
-        response = supabase_client.table("chat_history") \
-            .select("*") \
-            .eq("session_id", session_id) \
-            .order("created_at") \
-            .execute()
-            
-        messages = []
-        if response.data:
-            for item in response.data:
-                # 질문 메시지 추가
-                user_message = {
-                    "role": "user",
-                    "content": item["question"]
-                }
-                
-                # 이미지가 있는 경우 추가
-                if item.get("images") and item["images"]:
-                    user_message["images"] = item["images"]  # URL 배열
-                
-                messages.append(user_message)
-                
-                # 답변 메시지 추가
-                assistant_message = {
-                    "role": "assistant",
-                    "content": item["answer"]
-                }
-                messages.append(assistant_message)
-        
-        logger.info(f"채팅 이력 로드 성공: 세션 ID {session_id}, QA 쌍 수 {len(response.data) if response.data else 0}")
+        # 채팅 이력 조회 (턴 순서, 생성일 순으로 정렬)
+        query = supabase_client.table("chat_history") \
+            .select(CHAT_HISTORY_COLUMNS if CHAT_HISTORY_INCREMENTAL else "*") \
+            .eq("session_id", session_id)
+        if CHAT_HISTORY_INCREMENTAL:
+            query = query.order("turn_index")
+        response = query.order("created_at").execute()
+        rows = response.data or []
+        messages = rows_to_messages(rows)
+        
+        # 로드한 턴은 이미 저장된 것으로 기록 (다음 저장에서 새 턴만 전송)
+        remember_persisted_turns(session_id, rows)
+        
+        logger.info(f"채팅 이력 로드 성공: 세션 ID {session_id}, QA 쌍 수 {len(rows)}")
         return messages
     
     except Exception as e:
         logger.error(f"채팅 이력 로드 실패: {str(e)}")
         return []
 
+def fetch_chat_history_page(supabase_client, session_id, before_turn=None, limit=LOAD_SESSION_PAGE_TURNS):
+    """세션의 최근 턴 행 한 페이지를 turn_index 오름차순으로 조회 (필요한 컬럼만)"""
+    query = supabase_client.table("chat_history") \
+        .select(CHAT_HISTORY_COLUMNS) \
+        .eq("session_id", session_id)
+    if before_turn is not None:
+        query = query.lt("turn_index", before_turn)
+    response = query \
+        .order("turn_index", desc=True) \
+        .limit(limit) \
+        .execute()
+    return list(reversed(response.data or []))
+
+def iter_chat_history_pages(supabase_client, session_id, before_turn=None, page_size=EXPORT_PAGE_TURNS):
+    """
+    세션의 턴을 turn_index 오름차순으로 페이지 단위로 조회 (내보내기용, 키셋 페이지네이션)
+    
+    Args:
+        before_turn: 이 turn_index 이전 턴만 조회 (None이면 전체)
+        page_size: 한 번에 조회할 턴 수
+        
+    Yields:
+        메시지 목록 (페이지 단위)
+    """
+    if not CHAT_HISTORY_INCREMENTAL:
+        # turn_index가 없는 기존 저장 방식은 전체 로드
+        yield load_chat_history_from_supabase(supabase_client, session_id)
+        return
+    
+    after_turn = -1
+    while True:
+        query = supabase_client.table("chat_history") \
+            .select(CHAT_HISTORY_COLUMNS) \
+            .eq("session_id", session_id) \
+            .gt("turn_index", after_turn)
+        if before_turn is not None:
+            query = query.lt("turn_index", before_turn)
+        rows = query.order("turn_index").limit(page_size).execute().data or []
+        if not rows:
+            return
+        yield rows_to_messages(rows)
+        if len(rows) < page_size:
+            return
+        after_turn = rows[-1]["turn_index"]
+
+def load_chat_history_page_from_supabase(supabase_client, session_id, before_turn=None, limit=LOAD_SESSION_PAGE_TURNS, on_rows=None):
+    """
+    Supabase에서 채팅 이력의 최근 턴 한 페이지를 불러옴 (필요한 컬럼만 조회)
+    
+    Args:
+        supabase_client: Supabase 클라이언트 인스턴스
+        session_id: 채팅 세션 ID
+        before_turn: 이 turn_index 이전 턴만 조회 (None이면 가장 최근 턴부터)
+        limit: 가져올 최대 턴 수
+        on_rows: 조회한 행 목록을 받을 함수 (로컬 미러 기록 등, 선택)
+        
+    Returns:
+        (messages, first_turn_index, has_more): 메시지 목록, 첫 턴의 turn_index,
+        더 이전 턴이 남아 있는지 여부
+    """
+    if not CHAT_HISTORY_INCREMENTAL:
+        # turn_index가 없는 기존 저장 방식은 세션 전체 재작성이므로 전체 로드
+        return load_chat_history_from_supabase(supabase_client, session_id), 0, False
+    
+    try:
+        rows = fetch_chat_history_page(supabase_client, session_id, before_turn, limit)
+        if on_rows is not None and rows:
+            on_rows(rows)
+        first_turn_index = rows[0]["turn_index"] if rows else (before_turn or 0)
+        messages = rows_to_messages(rows)
+        
+        # 로드한 턴은 이미 저장된 것으로 기록 (이전 페이지는 기존 기록에 합침)
+        remember_persisted_turns(session_id, rows, first_turn_index, replace=before_turn is None)
+        
+        logger.info(
+            f"채팅 이력 페이지 로드 성공: 세션 ID {session_id}, "
+            f"턴 {first_turn_index}~{first_turn_index + len(rows) - 1}"
+        )
+        # turn_index는 0부터 연속이므로 첫 턴이 0보다 크면 이전 턴이 남아 있음
+        return messages, first_turn_index, first_turn_index > 0
+    
+    except Exception as e:
+        logger.error(f"채팅 이력 페이지 로드 실패: {str(e)}")
+        return [], before_turn or 0, False
+
 def get_chat_sessions_from_supabase(supabase_client, user_id):
     """
     Supabase에서 사용자의 채팅 세션 목록을 가져옴
@@ -348,4 +659,86 @@ def get_chat_sessions_from_supabase(supabase_client, user_id):
     
     except Exception as e:
         logger.error(f"채팅 세션 목록 조회 실패: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+
+# 세션 목록: chat_sessions 요약 테이블을 (last_updated, id) 키셋 페이지네이션으로 조회
+# (supabase/migrations/20261018000100_chat_sessions_index.sql 적용 필요)
+# CHAT_SESSION_INDEX=0 이면 기존처럼 chat_history 전체를 읽어 세션을 묶음
+CHAT_SESSION_INDEX = os.environ.get("CHAT_SESSION_INDEX", "1") == "1"
+SESSION_PAGE_SIZE = int(os.environ.get("SESSION_PAGE_SIZE", "10"))
+
+
+def _parse_timestamp(value):
+    """Supabase 타임스탬프(ISO 문자열 또는 datetime)를 UTC datetime으로 변환"""
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00')) if isinstance(value, str) else value
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+    except (ValueError, AttributeError):
+        return datetime.now(timezone.utc)
+
+
+def _session_keyset_filter(cursor):
+    """(last_updated, id) < 커서 조건을 PostgREST or 필터로 변환"""
+    last_updated, session_id = cursor
+    return (
+        f'last_updated.lt."{last_updated}",'
+        f'and(last_updated.eq."{last_updated}",id.lt."{session_id}")'
+    )
+
+
+def get_chat_sessions_page_from_supabase(supabase_client, user_id, cursor=None, limit=SESSION_PAGE_SIZE):
+    """
+    Supabase 세션 요약 테이블에서 최근 업데이트 순으로 세션 한 페이지를 가져옴
+    
+    Args:
+        supabase_client: Supabase 클라이언트 인스턴스
+        user_id: 사용자 ID
+        cursor: 이전 페이지가 돌려준 다음 페이지 커서 (첫 페이지는 None)
+        limit: 페이지 크기
+        
+    Returns:
+        (sessions, next_cursor): 세션 목록과 다음 페이지 커서 (마지막 페이지면 None)
+    """
+    if not CHAT_SESSION_INDEX:
+        return get_chat_sessions_from_supabase(supabase_client, user_id), None
+    
+    try:
+        query = supabase_client.table("chat_sessions") \
+            .select("id, title, created_at, last_updated, turn_count") \
+            .eq("user_id", user_id)
+        if cursor:
+            query = query.or_(_session_keyset_filter(cursor))
+        # 다음 페이지 존재 여부를 알기 위해 한 행 더 조회
+        response = query \
+            .order("last_updated", desc=True) \
+            .order("id", desc=True) \
+            .limit(limit + 1) \
+            .execute()
+        
+        rows = response.data or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        sessions = []
+        for item in rows:
+            question = item.get("title") or ""
+            sessions.append({
+                "id": item["id"],
+                "title": question[:30] + "..." if len(question) > 30 else question,
+                "created_at": _parse_timestamp(item["created_at"]),
+                "last_updated": _parse_timestamp(item["last_updated"]),
+                "turn_count": item.get("turn_count", 0),
+            })
+        
+        # 커서는 서버가 준 타임스탬프 문자열 그대로 사용 (정밀도 손실 방지)
+        next_cursor = (rows[-1]["last_updated"], rows[-1]["id"]) if has_more and rows else None
+        logger.info(f"채팅 세션 페이지 조회 성공: 사용자 ID {user_id}, 세션 수 {len(sessions)}, 다음 페이지 {'있음' if next_cursor else '없음'}")
+        return sessions, next_cursor
+    
+    except Exception as e:
+        # 요약 테이블이 아직 없는 경우 (마이그레이션 미적용) 기존 방식으로 대체
+        logger.warning(f"⚠️ 세션 요약 조회 실패, 전체 이력 조회로 대체: {str(e)}")
+        return get_chat_sessions_from_supabase(supabase_client, user_id), None
@@ -0,0 +1,101 @@
+# config/streaming.py
+# Gemini 응답 토큰 스트리밍 및 턴별 지연 시간 지표 (TTFT / 전체 생성 시간)
+
+import logging
+import os
+import time
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# 세션별로 보관할 최근 턴 지표 개수
+MAX_TURN_METRICS = 50
+
+
+def is_streaming_enabled() -> bool:
+    """스트리밍 모드 여부 (GEMINI_STREAMING=0 으로 비활성화)"""
+    return os.environ.get("GEMINI_STREAMING", "1") == "1"
+
+
+def _chunk_text(chunk) -> str:
+    """스트림 청크에서 텍스트만 안전하게 꺼냅니다 (안전 필터 등으로 빈 청크 가능)."""
+    try:
+        return chunk.text or ""
+    except (ValueError, AttributeError):
+        return ""
+
+
+def record_turn_metrics(kind: str, ttft: float, total: float, chars: int, chunks: int, streamed: bool) -> dict:
+    """턴 지표를 세션 상태에 기록하고 반환합니다."""
+    metrics = {
+        "kind": kind,
+        "ttft": round(ttft, 4) if ttft is not None else None,
+        "total": round(total, 4),
+        "chars": chars,
+        "chunks": chunks,
+        "streamed": streamed,
+    }
+    try:
+        history = st.session_state.get("turn_metrics", [])
+        history.append(metrics)
+        st.session_state.turn_metrics = history[-MAX_TURN_METRICS:]
+        st.session_state.last_turn_metrics = metrics
+    except Exception:
+        # Streamlit 실행 컨텍스트 밖(배치 스크립트 등)에서는 로그만 남김
+        pass
+
+    ttft_text = f"{ttft:.3f}s" if ttft is not None else "n/a"
+    logger.info(f"TIMING: gemini[{kind}] ttft={ttft_text} total={total:.3f}s chars={chars} chunks={chunks} streamed={streamed}")
+    return metrics
+
+
+def send_message_with_metrics(chat_session, content, stream_target=None, kind="chat", as_chat_message=True) -> str:
+    """
+    채팅 세션에 메시지를 보내고 최종 텍스트를 반환합니다.
+
+    Args:
+        chat_session: Gemini ChatSession
+        content: 전송할 프롬프트 (문자열 또는 멀티파트 리스트)
+        stream_target: 청크를 렌더링할 Streamlit 컨테이너 (st.empty() 등).
+            None이거나 스트리밍이 비활성화된 경우 전체 응답을 기다립니다.
+        kind: 지표 구분용 이름 (pdf, webpage, youtube, image, chat ...)
+        as_chat_message: True면 assistant 말풍선 안에 스트리밍 (이미 말풍선 안이면 False)
+
+    Returns:
+        완성된 응답 텍스트 (chat_history/저장용)
+    """
+    t0 = time.perf_counter()
+
+    if stream_target is None or not is_streaming_enabled():
+        response = chat_session.send_message(content)
+        text = response.text
+        total = time.perf_counter() - t0
+        record_turn_metrics(kind, total, total, len(text), 1, streamed=False)
+        return text
+
+    response = chat_session.send_message(content, stream=True)
+    state = {"ttft": None, "chunks": 0}
+
+    def _iter_chunks():
+        for chunk in response:
+            piece = _chunk_text(chunk)
+            if not piece:
+                continue
+            if state["ttft"] is None:
+                state["ttft"] = time.perf_counter() - t0
+            state["chunks"] += 1
+            yield piece
+
+    with stream_target.container():
+        if as_chat_message:
+            with st.chat_message("assistant"):
+                written = st.write_stream(_iter_chunks())
+        else:
+            written = st.write_stream(_iter_chunks())
+
+    # write_stream은 문자열 청크만 받은 경우 합쳐진 문자열을 반환
+    text = written if isinstance(written, str) else "".join(str(w) for w in written or [])
+    total = time.perf_counter() - t0
+    record_turn_metrics(kind, state["ttft"], total, len(text), state["chunks"], streamed=True)
+    return text
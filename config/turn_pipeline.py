@@ -0,0 +1,248 @@
+# config/turn_pipeline.py
+# 턴 처리 단계를 의존성 그래프(DAG)로 실행하는 파이프라인 엔진
+#
+# - 각 단계는 이름, 함수, 의존 단계 목록, 타임아웃을 가집니다.
+# - 의존 단계가 모두 끝난 단계는 공유 스레드 풀에서 동시에 실행됩니다.
+# - 실패/타임아웃된 단계의 결과는 None으로 의존 단계에 전달됩니다.
+# - soft_deps는 "헤지" 시작용입니다: 의존 단계가 끝난 뒤 soft_deps가 끝나면 바로,
+#   soft_grace초 안에 끝나지 않으면 기다리지 않고 시작합니다
+#   (예: 날씨 API가 빨리 답하면 폴백 검색을 생략, 늦으면 검색을 동시에 시작).
+# - answers_turn 조건을 만족한 단계가 나오면(예: 날씨 API 성공) 아직 시작하지 않은
+#   단계는 취소하고, 실행 중인 단계는 기다리지 않고 결과를 버립니다.
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TURN_PIPELINE_MAX_WORKERS = int(os.environ.get("TURN_PIPELINE_MAX_WORKERS", "8"))
+DEFAULT_STAGE_TIMEOUT = 10.0
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_SKIPPED = "skipped"
+STATUS_CANCELLED = "cancelled"
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor():
+    """프로세스 전역 스레드 풀 (턴마다 스레드를 새로 만들지 않음)"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=TURN_PIPELINE_MAX_WORKERS,
+                    thread_name_prefix="turn-stage",
+                )
+    return _EXECUTOR
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    파이프라인 단계.
+
+    Attributes:
+        name: 단계 이름 (결과 키)
+        fn: 의존 단계 결과 dict를 받아 결과를 반환하는 함수
+        deps: 먼저 끝나야 하는 단계 이름들
+        timeout: 단계 타임아웃(초). 넘으면 결과 None, 상태 timeout
+        run_if: 의존 결과 dict를 받아 실행 여부를 판단 (False면 skipped)
+        answers_turn: 결과를 받아 이 단계가 턴의 답을 확정했는지 판단
+        soft_deps: 끝날 때까지 최대 soft_grace초만 기다리는 단계들
+            (끝났으면 결과가 의존 결과 dict에 들어가고, 아직이면 None)
+        soft_grace: soft_deps를 기다리는 최대 시간(초, deps가 끝난 시점부터)
+    """
+    name: str
+    fn: Callable[[dict], object]
+    deps: Tuple[str, ...] = ()
+    timeout: float = DEFAULT_STAGE_TIMEOUT
+    run_if: Optional[Callable[[dict], bool]] = None
+    answers_turn: Optional[Callable[[object], bool]] = None
+    soft_deps: Tuple[str, ...] = ()
+    soft_grace: float = 0.0
+
+
+@dataclass
+class PipelineResult:
+    """파이프라인 실행 결과"""
+    results: dict = field(default_factory=dict)
+    status: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    answered_by: Optional[str] = None
+    elapsed: float = 0.0
+
+    def get(self, name, default=None):
+        value = self.results.get(name)
+        return default if value is None else value
+
+
+class TurnPipeline:
+    """
+    단계 DAG를 검증하고 실행합니다.
+
+    Args:
+        stages: Stage 목록
+        name: 로그용 파이프라인 이름
+        thread_setup: 작업 스레드에서 단계 실행 직전에 호출할 함수
+            (예: Streamlit ScriptRunContext 연결)
+    """
+
+    def __init__(self, stages, name="turn", thread_setup=None):
+        self.name = name
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"중복된 단계 이름: {stage.name}")
+            self.stages[stage.name] = stage
+        self.thread_setup = thread_setup
+        self._validate()
+
+    def _validate(self):
+        """알 수 없는 의존성과 순환 의존성을 검사합니다."""
+        for stage in self.stages.values():
+            for dep in stage.deps + stage.soft_deps:
+                if dep not in self.stages:
+                    raise ValueError(f"단계 '{stage.name}'의 의존 단계 '{dep}'가 없습니다.")
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"순환 의존성: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps + self.stages[name].soft_deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _call(self, stage, dep_results):
+        if self.thread_setup is not None:
+            self.thread_setup()
+        return stage.fn(dep_results)
+
+    def run(self, timeout=None):
+        """
+        모든 단계를 실행합니다.
+
+        Args:
+            timeout: 파이프라인 전체 타임아웃(초, 선택)
+
+        Returns:
+            PipelineResult
+        """
+        t0 = time.perf_counter()
+        run = PipelineResult()
+        pending = dict(self.stages)
+        running = {}  # future -> (stage, started_at)
+        soft_deadlines = {}  # 이름 -> soft_deps를 기다리는 마감 시각
+        executor = _get_executor()
+
+        def finish(name, status, value=None, started=None):
+            run.status[name] = status
+            run.results[name] = value
+            if started is not None:
+                run.timings[name] = time.perf_counter() - started
+
+        while pending or running:
+            # 1) 의존성이 모두 끝난 단계 시작 (skip된 단계가 다른 단계를 풀어줄 수 있어 반복)
+            launched = True
+            while launched:
+                launched = False
+                for name, stage in list(pending.items()):
+                    if not all(dep in run.status for dep in stage.deps):
+                        continue
+                    if not all(dep in run.status for dep in stage.soft_deps):
+                        deadline = soft_deadlines.setdefault(name, time.perf_counter() + stage.soft_grace)
+                        if time.perf_counter() < deadline:
+                            continue
+                        logger.info(f"⏩ [{self.name}] {name}: {', '.join(stage.soft_deps)} 대기 {stage.soft_grace:.1f}s 초과, 먼저 시작")
+                    soft_deadlines.pop(name, None)
+                    del pending[name]
+                    launched = True
+                    dep_results = {dep: run.results.get(dep) for dep in stage.deps + stage.soft_deps}
+                    try:
+                        should_run = stage.run_if is None or stage.run_if(dep_results)
+                    except Exception as e:
+                        logger.warning(f"⚠️ [{self.name}] {name} run_if 오류: {e}")
+                        should_run = False
+                    if not should_run:
+                        finish(name, STATUS_SKIPPED)
+                        continue
+                    future = executor.submit(self._call, stage, dep_results)
+                    running[future] = (stage, time.perf_counter())
+
+            if not running and not soft_deadlines:
+                break
+
+            # 2) 가장 먼저 끝나는 단계, 가장 가까운 타임아웃 또는 soft_deps 대기 마감까지 대기
+            now = time.perf_counter()
+            deadlines = [started + stage.timeout for stage, started in running.values()]
+            deadlines.extend(soft_deadlines.values())
+            if timeout is not None:
+                deadlines.append(t0 + timeout)
+            wait_for = max(0.0, min(deadlines) - now)
+            if running:
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(wait_for)
+                done = ()
+
+            for future in done:
+                stage, started = running.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    logger.error(f"❌ [{self.name}] {stage.name} 단계 오류: {e}")
+                    finish(stage.name, STATUS_ERROR, None, started)
+                    continue
+                finish(stage.name, STATUS_OK, value, started)
+                if run.answered_by is None and stage.answers_turn is not None:
+                    try:
+                        if stage.answers_turn(value):
+                            run.answered_by = stage.name
+                    except Exception as e:
+                        logger.warning(f"⚠️ [{self.name}] {stage.name} answers_turn 오류: {e}")
+
+            # 3) 타임아웃 처리 (스레드는 강제 종료할 수 없으므로 결과만 버림)
+            now = time.perf_counter()
+            overall_expired = timeout is not None and now >= t0 + timeout
+            for future, (stage, started) in list(running.items()):
+                if overall_expired or now >= started + stage.timeout:
+                    future.cancel()
+                    del running[future]
+                    logger.warning(f"⏱️ [{self.name}] {stage.name} 단계 타임아웃 ({stage.timeout:.1f}s)")
+                    finish(stage.name, STATUS_TIMEOUT, None, started)
+
+            # 4) 턴의 답이 확정되면 나머지 단계 취소
+            if run.answered_by is not None or overall_expired:
+                for future, (stage, started) in running.items():
+                    future.cancel()
+                    finish(stage.name, STATUS_CANCELLED, None, started)
+                running.clear()
+                for name in pending:
+                    finish(name, STATUS_CANCELLED)
+                pending.clear()
+
+        run.elapsed = time.perf_counter() - t0
+        stage_times = ", ".join(
+            f"{name}={run.status.get(name)}:{run.timings[name]:.3f}s" if name in run.timings
+            else f"{name}={run.status.get(name)}"
+            for name in self.stages
+        )
+        answered = f" answered_by={run.answered_by}" if run.answered_by else ""
+        logger.info(f"TIMING: pipeline[{self.name}] total={run.elapsed:.3f}s{answered} ({stage_times})")
+        return run
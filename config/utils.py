@@ -491,22 +491,179 @@ from config.imports import *
 # Load environment variables
 from config.env import GEMINI_API_KEY
 
+from dataclasses import dataclass
+
+from config.http_client import (
+    BROWSER_HEADERS,
+    HTML_CONTENT_TYPES,
+    HTTP_MAX_HTML_BYTES,
+    HTTP_MAX_PDF_BYTES,
+    PDF_CONTENT_TYPES,
+    DownloadError,
+    http_client_stats,
+    http_download,
+)
+from config.html_extract import HTML_PARSER, default_metadata, extract_page
+from config.keyword_engine import keyword_trie_pattern
+from config.webpage_cache import WEBPAGE_NOT_FOUND, is_failure_text, is_not_found_text, webpage_cache
+from config.browser_pool import browser_pool
+from config.site_adapters import BROWSER, adapter_for
+
 # set logger
 import logging
 logger = logging.getLogger(__name__)
 
+WEBPAGE_MAX_CHARS = 25000  # 모델에 넘길 웹페이지 본문 최대 길이 (토큰 수 고려)
+PDF_MAX_CHARS = 15000  # 모델에 넘길 PDF 본문 최대 길이
+PLAYWRIGHT_CONTENT_SELECTORS = ['div.se-main-container', 'div.post-view', 'div#postListBody', 'article']  # 브라우저 폴백이 기다릴 본문 영역
+
+# =============================================================================
+# 요청 라우팅 (URL 1회 추출 + 사전 컴파일 패턴)
+# =============================================================================
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"]+|www\.[^\s<>"]+')
+
+YOUTUBE_URL_PATTERN = re.compile(
+    r'(?:https?://)?(?:(?:www\.)?youtube\.com/(?:watch\?v=|embed/|shorts/)|youtu\.be/)'  # Shorts 포함
+)
+
+YOUTUBE_VIDEO_ID_PATTERNS = [
+    re.compile(r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([^&\n?#]+)'),
+    re.compile(r'(?:https?://)?(?:www\.)?youtube\.com/embed/([^&\n?#]+)'),
+    re.compile(r'(?:https?://)?(?:www\.)?youtube\.com/v/([^&\n?#]+)'),
+    re.compile(r'(?:https?://)?youtu\.be/([^&\n?#]+)'),
+    re.compile(r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([^&\n?#]+)'),  # YouTube Shorts 패턴 추가
+]
+
+ARXIV_URL_PATTERN = re.compile(r'(?:https?://)?(?:www\.|export\.)?arxiv\.org/', re.IGNORECASE)
+NAVER_BLOG_URL_PATTERN = re.compile(r'(?:https?://)?(?:m\.)?blog\.naver\.com/', re.IGNORECASE)
+
+# URL 종류
+URL_KIND_YOUTUBE = "youtube"
+URL_KIND_PDF = "pdf"
+URL_KIND_ARXIV = "arxiv"
+URL_KIND_NAVER_BLOG = "naver_blog"
+URL_KIND_GENERIC = "generic"
+
+# 이미지 분석 키워드 (한국어/영어/스페인어)
+IMAGE_ANALYSIS_KEYWORDS = [
+    # 한국어
+    '분석', '설명', '알려줘', '무엇', '뭐', '어떤', '보여줘', '읽어줘', '해석', '분석해줘',
+    # 영어
+    'analyze', 'describe', 'explain', 'what', 'show', 'read', 'tell', 'see', 'image', 'picture', 'photo',
+    # 스페인어
+    'analizar', 'describir', 'explicar', 'qué', 'mostrar', 'leer', 'decir', 'ver',
+    'imagen', 'foto', 'picture', 'muestra', 'enseña', 'dice', 'contiene',
+    'puedes', 'podrías', 'ayuda', 'favor',
+]
+
+# PDF 분석 키워드 (한국어/영어/스페인어)
+PDF_ANALYSIS_KEYWORDS = [
+    # 한국어
+    '요약', '분석', '설명', '알려줘', '정리',
+    # 영어
+    'summarize', 'analyze', 'explain', 'describe', 'tell',
+    # 스페인어
+    'resumir', 'analizar', 'explicar', 'describir', 'decir',
+    'mostrar', 'ayuda', 'puedes', 'podrías',
+]
+
+
+def _compile_keyword_matcher(keywords: List[str]):
+    """부분 문자열 키워드 목록을 단일 트라이 패턴으로 컴파일"""
+    return re.compile(keyword_trie_pattern(keywords))
+
+
+IMAGE_ANALYSIS_MATCHER = _compile_keyword_matcher(IMAGE_ANALYSIS_KEYWORDS)
+PDF_ANALYSIS_MATCHER = _compile_keyword_matcher(PDF_ANALYSIS_KEYWORDS)
+# 두 키워드 집합을 합친 패턴: 대부분의 메시지(키워드 없음)는 한 번의 스캔으로 끝남
+ANALYSIS_KEYWORD_MATCHER = _compile_keyword_matcher(IMAGE_ANALYSIS_KEYWORDS + PDF_ANALYSIS_KEYWORDS)
+
+
+def classify_url(url: str) -> str:
+    """URL 종류 분류 (YouTube > PDF > arXiv > 네이버 블로그 > 일반)"""
+    if YOUTUBE_URL_PATTERN.match(url):
+        return URL_KIND_YOUTUBE
+    if is_pdf_url(url):
+        return URL_KIND_PDF
+    if ARXIV_URL_PATTERN.match(url):
+        return URL_KIND_ARXIV
+    if NAVER_BLOG_URL_PATTERN.match(url):
+        return URL_KIND_NAVER_BLOG
+    return URL_KIND_GENERIC
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """사용자 입력 1건에 대한 라우팅 결정 (입력은 한 번만 파싱)"""
+    urls: tuple = ()
+    url_kinds: tuple = ()
+    wants_pdf_analysis: bool = False
+    wants_image_analysis: bool = False
+
+    @property
+    def primary_url(self) -> Optional[str]:
+        """라우팅 기준이 되는 첫 번째 URL"""
+        return self.urls[0] if self.urls else None
+
+    @property
+    def primary_kind(self) -> Optional[str]:
+        return self.url_kinds[0] if self.url_kinds else None
+
+    @property
+    def is_youtube(self) -> bool:
+        return self.primary_kind == URL_KIND_YOUTUBE
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.primary_kind == URL_KIND_PDF
+
+    @property
+    def is_webpage(self) -> bool:
+        """PDF/YouTube가 아닌 URL (arXiv abs, 네이버 블로그, 일반 웹페이지)"""
+        return self.primary_kind in (URL_KIND_ARXIV, URL_KIND_NAVER_BLOG, URL_KIND_GENERIC)
+
+    def is_pdf_analysis(self, has_pdf: bool) -> bool:
+        """업로드된 PDF 또는 PDF URL에 대한 분석 요청인지"""
+        if not has_pdf and not self.is_pdf:
+            return False
+        return self.wants_pdf_analysis
+
+    def is_image_analysis(self, has_images: bool) -> bool:
+        """업로드된 이미지에 대한 분석 요청인지"""
+        return bool(has_images) and self.wants_image_analysis
+
+
+@lru_cache(maxsize=256)
+def classify_request(text: str) -> RouteDecision:
+    """
+    사용자 입력을 한 번만 스캔하여 라우팅 결정을 반환합니다.
+
+    URL 추출, URL 종류 분류, 분석 키워드 검사를 모두 1회씩만 수행합니다.
+    URL이 있을 수 없는 입력은 URL 정규식을 건너뛰고, 분석 키워드는 합친 패턴으로 한 번 스캔한 뒤
+    키워드가 있을 때만 첫 키워드 위치부터 PDF/이미지 키워드를 구분합니다.
+    """
+    text = text or ""
+    urls = tuple(URL_PATTERN.findall(text)) if ("http" in text or "www." in text) else ()
+    text_lower = text.lower()
+    wants_pdf = wants_image = False
+    first = ANALYSIS_KEYWORD_MATCHER.search(text_lower)
+    if first is not None:
+        wants_pdf = PDF_ANALYSIS_MATCHER.search(text_lower, first.start()) is not None
+        wants_image = IMAGE_ANALYSIS_MATCHER.search(text_lower, first.start()) is not None
+    return RouteDecision(
+        urls=urls,
+        url_kinds=tuple(classify_url(url) for url in urls),
+        wants_pdf_analysis=wants_pdf,
+        wants_image_analysis=wants_image,
+    )
+
+
 def extract_video_id(url: str) -> Optional[str]:
     """YouTube URL에서 비디오 ID 추출 (Shorts 포함)"""
     logger.debug(f"Extracting video ID from URL: {url}")
-    patterns = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([^&\n?#]+)',
-        r'(?:https?://)?(?:www\.)?youtube\.com/embed/([^&\n?#]+)',
-        r'(?:https?://)?(?:www\.)?youtube\.com/v/([^&\n?#]+)',
-        r'(?:https?://)?youtu\.be/([^&\n?#]+)',
-        r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([^&\n?#]+)',  # YouTube Shorts 패턴 추가
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in YOUTUBE_VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             video_id = match.group(1)
             logger.info(f"Successfully extracted video ID: {video_id}")
@@ -516,32 +673,24 @@ def extract_video_id(url: str) -> Optional[str]:
 
 def is_youtube_url(url: str) -> bool:
     """YouTube URL인지 확인 (Shorts 포함)"""
-    patterns = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=',
-        r'(?:https?://)?(?:www\.)?youtube\.com/embed/',
-        r'(?:https?://)?youtu\.be/',
-        r'(?:https?://)?(?:www\.)?youtube\.com/shorts/',  # YouTube Shorts 패턴 추가
-    ]
-    return any(re.match(pattern, url) for pattern in patterns)
+    return YOUTUBE_URL_PATTERN.match(url) is not None
 
 def is_youtube_summarization_request(text: str) -> tuple[bool, Optional[str]]:
     """YouTube 요약 요청인지 확인하고 URL 추출"""
-    youtube_url = extract_urls_from_text(text)
-    if youtube_url and is_youtube_url(youtube_url[0]):
-        return True, youtube_url[0]
+    route = classify_request(text)
+    if route.is_youtube:
+        return True, route.primary_url
     return False, None
 
 def extract_urls_from_text(text: str) -> List[str]:
     """텍스트에서 URL 추출"""
-    url_pattern = r'https?://[^\s<>"]+|www\.[^\s<>"]+'
-    urls = re.findall(url_pattern, text)
-    return urls
+    return list(classify_request(text).urls)
 
 def is_url_summarization_request(text: str) -> tuple[bool, Optional[str]]:
     """URL 요약 요청인지 확인하고 URL 추출 (PDF 및 YouTube URL 제외)"""
-    urls = extract_urls_from_text(text)
-    if urls and not is_youtube_url(urls[0]) and not is_pdf_url(urls[0]):
-        return True, urls[0]
+    route = classify_request(text)
+    if route.is_webpage:
+        return True, route.primary_url
     return False, None
 
 def is_pdf_url(url):
@@ -550,302 +699,184 @@ def is_pdf_url(url):
 
 def is_pdf_summarization_request(text: str) -> tuple[bool, Optional[str]]:
     """PDF 요약 요청인지 확인하고 URL 추출"""
-    urls = extract_urls_from_text(text)
-    if urls and is_pdf_url(urls[0]):
-        return True, urls[0]
+    route = classify_request(text)
+    if route.is_pdf:
+        return True, route.primary_url
     return False, None
 
-@lru_cache(maxsize=128)
 def fetch_webpage_content(url: str) -> str:
-    """웹페이지 내용 가져오기 (개선된 버전)"""
+    """웹페이지 내용 가져오기 (디스크 캐시 + 조건부 GET 재검증)"""
+    return fetch_webpage(url)[0]
+
+def fetch_webpage(url: str) -> tuple[str, Dict[str, str]]:
+    """
+    웹페이지 본문과 메타데이터를 함께 가져옵니다 (같은 파싱 결과에서 추출, 캐시 적용).
+
+    Returns:
+        (본문, {"title", "description", "author", "published_date", "site_name"})
+    """
+    adapter = adapter_for(url)
+    text, metadata = webpage_cache.get_or_fetch(
+        url, lambda target, headers: _fetch_with_adapter(adapter, target, headers), ttl=adapter.cache_ttl
+    )
+    return text, metadata or default_metadata(url)
+
+def _fetch_with_adapter(adapter, url: str, conditional_headers: Optional[Dict] = None) -> tuple[Optional[str], Dict, Dict]:
+    """
+    사이트 어댑터의 가져오기 전략을 순서대로 시도합니다 (최근 성공한 전략 먼저).
+    네이버 블로그: PostView → 모바일 → (글 주소가 아니면 프레임셋) → 브라우저
+
+    Returns:
+        _fetch_webpage와 같음 (모든 전략이 실패하면 마지막 실패 결과)
+    """
+    result = None
+    for strategy, target in adapter.plan(url):
+        t0 = time.perf_counter()
+        if strategy.method == BROWSER:
+            text = fetch_naver_blog_with_playwright(target)
+            # 브라우저 결과에는 검증자가 없음, 메타데이터는 앞선 HTTP 결과 사용
+            attempt = (text, {}, result[2] if result else {}) if text else None
+        else:
+            attempt = _fetch_webpage(target, conditional_headers, adapter)
+        ok = attempt is not None and (attempt[0] is None or not is_failure_text(attempt[0]))
+        adapter.record(strategy, ok)
+        if os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1":
+            logger.info(f"TIMING: webpage {adapter.name}/{strategy.name} {target} took {time.perf_counter() - t0:.4f}s (ok={ok})")
+        if ok:
+            return attempt
+        result = attempt or result
+        if result and is_not_found_text(result[0]):
+            break  # 글이 없으면 다른 주소/브라우저로도 없음
+        logger.info(f"🔁 {adapter.name}/{strategy.name} 전략 실패, 다음 전략 시도: {target}")
+    return result or (f"❌ 웹페이지 내용을 가져오지 못했습니다: {url}", {}, {})
+
+def _response_validators(response):
+    return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+def _fetch_webpage(url: str, conditional_headers: Optional[Dict] = None, adapter=None) -> tuple[Optional[str], Dict, Dict]:
+    """
+    웹페이지를 한 번 GET해 본문과 메타데이터를 추출합니다 (캐시 없이, HTML은 한 번만 파싱).
+    adapter: 본문 선택자/iframe 처리를 정하는 사이트 어댑터 (기본: URL 도메인으로 선택)
+
+    Returns:
+        (본문, 검증자 {"etag", "last_modified"}, 메타데이터); 304 Not Modified면 본문 None
+    """
     try:
         debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
         t0 = time.perf_counter() if debug_timings else None
         
-        session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        session.mount('https://', HTTPAdapter(max_retries=retries))
-        session.headers.update({
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://www.naver.com/',
-            'Cache-Control': 'no-cache'
-        })
-        
-        response = session.get(url, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        response.encoding = 'utf-8'  # 인코딩 명시적 설정
-        
-        # 네이버 블로그 프레임셋 URL 감지 (iframe을 통한 리다이렉트)
-        if "blog.naver.com" in url and "/PostView.naver" not in url:
-            from bs4 import BeautifulSoup
-            soup_check = BeautifulSoup(response.text, 'html.parser')
-            iframe = soup_check.find('iframe')
-            if iframe and iframe.get('src'):
-                iframe_src = iframe.get('src')
-                # 상대 경로를 절대 경로로 변환
-                if iframe_src.startswith('/'):
-                    iframe_url = 'https://blog.naver.com' + iframe_src
-                else:
-                    iframe_url = iframe_src
-                logger.info(f"🔄 네이버 블로그 iframe 감지, 리다이렉트: {iframe_url}")
-                # iframe의 실제 콘텐츠 가져오기 (재귀 호출)
-                return fetch_webpage_content(iframe_url)
+        headers = {**BROWSER_HEADERS, **(conditional_headers or {})}
+        # 스트리밍으로 최대 HTTP_MAX_HTML_BYTES까지만 받음 (넘으면 앞부분만 사용, HTML이 아니면 중단)
+        download = http_download(url, HTTP_MAX_HTML_BYTES, accept=HTML_CONTENT_TYPES, truncate=True,
+                                 headers=headers, timeout=15, allow_redirects=True)
+        response = download.response
+        if response.status_code == 304:
+            return None, _response_validators(response), {}
+        html = download.data.decode('utf-8', errors='replace')  # 인코딩 명시적 설정
         
         if debug_timings:
             t1 = time.perf_counter()
-            logger.info(f"TIMING: fetch_webpage_content GET {url} took {t1 - t0:.4f}s")
+            pool = http_client_stats()
+            logger.info(
+                f"TIMING: fetch_webpage_content GET {url} took {t1 - t0:.4f}s "
+                f"(pooled reuse {pool['reused']}/{pool['requests']})"
+            )
         
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
+        page = extract_page(html, url, max_chars=WEBPAGE_MAX_CHARS, adapter=adapter)
+        if debug_timings:
+            logger.info(f"TIMING: extract_page {url} took {time.perf_counter() - t1:.4f}s (parser={HTML_PARSER})")
         
-        # 불필요한 태그 제거
-        for script in soup(["script", "style", "nav", "header", "footer", "aside", "advertisement", "noscript"]):
-            script.decompose()
+        # 프레임셋 (네이버 블로그): iframe의 실제 콘텐츠 가져오기
+        # (iframe URL도 캐시, 프레임셋은 검증자 없이 TTL만 적용)
+        if page.iframe_url:
+            logger.info(f"🔄 네이버 블로그 iframe 감지, 리다이렉트: {page.iframe_url}")
+            text, metadata = fetch_webpage(page.iframe_url)
+            return text, {}, metadata
         
-        # 네이버 블로그 특화 처리
-        text = ""
-        if "blog.naver.com" in url:
-            # 방법 1: 네이버 블로그 본문 영역 (CSS 선택자)
-            selectors_to_try = [
-                'div.se-main-container',
-                'div#postListBody',
-                'div.post-body',
-                'div.se-viewer',
-                'div.se-component',
-                'div[role="main"]',
-                'article',
-            ]
-            
-            for selector in selectors_to_try:
-                try:
-                    post_body = soup.select_one(selector)
-                    if post_body:
-                        text = post_body.get_text(separator='\n', strip=True)
-                        if len(text) > 100:
-                            logger.info(f"✅ 네이버 블로그 본문 추출 완료 (셀렉터: {selector}): {len(text)} chars")
-                            break
-                        else:
-                            text = ""  # 너무 짧으면 다음 선택자 시도
-                except Exception as e:
-                    logger.debug(f"선택자 실패 {selector}: {e}")
-                    continue
-            
-            # 방법 2: JSON 메타데이터에서 추출 (Naver 블로그 고유)
-            if not text or len(text) < 100:
-                try:
-                    import json
-                    import re
-                    
-                    # HTML에서 JSON 데이터 찾기
-                    json_pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
-                    json_matches = re.findall(json_pattern, response.text, re.DOTALL)
-                    
-                    for json_str in json_matches:
-                        try:
-                            json_data = json.loads(json_str)
-                            if isinstance(json_data, dict):
-                                # articleBody 또는 description 찾기
-                                if 'articleBody' in json_data:
-                                    text = json_data['articleBody']
-                                    logger.info(f"✅ JSON 메타데이터에서 추출: {len(text)} chars")
-                                    break
-                                elif 'description' in json_data:
-                                    text = json_data['description']
-                                    logger.info(f"✅ JSON description 추출: {len(text)} chars")
-                                    break
-                        except json.JSONDecodeError:
-                            continue
-                except Exception as e:
-                    logger.debug(f"JSON 메타데이터 추출 실패: {e}")
-            
-            if not text:
-                logger.warning(f"⚠️ 네이버 블로그 본문을 추출하지 못함: {url}")
-        
-        # 네이버 블로그가 아니거나 본문을 찾지 못한 경우
-        if not text:
-            # 주요 컨텐츠 영역 우선 추출
-            main_content = None
-            for selector in ['main', 'article', '.content', '.post-content', '.entry-content', '#content', '.post-view', '.blog-content']:
-                if content_elem := soup.select_one(selector):
-                    main_content = content_elem
-                    break
-            
-            if main_content:
-                text = main_content.get_text(separator='\n', strip=True)
-            else:
-                text = soup.get_text(separator='\n', strip=True)
-        
-        # 텍스트 정리
-        lines = [line.strip() for line in text.split('\n') if line.strip() and len(line.strip()) > 2]
-        cleaned_text = '\n'.join(lines)
+        cleaned_text = page.text
         
         # 빈 문자열 체크
         if not cleaned_text or len(cleaned_text.strip()) < 100:
             logger.warning(f"추출된 웹페이지 내용이 너무 짧음: {len(cleaned_text)} chars from {url}")
-            # 네이버 블로그인 경우 Playwright 폴백 시도
-            if "blog.naver.com" in url:
-                logger.info(f"Playwright 폴백 시도: {url}")
-                playwright_content = fetch_naver_blog_with_playwright(url)
-                if playwright_content:  # 빈 문자열이 아닌 경우만
-                    return playwright_content
-            
-            return f"⚠️ 웹페이지에서 충분한 내용을 추출하지 못했습니다. URL: {url}\n\n추출된 내용: {cleaned_text[:500]}"
+            # 네이버 블로그의 브라우저 폴백은 사이트 어댑터 전략으로 이어짐
+            return f"⚠️ 웹페이지에서 충분한 내용을 추출하지 못했습니다. URL: {url}\n\n추출된 내용: {cleaned_text[:500]}", {}, page.metadata
         
-        # 길이 제한 (토큰 수 고려)
-        return cleaned_text[:25000]
+        # 길이 제한 (토큰 수 고려, 추출 단계에서 이미 WEBPAGE_MAX_CHARS로 제한됨)
+        return cleaned_text, _response_validators(response), page.metadata
         
+    except DownloadError as e:
+        logger.error(f"웹페이지 다운로드 중단: {url} ({e})")
+        if e.reason == "content_type":
+            return f"❌ 웹페이지가 HTML 문서가 아닙니다 ({e.content_type}): {url}", {}, {}
+        return f"❌ 웹페이지를 가져오는 중 다운로드가 중단되었습니다 ({e}): {url}", {}, {}
     except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
-            logger.error(f"웹페이지를 찾을 수 없음: {url}")
-            return f"❌ 웹페이지를 찾을 수 없습니다 (404): {url}"
+        if e.response.status_code in (404, 410):
+            logger.error(f"웹페이지를 찾을 수 없음 ({e.response.status_code}): {url}")
+            return f"{WEBPAGE_NOT_FOUND}: {url}", {}, {}
         elif e.response.status_code == 403:
             logger.error(f"웹페이지 접근 금지: {url}")
-            # 네이버 블로그 403인 경우 Playwright 시도
-            if "blog.naver.com" in url:
-                logger.info(f"403 에러 - Playwright 폴백 시도: {url}")
-                playwright_content = fetch_naver_blog_with_playwright(url)
-                if playwright_content:  # 빈 문자열이 아닌 경우만
-                    return playwright_content
-            return f"❌ 웹페이지에 접근할 수 없습니다 (403 - 접근 금지): {url}"
+            return f"❌ 웹페이지에 접근할 수 없습니다 (403 - 접근 금지): {url}", {}, {}
         logger.error(f"웹페이지 접근 오류: {str(e)}")
-        return f"❌ 웹페이지 접근 중 오류가 발생했습니다: {str(e)}"
+        return f"❌ 웹페이지 접근 중 오류가 발생했습니다: {str(e)}", {}, {}
     except Exception as e:
         logger.error(f"웹페이지 내용 가져오기 오류: {str(e)}")
-        return f"❌ 웹페이지 내용을 가져오는 중 오류가 발생했습니다: {str(e)}"
+        return f"❌ 웹페이지 내용을 가져오는 중 오류가 발생했습니다: {str(e)}", {}, {}
 
 def fetch_naver_blog_with_playwright(url: str) -> str:
     """
     Playwright를 사용하여 네이버 블로그 동적 콘텐츠 가져오기
-    Streamlit Cloud 환경에서 브라우저 설치가 안 된 경우를 대비한 폴백 처리
+    프로세스당 하나의 브라우저를 재사용하는 browser_pool을 사용하며,
+    비활성화/브라우저 미설치/대기 초과 시 빈 문자열을 반환합니다 (다른 폴백으로 진행).
     """
-    # Playwright 비활성화 플래그 확인
-    if os.environ.get("PLAYWRIGHT_DISABLED") == "1":
-        logger.warning("🎭 Playwright가 비활성화되어 있습니다 (Streamlit Cloud 환경).")
-        return ""  # 빈 문자열 반환 -> 다른 폴백으로 진행
+    logger.info(f"Playwright로 네이버 블로그 콘텐츠 가져오기: {url}")
     
-    try:
-        from playwright.sync_api import sync_playwright
-        
-        logger.info(f"Playwright로 네이버 블로그 콘텐츠 가져오기: {url}")
-        
-        with sync_playwright() as p:
-            # 브라우저 옵션: 보수적 설정
-            browser = p.chromium.launch(
-                headless=True,
-                args=['--disable-dev-shm-usage', '--single-process']  # Streamlit Cloud 메모리 최적화
-            )
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            page = context.new_page()
-            
-            try:
-                # 페이지 로드 (JavaScript 실행)
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                
-                # 콘텐츠 추출 (대기 없이 즉시 시도)
-                content_html = page.content()
-                soup = BeautifulSoup(content_html, 'html.parser')
-                
-                # 불필요한 요소 제거
-                for elem in soup(['script', 'style', 'nav', 'header', 'footer']):
-                    elem.decompose()
-                
-                # 본문 추출
-                text = ""
-                for selector in ['div.se-main-container', 'div.post-view', 'div#postListBody', 'article']:
-                    main_content = soup.select_one(selector)
-                    if main_content:
-                        text = main_content.get_text(separator='\n', strip=True)
-                        break
-                
-                if not text:
-                    text = soup.get_text(separator='\n', strip=True)
-                
-                # 텍스트 정리
-                lines = [line.strip() for line in text.split('\n') if line.strip() and len(line.strip()) > 2]
-                cleaned_text = '\n'.join(lines)
-                
-                logger.info(f"✅ Playwright 추출 완료: {len(cleaned_text)} chars")
-                
-                if len(cleaned_text) > 100:
-                    return cleaned_text[:25000]
-                else:
-                    return ""  # 빈 결과는 다른 폴백으로 진행
-                    
-            finally:
-                context.close()
-                browser.close()
-                
-    except ImportError:
-        logger.error("❌ Playwright 라이브러리가 설치되지 않았습니다")
-        return ""
-    except FileNotFoundError as e:
-        # Chromium 실행 파일을 찾을 수 없는 경우
-        if "headless_shell" in str(e) or "chrome" in str(e).lower():
-            logger.warning(f"⚠️ Playwright 브라우저 바이너리를 찾을 수 없습니다: {str(e)}")
-            # 환경 변수 설정으로 다음 시도에서 스킵
-            os.environ["PLAYWRIGHT_DISABLED"] = "1"
-            return ""
-        raise
-    except Exception as e:
-        logger.warning(f"⚠️ Playwright 추출 오류 (폴백으로 진행): {str(e)}")
+    # 본문 선택자가 (iframe 포함) 나타나면 그 프레임의 HTML을 받음
+    content_html = browser_pool.fetch_html(url, PLAYWRIGHT_CONTENT_SELECTORS)
+    if not content_html:
         return ""  # 빈 결과 반환 -> requests 기반 추출 계속 시도
-
-def extract_webpage_metadata(url: str, content: str) -> Dict[str, str]:
-    """웹페이지 메타데이터 추출 (이미 가져온 content 사용)"""
+    
     try:
-        from bs4 import BeautifulSoup
-        
-        # 이미 가져온 content를 사용 (추가 HTTP 요청 불필요)
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = BeautifulSoup(content_html, HTML_PARSER)
         
-        metadata = {
-            "title": "Unknown",
-            "description": "No description available",
-            "author": "Unknown",
-            "published_date": "Unknown",
-            "site_name": "Unknown"
-        }
+        # 불필요한 요소 제거
+        for elem in soup(['script', 'style', 'nav', 'header', 'footer']):
+            elem.decompose()
         
-        # 제목 추출
-        if title_tag := soup.find('title'):
-            metadata["title"] = title_tag.get_text().strip()
-        elif h1_tag := soup.find('h1'):
-            metadata["title"] = h1_tag.get_text().strip()
+        # 본문 추출
+        text = ""
+        for selector in PLAYWRIGHT_CONTENT_SELECTORS:
+            main_content = soup.select_one(selector)
+            if main_content:
+                text = main_content.get_text(separator='\n', strip=True)
+                break
         
-        # 메타 태그에서 정보 추출
-        meta_tags = soup.find_all('meta')
-        for tag in meta_tags:
-            if tag.get('name') == 'description' or tag.get('property') == 'og:description':
-                metadata["description"] = tag.get('content', '')[:200]
-            elif tag.get('name') == 'author':
-                metadata["author"] = tag.get('content', '')
-            elif tag.get('property') == 'og:site_name':
-                metadata["site_name"] = tag.get('content', '')
-            elif tag.get('name') == 'date' or tag.get('property') == 'article:published_time':
-                metadata["published_date"] = tag.get('content', '')
+        if not text:
+            text = soup.get_text(separator='\n', strip=True)
         
-        # URL에서 사이트명 추출 (fallback)
-        if metadata["site_name"] == "Unknown":
-            from urllib.parse import urlparse
-            parsed_url = urlparse(url)
-            metadata["site_name"] = parsed_url.netloc
+        # 텍스트 정리
+        lines = [line.strip() for line in text.split('\n') if line.strip() and len(line.strip()) > 2]
+        cleaned_text = '\n'.join(lines)
         
-        return metadata
+        logger.info(f"✅ Playwright 추출 완료: {len(cleaned_text)} chars")
         
+        if len(cleaned_text) > 100:
+            return cleaned_text[:WEBPAGE_MAX_CHARS]
+        return ""  # 빈 결과는 다른 폴백으로 진행
+    except Exception as e:
+        logger.warning(f"⚠️ Playwright 추출 오류 (폴백으로 진행): {str(e)}")
+        return ""
+
+def extract_webpage_metadata(url: str, content: str) -> Dict[str, str]:
+    """
+    HTML에서 웹페이지 메타데이터 추출.
+    fetch_webpage가 본문과 함께 메타데이터를 반환하므로 새 코드는 그쪽을 사용하세요.
+    (추출된 평문을 넘기면 제목/설명은 기본값이 됩니다)
+    """
+    try:
+        return extract_page(content, url).metadata
     except Exception as e:
         logger.error(f"웹페이지 메타데이터 추출 오류: {str(e)}")
-        return {
-            "title": "Unknown",
-            "description": "No description available", 
-            "author": "Unknown",
-            "published_date": "Unknown",
-            "site_name": "Unknown"
-        }
+        return default_metadata(url)
 
 def fetch_pdf_text(pdf_url: str = None, pdf_file=None) -> tuple[str, Dict, Optional[Dict]]:
     """PDF 내용 가져오기 (URL 또는 파일 입력 지원)"""
@@ -853,15 +884,22 @@ def fetch_pdf_text(pdf_url: str = None, pdf_file=None) -> tuple[str, Dict, Optio
         debug_timings = os.environ.get("STREAMLIT_DEBUG_LOAD_TIMINGS", "0") == "1"
         t0 = time.perf_counter() if debug_timings else None
         if pdf_url:
-            response = requests.get(pdf_url, timeout=10)
-            response.raise_for_status()
+            # 스트리밍으로 최대 HTTP_MAX_PDF_BYTES까지 받고, 첫 청크에서 PDF가 아니면 중단
+            try:
+                download = http_download(pdf_url, HTTP_MAX_PDF_BYTES, accept=PDF_CONTENT_TYPES,
+                                         allow_unknown=False, timeout=10)
+            except DownloadError as e:
+                if e.reason == "content_type":
+                    logger.error(f"URL이 PDF 형식이 아님: {pdf_url}")
+                    return f"❌ URL은 PDF 파일이 아닙니다: {pdf_url}", {}, None
+                logger.error(f"PDF 다운로드 중단: {pdf_url} ({e})")
+                if e.reason == "too_large":
+                    return f"❌ PDF 파일이 너무 큽니다 (최대 {HTTP_MAX_PDF_BYTES // (1024 * 1024)}MB): {pdf_url}", {}, None
+                return f"❌ PDF 다운로드 중 오류: {str(e)}", {}, None
             if debug_timings:
                 t1 = time.perf_counter()
-                logger.info(f"TIMING: fetch_pdf_text GET {pdf_url} took {t1 - t0:.4f}s")
-            if 'application/pdf' not in response.headers.get('Content-Type', '').lower():
-                logger.error(f"URL이 PDF 형식이 아님: {pdf_url}")
-                return f"❌ URL은 PDF 파일이 아닙니다: {pdf_url}", {}, None
-            pdf_file = io.BytesIO(response.content)
+                logger.info(f"TIMING: fetch_pdf_text GET {pdf_url} took {t1 - t0:.4f}s ({len(download.data)} bytes)")
+            pdf_file = io.BytesIO(download.data)
         elif pdf_file:
             if not isinstance(pdf_file, io.BytesIO):
                 pdf_file = io.BytesIO(pdf_file.read())
@@ -874,12 +912,14 @@ def fetch_pdf_text(pdf_url: str = None, pdf_file=None) -> tuple[str, Dict, Optio
         for page in reader.pages:
             page_text = page.extract_text() or ""
             text += page_text + " "
+            if len(text) >= PDF_MAX_CHARS and text.strip():
+                break  # 잘라낼 나머지 페이지는 추출하지 않음
         metadata = reader.metadata or {}
         sections = None
         if not text.strip():
             logger.warning("PDF에서 텍스트를 추출할 수 없습니다.")
             return "❌ PDF에서 텍스트를 추출할 수 없습니다.", {}, None
-        return text[:15000], metadata, sections
+        return text[:PDF_MAX_CHARS], metadata, sections
     except requests.exceptions.HTTPError as e:
         if pdf_url and e.response.status_code == 404:
             logger.error(f"PDF URL을 찾을 수 없음: {pdf_url}")
@@ -1087,42 +1127,11 @@ def is_image_analysis_request(query, has_images):
     """이미지 분석 요청인지 확인 (한국어/영어/스페인어 지원)"""
     if not has_images:
         return False
-    
-    # 한국어 키워드
-    ko_keywords = ['분석', '설명', '알려줘', '무엇', '뭐', '어떤', '보여줘', '읽어줘', '해석', '분석해줘']
-    
-    # 영어 키워드
-    en_keywords = ['analyze', 'describe', 'explain', 'what', 'show', 'read', 'tell', 'see', 'image', 'picture', 'photo']
-    
-    # 스페인어 키워드 추가
-    es_keywords = [
-        'analizar', 'describir', 'explicar', 'qué', 'mostrar', 'leer', 'decir', 'ver', 
-        'imagen', 'foto', 'picture', 'muestra', 'enseña', 'dice', 'contiene',
-        'puedes', 'podrías', 'ayuda', 'favor'
-    ]
-    
-    # 모든 키워드 통합
-    all_keywords = ko_keywords + en_keywords + es_keywords
-    
-    return any(keyword in query.lower() for keyword in all_keywords)
+    return classify_request(query).is_image_analysis(has_images)
 
 def is_pdf_analysis_request(query, has_pdf):
     """PDF 분석 요청인지 확인 (한국어/영어/스페인어 지원)"""
-    if not has_pdf and not is_pdf_summarization_request(query)[0]:
-        return False
-    
-    # 다국어 분석 키워드
-    analysis_keywords = [
-        # 한국어
-        '요약', '분석', '설명', '알려줘', '정리',
-        # 영어  
-        'summarize', 'analyze', 'explain', 'describe', 'tell',
-        # 스페인어
-        'resumir', 'analizar', 'explicar', 'describir', 'decir',
-        'mostrar', 'ayuda', 'puedes', 'podrías'
-    ]
-    
-    return any(keyword in query.lower() for keyword in analysis_keywords)
+    return classify_request(query).is_pdf_analysis(has_pdf)
 
 def create_summary(text: str, target_length: int = 400) -> str:
     """글자수 기준 요약 생성 (최종 폴백용)"""
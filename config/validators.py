@@ -3,6 +3,7 @@
 
 from config.imports import *
 from config.lang import get_text
+from config.image_pipeline import prepare_uploaded_image
 import logging
 import re
 import unicodedata
@@ -51,11 +52,9 @@ def validate_pdf_file(uploaded_file):
     return True, get_text("valid_pdf", lang)
 
 def process_image_for_gemini(uploaded_file):
-    """Gemini API용 이미지 처리"""
-    try:
-        image = Image.open(uploaded_file)
-        logger.info(f"이미지 크기: {image.size}, 모드: {image.mode}, 형식: {image.format}")
-        return image
-    except Exception as e:
-        logger.error(f"이미지 처리 오류: {str(e)}")
+    """Gemini API용 이미지 처리 (한 번 디코딩, EXIF 회전, 긴 변 축소 후 인코딩된 blob 반환)"""
+    prepared = prepare_uploaded_image(uploaded_file)
+    if prepared is None:
         return None
+    logger.info(f"이미지 크기: {prepared.size}, 형식: {prepared.model_part['mime_type']}")
+    return prepared.model_part
@@ -1,12 +1,12 @@
 # config/weather_api.py
-import requests
 import logging
 import re
-from requests.adapters import HTTPAdapter, Retry
 from functools import lru_cache
 from datetime import datetime, timedelta
 import pytz
 
+from config.http_client import http_get
+
 logger = logging.getLogger(__name__)
 
 class WeatherAPI:
@@ -18,13 +18,9 @@ class WeatherAPI:
         self.geo_url = "https://api.openweathermap.org/geo/1.0"
 
     def fetch_weather(self, url, params):
-        """API 요청을 수행합니다 (재시도 로직 포함)"""
-        session = requests.Session()
-        retry_strategy = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
+        """API 요청을 수행합니다 (호출 한도가 있어 재시도 없이 한 번만, 실패 시 캐시 폴백)"""
         try:
-            response = session.get(url, params=params, timeout=3)
+            response = http_get(url, params=params, timeout=3, retry=False)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -71,7 +67,7 @@ class WeatherAPI:
                 "appid": self.WEATHER_API_KEY
             }
             
-            response = requests.get(url, params=params, timeout=3)
+            response = http_get(url, params=params, timeout=3, retry=False)
             response.raise_for_status()
             
             results = response.json()
@@ -119,7 +115,7 @@ class WeatherAPI:
                 "lang": "kr"
             }
             
-            response = requests.get(url, params=params, timeout=3)
+            response = http_get(url, params=params, timeout=3, retry=False)
             response.raise_for_status()
             
             data = response.json()
@@ -160,7 +156,7 @@ class WeatherAPI:
                 "lang": "kr"
             }
             
-            response = requests.get(url, params=params, timeout=3)
+            response = http_get(url, params=params, timeout=3, retry=False)
             response.raise_for_status()
             
             data = response.json()
@@ -1,14 +1,134 @@
 # config/web_search.py
-import urllib.request
 import urllib.parse
-import json
 import re
 import logging
 from datetime import datetime
 import uuid
 
+from config.http_client import http_get
+from config.keyword_engine import KeywordScoringEngine
+
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# should_search 키워드 테이블 (import 시점에 한 번만 컴파일)
+# =============================================================================
+
+# 0. 짧은 추가 질문 (이전 컨텍스트 활용)
+SHORT_FOLLOWUP_PATTERNS = [
+    r'^[가-힣]{1,3}[는은]?\?*$',  # "온도는?", "습도?"
+    r'^[가-힣]{1,5}[요야]?\?*$',  # "얼마야?", "몇도요?"
+    r'^정확한\s*[가-힣]{2,4}',    # "정확한 온도"
+    r'^구체적인\s*[가-힣]{2,4}',  # "구체적인 습도"
+    r'^\w{1,10}\?*$',            # 영어 단어 하나 "temperature?"
+]
+
+# 1. 부정 키워드 (일반 지식/설명 요청)
+SEARCH_NEGATIVE_PATTERNS = [
+    # 일반 설명/정의 요청 (한국어)
+    r"\b설명해\b", r"\b설명\b", r"\b이란\b", r"\b뭐야\b", r"\b무엇\b",
+    r"\b뭔지\b", r"\b의미\b", r"\b개념\b", r"\b정의\b",
+    r"\b이해\b", r"\b알려줘\b(?!.*검색)", # "알려줘"만 단독으로 (검색 없이)
+    # 비교/추천 (검색 불필요)
+    r"\b차이\b", r"\b비교\b", r"\b추천\b", r"\b좋은\b", r"\b나은\b",
+    # 의견/생각 요청
+    r"\b생각해\b", r"\b의견\b", r"\b어떻게 생각\b",
+    # 역사/이론/학문
+    r"\b역사\b", r"\b기원\b", r"\b유래\b", r"\b이론\b",
+    r"\b철학\b", r"\b원리\b", r"\b과학\b", r"\b수학\b",
+    # 일반 대화
+    r"\b안녕\b", r"\b감사\b", r"\b고마워\b", r"\b미안\b",
+    
+    # 영어
+    r"\bexplain\b", r"\bwhat is\b", r"\bwhat's\b", r"\bwhat are\b",
+    r"\bdefine\b", r"\bdefinition\b", r"\bmeaning\b", r"\bconcept\b",
+    r"\btell me about\b(?!.*(latest|recent|current))", # "tell me about"만 단독
+    r"\bcompare\b", r"\bdifference\b", r"\brecommend\b",
+    r"\bopinion\b", r"\bthink\b", r"\bbelieve\b",
+    r"\bhistory\b", r"\btheory\b", r"\borigin\b", r"\bphilosophy\b",
+    r"\bhello\b", r"\bthanks\b", r"\bthank you\b", r"\bsorry\b",
+    
+    # 스페인어
+    r"\bexplicar\b", r"\bqué es\b", r"\bcuál es\b",
+    r"\bdefinir\b", r"\bdefinición\b", r"\bsignificado\b",
+    r"\bcomparar\b", r"\bdiferencia\b", r"\brecomendar\b",
+    r"\bopinión\b", r"\bpensar\b", r"\bcreer\b",
+    r"\bhistoria\b", r"\bteoría\b", r"\borigen\b",
+    r"\bhola\b", r"\bgracias\b", r"\bperdón\b",
+]
+
+# 부정 키워드와 함께 쓰여도 검색을 허용하는 실시간 키워드
+REALTIME_OVERRIDE_KEYWORDS = ['최신', '현재', '실시간', '오늘', 'latest', 'current', 'today', 'now']
+
+# 2. 명시적 검색 의도
+EXPLICIT_SEARCH_PATTERNS = [
+    # 한국어
+    r"\b검색\b", r"\b찾아봐\b", r"\b찾아줘\b", r"\b조회\b",
+    r"\b검색해\b", r"\b알아봐\b",
+    # 영어
+    r"\bsearch\b", r"\blook up\b", r"\bfind out\b",
+    r"\bgoogle\b", r"\bcheck\b",
+    # 스페인어
+    r"\bbuscar\b", r"\bbusca\b", r"\bconsultar\b",
+]
+
+# 3.1) 실시간 필수 정보 (높은 점수)
+REALTIME_CRITICAL = {
+    # 날씨 (1.5점)
+    '날씨': 1.5, 'weather': 1.5, 'tiempo': 1.5,
+    '기온': 1.5, 'temperature': 1.5, 'temperatura': 1.5,
+    # 금융 (1.5점)
+    '주가': 1.5, 'stock': 1.5, 'bolsa': 1.5,
+    '환율': 1.5, 'exchange rate': 1.5, 'tipo de cambio': 1.5,
+    '비트코인': 1.3, 'bitcoin': 1.3,
+    # 뉴스/속보 (1.5점)
+    '뉴스': 1.5, 'news': 1.5, 'noticias': 1.5,
+    '속보': 1.5, 'breaking': 1.5,
+}
+
+# 3.2) 시간성 키워드 (중간 점수)
+TEMPORAL_KEYWORDS = {
+    '오늘': 1.0, 'today': 1.0, 'hoy': 1.0,
+    '현재': 1.0, 'current': 1.0, 'actual': 1.0,
+    '지금': 1.0, 'now': 1.0, 'ahora': 1.0,
+    '최신': 1.0, 'latest': 1.0, 'último': 1.0,
+    '최근': 0.8, 'recent': 0.8, 'reciente': 0.8,
+    '실시간': 1.2, 'real-time': 1.2, 'tiempo real': 1.2,
+}
+
+# 3.3) 의약품 (안전을 위해 검색 권장)
+MEDICINE_KEYWORDS = {
+    '타이레놀': 1.5, 'tylenol': 1.5,
+    '아스피린': 1.5, 'aspirin': 1.5,
+    '부작용': 1.3, 'side effect': 1.3, 'efectos secundarios': 1.3,
+    '복용법': 1.3, 'dosage': 1.3, 'dosis': 1.3,
+    '효능': 1.0, 'efficacy': 1.0,
+}
+
+# 3.4) 지역 + 날씨/시간 조합, 3.5) 날짜/연도 포함 - (정규식, 점수, 라벨)
+SEARCH_BONUS_PATTERNS = [
+    (re.compile(r'(서울|부산|인천|뉴욕|런던|도쿄|파리|베이징|LA|시드니).*(날씨|기온|시간|온도|weather|temperature)'), 2.0, '지역+날씨'),
+    (re.compile(r'(202[0-9]|203[0-9])년?'), 0.8, '연도'),
+    (re.compile(r'\b(\d{1,2}월|어제|내일|방금)\b'), 0.5, '날짜'),
+]
+
+SEARCH_SCORE_THRESHOLD = 2.5
+
+SEARCH_SCORING_ENGINE = KeywordScoringEngine(
+    literal_tables={
+        "realtime_critical": REALTIME_CRITICAL,
+        "temporal": TEMPORAL_KEYWORDS,
+        "medicine": MEDICINE_KEYWORDS,
+        "realtime_override": {kw: 0.0 for kw in REALTIME_OVERRIDE_KEYWORDS},
+    },
+    pattern_tables={
+        "followup": SHORT_FOLLOWUP_PATTERNS,
+        "negative": SEARCH_NEGATIVE_PATTERNS,
+        "explicit": EXPLICIT_SEARCH_PATTERNS,
+    },
+    name="should_search",
+)
+
 class WebSearchAPI:
     def __init__(self, client_id, client_secret, cache_handler, cache_ttl=3600, daily_limit=25000):
         self.client_id = client_id
@@ -47,16 +167,16 @@ class WebSearchAPI:
         try:
             enc_text = urllib.parse.quote(query)
             url = f"{self.base_url}?query={enc_text}&display={display}&sort={sort}"
+            headers = {
+                "X-Naver-Client-Id": self.client_id,
+                "X-Naver-Client-Secret": self.client_secret,
+            }
             
-            request = urllib.request.Request(url)
-            request.add_header("X-Naver-Client-Id", self.client_id)
-            request.add_header("X-Naver-Client-Secret", self.client_secret)
-            
-            response = urllib.request.urlopen(request, timeout=3)
+            response = http_get(url, headers=headers, timeout=3, retry=False)
             self.increment_request_count()
             
-            if response.getcode() == 200:
-                data = json.loads(response.read().decode('utf-8'))
+            if response.status_code == 200:
+                data = response.json()
                 results = data.get('items', [])
                 
                 if not results:
@@ -67,7 +187,7 @@ class WebSearchAPI:
                 self.cache.set(cache_key, formatted_result, expire=self.cache_ttl)
                 return formatted_result
             else:
-                return f"검색 API 오류 (코드: {response.getcode()}) 😓"
+                return f"검색 API 오류 (코드: {response.status_code}) 😓"
                 
         except Exception as e:
             logger.error(f"Naver API 오류: {str(e)}")
@@ -109,161 +229,55 @@ class WebSearchAPI:
         반환: (bool, reason)
         - True: 검색이 필요함
         - False: 검색 불필요, 이유 문자열 반환
+
+        모든 키워드/패턴 테이블은 import 시점에 SEARCH_SCORING_ENGINE으로 컴파일되며,
+        쿼리당 한 번의 스캔으로 점수와 매칭 이유를 얻습니다.
         """
         if not query or not isinstance(query, str):
             return False, "빈 쿼리"
 
         q = query.lower()
+        scan = SEARCH_SCORING_ENGINE.scan(q)
         
         # ========================================
         # 0. 짧은 추가 질문 필터링 (이전 컨텍스트 활용)
         # ========================================
-        short_followup_patterns = [
-            r'^[가-힣]{1,3}[는은]?\\?*$',  # "온도는?", "습도?"
-            r'^[가-힣]{1,5}[요야]?\\?*$',  # "얼마야?", "몇도요?"
-            r'^정확한\\s*[가-힣]{2,4}',    # "정확한 온도"
-            r'^구체적인\\s*[가-힣]{2,4}',  # "구체적인 습도"
-            r'^\\w{1,10}\\?*$',            # 영어 단어 하나 "temperature?"
-        ]
-        
-        for pattern in short_followup_patterns:
-            if re.search(pattern, q):
-                return False, "추가 질문 (이전 컨텍스트 활용)"
+        if scan.first("followup") is not None:
+            return False, "추가 질문 (이전 컨텍스트 활용)"
 
         # ========================================
         # 1. 부정 키워드 체크 (일반 지식/설명 요청)
         # ========================================
-        NEGATIVE_KEYWORDS = [
-            # 일반 설명/정의 요청 (한국어)
-            r"\\b설명해\\b", r"\\b설명\\b", r"\\b이란\\b", r"\\b뭐야\\b", r"\\b무엇\\b",
-            r"\\b뭔지\\b", r"\\b의미\\b", r"\\b개념\\b", r"\\b정의\\b",
-            r"\\b이해\\b", r"\\b알려줘\\b(?!.*검색)", # "알려줘"만 단독으로 (검색 없이)
-            # 비교/추천 (검색 불필요)
-            r"\\b차이\\b", r"\\b비교\\b", r"\\b추천\\b", r"\\b좋은\\b", r"\\b나은\\b",
-            # 의견/생각 요청
-            r"\\b생각해\\b", r"\\b의견\\b", r"\\b어떻게 생각\\b",
-            # 역사/이론/학문
-            r"\\b역사\\b", r"\\b기원\\b", r"\\b유래\\b", r"\\b이론\\b",
-            r"\\b철학\\b", r"\\b원리\\b", r"\\b과학\\b", r"\\b수학\\b",
-            # 일반 대화
-            r"\\b안녕\\b", r"\\b감사\\b", r"\\b고마워\\b", r"\\b미안\\b",
-            
-            # 영어
-            r"\\bexplain\\b", r"\\bwhat is\\b", r"\\bwhat's\\b", r"\\bwhat are\\b",
-            r"\\bdefine\\b", r"\\bdefinition\\b", r"\\bmeaning\\b", r"\\bconcept\\b",
-            r"\\btell me about\\b(?!.*(latest|recent|current))", # "tell me about"만 단독
-            r"\\bcompare\\b", r"\\bdifference\\b", r"\\brecommend\\b",
-            r"\\bopinion\\b", r"\\bthink\\b", r"\\bbelieve\\b",
-            r"\\bhistory\\b", r"\\btheory\\b", r"\\borigin\\b", r"\\bphilosophy\\b",
-            r"\\bhello\\b", r"\\bthanks\\b", r"\\bthank you\\b", r"\\bsorry\\b",
-            
-            # 스페인어
-            r"\\bexplicar\\b", r"\\bqué es\\b", r"\\bcuál es\\b",
-            r"\\bdefinir\\b", r"\\bdefinición\\b", r"\\bsignificado\\b",
-            r"\\bcomparar\\b", r"\\bdiferencia\\b", r"\\brecomendar\\b",
-            r"\\bopinión\\b", r"\\bpensar\\b", r"\\bcreer\\b",
-            r"\\bhistoria\\b", r"\\bteoría\\b", r"\\borigen\\b",
-            r"\\bhola\\b", r"\\bgracias\\b", r"\\bperdón\\b",
-        ]
-        
-        for neg_pattern in NEGATIVE_KEYWORDS:
-            if re.search(neg_pattern, q):
-                # 단, 실시간 키워드와 함께 사용되면 검색 허용
-                realtime_override = ['최신', '현재', '실시간', '오늘', 'latest', 'current', 'today', 'now']
-                if not any(rt in q for rt in realtime_override):
-                    return False, f"일반 대화/설명 요청 감지: {neg_pattern}"
+        neg_pattern = scan.first("negative")
+        if neg_pattern is not None:
+            # 단, 실시간 키워드와 함께 사용되면 검색 허용
+            if not scan.matched("realtime_override"):
+                return False, f"일반 대화/설명 요청 감지: {neg_pattern}"
 
         # ========================================
         # 2. 명시적 검색 의도 체크 (우선순위 최상위)
         # ========================================
-        EXPLICIT_SEARCH_KEYWORDS = [
-            # 한국어
-            r"\\b검색\\b", r"\\b찾아봐\\b", r"\\b찾아줘\\b", r"\\b조회\\b",
-            r"\\b검색해\\b", r"\\b알아봐\\b",
-            # 영어
-            r"\\bsearch\\b", r"\\blook up\\b", r"\\bfind out\\b",
-            r"\\bgoogle\\b", r"\\bcheck\\b",
-            # 스페인어
-            r"\\bbuscar\\b", r"\\bbusca\\b", r"\\bconsultar\\b",
-        ]
-        
-        for search_kw in EXPLICIT_SEARCH_KEYWORDS:
-            if re.search(search_kw, q):
-                return True, f"명시적 검색 요청: {search_kw}"
+        search_kw = scan.first("explicit")
+        if search_kw is not None:
+            return True, f"명시적 검색 요청: {search_kw}"
 
         # ========================================
         # 3. 스코어링 시스템 (실시간 정보 필요성 평가)
         # ========================================
-        score = 0.0
-        matched_reasons = []
-        
-        # 3.1) 실시간 필수 정보 (높은 점수)
-        REALTIME_CRITICAL = {
-            # 날씨 (1.5점)
-            '날씨': 1.5, 'weather': 1.5, 'tiempo': 1.5,
-            '기온': 1.5, 'temperature': 1.5, 'temperatura': 1.5,
-            # 금융 (1.5점)
-            '주가': 1.5, 'stock': 1.5, 'bolsa': 1.5,
-            '환율': 1.5, 'exchange rate': 1.5, 'tipo de cambio': 1.5,
-            '비트코인': 1.3, 'bitcoin': 1.3,
-            # 뉴스/속보 (1.5점)
-            '뉴스': 1.5, 'news': 1.5, 'noticias': 1.5,
-            '속보': 1.5, 'breaking': 1.5,
-        }
-        
-        for kw, points in REALTIME_CRITICAL.items():
-            if kw in q:
-                score += points
-                matched_reasons.append(f'{kw}(+{points})')
-        
-        # 3.2) 시간성 키워드 (중간 점수)
-        TEMPORAL_KEYWORDS = {
-            '오늘': 1.0, 'today': 1.0, 'hoy': 1.0,
-            '현재': 1.0, 'current': 1.0, 'actual': 1.0,
-            '지금': 1.0, 'now': 1.0, 'ahora': 1.0,
-            '최신': 1.0, 'latest': 1.0, 'último': 1.0,
-            '최근': 0.8, 'recent': 0.8, 'reciente': 0.8,
-            '실시간': 1.2, 'real-time': 1.2, 'tiempo real': 1.2,
-        }
+        # 3.1) 실시간 필수 정보 / 3.2) 시간성 키워드 / 3.3) 의약품
+        score, matched = scan.score("realtime_critical", "temporal", "medicine")
+        matched_reasons = [f'{kw}(+{points})' for _, kw, points in matched]
         
-        for kw, points in TEMPORAL_KEYWORDS.items():
-            if kw in q:
+        # 3.4) 지역 + 날씨/시간 조합 / 3.5) 날짜/연도 포함
+        for regex, points, label in SEARCH_BONUS_PATTERNS:
+            if regex.search(q):
                 score += points
-                matched_reasons.append(f'{kw}(+{points})')
-        
-        # 3.3) 의약품 (안전을 위해 검색 권장)
-        MEDICINE_KEYWORDS = {
-            '타이레놀': 1.5, 'tylenol': 1.5,
-            '아스피린': 1.5, 'aspirin': 1.5,
-            '부작용': 1.3, 'side effect': 1.3, 'efectos secundarios': 1.3,
-            '복용법': 1.3, 'dosage': 1.3, 'dosis': 1.3,
-            '효능': 1.0, 'efficacy': 1.0,
-        }
-        
-        for kw, points in MEDICINE_KEYWORDS.items():
-            if kw in q:
-                score += points
-                matched_reasons.append(f'{kw}(+{points})')
-        
-        # 3.4) 지역 + 날씨/시간 조합 (강력한 실시간 지표)
-        location_weather_pattern = r'(서울|부산|인천|뉴욕|런던|도쿄|파리|베이징|LA|시드니).*(날씨|기온|시간|온도|weather|temperature)'
-        if re.search(location_weather_pattern, q):
-            score += 2.0
-            matched_reasons.append('지역+날씨(+2.0)')
-        
-        # 3.5) 날짜/연도 포함 (중간 점수)
-        if re.search(r'(202[0-9]|203[0-9])년?', q):
-            score += 0.8
-            matched_reasons.append('연도(+0.8)')
-        
-        if re.search(r'\\b(\\d{1,2}월|어제|내일|방금)\\b', q):
-            score += 0.5
-            matched_reasons.append('날짜(+0.5)')
+                matched_reasons.append(f'{label}(+{points})')
         
         # ========================================
         # 4. Threshold 판단 (2.5 이상이면 검색)
         # ========================================
-        THRESHOLD = 2.5
+        THRESHOLD = SEARCH_SCORE_THRESHOLD
         
         if score >= THRESHOLD:
             reason = f"실시간 정보 필요 (점수: {score:.1f}/{THRESHOLD}, 매칭: {', '.join(matched_reasons)})"
@@ -299,6 +313,23 @@ class WebSearchAPI:
     
     def search_and_create_context(self, query, session_state=None):
         """검색을 수행하고 컨텍스트를 생성합니다."""
+        entry = self.run_search(query)
+        
+        # 세션 상태 저장
+        if session_state is not None:
+            self.store_search_context(session_state, entry)
+        else:
+            logger.error("❌ 세션 상태가 전달되지 않음!")
+        
+        return self.format_search_context(entry["result"])
+    
+    def run_search(self, query):
+        """
+        검색만 수행합니다 (세션 상태를 건드리지 않으므로 작업 스레드에서 호출 가능).
+        
+        Returns:
+            {"type", "query", "result", "timestamp"} — store_search_context로 세션에 저장
+        """
         logger.info(f"검색 시작: '{query}'")
         
         # 쿼리에서 '검색' 키워드 제거
@@ -315,29 +346,31 @@ class WebSearchAPI:
             logger.info(f"날씨 쿼리 개선: '{clean_query}'")
         
         # 검색 수행
-        search_result = self.search_web(clean_query)
+        return {
+            "type": "naver_search",
+            "query": clean_query,
+            "result": self.search_web(clean_query),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def store_search_context(session_state, entry):
+        """run_search 결과를 세션 상태에 저장합니다 (스크립트 스레드에서 호출). Returns: 컨텍스트 ID"""
+        if "search_contexts" not in session_state:
+            session_state.search_contexts = {}
+        if "current_context" not in session_state:
+            session_state.current_context = None
         
-        # 세션 상태 저장
-        if session_state is not None:
-            if "search_contexts" not in session_state:
-                session_state.search_contexts = {}
-            if "current_context" not in session_state:
-                session_state.current_context = None
-            
-            context_id = str(uuid.uuid4())
-            session_state.search_contexts[context_id] = {
-                "type": "naver_search",
-                "query": clean_query,
-                "result": search_result,
-                "timestamp": datetime.now().isoformat()
-            }
-            session_state.current_context = context_id
-            
-            logger.info(f"✅ 검색 컨텍스트 저장 완료: {context_id}")
-        else:
-            logger.error("❌ 세션 상태가 전달되지 않음!")
+        context_id = str(uuid.uuid4())
+        session_state.search_contexts[context_id] = entry
+        session_state.current_context = context_id
         
-        # 멀티턴 대화를 위한 안내 추가
+        logger.info(f"✅ 검색 컨텍스트 저장 완료: {context_id}")
+        return context_id
+    
+    @staticmethod
+    def format_search_context(search_result):
+        """검색 결과에 멀티턴 대화를 위한 안내를 붙입니다."""
         enhanced_result = search_result + "\n\n💡 검색 결과에 대해 더 질문하시면 답변해드릴게요. 예를 들어:\n"
         enhanced_result += "- '검색 결과를 요약해'\n"
         enhanced_result += "- '첫 번째 결과에 대해 자세히 설명해줘'\n"
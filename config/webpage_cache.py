@@ -0,0 +1,235 @@
+# config/webpage_cache.py
+# 웹페이지 본문 디스크 캐시 (diskcache, 조건부 GET 재검증)
+#
+# - 정규화한 URL을 키로 추출된 본문, 메타데이터, ETag / Last-Modified를 저장합니다.
+#   프로세스 재시작 후에도 남고, 같은 캐시 디렉터리를 쓰는 모든 프로세스/레플리카가 공유합니다.
+# - 신선 기간(WEBPAGE_CACHE_TTL, 사이트 어댑터가 따로 정할 수 있음) 안에는 네트워크 없이
+#   반환하고, 지나면 검증자로 조건부 GET을 보내 304면 저장된 본문을 그대로 씁니다.
+# - 실패 결과("❌", "⚠️")는 짧은 TTL로만 저장합니다. 재검증 중 일시적으로 실패하면 이전 본문을
+#   반환하되, 마지막으로 가져온 시점에 정한 stale_until까지만 반환합니다 (실패해도 연장하지 않음).
+#   404/410(WEBPAGE_NOT_FOUND)은 확정된 실패이므로 이전 본문을 지우고 실패 결과로 바꿉니다.
+# - 같은 URL을 여러 사용자가 동시에 요청하면 한 곳만 가져오고 나머지는 결과를 기다립니다
+#   (캐시 디렉터리 안의 잠금 키 사용).
+# - 캐시 크기는 WEBPAGE_CACHE_SIZE_LIMIT로 제한되며 가장 오래 쓰지 않은 항목부터 지웁니다.
+
+import logging
+import os
+import threading
+import time
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# WEBPAGE_CACHE=0 이면 캐시 없이 매번 가져옴
+WEBPAGE_CACHE_ENABLED = os.environ.get("WEBPAGE_CACHE", "1") == "1"
+WEBPAGE_CACHE_DIR = os.environ.get("WEBPAGE_CACHE_DIR", os.path.join("api_cache", "webpages"))
+WEBPAGE_CACHE_TTL = int(os.environ.get("WEBPAGE_CACHE_TTL", str(6 * 3600)))  # 성공 결과 신선 기간
+WEBPAGE_CACHE_ERROR_TTL = int(os.environ.get("WEBPAGE_CACHE_ERROR_TTL", "300"))  # 실패 결과 보관 기간
+WEBPAGE_CACHE_REVALIDATE_WINDOW = 7 * 86400  # 신선 기간이 지난 뒤 조건부 GET용으로 보관하는 기간
+WEBPAGE_CACHE_SIZE_LIMIT = int(os.environ.get("WEBPAGE_CACHE_SIZE_LIMIT", str(256 * 1024 * 1024)))
+WEBPAGE_FETCH_LOCK_TIMEOUT = 30  # 다른 프로세스의 가져오기를 기다리는 최대 시간 (초)
+
+_FAILURE_PREFIXES = ("❌", "⚠️")
+# 페이지가 없어졌다는 확정 실패 (404/410): 이전 본문을 반환하지 않음
+WEBPAGE_NOT_FOUND = "❌ 웹페이지를 찾을 수 없습니다 (404)"
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref_src", "spm"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """
+    캐시 키용 URL 정규화 (요청은 원래 URL로 보냅니다).
+    scheme/호스트 소문자, 기본 포트·fragment·추적 파라미터 제거, 쿼리 정렬
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith("utm_") or k.lower() in _TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def is_failure_text(text):
+    return not text or text.startswith(_FAILURE_PREFIXES)
+
+
+def is_not_found_text(text):
+    return bool(text) and text.startswith(WEBPAGE_NOT_FOUND)
+
+
+class WebpageCache:
+    """
+    diskcache 기반 웹페이지 본문 캐시.
+
+    Args:
+        directory: 캐시 디렉터리 (레플리카 간 공유하려면 공유 볼륨 경로)
+        size_limit: 최대 디스크 사용량 (바이트)
+    """
+
+    def __init__(self, directory=WEBPAGE_CACHE_DIR, size_limit=WEBPAGE_CACHE_SIZE_LIMIT):
+        self.directory = directory
+        self.size_limit = size_limit
+        self._store = None
+        self._store_failed = False
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "refetched": 0,
+                      "errors": 0, "stale_served": 0, "waited": 0}
+
+    def _get_store(self):
+        if self._store is None and not self._store_failed:
+            with self._lock:
+                if self._store is None and not self._store_failed:
+                    try:
+                        from diskcache import Cache
+                        self._store = Cache(
+                            self.directory,
+                            size_limit=self.size_limit,
+                            eviction_policy="least-recently-used",
+                        )
+                    except Exception as e:
+                        self._store_failed = True
+                        logger.warning(f"⚠️ 웹페이지 캐시 초기화 실패, 캐시 없이 진행: {e}")
+        return self._store
+
+    @staticmethod
+    def _result(entry):
+        # 메타데이터 저장 이전 항목은 None
+        return entry["text"], entry.get("metadata")
+
+    @staticmethod
+    def _fresh(entry, now):
+        return entry is not None and entry.get("fresh_until", 0) > now
+
+    def _wait_for_other(self, store, key, lock_key):
+        """다른 프로세스가 가져오는 중이면 결과를 기다립니다. Returns: 잠금 토큰 (결과가 생기면 None)"""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + WEBPAGE_FETCH_LOCK_TIMEOUT
+        waited = False
+        while True:
+            if store.add(lock_key, token, expire=WEBPAGE_FETCH_LOCK_TIMEOUT):
+                return token
+            if not waited:
+                waited = True
+                self.stats["waited"] += 1
+            time.sleep(0.05)
+            if self._fresh(store.get(key), time.time()):
+                return None
+            if time.monotonic() > deadline:
+                return token  # 잠금이 만료되지 않았더라도 직접 가져옴
+
+    def get_or_fetch(self, url, fetch, ttl=None):
+        """
+        캐시된 본문을 반환하거나 fetch로 가져와 저장합니다.
+
+        Args:
+            url: 요청 URL
+            fetch: fetch(url, 조건부 요청 헤더) -> (본문, {"etag", "last_modified"}, 메타데이터)
+                   304 Not Modified면 본문 None
+            ttl: 성공 결과 신선 기간 (사이트 어댑터별, 기본 WEBPAGE_CACHE_TTL)
+
+        Returns:
+            (본문, 메타데이터) — 실패 시 본문은 "❌"/"⚠️"로 시작하는 안내 문자열
+        """
+        store = self._get_store() if WEBPAGE_CACHE_ENABLED else None
+        if store is None:
+            text, _, metadata = fetch(url, {})
+            return text, metadata
+
+        key = f"webpage:{normalize_url(url)}"
+        try:
+            entry = store.get(key)
+        except Exception as e:
+            logger.warning(f"⚠️ 웹페이지 캐시 조회 실패: {e}")
+            text, _, metadata = fetch(url, {})
+            return text, metadata
+        if self._fresh(entry, time.time()):
+            self.stats["hits"] += 1
+            logger.debug(f"🗂️ 웹페이지 캐시 적중: {url}")
+            return self._result(entry)
+
+        lock_key = f"{key}:lock"
+        token = self._wait_for_other(store, key, lock_key)
+        try:
+            entry = store.get(key)
+            if self._fresh(entry, time.time()):
+                self.stats["hits"] += 1
+                return self._result(entry)
+            return self._refresh(store, key, url, entry, fetch, ttl or WEBPAGE_CACHE_TTL)
+        finally:
+            if token is not None and store.get(lock_key) == token:
+                store.delete(lock_key)
+
+    def _refresh(self, store, key, url, entry, fetch, ttl):
+        cached_ok = entry is not None and entry.get("ok")
+        headers = {}
+        if cached_ok:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        t0 = time.perf_counter()
+        text, validators, metadata = fetch(url, headers)
+        now = time.time()
+
+        if text is None and cached_ok:
+            self.stats["revalidated"] += 1
+            entry["fresh_until"] = now + ttl
+            entry["stale_until"] = now + ttl + WEBPAGE_CACHE_REVALIDATE_WINDOW
+            store.set(key, entry, expire=ttl + WEBPAGE_CACHE_REVALIDATE_WINDOW)
+            logger.info(f"TIMING: webpage revalidate {url} took {time.perf_counter() - t0:.4f}s (304)")
+            return self._result(entry)
+
+        if text is None or is_failure_text(text):
+            # 이전 항목에 stale_until이 없으면 (필드 추가 이전 항목) 지금부터 한 번만 정함
+            stale_until = entry.get("stale_until", now + WEBPAGE_CACHE_REVALIDATE_WINDOW) if cached_ok else 0
+            if cached_ok and not is_not_found_text(text) and stale_until > now:
+                # 일시적인 재검증 실패: 이전 본문을 반환하고 실패 TTL 뒤에 다시 시도 (stale_until은 그대로)
+                self.stats["stale_served"] += 1
+                entry["fresh_until"] = min(now + WEBPAGE_CACHE_ERROR_TTL, stale_until)
+                entry["stale_until"] = stale_until
+                store.set(key, entry, expire=stale_until - now)
+                logger.warning(f"⚠️ 웹페이지 재검증 실패, 이전 본문 사용: {url}")
+                return self._result(entry)
+            if cached_ok:
+                logger.warning(f"⚠️ 웹페이지 재검증 실패, 이전 본문 폐기: {url}")
+            self.stats["errors"] += 1
+            text = text or f"❌ 웹페이지 내용을 가져오지 못했습니다: {url}"
+            store.set(key, {"text": text, "ok": False, "metadata": metadata or None,
+                            "fresh_until": now + WEBPAGE_CACHE_ERROR_TTL},
+                      expire=WEBPAGE_CACHE_ERROR_TTL)
+            return text, metadata
+
+        self.stats["refetched" if entry is not None else "misses"] += 1
+        validators = validators or {}
+        has_validators = bool(validators.get("etag") or validators.get("last_modified"))
+        store.set(key, {
+            "text": text,
+            "ok": True,
+            "metadata": metadata or None,
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "fresh_until": now + ttl,
+            "stale_until": now + ttl + WEBPAGE_CACHE_REVALIDATE_WINDOW,
+        }, expire=ttl + (WEBPAGE_CACHE_REVALIDATE_WINDOW if has_validators else 0))
+        return text, metadata
+
+    def clear(self):
+        store = self._get_store()
+        if store is not None:
+            store.clear()
+
+
+# 프로세스 전역 웹페이지 캐시
+webpage_cache = WebpageCache()
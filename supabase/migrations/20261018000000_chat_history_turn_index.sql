@@ -0,0 +1,23 @@
+-- chat_history: 세션 내 턴 번호(turn_index) 추가
+--
+-- 채팅 이력 저장은 세션 전체를 지우고 다시 쓰는 대신 (session_id, turn_index) 키로
+-- 새 턴/변경된 턴만 upsert 합니다 (config/storage_utils.py save_chat_history_to_supabase).
+
+alter table public.chat_history
+    add column if not exists turn_index integer;
+
+-- 기존 행 백필: 세션별 생성 순서대로 0부터 번호 부여
+with numbered as (
+    select ctid as row_ctid,
+           row_number() over (partition by session_id order by created_at) - 1 as rn
+    from public.chat_history
+    where turn_index is null
+)
+update public.chat_history c
+set turn_index = numbered.rn
+from numbered
+where c.ctid = numbered.row_ctid;
+
+-- upsert 충돌 키 (on_conflict=session_id,turn_index)
+create unique index if not exists chat_history_session_turn_uidx
+    on public.chat_history (session_id, turn_index);
@@ -0,0 +1,134 @@
+-- chat_sessions: 사이드바용 세션 요약 테이블 (chat_history 쓰기 시 트리거로 유지)
+--
+-- 세션 목록은 사용자의 모든 질문 행을 내려받아 파이썬에서 묶는 대신
+-- 이 테이블을 (last_updated, id) 키셋 페이지네이션으로 조회합니다
+-- (config/storage_utils.py get_chat_sessions_page_from_supabase).
+--
+-- 접근 제어: 요약에는 사용자의 첫 질문이 들어 있으므로 RLS를 켜고, 호출자가 같은 세션의
+-- chat_history 행을 볼 수 있을 때만 요약 행을 보여줍니다 (chat_history의 RLS/권한을 그대로 따름).
+-- 쓰기 정책은 없으며 요약은 SECURITY DEFINER 트리거로만 갱신됩니다.
+-- 두 함수는 PostgREST RPC로 호출되지 않도록 public/anon/authenticated의 실행 권한을 회수합니다.
+
+-- 권장 인덱스: 세션 로드(세션 내 정렬)와 사용자별 조회
+create index if not exists chat_history_session_created_idx
+    on public.chat_history (session_id, created_at);
+create index if not exists chat_history_user_created_idx
+    on public.chat_history (user_id, created_at);
+
+create table if not exists public.chat_sessions (
+    id text primary key,              -- chat_history.session_id
+    user_id text not null,
+    title text not null default '',   -- 첫 질문 (앞 100자)
+    created_at timestamptz not null,
+    last_updated timestamptz not null,
+    turn_count integer not null default 0
+);
+
+-- 키셋 페이지네이션: where user_id = ? and (last_updated, id) < (?, ?) order by last_updated desc, id desc
+create index if not exists chat_sessions_user_updated_idx
+    on public.chat_sessions (user_id, last_updated desc, id desc);
+
+alter table public.chat_sessions enable row level security;
+
+-- 읽기: 같은 세션의 chat_history 행이 호출자에게 보일 때만 (하위 쿼리에 chat_history RLS 적용)
+-- session_id 타입으로 비교해야 chat_history (session_id, created_at) 인덱스를 사용
+do $$
+declare
+    session_id_type text;
+begin
+    select format_type(atttypid, atttypmod) into session_id_type
+    from pg_attribute
+    where attrelid = 'public.chat_history'::regclass and attname = 'session_id' and not attisdropped;
+
+    execute 'drop policy if exists chat_sessions_select_visible_history on public.chat_sessions';
+    execute format(
+        'create policy chat_sessions_select_visible_history on public.chat_sessions
+             for select
+             using (exists (
+                 select 1 from public.chat_history h
+                 where h.session_id = chat_sessions.id::%s
+             ))',
+        session_id_type
+    );
+end;
+$$;
+
+-- 세션 하나의 요약 행을 다시 계산 (행이 없으면 요약 삭제)
+create or replace function public.refresh_chat_session_summary(p_session_id public.chat_history.session_id%TYPE)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if not exists (select 1 from public.chat_history where session_id = p_session_id) then
+        delete from public.chat_sessions where id = p_session_id::text;
+        return;
+    end if;
+
+    insert into public.chat_sessions (id, user_id, title, created_at, last_updated, turn_count)
+    select p_session_id::text,
+           (array_agg(user_id::text order by turn_index nulls last, created_at))[1],
+           left(coalesce((array_agg(question order by turn_index nulls last, created_at))[1], ''), 100),
+           min(created_at),
+           max(created_at),
+           count(*)
+    from public.chat_history
+    where session_id = p_session_id
+    on conflict (id) do update
+        set user_id = excluded.user_id,
+            title = excluded.title,
+            created_at = excluded.created_at,
+            last_updated = excluded.last_updated,
+            turn_count = excluded.turn_count;
+end;
+$$;
+
+-- 문장 단위 트리거: 일괄 upsert/delete 한 번에 세션당 한 번만 요약 갱신
+create or replace function public.chat_history_sessions_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    sid public.chat_history.session_id%TYPE;
+begin
+    if TG_OP = 'DELETE' then
+        for sid in select distinct session_id from old_rows loop
+            perform public.refresh_chat_session_summary(sid);
+        end loop;
+    else
+        for sid in select distinct session_id from new_rows loop
+            perform public.refresh_chat_session_summary(sid);
+        end loop;
+    end if;
+    return null;
+end;
+$$;
+
+-- RPC로 직접 호출하지 못하도록 실행 권한 회수 (트리거는 함수 소유자 권한으로 실행)
+revoke execute on function public.refresh_chat_session_summary(public.chat_history.session_id%TYPE) from public, anon, authenticated;
+revoke execute on function public.chat_history_sessions_trigger() from public, anon, authenticated;
+
+drop trigger if exists chat_history_sessions_insert on public.chat_history;
+create trigger chat_history_sessions_insert
+    after insert on public.chat_history
+    referencing new table as new_rows
+    for each statement execute function public.chat_history_sessions_trigger();
+
+drop trigger if exists chat_history_sessions_update on public.chat_history;
+create trigger chat_history_sessions_update
+    after update on public.chat_history
+    referencing new table as new_rows
+    for each statement execute function public.chat_history_sessions_trigger();
+
+drop trigger if exists chat_history_sessions_delete on public.chat_history;
+create trigger chat_history_sessions_delete
+    after delete on public.chat_history
+    referencing old table as old_rows
+    for each statement execute function public.chat_history_sessions_trigger();
+
+-- 기존 세션 백필
+select public.refresh_chat_session_summary(session_id)
+from (select distinct session_id from public.chat_history) s;
@@ -0,0 +1,29 @@
+-- chat_history: 로컬 SQLite 미러 동기화용 updated_at 워터마크
+--
+-- 로컬 미러(config/local_store.py)는 updated_at > 마지막 워터마크 인 행만 가져옵니다.
+-- created_at은 턴 생성 시각(정렬용)으로 유지하고, 수정 시에는 updated_at만 갱신됩니다.
+
+alter table public.chat_history
+    add column if not exists updated_at timestamptz not null default now();
+
+-- 기존 행 백필
+update public.chat_history set updated_at = created_at where updated_at <> created_at;
+
+create or replace function public.chat_history_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists chat_history_touch_updated_at on public.chat_history;
+create trigger chat_history_touch_updated_at
+    before update on public.chat_history
+    for each row execute function public.chat_history_touch_updated_at();
+
+-- 사용자별 증분 동기화: where user_id = ? and updated_at > ? order by updated_at
+create index if not exists chat_history_user_updated_idx
+    on public.chat_history (user_id, updated_at);
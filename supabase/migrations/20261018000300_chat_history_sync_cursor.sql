@@ -0,0 +1,12 @@
+-- chat_history: 로컬 미러 pull 커서 인덱스
+--
+-- 한 문장(일괄 upsert, 가져오기 배치)으로 쓴 행은 updated_at(now())이 모두 같으므로
+-- 로컬 미러(config/local_store.py)는 updated_at만이 아니라 (updated_at, session_id, turn_index)
+-- 커서로 페이지를 나눕니다:
+--   where user_id = ? and (updated_at, session_id, turn_index) > (?, ?, ?)
+--   order by updated_at, session_id, turn_index
+
+create index if not exists chat_history_user_sync_cursor_idx
+    on public.chat_history (user_id, updated_at, session_id, turn_index);
+
+drop index if exists public.chat_history_user_updated_idx;